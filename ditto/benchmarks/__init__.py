@@ -0,0 +1,158 @@
+"""
+Load tests and benchmarks for the bot's hot paths, kept out of the modules they exercise.
+
+Run them from the ditto directory, e.g. `python -m benchmarks.market`, with DIRECTORY set
+the way the launcher sets it. The ones that need a database read DATABASE_URL, REDIS_URL
+or MONGO_URL, and only ever write to a scratch schema or scratch keys, which are dropped
+afterwards. Each one asserts the new code behaves like what it replaced before timing it.
+"""
+import contextlib
+import logging
+import os
+from pathlib import Path
+
+import asyncpg
+import ujson
+from dittocore.commondb import OWNERSHIP_SCHEMA, CommonDB
+from dittocore.leaderboards import Leaderboards
+
+# The columns of the bot's tables that the benchmarked code reads or writes
+SCRATCH_TABLES = """
+CREATE TABLE users (
+    u_id bigint PRIMARY KEY,
+    pokes bigint[] NOT NULL DEFAULT '{}',
+    inventory json,
+    items json,
+    mewcoins bigint NOT NULL DEFAULT 0,
+    redeems integer NOT NULL DEFAULT 0,
+    tradelock boolean NOT NULL DEFAULT false,
+    hunt text,
+    chain integer NOT NULL DEFAULT 0,
+    fishing_exp bigint NOT NULL DEFAULT 0,
+    staff text
+);
+CREATE TABLE achievements (
+    u_id bigint PRIMARY KEY,
+    shiny_caught integer NOT NULL DEFAULT 0,
+    pokemon_caught integer NOT NULL DEFAULT 0,
+    market_purchased integer NOT NULL DEFAULT 0,
+    market_sold integer NOT NULL DEFAULT 0
+);
+CREATE TABLE pokes (
+    id bigserial PRIMARY KEY,
+    pokname text,
+    name text,
+    poknick text,
+    pokelevel integer,
+    counter integer,
+    hpiv integer,
+    atkiv integer,
+    defiv integer,
+    spatkiv integer,
+    spdefiv integer,
+    speediv integer,
+    hpev integer,
+    atkev integer,
+    defev integer,
+    spatkev integer,
+    spdefev integer,
+    speedev integer,
+    moves text[],
+    hitem text,
+    exp integer,
+    nature text,
+    expcap integer,
+    shiny boolean,
+    price integer,
+    market_enlist boolean,
+    fav boolean,
+    ability_index integer,
+    gender text,
+    caught_by bigint,
+    radiant boolean,
+    skin text
+);
+CREATE TABLE market (
+    id bigserial PRIMARY KEY,
+    poke bigint,
+    owner bigint,
+    price integer,
+    buyer bigint
+);
+"""
+
+
+def data_directory() -> Path:
+    return Path(os.environ["DIRECTORY"]) / "shared" / "data"
+
+
+def load_dex():
+    """The Dex the bot would load, read from the data files instead of mongo."""
+    from dittocore.dex import Dex
+
+    return Dex.from_files(data_directory())
+
+
+@contextlib.asynccontextmanager
+async def scratch_pool(dsn: str, schema: str, *, size: int = 2, on_connect=None):
+    """
+    Yields a pool whose connections only see `schema`, a fresh copy of SCRATCH_TABLES.
+
+    Connections decode json like the bot's do, and are passed to `on_connect` as they
+    are opened. The schema is dropped afterwards.
+    """
+
+    async def init(con):
+        await con.set_type_codec(
+            "json", encoder=ujson.dumps, decoder=ujson.loads, schema="pg_catalog"
+        )
+        if on_connect is not None:
+            on_connect(con)
+
+    con = await asyncpg.connect(dsn)
+    try:
+        await con.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE; CREATE SCHEMA {schema}")
+        await con.execute(f"SET search_path = {schema}; {SCRATCH_TABLES}; {OWNERSHIP_SCHEMA}")
+        async with asyncpg.create_pool(
+            dsn,
+            min_size=size,
+            max_size=size,
+            init=init,
+            server_settings={"search_path": schema},
+        ) as pool:
+            yield pool
+    finally:
+        await con.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        await con.close()
+
+
+class _RedisManager:
+    def __init__(self, redis):
+        self.redis = redis
+
+
+class ScratchBot:
+    """
+    The parts of the bot that the benchmarked code reaches for, pointed at scratch databases.
+
+    Leaderboard updates are skipped when there is no redis, the same as when the bot's
+    redis is down.
+    """
+
+    def __init__(self, pool=None, *, mongo=None, redis=None, dex=None, cluster_id: int = 0):
+        self.db = [pool, mongo, redis]
+        self.redis_manager = _RedisManager(redis)
+        self.dex = dex
+        self.logger = logging.getLogger("benchmarks")
+        self.cluster = {
+            "id": cluster_id,
+            "name": f"cluster {cluster_id}",
+            "shards": [cluster_id],
+        }
+        self.latency = 0.05
+        self.guilds = []
+        self.commondb = CommonDB(self)
+        self.leaderboards = Leaderboards(self)
+
+    def botbanned(self, id):
+        return False
@@ -0,0 +1,142 @@
+"""
+Times catches on a single connection, as the old reward writes and through the CatchRewardPipeline.
+
+Usage: DATABASE_URL=... REDIS_URL=... python -m benchmarks.catch_rewards
+"""
+import asyncio
+import os
+import random
+import time
+
+import aioredis
+from dittocore.leaderboards import _key
+from dittocore.mission_progress import MissionProgress
+from pokemon_utils.catch_rewards import CatchRewardPipeline
+
+from benchmarks import ScratchBot, load_dex, scratch_pool
+
+
+class _UnflushedUsers:
+    """Mongo's users collection before MissionProgress has flushed anything to it."""
+
+    async def find_one(self, *args, **kwargs):
+        return None
+
+
+class _Mongo:
+    users = _UnflushedUsers()
+
+
+async def benchmark(dsn: str, redis_url: str, catches: int = 1000):
+    """
+    Times `catches` catches each way, and checks both gave out every poke.
+
+    Both paths add to the pokemon leaderboard on the given redis. The old path also made a
+    mongo read and write for mission progress, which is left out here, so it was slower
+    than this. Returns (old catches per second, pipeline catches per second, old postgres
+    statements per catch, pipeline postgres statements per catch).
+    """
+    statements = 0
+
+    def count(record):
+        nonlocal statements
+        statements += 1
+
+    redis = await aioredis.create_pool(redis_url)
+    try:
+        async with scratch_pool(
+            dsn, "catch_check", size=1, on_connect=lambda con: con.add_query_logger(count)
+        ) as pool:
+            bot = ScratchBot(pool, mongo=_Mongo(), redis=redis, dex=load_dex())
+            # Not started, so increments only add up in memory like they do between flushes
+            bot.mission_progress = MissionProgress(bot)
+            pipeline = CatchRewardPipeline(bot)
+            await pool.execute(
+                "INSERT INTO users (u_id, inventory, items, hunt) "
+                "SELECT u_id, '{\"iv-multiplier\": 10}', '{}', 'Eevee' FROM unnest('{1,2}'::bigint[]) AS u_id; "
+                "INSERT INTO achievements (u_id) VALUES (1), (2)"
+            )
+
+            # What Spawn.on_message wrote for a catch before, minus the mongo mission update
+            async def old_catch(user_id, pokemon, premium):
+                async with pool.acquire() as pconn:
+                    inventory = await pconn.fetchval(
+                        "SELECT inventory::json from users WHERE u_id = $1", user_id
+                    )
+                boosted = random.randrange(500) < inventory.get("iv-multiplier", 0)
+                await bot.commondb.create_poke(
+                    bot, user_id, pokemon, boosted=boosted, level=random.randint(1, 60)
+                )
+                async with pool.acquire() as pconn:
+                    items = await pconn.fetchval(
+                        "SELECT items::json FROM users WHERE u_id = $1", user_id
+                    )
+                    await pconn.execute(
+                        "UPDATE achievements SET pokemon_caught = pokemon_caught + 1 WHERE u_id = $1",
+                        user_id,
+                    )
+                    if max(1, int(random.random() * 350)) in range(1, 8):
+                        berry = random.choice(pipeline.berries)
+                        items[berry] = items.get(berry, 0) + 1
+                        await pconn.execute(
+                            "UPDATE users SET items = $1::json WHERE u_id = $2", items, user_id
+                        )
+                    if not random.randint(0, 200):
+                        inventory = await pconn.fetchval(
+                            "SELECT inventory::json FROM users WHERE u_id = $1", user_id
+                        )
+                        inventory["common chest"] = inventory.get("common chest", 0) + 1
+                        await pconn.execute(
+                            "UPDATE users SET inventory = $1::json where u_id = $2",
+                            inventory,
+                            user_id,
+                        )
+                    if premium:
+                        await pconn.execute(
+                            "UPDATE users SET mewcoins = mewcoins + $1 where u_id = $2",
+                            random.randint(100, 250),
+                            user_id,
+                        )
+
+            await old_catch(1, "Pikachu", True)
+            await pipeline.catch(2, "Pikachu", premium=True)
+            statements = 0
+            started = time.perf_counter()
+            for _ in range(catches):
+                await old_catch(1, "Pikachu", True)
+            old = catches / (time.perf_counter() - started)
+            old_statements = statements / catches
+            statements = 0
+            started = time.perf_counter()
+            for _ in range(catches):
+                await pipeline.catch(2, "Pikachu", premium=True)
+            new = catches / (time.perf_counter() - started)
+            new_statements = statements / catches
+
+            # Both users own every poke they caught, in order, and every catch was counted
+            for user_id in (1, 2):
+                owned, last, caught = await pool.fetchrow(
+                    "SELECT count(*), max(position), "
+                    "(SELECT pokemon_caught FROM achievements WHERE u_id = $1) "
+                    "FROM ownership WHERE u_id = $1",
+                    user_id,
+                )
+                assert owned == last == caught == catches + 1
+            progress = await bot.mission_progress.get(2)
+            assert progress["catch-count"] == catches + 1
+    finally:
+        await redis.execute("ZREM", _key("pokemon"), 1, 2)
+        redis.close()
+        await redis.wait_closed()
+    return old, new, old_statements, new_statements
+
+
+if __name__ == "__main__":
+    old, new, old_statements, new_statements = asyncio.run(
+        benchmark(os.environ["DATABASE_URL"], os.environ.get("REDIS_URL", "redis://127.0.0.1"))
+    )
+    print(
+        f"Catches per second on one connection: old {old:.0f}, pipeline {new:.0f} "
+        f"({new / old:.1f}x), postgres statements per catch: old {old_statements:.1f}, "
+        f"pipeline {new_statements:.1f}"
+    )
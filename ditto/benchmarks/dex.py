@@ -0,0 +1,101 @@
+"""
+Times the reference data behind an /info, as the old per-call mongo reads and as Dex reads.
+
+Usage: MONGO_URL=... python -m benchmarks.dex
+"""
+import asyncio
+import os
+import random
+import time
+
+from dittocore.dex import TYPE_IDS
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from benchmarks import load_dex
+
+
+async def benchmark(dex, mongo, lookups: int = 2000, seed: int = 0):
+    """
+    Times `lookups` /info lookups of random forms each way.
+
+    `mongo` is a scratch motor database, it is filled from `dex` with the same indexes the
+    reference collections have and dropped afterwards. Returns (mongo seconds, dex seconds),
+    after checking both give the same answers.
+    """
+    forms = [form for form in dex.all_forms() if dex.types_of(form.pokemon_id)]
+    pokemon_ids = {form.pokemon_id for form in forms}
+    await mongo.forms.insert_many(
+        [{"identifier": form.identifier, "pokemon_id": form.pokemon_id} for form in forms]
+    )
+    await mongo.ptypes.insert_many(
+        [{"id": pokemon_id, "types": list(dex.types_of(pokemon_id))} for pokemon_id in pokemon_ids]
+    )
+    await mongo.types.insert_many(
+        [{"id": type_id, "identifier": dex.type_identifier(type_id)} for type_id in TYPE_IDS]
+    )
+    await mongo.pokemon_stats.insert_many(
+        [
+            {"pokemon_id": pokemon_id, "stats": list(dex.base_stats(pokemon_id) or ())}
+            for pokemon_id in pokemon_ids
+        ]
+    )
+    await mongo.poke_abilities.insert_many(
+        [
+            {"pokemon_id": pokemon_id, "ability_id": ability_id}
+            for pokemon_id in pokemon_ids
+            for ability_id in dex.abilities_of(pokemon_id)
+        ]
+    )
+    ability_ids = {a for pokemon_id in pokemon_ids for a in dex.abilities_of(pokemon_id)}
+    await mongo.abilities.insert_many(
+        [{"id": a, "identifier": dex.ability_identifier(a)} for a in ability_ids]
+    )
+    await mongo.forms.create_index("identifier")
+    for collection in (mongo.ptypes, mongo.types, mongo.abilities):
+        await collection.create_index("id")
+    for collection in (mongo.pokemon_stats, mongo.poke_abilities):
+        await collection.create_index("pokemon_id")
+
+    # What get_pokemon_info read for every /info before
+    async def from_mongo(name):
+        form = await mongo.forms.find_one({"identifier": name})
+        ptypes = await mongo.ptypes.find_one({"id": form["pokemon_id"]})
+        types = [(await mongo.types.find_one({"id": t}))["identifier"] for t in ptypes["types"]]
+        stats = (await mongo.pokemon_stats.find_one({"pokemon_id": form["pokemon_id"]}))["stats"]
+        abilities = []
+        async for record in mongo.poke_abilities.find({"pokemon_id": form["pokemon_id"]}):
+            abilities.append(
+                (await mongo.abilities.find_one({"id": record["ability_id"]}))["identifier"]
+            )
+        return types, tuple(stats), sorted(abilities)
+
+    def from_dex(name):
+        form = dex.form(name)
+        types = [dex.type_identifier(t) for t in dex.types_of(form.pokemon_id)]
+        stats = dex.base_stats(form.pokemon_id) or ()
+        abilities = [dex.ability_identifier(a) for a in dex.abilities_of(form.pokemon_id)]
+        return types, stats, sorted(abilities)
+
+    rng = random.Random(seed)
+    names = [rng.choice(forms).identifier for _ in range(lookups)]
+    try:
+        await from_mongo(names[0])
+        started = time.perf_counter()
+        expected = [await from_mongo(name) for name in names]
+        old = time.perf_counter() - started
+        started = time.perf_counter()
+        found = [from_dex(name) for name in names]
+        new = time.perf_counter() - started
+    finally:
+        await mongo.client.drop_database(mongo.name)
+    assert found == expected
+    return old, new
+
+
+if __name__ == "__main__":
+    mongo = AsyncIOMotorClient(os.environ["MONGO_URL"])["dex_check"]
+    old, new = asyncio.run(benchmark(load_dex(), mongo))
+    print(
+        f"2000 /info lookups: mongo {old * 1000:9.2f}ms, dex {new * 1000:7.2f}ms "
+        f"({old / new:.0f}x), same answers"
+    )
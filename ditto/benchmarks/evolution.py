@@ -0,0 +1,120 @@
+"""
+Checks the evolution graph evolves pokes exactly like the chain walk evolve() used to do,
+and times both.
+
+Usage: python -m benchmarks.evolution
+"""
+import random
+import time
+
+from dittocogs.pokemon_list import is_formed
+from dittocore.dex import Dex
+from pokemon_utils.evolution import EVOLUTION_BLOCKERS, EvoEdge, EvolutionGraph
+
+from benchmarks import data_directory
+
+
+def old_evolution(dex, poke, region, active_item_id=None, override_lvl_100=False):
+    """What evolve() used to pick for "poke", without its database reads. Returns a name or None."""
+    name = poke["pokname"].lower()
+    if poke["hitem"] in EVOLUTION_BLOCKERS or name == "egg":
+        return None
+    if is_formed(name) or any(name.endswith(x) for x in ("-staff", "-custom")):
+        return None
+    form = dex.form(name)
+    if form is None:
+        return None
+    species = dex.species_by_identifier(form.identifier)
+    if species is None:
+        return None
+    potential_evos = []
+    for x in dex.evolution_chain(species.evolution_chain_id):
+        if x.evolves_from_species_id != form.pokemon_id:
+            continue
+        raw = dex.evolution(x.id)
+        if raw is not None:
+            potential_evos.append(raw)
+    if not potential_evos or region is None:
+        return None
+    held_item_id = dex.item_id(poke["hitem"] or "")
+    best_score, best_id = -1, None
+    for raw in potential_evos:
+        edge = EvoEdge.from_raw(raw, dex)
+        if not edge.meets(poke, held_item_id, active_item_id, override_lvl_100):
+            continue
+        if edge.region and edge.region != region:
+            continue
+        if edge.reqs > best_score:
+            best_score, best_id = edge.reqs, raw["evolved_species_id"]
+    if best_id is None:
+        return None
+    return dex.species(best_id).identifier.capitalize()
+
+
+def check_graph(dex, count: int = 50000, seed: int = 0):
+    """
+    Checks the graph evolves `count` random pokes exactly like the old chain walk did.
+
+    The pokes are weighted towards ones that have evolutions, with the held items, moves,
+    levels and regions those evolutions ask for. Returns (old seconds, graph seconds,
+    evolutions), the old time being the requirement checks alone, without the mongo and
+    postgres reads evolve() also made for every level up.
+    """
+    rng = random.Random(seed)
+    graph = EvolutionGraph(dex)
+    evolvable = [form.identifier for form in dex.all_forms() if graph.edges_from(form.identifier)]
+    names = [form.identifier for form in dex.all_forms()]
+    edges = [edge for name in evolvable for edge in graph.edges_from(name)]
+    held_items = [None, None, "everstone"] + [
+        item for item in (dex.item_identifier(edge.held_item_id) for edge in edges) if item
+    ]
+    active_items = [edge.trigger_item_id for edge in edges if edge.trigger_item_id]
+    moves = ["tackle"] + [edge.known_move for edge in edges if edge.known_move]
+    # The regions /region can set, and owners that never set one
+    regions = [None, "original", "alola", "galar", "hisui"]
+    cases = []
+    for _ in range(count):
+        poke = {
+            "pokname": rng.choice(evolvable if rng.random() < 0.8 else names).capitalize(),
+            "pokelevel": rng.choice((rng.randint(1, 100), 100)),
+            "gender": rng.choice(("-m", "-f", "-x")),
+            "hitem": rng.choice(held_items),
+            "moves": rng.sample(moves, min(4, len(moves))),
+            "happiness": rng.randint(0, 255),
+            "radiant": not rng.randrange(10),
+        }
+        for column in ("atkiv", "atkev", "defiv", "defev"):
+            poke[column] = rng.randint(0, 31)
+        active_item_id = rng.choice(active_items) if not rng.randrange(10) else None
+        cases.append((poke, rng.choice(regions), active_item_id, not rng.randrange(20)))
+
+    started = time.perf_counter()
+    expected = [old_evolution(dex, *case) for case in cases]
+    old = time.perf_counter() - started
+    started = time.perf_counter()
+    found = []
+    for poke, region, active_item_id, override_lvl_100 in cases:
+        candidates = graph.candidates(
+            poke, active_item_id=active_item_id, override_lvl_100=override_lvl_100
+        )
+        edge = graph.pick(candidates, region) if candidates and region is not None else None
+        found.append(edge.evolved_name if edge is not None else None)
+    new = time.perf_counter() - started
+    for case, old_name, new_name in zip(cases, expected, found):
+        assert old_name == new_name, (case, old_name, new_name)
+    return old, new, sum(name is not None for name in found)
+
+
+
+if __name__ == "__main__":
+    tables = Dex._tables_from_files(data_directory())
+    # The regions live in mongo, give every third evolution one so region checks are covered
+    for idx, raw in enumerate(sorted(tables["evolutions"])):
+        if not idx % 3:
+            tables["evolutions"][raw]["region"] = ("alola", "galar", "hisui")[idx % 9 // 3]
+    for dex in (Dex.from_files(data_directory()), Dex(tables)):
+        old, new, evolved = check_graph(dex)
+        print(
+            f"50000 level ups, {evolved} evolutions, same picks as before: "
+            f"old checks {old * 1000:.1f}ms, graph {new * 1000:.1f}ms"
+        )
@@ -0,0 +1,110 @@
+"""
+Times `/f p level > 50 --order level` for large collections, the old way and through FilterPages.
+
+Usage: DATABASE_URL=... python -m benchmarks.filter
+"""
+import asyncio
+import os
+import time
+
+import discord
+from dittocogs.filter import OWNED_QUERY, PER_PAGE, FilterPages
+
+from benchmarks import ScratchBot, scratch_pool
+
+
+async def benchmark(dsn: str, sizes=(10000, 100000, 500000)):
+    """
+    Times the filter for a user owning each of `sizes` pokes.
+
+    The old way fetched up to 2250 matching rows and found each one's position with
+    pokes.index() while formatting every page up front. FilterPages is timed for the count
+    and first page, and for jumping to the last page. Returns [(pokes, old seconds, first
+    page seconds, last page seconds)].
+    """
+    conditions = "pokelevel > 50"
+    results = []
+    async with scratch_pool(dsn, "filter_check") as pool:
+        bot = ScratchBot(pool)
+        for size in sizes:
+            await pool.execute("TRUNCATE users, pokes, ownership")
+            await pool.execute(
+                "INSERT INTO pokes (id, pokname, name, poknick, pokelevel, counter, shiny, radiant, "
+                "skin, gender, hpiv, atkiv, defiv, spatkiv, spdefiv, speediv, "
+                "hpev, atkev, defev, spatkev, spdefev, speedev) "
+                "SELECT id, 'Pikachu', 'Pikachu', 'None', 1 + (id::bigint * 7919) % 100, 0, "
+                "id % 4096 = 0, false, NULL, '-m', "
+                "id % 32, id % 31, id % 30, id % 29, id % 28, id % 27, 0, 0, 0, 0, 0, 0 "
+                "FROM generate_series(1, $1) AS id",
+                size,
+            )
+            await pool.execute(
+                "INSERT INTO ownership SELECT 1, id, id FROM generate_series(1, $1) AS id", size
+            )
+            await pool.execute(
+                "INSERT INTO users (u_id, pokes) "
+                "SELECT 1, array_agg(poke_id ORDER BY position) FROM ownership"
+            )
+            await pool.execute("ANALYZE")
+
+            # What /f did before, every page formatted before the first one was sent
+            started = time.perf_counter()
+            pokes = tuple(await pool.fetchval("SELECT pokes FROM users WHERE u_id = 1"))
+            async with pool.acquire() as pconn:
+                async with pconn.transaction():
+                    cur = await pconn.cursor(
+                        "SELECT COALESCE(atkiv,0) + COALESCE(defiv,0) + COALESCE(spatkiv,0) + "
+                        "COALESCE(spdefiv,0) + COALESCE(speediv,0) + COALESCE(hpiv,0) AS ivs, "
+                        f"pokelevel, pokname, name, * FROM pokes WHERE id = ANY($1) AND {conditions} "
+                        "ORDER BY pokelevel DESC",
+                        pokes,
+                    )
+                    records = await cur.fetch(PER_PAGE * 150, timeout=20)
+            max_id = max(len(str(pokes.index(record["id"]) + 1)) for record in records)
+            lines = [
+                f"**`{str(pokes.index(record['id']) + 1).rjust(max_id)}`** "
+                f"__`{record['pokname']}`__`{record['pokelevel']}``{record['ivs'] / 186:02.0%}`"
+                for record in records
+            ]
+            old_pages = [
+                "\n".join(lines[i : i + PER_PAGE]) for i in range(0, len(lines), PER_PAGE)
+            ]
+            old = time.perf_counter() - started
+
+            pages = FilterPages(
+                bot,
+                OWNED_QUERY + conditions,
+                [1],
+                filter_type="p",
+                order_col="pokelevel",
+                order_dir="DESC",
+                mothers={},
+                base_embed=discord.Embed(title="Filtered Pokemon"),
+            )
+            started = time.perf_counter()
+            await pages.count()
+            first_page = await pages.get_page(0)
+            first = time.perf_counter() - started
+            started = time.perf_counter()
+            await pages.get_page(len(pages) - 1)
+            last = time.perf_counter() - started
+
+            # Positions are the poke ids here, and ties on level are broken by position
+            levels = {id: 1 + (id * 7919) % 100 for id in range(1, size + 1)}
+            top = [id for id in range(size, 0, -1) if levels[id] == 100]
+            shown = [
+                int(line.split("`")[1]) for line in first_page.description.splitlines()
+            ]
+            assert shown == top[:PER_PAGE], shown
+            assert pages.total == sum(level > 50 for level in levels.values())
+            assert len(old_pages) == min(150, len(pages))
+            results.append((size, old, first, last))
+    return results
+
+
+if __name__ == "__main__":
+    for size, old, first, last in asyncio.run(benchmark(os.environ["DATABASE_URL"])):
+        print(
+            f"{size:>7} pokes: old {old * 1000:9.2f}ms, first page {first * 1000:7.2f}ms "
+            f"({old / first:.0f}x), last page {last * 1000:7.2f}ms"
+        )
@@ -0,0 +1,116 @@
+"""
+Runs inventory deltas concurrently and checks none are lost, then times them against the
+read-modify-write writes they replaced.
+
+Usage: DATABASE_URL=... python -m benchmarks.inventory
+"""
+import asyncio
+import os
+import time
+
+from benchmarks import ScratchBot, scratch_pool
+
+
+async def check_inventory(dsn: str, opens: int = 200):
+    """
+    Checks concurrent update_user, add_items_clamped and item_counts calls add up exactly.
+
+    Returns (increments the old pattern lost out of `opens`, old seconds per increment,
+    add_items seconds per increment).
+    """
+    async with scratch_pool(dsn, "inventory_check", size=20) as pool:
+        commondb = ScratchBot(pool).commondb
+        await pool.execute(
+            "INSERT INTO users (u_id, inventory) VALUES (1, $1), (2, '{}'), (3, '{}')",
+            {"rare chest": opens},
+        )
+
+        # More opens than chests, each one taking a chest and giving gems and credits
+        opened = await asyncio.gather(
+            *(
+                commondb.update_user(
+                    1, inventory={"rare chest": -1, "radiant gem": 3}, mewcoins=1000
+                )
+                for _ in range(opens + opens // 4)
+            )
+        )
+        inventory, mewcoins = await pool.fetchrow(
+            "SELECT inventory, mewcoins FROM users WHERE u_id = 1"
+        )
+        assert sum(opened) == opens
+        assert inventory == {"rare chest": 0, "radiant gem": 3 * opens}
+        assert mewcoins == 1000 * opens
+
+        # Buying a multiplier one at a time may never go past its cap
+        bought = await asyncio.gather(
+            *(
+                commondb.update_user(
+                    2, inventory={"shiny-multiplier": 1}, caps={"shiny-multiplier": 50}
+                )
+                for _ in range(80)
+            )
+        )
+        assert sum(bought) == 50
+        # Clamped deltas stop at the cap on the way up and at 0 on the way down
+        left_over = await asyncio.gather(
+            *(
+                commondb.add_items_clamped(
+                    3, {"battle-multiplier": 2}, caps={"battle-multiplier": 50}
+                )
+                for _ in range(40)
+            ),
+            *(commondb.add_items_clamped(3, {"coin-case": 7}) for _ in range(20)),
+        )
+        assert sum(left.get("battle-multiplier", 0) for left in left_over) == 30
+        spent = await asyncio.gather(
+            *(commondb.add_items_clamped(3, {"coin-case": -9}) for _ in range(20))
+        )
+        # 140 coins, 180 spent, so 40 of it did not fit
+        assert sum(left.get("coin-case", 0) for left in spent) == -40
+        counts = await commondb.item_counts(3, ["battle-multiplier", "coin-case"])
+        assert counts == {"battle-multiplier": 50, "coin-case": 0}
+
+        # Only the json item columns can be passed as the column
+        for method in (commondb.add_items, commondb.take_items):
+            try:
+                await method(3, {"coin-case": 1}, column="mewcoins")
+            except ValueError:
+                pass
+            else:
+                raise AssertionError(f"{method.__name__} accepted column='mewcoins'")
+
+        # The read-modify-write pattern update_user replaced
+        async def old_add(user_id):
+            async with pool.acquire() as pconn:
+                inventory = await pconn.fetchval(
+                    "SELECT inventory::json FROM users WHERE u_id = $1", user_id
+                )
+                inventory["common chest"] = inventory.get("common chest", 0) + 1
+                await pconn.execute(
+                    "UPDATE users SET inventory = $1::json WHERE u_id = $2",
+                    inventory,
+                    user_id,
+                )
+
+        await asyncio.gather(*(old_add(2) for _ in range(opens)))
+        lost = opens - (await commondb.item_counts(2, ["common chest"]))["common chest"]
+
+        started = time.perf_counter()
+        for _ in range(opens):
+            await old_add(3)
+        old = time.perf_counter() - started
+        started = time.perf_counter()
+        for _ in range(opens):
+            await commondb.add_items(3, {"common chest": 1})
+        new = time.perf_counter() - started
+    return lost, old / opens, new / opens
+
+
+if __name__ == "__main__":
+    lost, old, new = asyncio.run(check_inventory(os.environ["DATABASE_URL"]))
+    print("Concurrent opens, caps and floors: no lost or extra deltas")
+    print(f"Read-modify-write lost {lost} of 200 concurrent increments")
+    print(
+        f"Per increment: read-modify-write {old * 1000:.3f}ms (2 round trips), "
+        f"update_user {new * 1000:.3f}ms (1 round trip)"
+    )
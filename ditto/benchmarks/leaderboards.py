@@ -0,0 +1,101 @@
+"""
+Times a leaderboard page and a rank lookup, as the old full-table sort and as sorted set reads,
+and checks changes made during a rebuild survive it.
+
+Usage: DATABASE_URL=... REDIS_URL=... python -m benchmarks.leaderboards
+
+This writes the real `leaderboard:fishing` and `leaderboard:excluded` keys, so only point
+it at a scratch redis.
+"""
+import asyncio
+import os
+import time
+
+import aioredis
+from dittocore.leaderboards import EXCLUDED_KEY, Leaderboards, _key, _rebuild_keys
+
+from benchmarks import ScratchBot, scratch_pool
+
+
+async def benchmark(dsn: str, redis_url: str, sizes=(10000, 100000, 1000000)):
+    """
+    Times the fishing board with `sizes` users on it.
+
+    Also checks that board changes made during a rebuild are replayed onto the rebuilt
+    board, and that the exclusion set is never seen empty. Returns [(users, sql seconds,
+    redis seconds)].
+    """
+    redis = await aioredis.create_pool(redis_url)
+    keys = (_key("fishing"), EXCLUDED_KEY, *_rebuild_keys("fishing"))
+    results = []
+    try:
+        async with scratch_pool(dsn, "leaderboard_check", size=4) as pool:
+            leaderboards = Leaderboards(ScratchBot(pool, redis=redis), batch_size=500)
+            for size in sizes:
+                await pool.execute("TRUNCATE users")
+                await pool.execute(
+                    "INSERT INTO users (u_id, fishing_exp) "
+                    "SELECT id, (id::bigint * 7919) % 1000003 FROM generate_series(1, $1) AS id",
+                    size,
+                )
+                await redis.execute("DEL", *keys)
+                await leaderboards.rebuild("fishing")
+                user_id = size // 2
+
+                # What /leaderboard fishing did before: sort every user, then find the caller
+                started = time.perf_counter()
+                rows = await pool.fetch(
+                    "SELECT u_id, fishing_exp, staff FROM users WHERE fishing_exp > 0 "
+                    "ORDER BY fishing_exp DESC"
+                )
+                page = rows[:25]
+                rank = next(
+                    idx for idx, row in enumerate(rows, start=1) if row["u_id"] == user_id
+                )
+                sql = time.perf_counter() - started
+
+                started = time.perf_counter()
+                top = await leaderboards.top("fishing", 0, 25)
+                rank_after = await leaderboards.rank("fishing", user_id)
+                sorted_set = time.perf_counter() - started
+                assert [score for _, score in top] == [row["fishing_exp"] for row in page]
+                assert rank_after[1] == rows[rank - 1]["fishing_exp"]
+                results.append((size, sql, sorted_set))
+
+            # Changes made while a rebuild is reading postgres must survive its swap
+            added = {}
+            seen_empty = False
+
+            async def change_during_rebuild():
+                nonlocal seen_empty
+                while not await redis.execute("EXISTS", _rebuild_keys("fishing")[1]):
+                    await asyncio.sleep(0)
+                for user_id in range(1, 2001):
+                    await leaderboards.add("fishing", user_id, 5)
+                    added[user_id] = added.get(user_id, 0) + 5
+                    if not await redis.execute("SCARD", EXCLUDED_KEY):
+                        seen_empty = True
+
+            await asyncio.gather(leaderboards.rebuild("fishing"), change_during_rebuild())
+            assert not seen_empty
+            for user_id, amount in added.items():
+                expected = await pool.fetchval(
+                    "SELECT fishing_exp FROM users WHERE u_id = $1", user_id
+                )
+                assert (await leaderboards.rank("fishing", user_id))[1] == expected + amount
+    finally:
+        await redis.execute("DEL", *keys)
+        redis.close()
+        await redis.wait_closed()
+    return results
+
+
+if __name__ == "__main__":
+    for size, sql, sorted_set in asyncio.run(
+        benchmark(os.environ["DATABASE_URL"], os.environ.get("REDIS_URL", "redis://127.0.0.1"))
+    ):
+        print(
+            f"{size:>8} users: full sort {sql * 1000:9.2f}ms, "
+            f"sorted set {sorted_set * 1000:6.2f}ms ({sql / sorted_set:.0f}x)"
+        )
+    print("Changes made during a rebuild were all replayed, exclusions never empty")
@@ -0,0 +1,87 @@
+"""
+Fires concurrent market buys at a single listing, and checks exactly one of them wins.
+
+Usage: DATABASE_URL=... python -m benchmarks.market
+"""
+import asyncio
+import os
+import time
+
+from dittocogs.market import DEPOSIT_RATE, Market
+
+from benchmarks import ScratchBot, scratch_pool
+
+SELLER = 1
+PRICE = 50000
+
+
+async def check_single_winner(dsn: str, buyers: int = 50, rounds: int = 20):
+    """
+    Lists a poke `rounds` times, and has `buyers` users try to buy each listing at once.
+
+    Every round must have exactly one buyer end up with the poke, and every other buyer
+    refused without being charged. Returns the median seconds for a round of buys.
+    """
+    async with scratch_pool(dsn, "market_check", size=min(buyers, 20)) as pool:
+        bot = ScratchBot(pool)
+        market = Market(bot)
+        buyer_ids = list(range(SELLER + 1, SELLER + 1 + buyers))
+        await pool.execute(
+            "INSERT INTO users (u_id, mewcoins) SELECT u_id, $2 FROM unnest($1::bigint[]) AS u_id",
+            [SELLER] + buyer_ids,
+            PRICE * rounds,
+        )
+        await pool.execute(
+            "INSERT INTO achievements (u_id) SELECT unnest($1::bigint[])", [SELLER] + buyer_ids
+        )
+        timings = []
+        for _ in range(rounds):
+            poke = await pool.fetchval("INSERT INTO pokes (pokname) VALUES ('Pikachu') RETURNING id")
+            listing_id = await pool.fetchval(
+                "INSERT INTO market (poke, owner, price) VALUES ($1, $2, $3) RETURNING id",
+                poke,
+                SELLER,
+                PRICE,
+            )
+            started = time.perf_counter()
+            results = await asyncio.gather(
+                *(market.buy_listing(buyer_id, listing_id) for buyer_id in buyer_ids)
+            )
+            timings.append(time.perf_counter() - started)
+
+            winners = [
+                buyer_id for buyer_id, (refusal, *_) in zip(buyer_ids, results) if refusal is None
+            ]
+            assert len(winners) == 1, winners
+            assert all(
+                refusal.startswith("That listing has already ended")
+                for refusal, *_ in results
+                if refusal is not None
+            )
+            assert await pool.fetchval("SELECT buyer FROM market WHERE id = $1", listing_id) == winners[0]
+            owners = await pool.fetch("SELECT u_id FROM ownership WHERE poke_id = $1", poke)
+            assert [row["u_id"] for row in owners] == winners
+
+        # Only the winners were charged, and the seller was paid once per listing
+        spent = await pool.fetchval(
+            "SELECT sum($1::bigint - mewcoins) FROM users WHERE u_id = ANY($2)",
+            PRICE * rounds,
+            buyer_ids,
+        )
+        assert spent == PRICE * rounds
+        earned = await pool.fetchval("SELECT mewcoins FROM users WHERE u_id = $1", SELLER)
+        assert earned == PRICE * rounds + (PRICE + int(PRICE * DEPOSIT_RATE)) * rounds
+        bought, sold = await pool.fetchrow(
+            "SELECT sum(market_purchased), sum(market_sold) FROM achievements"
+        )
+        assert bought == sold == rounds
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+if __name__ == "__main__":
+    median = asyncio.run(check_single_winner(os.environ["DATABASE_URL"]))
+    print(
+        f"50 concurrent buyers per listing, 20 listings: one winner each, "
+        f"median {median * 1000:.1f}ms per round"
+    )
@@ -0,0 +1,117 @@
+"""
+Times taking a poke from a large collection, from the old pokes array and through the ownership table.
+
+Usage: DATABASE_URL=... python -m benchmarks.ownership
+"""
+import asyncio
+import os
+import time
+
+from benchmarks import ScratchBot, scratch_pool
+
+
+class _RecordedBoards:
+    """Leaderboards that only remember the increments they were sent."""
+
+    def __init__(self):
+        self.sent = []
+
+    async def add(self, board, user_id, amount):
+        self.sent.append((board, user_id, amount))
+
+
+async def benchmark(dsn: str, sizes=(10000, 100000), rounds: int = 20):
+    """
+    Times removing the first and the last poke of a user owning each of `sizes` pokes.
+
+    Positions are kept dense, so removing the first poke renumbers every later one and is
+    O(collection size), like rewriting the old array was. Removing the last one only
+    touches its own row. Also checks pokemon leaderboard changes are only sent once the
+    outermost transaction commits. Returns [(pokes, old array seconds, first poke seconds,
+    last poke seconds)], each the median of `rounds` removals.
+    """
+    results = []
+    async with scratch_pool(dsn, "ownership_check") as pool:
+        bot = ScratchBot(pool)
+        bot.leaderboards = _RecordedBoards()
+        commondb = bot.commondb
+        await pool.execute("INSERT INTO users (u_id) VALUES (1), (2)")
+        assert await commondb.check_backfilled()
+
+        # Changes made in a rolled back transaction are never sent, committed ones are summed
+        async with pool.acquire() as pconn:
+            try:
+                async with commondb.transaction(pconn):
+                    await commondb.append_pokes(1, [1, 2], pconn=pconn)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            assert not bot.leaderboards.sent
+            async with commondb.transaction(pconn):
+                await commondb.append_pokes(1, [1, 2, 3], pconn=pconn)
+                assert not bot.leaderboards.sent
+                try:
+                    async with commondb.transaction(pconn):
+                        await commondb.remove_pokes(1, [1, 2], pconn=pconn)
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+                await commondb.remove_pokes(1, [2], pconn=pconn)
+        assert bot.leaderboards.sent == [("pokemon", 1, 2)], bot.leaderboards.sent
+        owned = await pool.fetch("SELECT poke_id FROM ownership WHERE u_id = 1 ORDER BY position")
+        assert [record["poke_id"] for record in owned] == [1, 3]
+
+        for size in sizes:
+            await pool.execute("TRUNCATE ownership")
+            await pool.execute(
+                "INSERT INTO ownership SELECT 1, id, id FROM generate_series(1, $1) AS id", size
+            )
+            # The old array is kept on a user of its own, as user 1 is already migrated
+            await pool.execute(
+                "UPDATE users SET pokes = (SELECT array_agg(id) FROM generate_series(1, $1) AS id) "
+                "WHERE u_id = 2",
+                size,
+            )
+            await pool.execute("ANALYZE")
+
+            # What releasing a poke did before, each one put back so the size stays the same
+            old = []
+            for poke_id in range(1, rounds + 1):
+                started = time.perf_counter()
+                await pool.execute(
+                    "UPDATE users SET pokes = array_remove(pokes, $2) WHERE u_id = $1", 2, poke_id
+                )
+                old.append(time.perf_counter() - started)
+                await pool.execute(
+                    "UPDATE users SET pokes = array_append(pokes, $2) WHERE u_id = $1", 2, poke_id
+                )
+
+            first, last = [], []
+            for _ in range(rounds):
+                poke_id = await commondb.poke_at(1, 1)
+                started = time.perf_counter()
+                await commondb.remove_pokes(1, [poke_id])
+                first.append(time.perf_counter() - started)
+                await commondb.append_pokes(1, [poke_id])
+
+                poke_id = await commondb.poke_at(1, size)
+                started = time.perf_counter()
+                await commondb.remove_pokes(1, [poke_id])
+                last.append(time.perf_counter() - started)
+                await commondb.append_pokes(1, [poke_id])
+
+            positions = await pool.fetchrow(
+                "SELECT count(*), min(position), max(position), count(DISTINCT position) "
+                "FROM ownership WHERE u_id = 1"
+            )
+            assert tuple(positions) == (size, 1, size, size), positions
+            results.append((size, *(sorted(times)[rounds // 2] for times in (old, first, last))))
+    return results
+
+
+if __name__ == "__main__":
+    for size, old, first, last in asyncio.run(benchmark(os.environ["DATABASE_URL"])):
+        print(
+            f"{size:>7} pokes: old array {old * 1000:8.2f}ms, "
+            f"first poke {first * 1000:8.2f}ms, last poke {last * 1000:6.2f}ms"
+        )
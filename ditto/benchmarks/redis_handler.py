@@ -0,0 +1,102 @@
+"""
+Times a stats request fanned out to many clusters, polled like before and resolved by future.
+
+Usage: REDIS_URL=... python -m benchmarks.redis_handler
+"""
+import asyncio
+import os
+import statistics
+import time
+from contextlib import suppress
+from uuid import uuid4
+
+import aioredis
+import orjson
+from async_timeout import timeout
+from dittocore.redis_handler import CLUSTER_CHANNEL, RedisHandler
+
+from benchmarks import ScratchBot
+
+
+class CountingHandler(RedisHandler):
+    """A RedisHandler that counts every frame it decodes, on any channel."""
+
+    decoded = 0
+
+    async def _messages(self, channel_name: str):
+        async for payload in super()._messages(channel_name):
+            CountingHandler.decoded += 1
+            yield payload
+
+
+async def polled(handler, action, expected_count, _timeout=2):
+    """What handler() did before: no reply channel, and the replies checked every 100ms."""
+    command_id = str(uuid4())
+    replies = []
+    handler._pending[command_id] = (
+        asyncio.get_running_loop().create_future(),
+        replies,
+        expected_count,
+    )
+    payload = {"scope": "bot", "action": action, "command_id": command_id}
+    try:
+        await handler.redis.execute("PUBLISH", CLUSTER_CHANNEL, orjson.dumps(payload))
+        with suppress(asyncio.TimeoutError):
+            async with timeout(_timeout):
+                while len(replies) < expected_count:
+                    await asyncio.sleep(0.1)
+    finally:
+        handler._pending.pop(command_id, None)
+    return replies
+
+
+async def resolved(handler, action, expected_count):
+    return await handler.handler(action, expected_count)
+
+
+async def benchmark(redis_url: str, clusters: int = 20, requests: int = 100):
+    """
+    Sends `requests` stats requests to `clusters` handlers each way.
+
+    Every handler runs in this process with its own redis connections. Returns
+    {mode: (median seconds, p99 seconds, frames decoded per request)}.
+    """
+    handlers = []
+    for cluster_id in range(clusters):
+        redis = await aioredis.create_pool(redis_url, minsize=2)
+        handler = CountingHandler(ScratchBot(redis=redis, cluster_id=cluster_id))
+        await handler.start()
+        handlers.append(handler)
+
+    results = {}
+    try:
+        for mode, send in (("polled", polled), ("future", resolved)):
+            timings = []
+            CountingHandler.decoded = 0
+            for _ in range(requests):
+                started = time.perf_counter()
+                replies = await send(handlers[0], "send_cluster_info", clusters)
+                timings.append(time.perf_counter() - started)
+                assert sorted(reply["id"] for reply in replies) == list(range(clusters))
+            # Replies still in flight for the last request are not counted
+            await asyncio.sleep(0.1)
+            timings.sort()
+            results[mode] = (
+                statistics.median(timings),
+                timings[int(len(timings) * 0.99) - 1],
+                CountingHandler.decoded / requests,
+            )
+    finally:
+        for handler in handlers:
+            handler.redis.close()
+            await handler.redis.wait_closed()
+    return results
+
+
+if __name__ == "__main__":
+    results = asyncio.run(benchmark(os.environ.get("REDIS_URL", "redis://127.0.0.1")))
+    for mode, (median, p99, decoded) in results.items():
+        print(
+            f"{mode:>6}: median {median * 1000:7.2f}ms, p99 {p99 * 1000:7.2f}ms, "
+            f"{decoded:.0f} frames decoded per request"
+        )
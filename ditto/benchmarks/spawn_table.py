@@ -0,0 +1,85 @@
+"""
+Checks the SpawnTable spawns every tier, and shinies, at the same rates as the rolls
+Spawn.on_message made before it.
+
+Usage: python -m benchmarks.spawn_table
+"""
+import random
+
+from pokemon_utils.spawn_table import SpawnTable, SpawnTier
+
+from benchmarks import load_dex
+
+
+def old_roll(honey: str = None, rng=random) -> SpawnTier:
+    """The tier Spawn.on_message picked before the SpawnTable, roll for roll."""
+    if honey is None:
+        honey = 0
+    elif honey == "ghost":
+        if rng.randrange(4):
+            return SpawnTier.GHOST
+        honey = 0
+    elif honey == "cheer":
+        return SpawnTier.ICE
+    else:
+        honey = 50
+    legendchance = int(rng.random() * (round(4000 - 7600 * honey / 100)))
+    ubchance = int(rng.random() * (round(3000 - 5700 * honey / 100)))
+    pseudochance = int(rng.random() * (round(1000 - 1900 * honey / 100)))
+    starterchance = int(rng.random() * (round(500 - 950 * honey / 100)))
+    if legendchance < 2:
+        return SpawnTier.LEGENDARY
+    if ubchance < 2:
+        return SpawnTier.ULTRA_BEAST
+    if pseudochance < 2:
+        return SpawnTier.PSEUDO
+    if starterchance < 2:
+        return SpawnTier.STARTER
+    return SpawnTier.NORMAL
+
+
+def check_same_rate(label, old_hits, new_hits, samples, max_z):
+    """Two proportion z-test, fails if the rates differ by more than `max_z` standard errors."""
+    pooled = (old_hits + new_hits) / (2 * samples)
+    if pooled in (0, 1):
+        assert old_hits == new_hits, label
+        return 0.0
+    z = (new_hits - old_hits) / samples / (2 * pooled * (1 - pooled) / samples) ** 0.5
+    assert abs(z) < max_z, f"{label}: old {old_hits}, new {new_hits} of {samples} (z={z:.1f})"
+    return z
+
+
+def check_rates(dex, samples: int = 1000000, seed: int = 0, max_z: float = 5.0):
+    """
+    Checks the table spawns every tier, and shinies, at the same rate as the old rolls.
+
+    Draws `samples` spawns per honey state from both and compares each rate with a two
+    proportion z-test. Returns the largest |z| seen, anything near `max_z` is a mismatch.
+    """
+    table = SpawnTable(dex)
+    old_rng = random.Random(seed)
+    new_rng = random.Random(seed + 1)
+    worst = 0.0
+    for honey in (None, "honey", "ghost", "cheer"):
+        old = dict.fromkeys(SpawnTier, 0)
+        new = dict.fromkeys(SpawnTier, 0)
+        for _ in range(samples):
+            old[old_roll(honey, old_rng)] += 1
+            new[table.roll_tier(honey, new_rng)] += 1
+        for tier in SpawnTier:
+            z = check_same_rate(f"{honey} {tier.name}", old[tier], new[tier], samples, max_z)
+            worst = max(worst, abs(z))
+    for multiplier in (0, 25, 50):
+        threshold = round(4000 - 4000 * (multiplier / 100))
+        # The old roll picked from a list of `threshold` Falses and one True
+        old_hits = sum(old_rng.randrange(threshold + 1) == threshold for _ in range(samples))
+        new_hits = sum(table.roll_shiny(multiplier, new_rng) for _ in range(samples))
+        z = check_same_rate(f"shiny x{multiplier}", old_hits, new_hits, samples, max_z)
+        worst = max(worst, abs(z))
+    return worst
+
+
+
+if __name__ == "__main__":
+    worst = check_rates(load_dex())
+    print(f"Tier and shiny rates match the old rolls (largest |z| {worst:.2f})")
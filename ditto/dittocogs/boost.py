@@ -6,6 +6,7 @@ from discord.ui import Modal, TextInput
 from discord.ext import commands
 from discord import app_commands
 
+from dittocore.commondb import MULTIPLIER_CAPS
 from utils.misc import ConfirmView, ListSelectView2
 from utils.checks import check_admin, check_owner, check_helper
 
@@ -81,28 +82,29 @@ class Boost(commands.Cog):
             await self.bot.redis_manager.redis.execute("LPUSH", "nitrorace", str(ctx.author.id))
             return
         async with ctx.bot.db[0].acquire() as pconn:
-            inventory = await pconn.fetchval(
-                "SELECT inventory::json FROM users WHERE u_id = $1", ctx.author.id
+            started = await pconn.fetchval(
+                "SELECT 1 FROM users WHERE u_id = $1", ctx.author.id
             )
-            if inventory is None:
+            if started is None:
                 await ctx.send(f"You have not Started!\nStart with `/start` first!")
                 await self.bot.redis_manager.redis.execute("LREM", "nitrorace", "1", str(ctx.author.id))
                 return
             if "Rare chest - x1" in choice:
-                inventory["rare chest"] = inventory.get("rare chest", 0) + 1
+                await ctx.bot.commondb.add_items(
+                    ctx.author.id, {"rare chest": 1}, pconn=pconn
+                )
 
             elif "Battle/shiny multi - x5 Breed/IV multi - x3" in choice:
-                inventory["battle-multiplier"] = min(
-                    50, inventory.get("battle-multiplier", 0) + 5
-                )
-                inventory["shiny-multiplier"] = min(
-                    50, inventory.get("shiny-multiplier", 0) + 5
-                )
-                inventory["iv-multiplier"] = min(
-                    50, inventory.get("iv-multiplier", 0) + 3
-                )
-                inventory["breeding-multiplier"] = min(
-                    50, inventory.get("breeding-multiplier", 0) + 3
+                await ctx.bot.commondb.add_items_clamped(
+                    ctx.author.id,
+                    {
+                        "battle-multiplier": 5,
+                        "shiny-multiplier": 5,
+                        "iv-multiplier": 3,
+                        "breeding-multiplier": 3,
+                    },
+                    caps=MULTIPLIER_CAPS,
+                    pconn=pconn,
                 )
 
             elif "Credits - 150,000 + Redeems - x3" in choice:
@@ -130,12 +132,7 @@ class Boost(commands.Cog):
                     ctx.author.id,
                 )
 
-            await pconn.execute(
-                "UPDATE users SET inventory = $1::json WHERE u_id = $2",
-                inventory,
-                ctx.author.id,
-            )
-            
+
             await ctx.send(f"You chose and have been given - `{choice}`\nThank you for boosting the server!.",
                                view=None)
             await ctx.bot.db[1].boosters.update_one({}, {"$push": {"boosters": ctx.author.id}})
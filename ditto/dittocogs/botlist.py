@@ -1,6 +1,5 @@
 from typing import Optional
 import os
-import aiohttp
 from discord.ext import commands, tasks
 import discord
 from discord import app_commands
@@ -26,25 +25,7 @@ class BotList(commands.Cog):
 
     async def _guild_count(self) -> Optional[int]:
         """Handle clustering (this code was made by flame and was just made a function). If this returns None, ignore the whole guild count post"""
-        launcher_res = await self.bot.handler("statuses", 1, scope="launcher")
-        if not launcher_res:
-            return None  # Ignore this round
-        processes = len(launcher_res[0])
-        body = "return len(bot.guilds)"
-        eval_res = await self.bot.handler(
-            "_eval",
-            processes,
-            args={"body": body, "cluster_id": "-1"},
-            scope="bot",
-            _timeout=5,
-        )
-        return (
-            sum(
-                int(response["message"]) for response in eval_res if response["message"]
-            )
-            if eval_res
-            else None
-        )
+        return await self.bot.telemetry.guild_count()
 
     async def _shard_count(self) -> Optional[int]:
         """Return shard count. In case clustering solution changes, you can just change this"""
@@ -74,19 +55,18 @@ class BotList(commands.Cog):
             f"Posting botblock stats with JSON {botblock_base_json} and full JSON of {botblock_json}"
         )
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(self.botblock_url, json=botblock_json) as res:
-                response = await res.json()
-                if res.status != 200:
-                    msg = f"Got a non 200 status code trying to post to BotBlock.\n\nResponse: {response}\n\nStatus: {res.status}"
-                    #if res.ratelimit_reset:
-                       # msg += f"\n<t:{res.ratelimit_reset}:R>"
-                    self.bot.logger.warn(msg)
-                    return False, msg
-                self.bot.logger.info(
-                    "SUCCESS: Successfully posted to BotBlock. Should be propogating to all lists now"
-                )
-                return True, response
+        res = await self.bot.web.post(self.botblock_url, json=botblock_json)
+        response = res.json()
+        if res.status != 200:
+            msg = f"Got a non 200 status code trying to post to BotBlock.\n\nResponse: {response}\n\nStatus: {res.status}"
+            #if res.ratelimit_reset:
+               # msg += f"\n<t:{res.ratelimit_reset}:R>"
+            self.bot.logger.warn(msg)
+            return False, msg
+        self.bot.logger.info(
+            "SUCCESS: Successfully posted to BotBlock. Should be propogating to all lists now"
+        )
+        return True, response
 
     @tasks.loop(seconds=60 * 45)
     async def botblock(self):
@@ -10,6 +10,7 @@ from dataclasses import dataclass
 from datetime import datetime
 
 from discord.ext import commands
+from dittocore.rate_limits import fixed_window
 from utils.misc import get_emoji
 
 from dittocogs.json_files import *
@@ -179,12 +180,6 @@ async def get_parent(ctx, challenger):
     specialattack = challenger["spatkiv"]
     specialdefense = challenger["spdefiv"]
     speed = challenger["speediv"]
-    challenger["hpev"]
-    challenger["atkev"]
-    challenger["defev"]
-    challenger["spatkev"]
-    challenger["spdefev"]
-    challenger["speedev"]
     plevel = challenger["pokelevel"]
     shiny = challenger["shiny"]
     id = challenger["id"]
@@ -480,17 +475,15 @@ class Breeding(commands.Cog):
         self.bot = bot
         self.init_task = asyncio.create_task(self.initialize())
         self.auto_redo = defaultdict(lambda: None)  # user id: args
+        # Shared by every cluster, so switching clusters does not skip the wait
+        self.breed_cooldown = bot.rate_limits.shared("breed", fixed_window(1, 35))
 
     async def initialize(self):
-        # This is to make sure the breedcooldowns dict exists before we access in the cog check
-        await self.bot.redis_manager.redis.execute(
-            "HMSET", "breedcooldowns", "examplekey", "examplevalue"
-        )
+        # Cooldowns used to live in a hash that never expired, they now expire with their window
+        await self.bot.redis_manager.redis.execute("DEL", "breedcooldowns")
 
     async def reset_cooldown(self, id_):
-        await self.bot.redis_manager.redis.execute(
-            "HMSET", "breedcooldowns", str(id_), "0"
-        )
+        await self.breed_cooldown.reset(id_)
         self.auto_redo[id_] = None
 
     @commands.hybrid_command()
@@ -516,28 +509,10 @@ class Breeding(commands.Cog):
         if male > 2147483647 or female > 2147483647:
             await ctx.send("You do not have that many pokemon!")
             return
-        breed_reset = (
-            await ctx.bot.redis_manager.redis.execute(
-                "HMGET", "breedcooldowns", str(ctx.author.id)
-            )
-        )[0]
-
-        if breed_reset is None:
-            breed_reset = 0
-        else:
-            breed_reset = float(breed_reset.decode("utf-8"))
-
-        if breed_reset > time.time():
-            reset_in = breed_reset - time.time()
-            cooldown = f"{round(reset_in)}s"
-            if cooldown == "0s":
-                cooldown = None
-            else:
-                await ctx.send(f"Command on cooldown for {cooldown}")
-                return
-        await ctx.bot.redis_manager.redis.execute(
-            "HMSET", "breedcooldowns", str(ctx.author.id), str(time.time() + 35)
-        )
+        reset_in = await self.breed_cooldown.hit(ctx.author.id)
+        if reset_in:
+            await ctx.send(f"Command on cooldown for {max(1, round(reset_in))}s")
+            return
         if male == female:
             await ctx.send("You can not breed the same Pokemon!")
             await self.reset_cooldown(ctx.author.id)
@@ -545,7 +520,7 @@ class Breeding(commands.Cog):
         father, mother = male, female
         async with ctx.bot.db[0].acquire() as pconn:
             pokes = await pconn.fetchrow(
-                "SELECT pokes, daycarelimit, inventory::json FROM users WHERE u_id = $1",
+                "SELECT daycarelimit, inventory::json FROM users WHERE u_id = $1",
                 ctx.author.id,
             )
 
@@ -557,24 +532,23 @@ class Breeding(commands.Cog):
             is_shiny = random.choice([False for i in range(s_threshold)] + [True])
 
             dlimit = pokes["daycarelimit"]
-            pokes = pokes["pokes"]
-            daycared = await pconn.fetchval(
-                "SELECT count(*) FROM pokes WHERE id = ANY ($1) AND pokname = 'Egg'",
-                pokes,
-            )
+            async with ctx.bot.commondb.ownership_conn(ctx.author.id, pconn):
+                daycared = await pconn.fetchval(
+                    "SELECT count(*) FROM ownership INNER JOIN pokes ON pokes.id = ownership.poke_id "
+                    "WHERE ownership.u_id = $1 AND pokname = 'Egg'",
+                    ctx.author.id,
+                )
             if daycared > dlimit:
                 await ctx.send("You already have enough Pokemon in the Daycare!")
                 await self.reset_cooldown(ctx.author.id)
                 return
-            father_details = await pconn.fetchrow(
-                "SELECT * FROM pokes WHERE id = (SELECT pokes[$1] FROM users WHERE u_id = $2)",
-                father,
-                ctx.author.id,
+            positions = await ctx.bot.commondb.pokes_at(
+                ctx.author.id, [father, mother], pconn=pconn
             )
-            mother_details = await pconn.fetchrow(
-                "SELECT * FROM pokes WHERE id = (SELECT pokes[$1] FROM users WHERE u_id = $2)",
-                mother,
-                ctx.author.id,
+            father_details, mother_details = await ctx.bot.commondb.get_pokes(
+                [positions.get(father, 0), positions.get(mother, 0)],
+                "breeding",
+                pconn=pconn,
             )
             if father_details is None or mother_details is None:
                 await ctx.send("You do not have that many pokemon!")
@@ -767,11 +741,7 @@ class Breeding(commands.Cog):
             await pconn.execute(mother_query, *mother_args)
             pokeid = await pconn.fetchval(query, *args)
             # a = await pconn.fetchval("SELECT currval('pokes_id_seq');")
-            await pconn.execute(
-                "UPDATE users SET pokes = array_append(pokes, $1) WHERE u_id = $2",
-                pokeid,
-                ctx.author.id,
-            )
+            await ctx.bot.commondb.append_poke(ctx.author.id, pokeid, pconn=pconn)
         name = mother.name
         ivsum = (
             child.attack
@@ -840,9 +810,7 @@ class Breeding(commands.Cog):
     async def breedswith(self, ctx, poke_id: int, filter_args: str = None):
         """Runs a version of filter that only shows pokes that can breed with a certain pokemon."""
         async with ctx.bot.db[0].acquire() as pconn:
-            poke = await pconn.fetchval(
-                "SELECT pokes[$1] FROM users WHERE u_id = $2", poke_id, ctx.author.id
-            )
+            poke = await ctx.bot.commondb.poke_at(ctx.author.id, poke_id, pconn=pconn)
             if poke is None:
                 await ctx.send("That pokemon does not exist!")
                 return
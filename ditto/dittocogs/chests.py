@@ -2,6 +2,7 @@ import random
 
 import discord
 from discord.ext import commands
+from dittocore.commondb import MULTIPLIER_CAPS, UserNotStartedError
 from utils.misc import ConfirmView, ListSelectView
 from discord import app_commands
 from dittocogs.pokemon_list import LegendList, pList, pseudoList, starterList, ubList
@@ -107,41 +108,40 @@ class RadiantView(discord.ui.View):
             if choice is None:
                 await self.ctx.send("You did not select in time, cancelling.")
                 return
-        async with self.ctx.bot.db[0].acquire() as pconn:
-            inventory = await pconn.fetchval(
-                "SELECT inventory::json FROM users WHERE u_id = $1", self.ctx.author.id
-            )
-            if inventory is None:
-                await self.ctx.send(f"You have not Started!\nStart with `/start` first!")
-                return
-            if inventory.get("radiant gem", 0) < pack[1]:
-                await self.ctx.send("You cannot afford that pack!")
-                return
-            # await self.log_chest(ctx)
-            inventory["radiant gem"] = inventory.get("radiant gem", 0) - pack[1]
-            if self.choice in {1, 2, 3, 4}:
-                if self.choice == 1:
-                    item = "shiny-multiplier"
-                elif self.choice == 2:
-                    item = "battle-multiplier"
-                elif self.choice == 3:
-                    item = "iv-multiplier"
-                elif self.choice == 4:
-                    item = "breeding-multiplier"
-                if inventory.get(item, 0) >= 50:
+        deltas = {"radiant gem": -pack[1]}
+        item = None
+        if self.choice in {1, 2, 3, 4}:
+            if self.choice == 1:
+                item = "shiny-multiplier"
+            elif self.choice == 2:
+                item = "battle-multiplier"
+            elif self.choice == 3:
+                item = "iv-multiplier"
+            elif self.choice == 4:
+                item = "breeding-multiplier"
+            deltas[item] = 1
+        elif self.choice == 5:
+            deltas["legend chest"] = 1
+        # await self.log_chest(ctx)
+        try:
+            bought = await self.ctx.bot.commondb.update_user(
+                self.ctx.author.id, inventory=deltas, caps=MULTIPLIER_CAPS
+            )
+        except UserNotStartedError:
+            await self.ctx.send(f"You have not Started!\nStart with `/start` first!")
+            return
+        if not bought:
+            # The cap is checked in the same update, this only picks the message
+            if item is not None:
+                counts = await self.ctx.bot.commondb.item_counts(self.ctx.author.id, [item])
+                if counts[item] >= MULTIPLIER_CAPS[item]:
                     await self.ctx.send("You have hit the cap for that multiplier!")
                     return
-                inventory[item] = min(inventory.get(item, 0) + 1, 50)
-            elif self.choice == 5:
-                inventory["legend chest"] = inventory.get("legend chest", 0) + 1
-            elif self.choice in {6, 7, 8}:
-                await self.ctx.bot.commondb.create_poke(
-                    self.ctx.bot, self.ctx.author.id, choice, radiant=True, boosted=True
-                )
-            await pconn.execute(
-                "UPDATE users SET inventory = $1::json where u_id = $2",
-                inventory,
-                self.__annotations__ctx.author.id,
+            await self.ctx.send("You cannot afford that pack!")
+            return
+        if self.choice in {6, 7, 8}:
+            await self.ctx.bot.commondb.create_poke(
+                self.ctx.bot, self.ctx.author.id, choice, radiant=True, boosted=True
             )
         await self.ctx.send(
             f"You have successfully bought {pack[0]} for <a:radiantgem:1013790990852685955>x{pack[1]}."
@@ -207,15 +207,10 @@ class Chests(commands.Cog):
             return ""
         if not self.EVENT_ACTIVE:
             return ""
-        options = []
-        async with ctx.bot.db[0].acquire() as pconn:
-            for p in self.EVENT_ACTIVE:
-                if not await pconn.fetchval(
-                    "SELECT count(id) FROM pokes WHERE id in (select unnest(u.pokes) from users u where u.u_id = $1) AND radiant = true AND pokname = $2",
-                    ctx.author.id,
-                    p,
-                ):
-                    options.append(p)
+        owned = await ctx.bot.commondb.owned_names(
+            ctx.author.id, list(self.EVENT_ACTIVE), radiant=True
+        )
+        options = [p for p in self.EVENT_ACTIVE if p not in owned]
         if not options:
             return ""
         poke = random.choice(options)
@@ -230,22 +225,12 @@ class Chests(commands.Cog):
     async def common(self, ctx):
         """Open a common chest."""
         async with ctx.bot.db[0].acquire() as pconn:
-            inventory = await pconn.fetchval(
-                "SELECT inventory::json FROM users WHERE u_id = $1", ctx.author.id
-            )
-            if inventory is None:
-                await ctx.send(f"You have not Started!\nStart with `/start` first!")
-                return
-            if "common chest" not in inventory or inventory["common chest"] <= 0:
+            if not await ctx.bot.commondb.take_items(
+                ctx.author.id, {"common chest": 1}, pconn=pconn
+            ):
                 await ctx.send("You do not have any Common Chests!")
                 return
             # await self.log_chest(ctx)
-            inventory["common chest"] = inventory.get("common chest", 0) - 1
-            await pconn.execute(
-                "UPDATE users SET inventory = $1::json where u_id = $2",
-                inventory,
-                ctx.author.id,
-            )
             await pconn.execute("UPDATE achievements SET chests_common = chests_common + 1 WHERE u_id = $1", ctx.author.id)
         reward = random.choices(
             ("radiant", "chest", "ev", "poke", "redeem", "cred"),
@@ -258,43 +243,19 @@ class Chests(commands.Cog):
             )
             msg = f"<a:slowpokeclap:1004716068599758848> **Congratulations! You received a radiant {pokemon}!**\n"
         elif reward == "chest":
-            async with ctx.bot.db[0].acquire() as pconn:
-                inventory = await pconn.fetchval(
-                    "SELECT inventory::json FROM users WHERE u_id = $1", ctx.author.id
-                )
-                inventory["rare chest"] = inventory.get("rare chest", 0) + 1
-                await pconn.execute(
-                    "UPDATE users SET inventory = $1::json where u_id = $2",
-                    inventory,
-                    ctx.author.id,
-                )
+            await ctx.bot.commondb.add_items(ctx.author.id, {"rare chest": 1})
             msg = "You received a Rare Chest!\n"
         elif reward == "redeem":
             amount = 1
-            async with ctx.bot.db[0].acquire() as pconn:
-                await pconn.execute(
-                    "UPDATE users SET redeems = redeems + $1 WHERE u_id = $2",
-                    amount,
-                    ctx.author.id,
-                )
+            await ctx.bot.commondb.update_user(ctx.author.id, redeems=amount)
             msg = "You received 1 redeem!\n"
         elif reward == "ev":
             amount = 250
-            async with ctx.bot.db[0].acquire() as pconn:
-                await pconn.execute(
-                    "UPDATE users SET evpoints = evpoints + $1 WHERE u_id = $2",
-                    amount,
-                    ctx.author.id,
-                )
+            await ctx.bot.commondb.update_user(ctx.author.id, evpoints=amount)
             msg = f"You received {amount} ev points!\n"
         elif reward == "cred":
             amount = random.randint(10, 25) * 1000
-            async with ctx.bot.db[0].acquire() as pconn:
-                await pconn.execute(
-                    "UPDATE users SET mewcoins = mewcoins + $1 WHERE u_id = $2",
-                    amount,
-                    ctx.author.id,
-                )
+            await ctx.bot.commondb.update_user(ctx.author.id, mewcoins=amount)
             msg = f"You received {amount} credits!\n"
         elif reward == "poke":
             pokemon = random.choice(pList)
@@ -303,16 +264,7 @@ class Chests(commands.Cog):
             )
             msg = f"You received a {pokedata.emoji}{pokemon}!\n"
         if gems := 1:
-            async with ctx.bot.db[0].acquire() as pconn:
-                inventory = await pconn.fetchval(
-                    "SELECT inventory::json FROM users WHERE u_id = $1", ctx.author.id
-                )
-                inventory["radiant gem"] = inventory.get("radiant gem", 0) + gems
-                await pconn.execute(
-                    "UPDATE users SET inventory = $1::json where u_id = $2",
-                    inventory,
-                    ctx.author.id,
-                )
+            await ctx.bot.commondb.add_items(ctx.author.id, {"radiant gem": gems})
             msg += f"You also received {gems} Radiant Gems <a:radiantgem:1013790990852685955>!\n"
         msg += await self._maybe_spawn_event(ctx, 0.15)
         await ctx.send(msg)
@@ -321,22 +273,12 @@ class Chests(commands.Cog):
     async def rare(self, ctx):
         """Open a rare chest."""
         async with ctx.bot.db[0].acquire() as pconn:
-            inventory = await pconn.fetchval(
-                "SELECT inventory::json FROM users WHERE u_id = $1", ctx.author.id
-            )
-            if inventory is None:
-                await ctx.send(f"You have not Started!\nStart with `/start` first!")
-                return
-            if "rare chest" not in inventory or inventory["rare chest"] <= 0:
+            if not await ctx.bot.commondb.take_items(
+                ctx.author.id, {"rare chest": 1}, pconn=pconn
+            ):
                 await ctx.send("You do not have any Rare Chests!")
                 return
             # await self.log_chest(ctx)
-            inventory["rare chest"] = inventory.get("rare chest", 0) - 1
-            await pconn.execute(
-                "UPDATE users SET inventory = $1::json where u_id = $2",
-                inventory,
-                ctx.author.id,
-            )
             await pconn.execute("UPDATE achievements SET chests_rare = chests_rare + 1 WHERE u_id = $1", ctx.author.id)
         reward = random.choices(
             ("radiant", "redeem", "chest", "boostedshiny", "shiny"),
@@ -350,24 +292,10 @@ class Chests(commands.Cog):
             msg = f"<a:slowpokeclap:1004716068599758848> **Congratulations! You received a radiant {pokemon}!**\n"
         elif reward == "redeem":
             amount = random.randint(4, 6)
-            async with ctx.bot.db[0].acquire() as pconn:
-                await pconn.execute(
-                    "UPDATE users SET redeems = redeems + $1 WHERE u_id = $2",
-                    amount,
-                    ctx.author.id,
-                )
+            await ctx.bot.commondb.update_user(ctx.author.id, redeems=amount)
             msg = f"You received {amount} redeems!\n"
         elif reward == "chest":
-            async with ctx.bot.db[0].acquire() as pconn:
-                inventory = await pconn.fetchval(
-                    "SELECT inventory::json FROM users WHERE u_id = $1", ctx.author.id
-                )
-                inventory["mythic chest"] = inventory.get("mythic chest", 0) + 1
-                await pconn.execute(
-                    "UPDATE users SET inventory = $1::json where u_id = $2",
-                    inventory,
-                    ctx.author.id,
-                )
+            await ctx.bot.commondb.add_items(ctx.author.id, {"mythic chest": 1})
             msg = "You received a Mythic Chest!\n"
         elif reward == "shiny":
             pokemon = random.choice(pList)
@@ -382,16 +310,7 @@ class Chests(commands.Cog):
             )
             msg = f"You received a shiny boosted IV {pokemon}!\n"
         gems = random.randint(1, 2)
-        async with ctx.bot.db[0].acquire() as pconn:
-            inventory = await pconn.fetchval(
-                "SELECT inventory::json FROM users WHERE u_id = $1", ctx.author.id
-            )
-            inventory["radiant gem"] = inventory.get("radiant gem", 0) + gems
-            await pconn.execute(
-                "UPDATE users SET inventory = $1::json where u_id = $2",
-                inventory,
-                ctx.author.id,
-            )
+        await ctx.bot.commondb.add_items(ctx.author.id, {"radiant gem": gems})
         msg += f"You also received {gems} Radiant Gems <a:radiantgem:1013790990852685955>!\n"
         msg += await self._maybe_spawn_event(ctx, 0.20)
         await ctx.send(msg)
@@ -400,22 +319,12 @@ class Chests(commands.Cog):
     async def mythic(self, ctx):
         """Open a mythic chest."""
         async with ctx.bot.db[0].acquire() as pconn:
-            inventory = await pconn.fetchval(
-                "SELECT inventory::json FROM users WHERE u_id = $1", ctx.author.id
-            )
-            if inventory is None:
-                await ctx.send(f"You have not Started!\nStart with `/start` first!")
-                return
-            if "mythic chest" not in inventory or inventory["mythic chest"] <= 0:
+            if not await ctx.bot.commondb.take_items(
+                ctx.author.id, {"mythic chest": 1}, pconn=pconn
+            ):
                 await ctx.send("You do not have any Mythic Chests!")
                 return
             # await self.log_chest(ctx)
-            inventory["mythic chest"] = inventory.get("mythic chest", 0) - 1
-            await pconn.execute(
-                "UPDATE users SET inventory = $1::json where u_id = $2",
-                inventory,
-                ctx.author.id,
-            )
             await pconn.execute("UPDATE achievements SET chests_mythic = chests_mythic + 1 WHERE u_id = $1", ctx.author.id)
         reward = random.choices(
             ("radiant", "boostedleg", "redeem", "chest", "shiny", "boostedshiny"),
@@ -423,24 +332,10 @@ class Chests(commands.Cog):
         )[0]
         if reward == "redeem":
             amount = random.randint(7, 15)
-            async with ctx.bot.db[0].acquire() as pconn:
-                await pconn.execute(
-                    "UPDATE users SET redeems = redeems + $1 WHERE u_id = $2",
-                    amount,
-                    ctx.author.id,
-                )
+            await ctx.bot.commondb.update_user(ctx.author.id, redeems=amount)
             msg = f"You received {amount} redeems!\n"
         elif reward == "chest":
-            async with ctx.bot.db[0].acquire() as pconn:
-                inventory = await pconn.fetchval(
-                    "SELECT inventory::json FROM users WHERE u_id = $1", ctx.author.id
-                )
-                inventory["legend chest"] = inventory.get("legend chest", 0) + 1
-                await pconn.execute(
-                    "UPDATE users SET inventory = $1::json where u_id = $2",
-                    inventory,
-                    ctx.author.id,
-                )
+            await ctx.bot.commondb.add_items(ctx.author.id, {"legend chest": 1})
             msg = "You received a Legend Chest!\n"
         elif reward == "boostedleg":
             pokemon = random.choice(LegendList)
@@ -467,16 +362,7 @@ class Chests(commands.Cog):
             )
             msg = f"You received a shiny boosted IV {pokemon}!\n"
         gems = random.randint(8, 11)
-        async with ctx.bot.db[0].acquire() as pconn:
-            inventory = await pconn.fetchval(
-                "SELECT inventory::json FROM users WHERE u_id = $1", ctx.author.id
-            )
-            inventory["radiant gem"] = inventory.get("radiant gem", 0) + gems
-            await pconn.execute(
-                "UPDATE users SET inventory = $1::json where u_id = $2",
-                inventory,
-                ctx.author.id,
-            )
+        await ctx.bot.commondb.add_items(ctx.author.id, {"radiant gem": gems})
         msg += f"You also received {gems} Radiant Gems <a:radiantgem:1013790990852685955>!\n"
         msg += await self._maybe_spawn_event(ctx, 0.25)
         await ctx.send(msg)
@@ -485,22 +371,12 @@ class Chests(commands.Cog):
     async def legend(self, ctx):
         """Open a legend chest."""
         async with ctx.bot.db[0].acquire() as pconn:
-            inventory = await pconn.fetchval(
-                "SELECT inventory::json FROM users WHERE u_id = $1", ctx.author.id
-            )
-            if inventory is None:
-                await ctx.send(f"You have not Started!\nStart with `/start` first!")
-                return
-            if "legend chest" not in inventory or inventory["legend chest"] <= 0:
+            if not await ctx.bot.commondb.take_items(
+                ctx.author.id, {"legend chest": 1}, pconn=pconn
+            ):
                 await ctx.send("You do not have any Legend Chests!")
                 return
             # await self.log_chest(ctx)
-            inventory["legend chest"] = inventory.get("legend chest", 0) - 1
-            await pconn.execute(
-                "UPDATE users SET inventory = $1::json where u_id = $2",
-                inventory,
-                ctx.author.id,
-            )
             await pconn.execute("UPDATE achievements SET chests_legend = chests_legend + 1 WHERE u_id = $1", ctx.author.id)
         voucher_chance = 0 if ctx.author.id in (399855039130238986,) else 0.001
         reward = random.choices(
@@ -552,12 +428,7 @@ class Chests(commands.Cog):
             msg = f"You received a shiny boosted IV {pokemon}!\n"
         elif reward == "redeem":
             amount = random.randint(30, 50)
-            async with ctx.bot.db[0].acquire() as pconn:
-                await pconn.execute(
-                    "UPDATE users SET redeems = redeems + $1 WHERE u_id = $2",
-                    amount,
-                    ctx.author.id,
-                )
+            await ctx.bot.commondb.update_user(ctx.author.id, redeems=amount)
             msg = f"You received {amount} redeems!\n"
         elif reward == "radiant":
             pokemon = random.choice(self.CURRENTLY_ACTIVE)
@@ -596,16 +467,7 @@ class Chests(commands.Cog):
             )
             msg = f"You received a shiny boosted IV {pokemon}!\n"
         gems = random.randint(10, 15)
-        async with ctx.bot.db[0].acquire() as pconn:
-            inv = await pconn.fetchval(
-                "SELECT inventory::json FROM users WHERE u_id = $1", ctx.author.id
-            )
-            inv["radiant gem"] = inv.get("radiant gem", 0) + gems
-            await pconn.execute(
-                "UPDATE users SET inventory = $1::json where u_id = $2",
-                inv,
-                ctx.author.id,
-            )
+        await ctx.bot.commondb.add_items(ctx.author.id, {"radiant gem": gems})
         msg += f"You also received {gems} Radiant Gems <a:radiantgem:1013790990852685955>!\n"
         msg += await self._maybe_spawn_event(ctx, 0.33)
         await ctx.send(msg)
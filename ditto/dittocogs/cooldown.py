@@ -1,9 +1,8 @@
 import contextlib
-import time
 
 from discord.ext import commands
+from dittocore.rate_limits import fixed_window
 
-wait_cache = {}
 immune_ids = (
     455277032625012737,  # dylee
     728736503366156361,  # bust
@@ -29,6 +28,11 @@ immune_ids = (
 
 
 class Cooldown(commands.Cog):
+    def __init__(self, bot):
+        self.wait_cache = bot.rate_limits.local(
+            "cooldown", fixed_window(1, self.get_command_cooldown(None))
+        )
+
     def get_command_cooldown(self, command):
         return 3
         # commands_cooldown = {
@@ -49,21 +53,17 @@ class Cooldown(commands.Cog):
                     "I require `embed_links` permission in order to function properly. Please give me that permission and try again."
                 )
                 return False
-        if ctx.author.id in wait_cache and not ctx.command.parent:
-            wait = wait_cache.get(ctx.author.id)
-            if wait > time.time():
-                secs = wait - time.time()
-                cooldown = f"<t:{int(round(secs))}:R>"
-                with contextlib.suppress(Exception):
-                    await ctx.channel.send(f"Command on cooldown for {cooldown} ")
-                return
-            else:
-                wait_cache[ctx.author.id] = time.time() + 3
-                return True
-        else:
-            wait_cache[ctx.author.id] = time.time() + 3
-            return True
+        # Subcommands are never held back, they restart the wait like any other command
+        if ctx.command.parent:
+            self.wait_cache.reset(ctx.author.id)
+        secs = self.wait_cache.hit(ctx.author.id)
+        if secs:
+            cooldown = f"<t:{int(round(secs))}:R>"
+            with contextlib.suppress(Exception):
+                await ctx.channel.send(f"Command on cooldown for {cooldown} ")
+            return
+        return True
 
 
 async def setup(bot):
-    await bot.add_cog(Cooldown())
+    await bot.add_cog(Cooldown(bot))
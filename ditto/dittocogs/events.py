@@ -7,6 +7,8 @@ from datetime import datetime
 
 import discord
 from discord.ext import commands
+from dittocore.commondb import MULTIPLIER_CAPS, UserNotStartedError
+from dittocore.dex import TYPE_IDS
 from utils.checks import check_mod, tradelock
 from utils.misc import (
     ConfirmView,
@@ -19,6 +21,8 @@ from dittocogs.pokemon_list import *
 
 ORANGE = 0xF4831B
 RED_GREEN = [0xBB2528, 0x146B3A]
+# What a christmas raid attacker gets for the damage their move did
+CHRISTMAS_GIFTS = {2: "large gift", 1: "small gift", 0: "coal"}
 BUYABLE_SKINS = {
     "event/dittohalloween1": [
         "bulbasaur",
@@ -196,26 +200,26 @@ class RaidSpawn(discord.ui.View):
         self.channel = channel
         self.poke = poke
         self.skin = skin
-        self.registered = []
+        self.registered = set()
         self.attacked = {}
         self.state = "registering"
         self.message = None
 
     async def interaction_check(self, interaction):
         if self.state == "registering":
-            if interaction.user in self.registered:
+            if interaction.user.id in self.registered:
                 await interaction.response.send_message(
                     content="You have already joined!", ephemeral=True
                 )
                 return False
             return True
         elif self.state == "attacking":
-            if interaction.user in self.attacked:
+            if interaction.user.id in self.attacked:
                 await interaction.response.send_message(
                     content="You have already attacked!", ephemeral=True
                 )
                 return False
-            if interaction.user not in self.registered:
+            if interaction.user.id not in self.registered:
                 await interaction.response.send_message(
                     content="You didn't join the battle! You can't attack this one.",
                     ephemeral=True,
@@ -232,7 +236,7 @@ class RaidSpawn(discord.ui.View):
         pokeurl = "https://skylarr1227.github.io/skins/" + await get_battle_file_name(
             self.poke, self.bot, skin=self.skin
         )
-        guild = await self.bot.mongo_find("guilds", {"id": self.channel.guild.id})
+        guild = self.bot.guild_settings.get(self.channel.guild.id)
         if guild is None:
             small_images = False
         else:
@@ -264,64 +268,28 @@ class RaidSpawn(discord.ui.View):
             await self.message.edit(embed=embed, view=None)
             return
 
-        # Calculate valid moves of each effectiveness tier
-        form_info = await self.bot.db[1].forms.find_one(
-            {"identifier": self.poke.lower()}
-        )
-        type_ids = (
-            await self.bot.db[1].ptypes.find_one({"id": form_info["pokemon_id"]})
-        )["types"]
-        type_effectiveness = {}
-        for te in await self.bot.db[1].type_effectiveness.find({}).to_list(None):
-            type_effectiveness[(te["damage_type_id"], te["target_type_id"])] = te[
-                "damage_factor"
-            ]
-        super_types = []
-        normal_types = []
-        un_types = []
-        for attacker_type in range(1, 19):
-            effectiveness = 1
-            for defender_type in type_ids:
-                effectiveness *= (
-                    type_effectiveness[(attacker_type, defender_type)] / 100
-                )
+        # Sort the damaging moves of every type into tiers by how well they hit the raid poke
+        form = self.bot.dex.form(self.poke)
+        type_ids = self.bot.dex.types_of(form.pokemon_id)
+        super_moves = []
+        normal_moves = []
+        un_moves = []
+        for attacker_type, effectiveness in zip(
+            TYPE_IDS, self.bot.dex.effectiveness_against(*type_ids)
+        ):
             if effectiveness > 1:
-                super_types.append(attacker_type)
+                tier = super_moves
             elif effectiveness < 1:
-                un_types.append(attacker_type)
+                tier = un_moves
             else:
-                normal_types.append(attacker_type)
-        super_raw = (
-            await self.bot.db[1]
-            .moves.find(
-                {"type_id": {"$in": super_types}, "damage_class_id": {"$ne": 1}}
-            )
-            .to_list(None)
-        )
-        super_moves = [
-            x["identifier"].capitalize().replace("-", " ") for x in super_raw
-        ]
-        normal_raw = (
-            await self.bot.db[1]
-            .moves.find(
-                {"type_id": {"$in": normal_types}, "damage_class_id": {"$ne": 1}}
-            )
-            .to_list(None)
-        )
-        normal_moves = [
-            x["identifier"].capitalize().replace("-", " ") for x in normal_raw
-        ]
-        un_raw = (
-            await self.bot.db[1]
-            .moves.find({"type_id": {"$in": un_types}, "damage_class_id": {"$ne": 1}})
-            .to_list(None)
-        )
-        un_moves = [x["identifier"].capitalize().replace("-", " ") for x in un_raw]
+                tier = normal_moves
+            tier.extend(self.bot.dex.damaging_moves_of_type(attacker_type))
 
         # Add the moves to the view
-        moves = []
-        moves.append(RaidMove(random.choice(super_moves), 2))
-        moves.append(RaidMove(random.choice(normal_moves), 1))
+        moves = [
+            RaidMove(random.choice(super_moves), 2),
+            RaidMove(random.choice(normal_moves), 1),
+        ]
         for move in random.sample(un_moves, k=2):
             moves.append(RaidMove(move, 0))
         random.shuffle(moves)
@@ -365,12 +333,13 @@ class RaidSpawn(discord.ui.View):
             return
 
         async with self.bot.db[0].acquire() as pconn:
-            for attacker, damage in self.attacked.items():
-                await pconn.execute(
-                    "UPDATE users SET skin_tokens = skin_tokens + $1 WHERE u_id = $2",
-                    damage * 2,
-                    attacker.id,
-                )
+            await pconn.execute(
+                "UPDATE users SET skin_tokens = skin_tokens + r.tokens "
+                "FROM unnest($1::bigint[], $2::int[]) AS r(u_id, tokens) "
+                "WHERE users.u_id = r.u_id",
+                list(self.attacked),
+                [damage * 2 for damage in self.attacked.values()],
+            )
         embed = discord.Embed(
             title="The Ditto Pokémon was defeated! Attackers have been awarded skin tokens.",
             color=color,
@@ -389,7 +358,7 @@ class RaidJoin(discord.ui.Button):
         super().__init__(label="Join", style=discord.ButtonStyle.green)
 
     async def callback(self, interaction):
-        self.view.registered.append(interaction.user)
+        self.view.registered.add(interaction.user.id)
         await interaction.response.send_message(
             content="You have joined the battle!", ephemeral=True
         )
@@ -399,11 +368,11 @@ class RaidMove(discord.ui.Button):
     """A move button for attacking a ditto pokemon raid."""
 
     def __init__(self, move, damage):
+        self.move = move.identifier.capitalize().replace("-", " ")
         super().__init__(
-            label=move,
+            label=self.move,
             style=discord.ButtonStyle.gray,
         )
-        self.move = move
         self.damage = damage
         if damage == 2:
             self.effective = (
@@ -415,7 +384,7 @@ class RaidMove(discord.ui.Button):
             self.effective = "It shrugged off your attack..."
 
     async def callback(self, interaction):
-        self.view.attacked[interaction.user] = self.damage
+        self.view.attacked[interaction.user.id] = self.damage
         await interaction.response.send_message(
             content=f"You attack the ditto pokemon with {self.move}... {self.effective}",
             ephemeral=True,
@@ -683,11 +652,11 @@ class Events(commands.Cog):
                     "WHERE u_id = $1",
                     ctx.author.id,
                 )
-                inventory["common chest"] = inventory.get("common chest", 0) + 1
-                await pconn.execute(
-                    "UPDATE users SET mewcoins = mewcoins + 10000, inventory = $1::json WHERE u_id = $2",
-                    inventory,
+                await ctx.bot.commondb.update_user(
                     ctx.author.id,
+                    inventory={"common chest": 1},
+                    mewcoins=10000,
+                    pconn=pconn,
                 )
             await ctx.send("You have received 10k credits and 1 common chest.")
         elif choice == 2:
@@ -711,11 +680,11 @@ class Events(commands.Cog):
                     "omastar = omastar - 1, chansey = chansey - 1 WHERE u_id = $1",
                     ctx.author.id,
                 )
-                inventory["common chest"] = inventory.get("common chest", 0) + 2
-                await pconn.execute(
-                    "UPDATE users SET mewcoins = mewcoins + 25000, inventory = $1::json WHERE u_id = $2",
-                    inventory,
+                await ctx.bot.commondb.update_user(
                     ctx.author.id,
+                    inventory={"common chest": 2},
+                    mewcoins=25000,
+                    pconn=pconn,
                 )
             await ctx.send("You have received 25k credits and 2 common chests.")
         elif choice == 3:
@@ -730,11 +699,11 @@ class Events(commands.Cog):
                     "WHERE u_id = $1",
                     ctx.author.id,
                 )
-                inventory["rare chest"] = inventory.get("rare chest", 0) + 1
-                await pconn.execute(
-                    "UPDATE users SET mewcoins = mewcoins + 50000, inventory = $1::json WHERE u_id = $2",
-                    inventory,
+                await ctx.bot.commondb.update_user(
                     ctx.author.id,
+                    inventory={"rare chest": 1},
+                    mewcoins=50000,
+                    pconn=pconn,
                 )
             await ctx.send("You have received 50k credits and 1 rare chest.")
         elif choice == 4:
@@ -748,11 +717,11 @@ class Events(commands.Cog):
                     "UPDATE eggs SET kyogre = kyogre - 1, dialga = dialga - 1 WHERE u_id = $1",
                     ctx.author.id,
                 )
-                inventory["mythic chest"] = inventory.get("mythic chest", 0) + 1
-                await pconn.execute(
-                    "UPDATE users SET mewcoins = mewcoins + 50000, inventory = $1::json WHERE u_id = $2",
-                    inventory,
+                await ctx.bot.commondb.update_user(
                     ctx.author.id,
+                    inventory={"mythic chest": 1},
+                    mewcoins=50000,
+                    pconn=pconn,
                 )
             await ctx.send("You have received 50k credits and 1 mythic chest.")
         elif choice == 5:
@@ -769,11 +738,8 @@ class Events(commands.Cog):
                     ctx.author.id,
                 )
                 if data["got_radiant"]:
-                    inventory["legend chest"] = inventory.get("legend chest", 0) + 1
-                    await pconn.execute(
-                        "UPDATE users SET inventory = $1::json WHERE u_id = $2",
-                        inventory,
-                        ctx.author.id,
+                    await ctx.bot.commondb.add_items(
+                        ctx.author.id, {"legend chest": 1}, pconn=pconn
                     )
                     await ctx.send("You have received 1 legend chest.")
                 else:
@@ -1105,49 +1071,25 @@ class Events(commands.Cog):
                 price,
             )
             if option == 2:
-                inventory = await pconn.fetchval(
-                    "SELECT inventory::json FROM users WHERE u_id = $1", ctx.author.id
-                )
-                inventory["ghost detector"] = inventory.get("ghost detector", 0) + 1
-                await pconn.execute(
-                    "UPDATE users SET inventory = $1::json where u_id = $2",
-                    inventory,
-                    ctx.author.id,
+                await ctx.bot.commondb.add_items(
+                    ctx.author.id, {"ghost detector": 1}, pconn=pconn
                 )
                 await ctx.send(
                     f"Successfully bought a ghost detector for {price} bones."
                 )
             elif option == 3:
-                inventory = await pconn.fetchval(
-                    "SELECT inventory::json FROM users WHERE u_id = $1", ctx.author.id
-                )
-                inventory["spooky chest"] = inventory.get("spooky chest", 0) + 1
-                await pconn.execute(
-                    "UPDATE users SET inventory = $1::json where u_id = $2",
-                    inventory,
-                    ctx.author.id,
+                await ctx.bot.commondb.add_items(
+                    ctx.author.id, {"spooky chest": 1}, pconn=pconn
                 )
                 await ctx.send(f"Successfully bought a spooky chest for {price} bones.")
             elif option == 4:
-                inventory = await pconn.fetchval(
-                    "SELECT inventory::json FROM users WHERE u_id = $1", ctx.author.id
-                )
-                inventory["fleshy chest"] = inventory.get("fleshy chest", 0) + 1
-                await pconn.execute(
-                    "UPDATE users SET inventory = $1::json where u_id = $2",
-                    inventory,
-                    ctx.author.id,
+                await ctx.bot.commondb.add_items(
+                    ctx.author.id, {"fleshy chest": 1}, pconn=pconn
                 )
                 await ctx.send(f"Successfully bought a fleshy chest for {price} bones.")
             elif option == 5:
-                inventory = await pconn.fetchval(
-                    "SELECT inventory::json FROM users WHERE u_id = $1", ctx.author.id
-                )
-                inventory["horrific chest"] = inventory.get("horrific chest", 0) + 1
-                await pconn.execute(
-                    "UPDATE users SET inventory = $1::json where u_id = $2",
-                    inventory,
-                    ctx.author.id,
+                await ctx.bot.commondb.add_items(
+                    ctx.author.id, {"horrific chest": 1}, pconn=pconn
                 )
                 await ctx.send(
                     f"Successfully bought a horrific chest for {price} bones."
@@ -1240,22 +1182,9 @@ class Events(commands.Cog):
         if not self.HALLOWEEN_COMMANDS:
             await ctx.send("This command can only be used during the halloween season!")
             return
-        async with ctx.bot.db[0].acquire() as pconn:
-            inventory = await pconn.fetchval(
-                "SELECT inventory::json FROM users WHERE u_id = $1", ctx.author.id
-            )
-            if inventory is None:
-                await ctx.send(f"You have not Started!\nStart with `/start` first!")
-                return
-            if "spooky chest" not in inventory or inventory["spooky chest"] <= 0:
-                await ctx.send("You do not have any Spooky Chests!")
-                return
-            inventory["spooky chest"] = inventory.get("spooky chest", 0) - 1
-            await pconn.execute(
-                "UPDATE users SET inventory = $1::json where u_id = $2",
-                inventory,
-                ctx.author.id,
-            )
+        if not await ctx.bot.commondb.take_items(ctx.author.id, {"spooky chest": 1}):
+            await ctx.send("You do not have any Spooky Chests!")
+            return
         reward = random.choices(
             ("radiant", "ev", "missingno", "redeem", "cred", "trick"),
             weights=(0.005, 0.2, 0.2, 0.05, 0.03, 0.515),
@@ -1317,22 +1246,9 @@ class Events(commands.Cog):
         if not self.HALLOWEEN_COMMANDS:
             await ctx.send("This command can only be used during the halloween season!")
             return
-        async with ctx.bot.db[0].acquire() as pconn:
-            inventory = await pconn.fetchval(
-                "SELECT inventory::json FROM users WHERE u_id = $1", ctx.author.id
-            )
-            if inventory is None:
-                await ctx.send(f"You have not Started!\nStart with `/start` first!")
-                return
-            if "fleshy chest" not in inventory or inventory["fleshy chest"] <= 0:
-                await ctx.send("You do not have any Fleshy Chests!")
-                return
-            inventory["fleshy chest"] = inventory.get("fleshy chest", 0) - 1
-            await pconn.execute(
-                "UPDATE users SET inventory = $1::json where u_id = $2",
-                inventory,
-                ctx.author.id,
-            )
+        if not await ctx.bot.commondb.take_items(ctx.author.id, {"fleshy chest": 1}):
+            await ctx.send("You do not have any Fleshy Chests!")
+            return
         reward = random.choices(
             ("radiant", "redeem", "boostedshiny", "missingno", "trick"),
             weights=(0.1, 0.2, 0.05, 0.15, 0.5),
@@ -1382,22 +1298,9 @@ class Events(commands.Cog):
         if not self.HALLOWEEN_COMMANDS:
             await ctx.send("This command can only be used during the halloween season!")
             return
-        async with ctx.bot.db[0].acquire() as pconn:
-            inventory = await pconn.fetchval(
-                "SELECT inventory::json FROM users WHERE u_id = $1", ctx.author.id
-            )
-            if inventory is None:
-                await ctx.send(f"You have not Started!\nStart with `/start` first!")
-                return
-            if "horrific chest" not in inventory or inventory["horrific chest"] <= 0:
-                await ctx.send("You do not have any Horrific Chests!")
-                return
-            inventory["horrific chest"] = inventory.get("horrific chest", 0) - 1
-            await pconn.execute(
-                "UPDATE users SET inventory = $1::json where u_id = $2",
-                inventory,
-                ctx.author.id,
-            )
+        if not await ctx.bot.commondb.take_items(ctx.author.id, {"horrific chest": 1}):
+            await ctx.send("You do not have any Horrific Chests!")
+            return
         reward = random.choices(
             ("boostedshiny", "missingno", "radiant", "trick"),
             weights=(0.155, 0.3, 0.235, 0.31),
@@ -1450,9 +1353,9 @@ class Events(commands.Cog):
                     "There is already honey in this channel! You can't use this yet."
                 )
                 return
-            if "ghost detector" in inv and inv["ghost detector"] >= 1:
-                inv["ghost detector"] -= 1
-            else:
+            if not await ctx.bot.commondb.take_items(
+                ctx.author.id, {"ghost detector": 1}, pconn=pconn
+            ):
                 await ctx.send("You do not have any ghost detectors!")
                 return
             expires = int(time.time() + (60 * 60))
@@ -1462,11 +1365,6 @@ class Events(commands.Cog):
                 expires,
                 ctx.author.id,
             )
-            await pconn.execute(
-                "UPDATE users SET inventory = $1::json WHERE u_id = $2",
-                inv,
-                ctx.author.id,
-            )
             await ctx.send(
                 "You have successfully started a ghost detector, ghost spawn chances are greatly increased for the next hour!"
             )
@@ -1553,15 +1451,14 @@ class Events(commands.Cog):
                     await ctx.send("You don't have enough coal for that!")
                     return
                 holidayinv["coal"] -= 50
-                inventory = await pconn.fetchval(
-                    "SELECT inventory::json FROM users WHERE u_id = $1", ctx.author.id
-                )
-                inventory["battle-multiplier"] = min(
-                    inventory.get("battle-multiplier", 0) + 2, 50
+                await ctx.bot.commondb.add_items_clamped(
+                    ctx.author.id,
+                    {"battle-multiplier": 2},
+                    caps=MULTIPLIER_CAPS,
+                    pconn=pconn,
                 )
                 await pconn.execute(
-                    "UPDATE users SET inventory = $1::json, holidayinv = $2::json WHERE u_id = $3",
-                    inventory,
+                    "UPDATE users SET holidayinv = $1::json WHERE u_id = $2",
                     holidayinv,
                     ctx.author.id,
                 )
@@ -1571,15 +1468,14 @@ class Events(commands.Cog):
                     await ctx.send("You don't have enough coal for that!")
                     return
                 holidayinv["coal"] -= 50
-                inventory = await pconn.fetchval(
-                    "SELECT inventory::json FROM users WHERE u_id = $1", ctx.author.id
-                )
-                inventory["shiny-multiplier"] = min(
-                    inventory.get("shiny-multiplier", 0) + 2, 50
+                await ctx.bot.commondb.add_items_clamped(
+                    ctx.author.id,
+                    {"shiny-multiplier": 2},
+                    caps=MULTIPLIER_CAPS,
+                    pconn=pconn,
                 )
                 await pconn.execute(
-                    "UPDATE users SET inventory = $1::json, holidayinv = $2::json WHERE u_id = $3",
-                    inventory,
+                    "UPDATE users SET holidayinv = $1::json WHERE u_id = $2",
                     holidayinv,
                     ctx.author.id,
                 )
@@ -1589,13 +1485,11 @@ class Events(commands.Cog):
                     await ctx.send("You don't have enough coal for that!")
                     return
                 holidayinv["coal"] -= 85
-                inventory = await pconn.fetchval(
-                    "SELECT inventory::json FROM users WHERE u_id = $1", ctx.author.id
+                await ctx.bot.commondb.add_items(
+                    ctx.author.id, {"radiant gem": 1}, pconn=pconn
                 )
-                inventory["radiant gem"] = inventory.get("radiant gem", 0) + 1
                 await pconn.execute(
-                    "UPDATE users SET inventory = $1::json, holidayinv = $2::json WHERE u_id = $3",
-                    inventory,
+                    "UPDATE users SET holidayinv = $1::json WHERE u_id = $2",
                     holidayinv,
                     ctx.author.id,
                 )
@@ -2182,25 +2076,17 @@ class Events(commands.Cog):
                     winners[self.UNOWN_GUESSES[idx]] += self.UNOWN_POINTS[character]
             async with self.bot.db[0].acquire() as pconn:
                 for uid, points in winners.items():
+                    chests = 0
                     if points > 10:
-                        points //= 10
-                        inventory = await pconn.fetchval(
-                            "SELECT inventory::json FROM users WHERE u_id = $1", uid
-                        )
-                        inventory["rare chest"] = (
-                            inventory.get("rare chest", 0) + points
-                        )
-                        await pconn.execute(
-                            "UPDATE users SET inventory = $1::json WHERE u_id = $2",
-                            inventory,
+                        chests = points // 10
+                        points = 10
+                    with contextlib.suppress(UserNotStartedError):
+                        await self.bot.commondb.update_user(
                             uid,
+                            inventory={"rare chest": chests},
+                            mewcoins=points * 5000,
+                            pconn=pconn,
                         )
-                        points = 10
-                    await pconn.execute(
-                        "UPDATE users SET mewcoins = mewcoins + $1 WHERE u_id = $2",
-                        points * 5000,
-                        uid,
-                    )
                 await pconn.execute("UPDATE users SET holidayinv = '{}'")
             embed = discord.Embed(
                 title="You identified the word!",
@@ -2284,30 +2170,30 @@ class ChristmasSpawn(discord.ui.View):
         self.cog = cog
         self.channel = channel
         self.poke = poke
-        self.registered = []
+        self.registered = set()
         self.attacked = {}
         self.state = "registering"
         self.message = None
 
     async def interaction_check(self, interaction):
         if self.state == "registering":
-            if interaction.user in self.registered:
+            if interaction.user.id in self.registered:
                 await interaction.response.send_message(
                     content="You have already joined!", ephemeral=True
                 )
                 return False
-            self.registered.append(interaction.user)
+            self.registered.add(interaction.user.id)
             await interaction.response.send_message(
                 content="You have joined the battle!", ephemeral=True
             )
             return False
         elif self.state == "attacking":
-            if interaction.user in self.attacked:
+            if interaction.user.id in self.attacked:
                 await interaction.response.send_message(
                     content="You have already attacked!", ephemeral=True
                 )
                 return False
-            if interaction.user not in self.registered:
+            if interaction.user.id not in self.registered:
                 await interaction.response.send_message(
                     content="You didn't join the battle! You can't attack this one.",
                     ephemeral=True,
@@ -2325,7 +2211,7 @@ class ChristmasSpawn(discord.ui.View):
         pokeurl = "https://skylarr1227.github.io/skins/" + await get_battle_file_name(
             self.poke, self.cog.bot, skin="xmas"
         )
-        guild = await self.cog.bot.mongo_find("guilds", {"id": self.channel.guild.id})
+        guild = self.cog.bot.guild_settings.get(self.channel.guild.id)
         if guild is None:
             small_images = False
         else:
@@ -2385,23 +2271,19 @@ class ChristmasSpawn(discord.ui.View):
             await self.message.edit(embed=self.embed, view=None)
             return
         async with self.cog.bot.db[0].acquire() as pconn:
-            for attacker, damage in self.attacked.items():
-                inventory = await pconn.fetchval(
-                    "SELECT holidayinv::json FROM users WHERE u_id = $1", attacker.id
-                )
-                if inventory is None:
-                    continue
-                if damage == 2:
-                    inventory["large gift"] = inventory.get("large gift", 0) + 1
-                elif damage == 1:
-                    inventory["small gift"] = inventory.get("small gift", 0) + 1
-                elif damage == 0:
-                    inventory["coal"] = inventory.get("coal", 0) + 1
-                await pconn.execute(
-                    "UPDATE users SET holidayinv = $1::json WHERE u_id = $2",
-                    inventory,
-                    attacker.id,
-                )
+            await pconn.execute(
+                """
+                UPDATE users SET holidayinv = (
+                    holidayinv::jsonb || jsonb_build_object(
+                        r.gift, COALESCE((holidayinv::jsonb ->> r.gift)::int, 0) + 1
+                    )
+                )::json
+                FROM unnest($1::bigint[], $2::text[]) AS r(u_id, gift)
+                WHERE users.u_id = r.u_id AND holidayinv IS NOT NULL
+                """,
+                list(self.attacked),
+                [CHRISTMAS_GIFTS[damage] for damage in self.attacked.values()],
+            )
         self.embed = discord.Embed(
             title="The Christmas Pokémon was defeated! Attackers have been awarded.",
             color=color,
@@ -2433,7 +2315,7 @@ class ChristmasMove(discord.ui.Button):
             )
 
     async def callback(self, interaction):
-        self.view.attacked[interaction.user] = self.damage
+        self.view.attacked[interaction.user.id] = self.damage
         await interaction.response.send_message(
             content=f"You used {self.move}. {self.effective}", ephemeral=True
         )
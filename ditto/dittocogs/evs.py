@@ -27,19 +27,14 @@ class Evs(commands.Cog):
         if amount < 1:
             await ctx.send("You must add at least 1 EV to a stat")
             return
-        async with ctx.bot.db[0].acquire() as pconn:
-            _id = await pconn.fetchval(
-                "SELECT selected FROM users WHERE u_id = $1", ctx.author.id
-            )
+        user = await ctx.loader.user()
+        _id = None if user is None else user["selected"]
         if not _id:
             await ctx.send(
                 f"You do not have a selected pokemon!\nUse `/select` to select a pokemon."
             )
             return
-        async with ctx.bot.db[0].acquire() as pconn:
-            ev_points = await pconn.fetchval(
-                "SELECT evpoints FROM users WHERE u_id = $1", ctx.author.id
-            )
+        ev_points = user["evpoints"]
         if ev_points is None:
             await ctx.send(f"You have not Started!\nStart with `/start` first!")
             return
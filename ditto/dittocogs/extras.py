@@ -1,4 +1,3 @@
-import ast
 import random
 import re
 import time
@@ -9,8 +8,15 @@ import discord
 import ujson
 from discord import Embed
 from discord.ext import commands
+from dittocore.commondb import UserNotStartedError
 from utils.checks import tradelock
-from utils.misc import ConfirmView, MenuView, get_pokemon_image, pagify
+from utils.misc import (
+    ConfirmView,
+    LazyMenuView,
+    MenuView,
+    get_pokemon_image,
+    pagify,
+)
 
 from dittocogs.json_files import *
 from dittocogs.market import (
@@ -22,6 +28,66 @@ from dittocogs.market import (
 from dittocogs.pokemon_list import *
 
 
+LEADERBOARD_FORMATS = {
+    "vote": ("Upvote Streak Rankings!", "{rank}. {score:,} votes - {name}"),
+    "pokemon": ("Pokemon Leaderboard!", "__{rank}__. {score:,} Pokemon - {name}"),
+    "fishing": ("Fishing Leaderboard!", "__{rank}__. `FishEXP` : **{score}** - `{name}`"),
+}
+
+
+class LeaderboardPages:
+    """
+    Pages of a leaderboard, for use with a LazyMenuView.
+
+    Each page reads just its own ranks from the leaderboard, and the trainer names
+    for those ranks, so the board never has to be sorted or fetched as a whole.
+    """
+
+    PER_PAGE = 15
+
+    def __init__(self, bot, board: str, line: str, *, base_embed: discord.Embed):
+        self.bot = bot
+        self.board = board
+        self.line = line
+        self.base_embed = base_embed
+        self.total = 0
+        self.footer = ""
+
+    def __len__(self):
+        return max(1, -(-self.total // self.PER_PAGE))
+
+    async def load(self, user_id: int):
+        """Fetches the size of the board, and where `user_id` is on it."""
+        self.total = await self.bot.leaderboards.count(self.board)
+        ranked = await self.bot.leaderboards.rank(self.board, user_id)
+        if ranked is not None:
+            self.footer = f" | You are #{ranked[0]:,}"
+
+    async def get_page(self, idx: int) -> discord.Embed:
+        start = idx * self.PER_PAGE
+        entries = await self.bot.leaderboards.top(
+            self.board, start, start + self.PER_PAGE
+        )
+        async with self.bot.db[0].acquire() as pconn:
+            records = await pconn.fetch(
+                "SELECT u_id, tnick FROM users WHERE u_id = ANY($1)",
+                [user_id for user_id, _ in entries],
+            )
+        names = {record["u_id"]: record["tnick"] for record in records}
+
+        desc = ""
+        for rank, (user_id, score) in enumerate(entries, start=start + 1):
+            if names.get(user_id) is not None:
+                name = f"{names[user_id]} - ({user_id})"
+            else:
+                name = f"Unknown user - ({user_id})"
+            desc += self.line.format(rank=rank, score=score, name=name) + "\n"
+        embed = self.base_embed.copy()
+        embed.description = desc or "Nobody is on this leaderboard yet."
+        embed.set_footer(text=f"Page {idx + 1}/{len(self)}{self.footer}")
+        return embed
+
+
 def do_health(maxHealth, health, healthDashes=10):
     dashConvert = int(
         maxHealth / healthDashes
@@ -78,12 +144,6 @@ class Extras(commands.Cog):
     @spread_cmds.command()
     async def honey(self, ctx):
         async with ctx.bot.db[0].acquire() as pconn:
-            inv = await pconn.fetchval(
-                "SELECT inventory::json FROM users WHERE u_id = $1", ctx.author.id
-            )
-            if not inv:
-                await ctx.send(f"You have not Started!\nStart with `/start` first!")
-                return
             honey = await pconn.fetchval(
                 "SELECT * FROM honey WHERE channel = $1 LIMIT 1",
                 ctx.channel.id,
@@ -93,10 +153,14 @@ class Extras(commands.Cog):
                     "There is already honey in this channel! You can't add more yet."
                 )
                 return
-            if "honey" in inv and inv["honey"] >= 1:
-                inv["honey"] -= 1
-            else:
-                await ctx.send("You do not have any units of Honey!")
+            try:
+                if not await ctx.bot.commondb.take_items(
+                    ctx.author.id, {"honey": 1}, pconn=pconn
+                ):
+                    await ctx.send("You do not have any units of Honey!")
+                    return
+            except UserNotStartedError:
+                await ctx.send(f"You have not Started!\nStart with `/start` first!")
                 return
             expires = int(time.time() + (60 * 60))
             await pconn.execute(
@@ -105,71 +169,30 @@ class Extras(commands.Cog):
                 expires,
                 ctx.author.id,
             )
-            await pconn.execute(
-                "UPDATE users SET inventory = $1::json WHERE u_id = $2",
-                inv,
-                ctx.author.id,
-            )
             await ctx.send(
                 "You have successfully spread some of your honey, rare spawn chance increased by nearly 20 times normal in this channel for the next hour!"
             )
 
     @commands.hybrid_command()
     async def leaderboard(self, ctx, board: str):
-        LEADERBOARD_IMMUNE_USERS = [
-            195938951188578304,  # gomp
-            3746,  # not a real user, just used to store pokes and such
-        ]
-        if board.lower() == "vote":
-            async with ctx.bot.db[0].acquire() as pconn:
-                leaders = await pconn.fetch(
-                    "SELECT tnick, vote_streak, u_id, staff FROM users WHERE last_vote >= $1 ORDER BY vote_streak DESC",
-                    time.time() - (36 * 60 * 60),
-                )
-            names = [record["tnick"] for record in leaders]
-            votes = [record["vote_streak"] for record in leaders]
-            ids = [record["u_id"] for record in leaders]
-            staffs = [record["staff"] for record in leaders]
-            embed = discord.Embed(title="Upvote Streak Rankings!", color=0xFFB6C1)
-            desc = ""
-            true_idx = 1
-            for idx, vote in enumerate(votes):
-                if staffs[idx] == "Developer" or ids[idx] in LEADERBOARD_IMMUNE_USERS:
-                    continue
-                if names[idx] is not None:
-                    name = f"{names[idx]} - ({ids[idx]})"
-                else:
-                    name = f"Unknown user - ({ids[idx]})"
-                desc += f"{true_idx}. {vote:,} votes - {name}\n"
-                true_idx += 1
-            pages = pagify(desc, base_embed=embed)
-            await MenuView(ctx, pages).start()
-        elif board.lower() == "servers":
-            total = []
-            launcher_res = await self.bot.handler("statuses", 1, scope="launcher")
-            if not launcher_res:
-                await ctx.send(
-                    "I can't process that request right now, try again later."
-                )
-                return
-            processes = len(launcher_res[0])
-            body = "return {x.name: x.member_count for x in bot.guilds if x.member_count is not None}"
-            eval_res = await self.bot.handler(
-                "_eval",
-                processes,
-                args={"body": body, "cluster_id": "-1"},
-                scope="bot",
-                _timeout=5,
+        if board.lower() in LEADERBOARD_FORMATS:
+            board = board.lower()
+            title, line = LEADERBOARD_FORMATS[board]
+            pages = LeaderboardPages(
+                ctx.bot,
+                board,
+                line,
+                base_embed=discord.Embed(title=title, color=0xFFB6C1),
             )
-            if not eval_res:
+            await pages.load(ctx.author.id)
+            await LazyMenuView(ctx, pages).start()
+        elif board.lower() == "servers":
+            total = await self.bot.telemetry.top_guilds()
+            if not total:
                 await ctx.send(
                     "I can't process that request right now, try again later."
                 )
                 return
-            for response in eval_res:
-                if response["message"]:
-                    total.extend(ast.literal_eval(response["message"]).items())
-            total.sort(key=lambda a: a[1], reverse=True)
             embed = discord.Embed(title="Top Servers with DittoBOT!", color=0xFFB6C1)
             desc = ""
             for true_idx, data in enumerate(total, start=1):
@@ -177,57 +200,6 @@ class Extras(commands.Cog):
                 desc += f"{true_idx}. {count:,} members - {name}\n"
             pages = pagify(desc, base_embed=embed)
             await MenuView(ctx, pages).start()
-        elif board.lower() == "pokemon":
-            async with ctx.bot.db[0].acquire() as pconn:
-                details = await pconn.fetch(
-                    """SELECT u_id, cardinality(pokes) as pokenum, staff, tnick FROM users ORDER BY pokenum DESC"""
-                )
-            pokes = [record["pokenum"] for record in details]
-            ids = [record["u_id"] for record in details]
-            staffs = [record["staff"] for record in details]
-            names = [record["tnick"] for record in details]
-            embed = discord.Embed(title="Pokemon Leaderboard!", color=0xFFB6C1)
-            desc = ""
-            true_idx = 1
-            for idx, id in enumerate(ids):
-                if staffs[idx] == "Developer" or ids[idx] in LEADERBOARD_IMMUNE_USERS:
-                    continue
-                pokenum = pokes[idx]
-                if names[idx] is not None:
-                    name = f"{names[idx]} - ({id})"
-                else:
-                    name = f"Unknown user - ({id})"
-                desc += f"__{true_idx}__. {pokenum:,} Pokemon - {name}\n"
-                true_idx += 1
-            pages = pagify(desc, base_embed=embed)
-            await MenuView(ctx, pages).start()
-        elif board.lower() == "fishing":
-            async with ctx.bot.db[0].acquire() as pconn:
-                details = await pconn.fetch(
-                    """SELECT u_id, fishing_exp, fishing_level as pokenum, staff, tnick FROM users ORDER BY fishing_exp DESC"""
-                )
-
-            pokes = [record["pokenum"] for record in details]
-            exps = [t["fishing_exp"] for t in details]
-            ids = [record["u_id"] for record in details]
-            staffs = [record["staff"] for record in details]
-            names = [record["tnick"] for record in details]
-            embed = discord.Embed(title="Fishing Leaderboard!", color=0xFFB6C1)
-            desc = ""
-            true_idx = 1
-            for idx, id in enumerate(ids):
-                if staffs[idx] == "Developer" or ids[idx] in LEADERBOARD_IMMUNE_USERS:
-                    continue
-                pokenum = pokes[idx]
-                exp = exps[idx]
-                if names[idx] is not None:
-                    name = f"{names[idx]} - ({id})"
-                else:
-                    name = f"Unknown user - ({id})"
-                desc += f"__{true_idx}__. `FishEXP` : **{exp}** - `{name}`\n"
-                true_idx += 1
-            pages = pagify(desc, base_embed=embed)
-            await MenuView(ctx, pages).start()
 
     @commands.hybrid_command()
     async def server(self, ctx):
@@ -276,32 +248,25 @@ class Extras(commands.Cog):
             await ctx.send("That Nature does not exist!")
             return
         nature = nature.capitalize()
-        async with ctx.bot.db[0].acquire() as conn:
-            dets = await conn.fetchval(
-                "SELECT inventory::json FROM users WHERE u_id = $1", ctx.author.id
-            )
-        if dets is None:
+        user = await ctx.loader.user()
+        if user is None:
             await ctx.send(f"You have not Started!\nStart with `/start` first!")
             return
-        if dets["nature-capsules"] <= 0 or nature is None:
-            await ctx.send(
-                "You have no nature capsules! Buy some with `/redeem nature capsules`."
-            )
-            return
-        dets["nature-capsules"] = dets["nature-capsules"] - 1
+        _id = user["selected"]
         async with ctx.bot.db[0].acquire() as pconn:
-            _id = await pconn.fetchval(
-                "SELECT selected FROM users WHERE u_id = $1", ctx.author.id
-            )
-            name = await pconn.fetchval("SELECT pokname FROM pokes WHERE id = $1", _id)
-            await pconn.execute(
-                "UPDATE users SET inventory = $1::json WHERE u_id = $2",
-                dets,
-                ctx.author.id,
-            )
-            await pconn.execute(
-                "UPDATE pokes SET nature = $1 WHERE id = $2", nature, _id
-            )
+            async with pconn.transaction():
+                # Taken in the update itself, the loaded inventory may already be out of date
+                if not await ctx.bot.commondb.take_items(
+                    ctx.author.id, {"nature-capsules": 1}, pconn=pconn
+                ):
+                    await ctx.send(
+                        "You have no nature capsules! Buy some with `/redeem nature capsules`."
+                    )
+                    return
+                await pconn.execute(
+                    "UPDATE pokes SET nature = $1 WHERE id = $2", nature, _id
+                )
+        ctx.loader.invalidate(_id)
         await ctx.send(
             f"You have successfully changed your selected Pokemon's nature to {nature}"
         )
@@ -408,15 +373,7 @@ class Extras(commands.Cog):
         if result:
             clusternum = result[0]["clusters"]
             shardnum = result[0]["shards"]
-            process_res = await ctx.bot.handler(
-                "_eval",
-                clusternum,
-                args={"body": "return len(bot.guilds)", "cluster_id": "-1"},
-                scope="bot",
-            )
-            servernum = 0
-            for cluster in process_res:
-                servernum += int(cluster["message"])
+            servernum = await ctx.bot.telemetry.guild_count() or len(ctx.bot.guilds)
         else:
             clusternum = "1"
             shardnum = len(ctx.bot.shards)
@@ -822,11 +779,13 @@ class Extras(commands.Cog):
                     f"You are not permitted to see the Trainer card of {user.name}"
                 )
                 return
-            pokes = details["pokes"]
-            daycared = await tconn.fetchval(
-                "SELECT count(*) FROM pokes WHERE id = ANY ($1) AND pokname = 'Egg'",
-                pokes,
-            )
+            async with ctx.bot.commondb.ownership_conn(user.id, tconn):
+                daycared = await tconn.fetchval(
+                    "SELECT count(*) FROM ownership INNER JOIN pokes ON pokes.id = ownership.poke_id "
+                    "WHERE ownership.u_id = $1 AND pokname = 'Egg'",
+                    user.id,
+                )
+                count = await ctx.bot.commondb.count_pokes(user.id, pconn=tconn)
             usedmarket = await tconn.fetchval(
                 "SELECT count(id) FROM market WHERE owner = $1 AND buyer IS NULL",
                 user.id,
@@ -843,7 +802,6 @@ class Extras(commands.Cog):
         hitem = details["held_item"]
         marketlimit = details["marketlimit"]
         dets = details["inventory"]
-        count = len(pokes)
         is_staff = details["staff"]
 
         embed = Embed(color=0xFFB6C1)
@@ -1039,7 +997,6 @@ class Extras(commands.Cog):
                 vote_streak = 0
             else:
                 vote_streak = details["vote_streak"]
-            pokes = details["pokes"]
             mystery_token = details["mystery_token"]
             details["visible"]
             details["u_id"]
@@ -1048,7 +1005,6 @@ class Extras(commands.Cog):
             uppoints = details["upvotepoints"]
             mewcoins = details["mewcoins"]
             evpoints = details["evpoints"]
-            len(pokes)
             is_staff = details["staff"]
             region = details["region"]
             staffrank = await tconn.fetchval(
@@ -1191,11 +1147,13 @@ class Extras(commands.Cog):
                     f"You are not permitted to see how many chests {user.name} has"
                 )
                 return
-            pokes = details["pokes"]
-            daycared = await pconn.fetchval(
-                "SELECT count(*) FROM pokes WHERE id = ANY ($1) AND pokname = 'Egg'",
-                pokes,
-            )
+            async with ctx.bot.commondb.ownership_conn(user.id, pconn):
+                daycared = await pconn.fetchval(
+                    "SELECT count(*) FROM ownership INNER JOIN pokes ON pokes.id = ownership.poke_id "
+                    "WHERE ownership.u_id = $1 AND pokname = 'Egg'",
+                    user.id,
+                )
+                count = await ctx.bot.commondb.count_pokes(user.id, pconn=pconn)
             usedmarket = await pconn.fetchval(
                 "SELECT count(id) FROM market WHERE owner = $1 AND buyer IS NULL",
                 user.id,
@@ -1208,7 +1166,6 @@ class Extras(commands.Cog):
         hitem = details["held_item"]
         marketlimit = details["marketlimit"]
         dets = details["inventory"]
-        count = len(pokes)
         is_staff = details["staff"]
         hunt = details["hunt"]
         huntprogress = details["chain"]
@@ -27,24 +27,19 @@ class Favs(commands.Cog):
 
     @fav_cmds.command()
     async def add(self, ctx, poke: int = None):
+        if poke is None:
+            details = await ctx.loader.selected()
+        elif poke < 1:
+            await ctx.send("You don't have that Pokemon")
+            return
+        else:
+            _id = await ctx.bot.commondb.poke_at(ctx.author.id, poke)
+            details = None if _id is None else await ctx.loader.poke(_id)
+        if details is None:
+            await ctx.send("You don't have that Pokemon")
+            return
+        _id, name = details["id"], details["pokname"]
         async with ctx.bot.db[0].acquire() as pconn:
-            if poke is None:
-                _id = await pconn.fetchval(
-                    "SELECT selected FROM users WHERE u_id = $1", ctx.author.id
-                )
-            else:
-                if poke < 1:
-                    await ctx.send("You don't have that Pokemon")
-                    return
-                _id = await pconn.fetchval(
-                    "SELECT pokes[$1] FROM users WHERE u_id = $2",
-                    poke,
-                    ctx.author.id,
-                )
-            name = await pconn.fetchval("SELECT pokname FROM pokes WHERE id = $1", _id)
-            if name is None:
-                await ctx.send("You don't have that Pokemon")
-                return
             await pconn.execute("UPDATE pokes SET fav = $1 WHERE id = $2", True, _id)
             await ctx.send(
                 f"You have successfully added your {name} to your favourite pokemon list!"
@@ -52,24 +47,19 @@ class Favs(commands.Cog):
 
     @fav_cmds.command()
     async def remove(self, ctx, poke: int = None):
+        if poke is None:
+            details = await ctx.loader.selected()
+        elif poke < 1:
+            await ctx.send("You don't have that Pokemon")
+            return
+        else:
+            _id = await ctx.bot.commondb.poke_at(ctx.author.id, poke)
+            details = None if _id is None else await ctx.loader.poke(_id)
+        if details is None:
+            await ctx.send("You don't have that Pokemon")
+            return
+        _id, name = details["id"], details["pokname"]
         async with ctx.bot.db[0].acquire() as pconn:
-            if poke is None:
-                _id = await pconn.fetchval(
-                    "SELECT selected FROM users WHERE u_id = $1", ctx.author.id
-                )
-            else:
-                if poke < 1:
-                    await ctx.send("You don't have that Pokemon")
-                    return
-                _id = await pconn.fetchval(
-                    "SELECT pokes[$1] FROM users WHERE u_id = $2",
-                    poke,
-                    ctx.author.id,
-                )
-            name = await pconn.fetchval("SELECT pokname FROM pokes WHERE id = $1", _id)
-            if name is None:
-                await ctx.send("You don't have that Pokemon")
-                return
             await pconn.execute("UPDATE pokes SET fav = $1 WHERE id = $2", False, _id)
             await ctx.send(
                 f"You have successfully removed your {name} from your favourite pokemon list!"
@@ -2,7 +2,8 @@ from datetime import datetime, timedelta
 
 import discord
 from discord.ext import commands
-from utils.misc import AsyncIter, MenuView, get_emoji, pagify
+from pokemon_utils.stats import STAT_COLUMNS
+from utils.misc import LazyMenuView, get_emoji
 
 from dittocogs.json_files import *
 from dittocogs.pokemon_list import *
@@ -60,17 +61,262 @@ KEYS = {
     "iv": "iv",  # ORDER
     "ev": "ev",  # ORDER
     "id": "id",  # ORDER
+    "hp-stat": "hp",  # ORDER, computed from base stats, nature, ivs and evs
+    "attack": "attack",
+    "atk": "attack",
+    "defense": "defense",
+    "def": "defense",
+    "spatk": "special-attack",
+    "special-attack": "special-attack",
+    "spdef": "special-defense",
+    "special-defense": "special-defense",
+    "speed": "speed",
+    "stats": "total",
+    "total": "total",
 }
+STAT_ORDERS = {
+    "hp": "HP",
+    "attack": "Atk",
+    "defense": "Def",
+    "special-attack": "SpA",
+    "special-defense": "SpD",
+    "speed": "Spe",
+    "total": "Total",
+}
+# Sorting by a computed stat reads every matching row, so it is capped
+STAT_ORDER_LIMIT = 50000
 PRECEDENCE = {"!": 3, "&": 2, "|": 1}
 PER_PAGE = 15
-PAGE_COUNT = 150
-POKE_COUNT = PER_PAGE * PAGE_COUNT
+# The pokes a user owns, $1 is their id, the filter's conditions are appended after the AND
+OWNED_QUERY = (
+    "SELECT COALESCE(atkiv,0) + COALESCE(defiv,0) + COALESCE(spatkiv,0) + COALESCE(spdefiv,0) + COALESCE(speediv,0) + COALESCE(hpiv,0) AS ivs, "
+    "COALESCE(atkev,0) + COALESCE(defev,0) + COALESCE(spatkev,0) + COALESCE(spdefev,0) + COALESCE(speedev,0) + COALESCE(hpev,0) as evs, "
+    "ownership.position AS orderid, pokes.* "
+    "FROM ownership INNER JOIN pokes ON pokes.id = ownership.poke_id "
+    "WHERE ownership.u_id = $1 AND "
+)
 
 
 class ExtractionException(ValueError):
     pass
 
 
+class FilterPages:
+    """
+    Lazily fetched pages of filter results, for use with a LazyMenuView.
+
+    Rows are fetched PER_PAGE at a time using keyset pagination on (order_col, orderid),
+    seeking from a neighbouring page that was already fetched, so a page costs the same
+    no matter how far into the results it is.
+
+    Computed stats are not columns, so when sorting by one (`stat_order`) the stat columns
+    of every matching row are read once, the stats are computed in one go by the bot's
+    StatEngine, and pages are fetched by the orderids of their slice of that ordering.
+    """
+
+    def __init__(
+        self,
+        bot,
+        query: str,
+        args: list,
+        *,
+        filter_type: str,
+        order_col: str,
+        order_dir: str,
+        mothers: dict,
+        base_embed: discord.Embed,
+        stat_order: str = None,
+    ):
+        self.bot = bot
+        self.query = query
+        self.args = args
+        self.filter_type = filter_type
+        if order_col in (None, "orderid"):
+            self.keys = ("orderid",)
+        else:
+            self.keys = (order_col, "orderid")
+        self.order_dir = order_dir if (order_col or stat_order) else "ASC"
+        self.mothers = mothers
+        self.base_embed = base_embed
+        self.stat_order = stat_order
+        self.total = 0
+        self._rows = {}
+        self._order = []
+        self._stat_values = {}
+        # Set when a stat sort was asked for but there were too many rows to sort
+        self.too_many_to_sort = False
+
+    def __len__(self):
+        return max(1, -(-self.total // PER_PAGE))
+
+    async def count(self):
+        """Counts the rows matching the filter, which sets the number of pages."""
+        async with self.bot.db[0].acquire() as pconn:
+            self.total = await pconn.fetchval(
+                f"SELECT count(*) FROM ({self.query}) AS results",
+                *self.args,
+                timeout=20,
+            )
+        if self.stat_order is not None and self.total:
+            if self.total > STAT_ORDER_LIMIT:
+                self.too_many_to_sort = True
+            else:
+                await self._order_by_stat()
+
+    async def _order_by_stat(self):
+        """Reads the stat columns of every matching row and orders the orderids by the computed stat."""
+        async with self.bot.db[0].acquire() as pconn:
+            rows = await pconn.fetch(
+                f"SELECT orderid, {', '.join(STAT_COLUMNS)} FROM ({self.query}) AS results",
+                *self.args,
+                timeout=20,
+            )
+        orderids = [row["orderid"] for row in rows]
+        order, keys = self.bot.stat_engine.order(
+            rows, self.stat_order, orderids, descending=self.order_dir == "DESC"
+        )
+        self._order = order.tolist()
+        self._stat_values = dict(zip(orderids, keys.tolist()))
+        self.total = len(self._order)
+
+    async def _fetch_by_order(self, idx: int):
+        """Fetches the rows of a page when sorting by a computed stat."""
+        orderids = self._order[idx * PER_PAGE : (idx + 1) * PER_PAGE]
+        async with self.bot.db[0].acquire() as pconn:
+            rows = await pconn.fetch(
+                f"SELECT * FROM ({self.query}) AS results WHERE orderid = ANY(${len(self.args) + 1})",
+                *self.args,
+                orderids,
+                timeout=20,
+            )
+        positions = {orderid: pos for pos, orderid in enumerate(orderids)}
+        return sorted(rows, key=lambda row: positions[row["orderid"]])
+
+    async def _fetch(self, *, after=None, reverse=False, offset=0):
+        """
+        Fetches up to PER_PAGE rows in sort order.
+
+        If `after` is a row, only rows past it are returned. If `reverse`, rows are
+        read backwards from the end (or from `after`), but returned in sort order.
+        """
+        ascending = (self.order_dir == "ASC") != reverse
+        direction = "ASC" if ascending else "DESC"
+        args = list(self.args)
+        query = f"SELECT * FROM ({self.query}) AS results"
+        if after is not None:
+            params = []
+            for key in self.keys:
+                args.append(after[key])
+                params.append(f"${len(args)}")
+            query += (
+                f" WHERE ({', '.join(self.keys)}) {'>' if ascending else '<'} "
+                f"({', '.join(params)})"
+            )
+        query += " ORDER BY " + ", ".join(f"{key} {direction}" for key in self.keys)
+        query += f" LIMIT {PER_PAGE} OFFSET {offset}"
+        async with self.bot.db[0].acquire() as pconn:
+            rows = await pconn.fetch(query, *args, timeout=20)
+        return rows[::-1] if reverse else rows
+
+    async def get_page(self, idx: int) -> discord.Embed:
+        if idx not in self._rows:
+            if self.stat_order is not None:
+                rows = await self._fetch_by_order(idx)
+            elif idx - 1 in self._rows:
+                rows = await self._fetch(after=self._rows[idx - 1][-1])
+            elif idx + 1 in self._rows:
+                rows = await self._fetch(after=self._rows[idx + 1][0], reverse=True)
+            elif idx and idx == len(self) - 1:
+                # The last page only holds what is left over after the full pages
+                rows = await self._fetch(reverse=True)
+                rows = rows[idx * PER_PAGE - self.total :]
+            else:
+                rows = await self._fetch(offset=idx * PER_PAGE)
+            self._rows[idx] = rows
+        return self._format(idx, self._rows[idx])
+
+    def _format(self, idx: int, records) -> discord.Embed:
+        """Formats one page of rows into an embed."""
+        max_id = 0
+        max_lvl = 3
+        max_name = 0
+        max_price = 0
+        for record in records:
+            name = record["pokname"]
+            if name.capitalize() == "Egg":
+                name = record["name"]
+            max_name = max(max_name, len(name))
+            max_id = max(max_id, len(str(record["orderid"])))
+            if self.filter_type == "m":
+                max_price = max(max_price, len(f"{record['pokeprice']:,.0f}"))
+
+        desc = ""
+        for record in records:
+            nr = record["pokname"].capitalize()
+            is_egg = False
+            if nr == "Egg":
+                is_egg = True
+                nr = record["name"].capitalize()
+            formatted_name = nr.ljust(max_name, " ")
+            pn = str(record["orderid"]).rjust(max_id, " ")
+            gid = record["id"]
+            iv = record["ivs"]
+            level = str(record["pokelevel"]).rjust(max_lvl, " ")
+            level = f"<:stop:1012773630649827451>`{level}`"
+            emoji = get_emoji(
+                blank="<:blank:942623726715936808>",
+                shiny=record["shiny"],
+                radiant=record["radiant"],
+                skin=record["skin"],
+            )
+            extra_text = ""
+            if self.filter_type == "m":
+                price = f"{record['pokeprice']:,.0f}".rjust(max_price, " ")
+                extra_text = f"<:dittocoin:1010679749212901407>`{price})`"
+            elif is_egg:
+                level = str(record["counter"]).rjust(max_lvl, " ")
+                level = f"<:egg:844434416200712193>`{level}`"
+            elif gid in self.mothers:
+                end = self.mothers[gid] + timedelta(hours=6)
+                now = datetime.now()
+                expires_in = end - now
+                if now > end:
+                    time = "0s"
+                elif expires_in.seconds // 3600:
+                    time = str(expires_in.seconds // 3600) + "h"
+                elif expires_in.seconds // 60:
+                    time = str(expires_in.seconds // 60) + "m"
+                else:
+                    time = str(expires_in.seconds) + "s"
+                extra_text = f"\N{STOPWATCH}`{time}`"
+            gender = (
+                "<:male:1011932024438800464>"
+                if record["gender"] == "-m"
+                else "<:female:1011935234067021834>"
+                if record["gender"] == "-f"
+                else "<:ditto_genderless:1004767591237169223>"
+                if record["gender"] == "-x"
+                else ""
+            )
+            iv = f"{iv/186:02.0%}".rjust(4, " ")
+            if self.stat_order is not None and not is_egg:
+                stat = self._stat_values.get(record["orderid"], 0)
+                extra_text += f"`{STAT_ORDERS[self.stat_order]} {stat}`"
+            desc += (
+                f"{emoji}{gender}"
+                f"<:our:1012769128085463170>**`{pn}`** "
+                f"__`{formatted_name}`__"
+                f"{level}"
+                f"<:stealing:1012771006278021141>`{iv}`"
+                f"{extra_text}\n"
+            )
+
+        embed = self.base_embed.copy()
+        embed.description = desc.strip() or "No pokemon left on this page."
+        embed.set_footer(text=f"Page {idx + 1}/{len(self)}")
+        return embed
+
+
 class Filter(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -129,26 +375,28 @@ class Filter(commands.Cog):
         args = args.strip(".&| ")
         order_col = None  # The column to sort by.
         order_dir = "DESC"  # The direction of the sort.
+        stat_order = None  # The computed stat to sort by, which replaces order_col.
         sql_data = (
             []
         )  # The raw data values by the user to be past to postgres. Using $1 notation to prevent an SQL injection.
         mothers = {}
 
         if filter_type == "p":
-            async with ctx.bot.db[0].acquire() as pconn:
-                pokes = await pconn.fetchval(
-                    "SELECT pokes FROM users WHERE u_id = $1", ctx.author.id
+            async with ctx.bot.commondb.ownership_conn(ctx.author.id) as pconn:
+                started = await pconn.fetchval(
+                    "SELECT EXISTS(SELECT 1 FROM users WHERE u_id = $1)", ctx.author.id
                 )
                 mother_raw = await pconn.fetch(
-                    f"SELECT pokemon_id, entry_time FROM mothers WHERE pokemon_id = ANY($1)",
-                    pokes,
+                    "SELECT pokemon_id, entry_time FROM mothers "
+                    "INNER JOIN ownership ON ownership.poke_id = mothers.pokemon_id "
+                    "WHERE ownership.u_id = $1",
+                    ctx.author.id,
                 )
                 mothers = {t["pokemon_id"]: t["entry_time"] for t in mother_raw}
-            if pokes is None:
+            if not started:
                 await ctx.send(f"You have not started!\nStart with `/start` first.")
                 return
-            pokes = tuple(pokes)
-            sql_data.append(pokes)
+            sql_data.append(ctx.author.id)
 
         # Splits the raw args string into a list of "tokens" that are easier for the code to understand.
         tokens = []
@@ -631,7 +879,7 @@ class Filter(commands.Cog):
                                 f"(market.price <= ${len(sql_data) - 1} AND market.price >= ${len(sql_data)})"
                             )
                 elif key == "iv":
-                    order_col = 1
+                    order_col = "ivs"
                     if not data:
                         pass
                     elif data[0].startswith("d"):
@@ -640,7 +888,7 @@ class Filter(commands.Cog):
                         order_dir = "ASC"
                     postfix.append("false")
                 elif key == "ev":
-                    order_col = 2
+                    order_col = "evs"
                     if not data:
                         pass
                     elif data[0].startswith("d"):
@@ -656,13 +904,15 @@ class Filter(commands.Cog):
                         order_dir = "DESC"
                     elif data[0].startswith("a"):
                         order_dir = "ASC"
-                    if filter_type != "m":
-                        # Extract out only the pokemon that actually need to get searched
-                        # to reduce O(N^2)'s N from len(pokes) to min(len(pokes), POKE_COUNT)
-                        if order_dir == "ASC":
-                            sql_data[0] = sql_data[0][:POKE_COUNT]
-                        else:
-                            sql_data[0] = list(reversed(sql_data[0][-POKE_COUNT:]))
+                    postfix.append("false")
+                elif key in STAT_ORDERS:
+                    stat_order = key
+                    if not data:
+                        pass
+                    elif data[0].startswith("d"):
+                        order_dir = "DESC"
+                    elif data[0].startswith("a"):
+                        order_dir = "ASC"
                     postfix.append("false")
                 elif key == "hidden-power":
                     if not data:
@@ -730,132 +980,46 @@ class Filter(commands.Cog):
             )
         conditions = stack[0]
 
-        # Build the full query based on what type of filter this is
+        # Build the full query based on what type of filter this is.
+        # Every row carries a unique orderid, which is the keyset tiebreaker for paging.
         if filter_type == "p":
-            extra = (
-                ", array_position($1, id) as orderid" if order_col == "orderid" else ""
-            )
-            query = (
-                "SELECT COALESCE(atkiv,0) + COALESCE(defiv,0) + COALESCE(spatkiv,0) + COALESCE(spdefiv,0) + COALESCE(speediv,0) + COALESCE(hpiv,0) AS ivs, "
-                "COALESCE(atkev,0) + COALESCE(defev,0) + COALESCE(spatkev,0) + COALESCE(spdefev,0) + COALESCE(speedev,0) + COALESCE(hpev,0) as evs, "
-                f"pokelevel, pokname, name{extra}, * FROM pokes WHERE id = ANY($1) AND {conditions}"
-            )
+            query = OWNED_QUERY + conditions
         elif filter_type == "m":
             query = (
                 "SELECT COALESCE(atkiv,0) + COALESCE(defiv,0) + COALESCE(spatkiv,0) + COALESCE(spdefiv,0) + COALESCE(speediv,0) + COALESCE(hpiv,0) AS ivs, "
                 "COALESCE(atkev,0) + COALESCE(defev,0) + COALESCE(spatkev,0) + COALESCE(spdefev,0) + COALESCE(speedev,0) + COALESCE(hpev,0) as evs, "
-                "pokelevel, pokname, market.id as orderid, market.price as pokeprice, * "
+                "market.id as orderid, market.price as pokeprice, pokes.* "
                 "FROM pokes INNER JOIN market ON pokes.id = market.poke WHERE "
                 f"buyer IS NULL AND {conditions}"
             )
-        if order_col:
-            query += f" ORDER BY {order_col} {order_dir}"
         # Since order args require a token to place them, they add a hanging false. This removes it in AND cases.
         query = query.replace(" AND false", "").replace("false AND ", "")
 
-        # Fetch the pokes that satisfy the filter
-        async with self.bot.db[0].acquire() as pconn:
-            async with pconn.transaction():
-                cur = await pconn.cursor(query, *sql_data)
-                records = await cur.fetch(POKE_COUNT, timeout=20)
-        if not records:
+        embed = discord.Embed(title="Filtered Pokemon", color=0xFFB6C1)
+        pages = FilterPages(
+            self.bot,
+            query,
+            sql_data,
+            filter_type=filter_type,
+            order_col=order_col,
+            order_dir=order_dir,
+            mothers=mothers,
+            base_embed=embed,
+            stat_order=stat_order,
+        )
+        await pages.count()
+        if not pages.total:
             await ctx.send(
                 "Your filter did not find any pokemon. Try a less narrow search."
             )
             return
-
-        # Prep the results for formatting
-        max_id = 0
-        max_lvl = 0
-        max_name = 0
-        max_price = 0
-        async for record in AsyncIter(records):
-            name = record["pokname"]
-            if name.capitalize() == "Egg":
-                name = record["name"]
-            max_name = max(max_name, len(name))
-            if filter_type == "p":
-                cur_id = str(pokes.index(record["id"]) + 1)
-            elif filter_type == "m":
-                cur_id = str(record["orderid"])
-                cur_price = f"{record['pokeprice']:,.0f}"
-                max_price = max(max_price, len(cur_price))
-            max_id = max(max_id, len(cur_id))
-            max_lvl = 3
-
-        # Format the returned pokes
-        desc = ""
-        async for record in AsyncIter(records):
-            nr = record["pokname"].capitalize()
-            is_egg = False
-            if nr == "Egg":
-                is_egg = True
-                nr = record["name"].capitalize()
-            formatted_name = nr.ljust(max_name, " ")
-            if filter_type == "p":
-                pn = pokes.index(record["id"]) + 1
-                price = ""
-            elif filter_type == "m":
-                pn = record["orderid"]
-                price = record["pokeprice"]
-            pn = str(pn).rjust(max_id, " ")
-            gid = record["id"]
-            nick = record["poknick"]
-            iv = record["ivs"]
-            shiny = record["shiny"]
-            radiant = record["radiant"]
-            level = str(record["pokelevel"]).rjust(max_lvl, " ")
-            level = f"<:stop:1012773630649827451>`{level}`"
-            emoji = get_emoji(
-                blank="<:blank:942623726715936808>",
-                shiny=shiny,
-                radiant=radiant,
-                skin=record["skin"],
-            )
-            extra_text = ""
-            if filter_type == "m":
-                price = f"{price:,.0f}".rjust(max_price, " ")
-                extra_text = f"<:dittocoin:1010679749212901407>`{price})`"
-            elif is_egg:
-                level = str(record["counter"]).rjust(max_lvl, " ")
-                level = f"<:egg:844434416200712193>`{level}`"
-            elif gid in mothers:
-                end = mothers[gid] + timedelta(hours=6)
-                now = datetime.now()
-                expires_in = end - now
-                if now > end:
-                    time = "0s"
-                elif expires_in.seconds // 3600:
-                    time = str(expires_in.seconds // 3600) + "h"
-                elif expires_in.seconds // 60:
-                    time = str(expires_in.seconds // 60) + "m"
-                else:
-                    time = str(expires_in.seconds) + "s"
-                extra_text = f"\N{STOPWATCH}`{time}`"
-            gender = (
-                "<:male:1011932024438800464>"
-                if record["gender"] == "-m"
-                else "<:female:1011935234067021834>"
-                if record["gender"] == "-f"
-                else "<:ditto_genderless:1004767591237169223>"
-                if record["gender"] == "-x"
-                else ""
-            )
-            iv = f"{iv/186:02.0%}".rjust(4, " ")
-            desc += (
-                f"{emoji}{gender}"
-                f"<:our:1012769128085463170>**`{pn}`** "
-                f"__`{formatted_name}`__"
-                f"{level}"
-                f"<:stealing:1012771006278021141>`{iv}`"
-                f"{extra_text}\n"
+        if pages.too_many_to_sort:
+            await ctx.send(
+                f"Your filter found too many pokemon to sort by stats, narrow it down to at most {STAT_ORDER_LIMIT:,} first."
             )
+            return
+        await LazyMenuView(ctx, pages).start()
 
-        # Send the result
-        embed = discord.Embed(title="Filtered Pokemon", color=0xFFB6C1)
-        pages = pagify(desc, per_page=PER_PAGE, base_embed=embed)
-        await MenuView(ctx, pages).start()
-    
     @commands.hybrid_command()    
     async def getids(self, ctx, msg_id: str):
         """Trade/breeding Utility for getting list of id's from a filter list using message id"""
@@ -877,3 +1041,4 @@ class Filter(commands.Cog):
             
 async def setup(bot):
     await bot.add_cog(Filter(bot))
+
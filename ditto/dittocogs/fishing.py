@@ -191,43 +191,28 @@ class Fishing(commands.Cog):
         ivpercent = round((pokedata.iv_sum / 186) * 100, 2)
         async with ctx.bot.db[0].acquire() as pconn:
             await pconn.execute("UPDATE achievements SET fishing_success = fishing_success + 1 WHERE u_id = $1", ctx.author.id)
-            if item not in ("common chest", "rare chest"):
-                items = await pconn.fetchval(
-                    "SELECT items::json FROM users WHERE u_id = $1", ctx.author.id
-                )
-                items[item] = items.get(item, 0) + 1
-                await pconn.execute(
-                    "UPDATE users SET items = $1::json WHERE u_id = $2",
-                    items,
-                    ctx.author.id,
-                )
-            else:
-                inventory = await pconn.fetchval(
-                    "SELECT inventory::json FROM users WHERE u_id = $1", ctx.author.id
-                )
-                inventory[item] = inventory.get(item, 0) + 1
-                await pconn.execute(
-                    "UPDATE users SET inventory = $1::json where u_id = $2",
-                    inventory,
-                    ctx.author.id,
-                )
+            column = "inventory" if item in ("common chest", "rare chest") else "items"
+            await ctx.bot.commondb.add_items(
+                ctx.author.id, {item: 1}, column=column, pconn=pconn
+            )
             leveled_up = cap < (exp_gain + exp) and level < 100
             if leveled_up:
                 newcap = getcap(level)
                 level += 1
-                await pconn.execute(
-                    "UPDATE users SET fishing_level = $3, fishing_level_cap = $2, fishing_exp = 0 WHERE u_id = $1",
+                fishing_exp = await pconn.fetchval(
+                    "UPDATE users SET fishing_level = $3, fishing_level_cap = $2, fishing_exp = 0 WHERE u_id = $1 RETURNING fishing_exp",
                     ctx.author.id,
                     newcap,
                     level,
                 )
 
             else:
-                await pconn.execute(
-                    "UPDATE users SET fishing_exp = fishing_exp + $2 WHERE u_id = $1",
+                fishing_exp = await pconn.fetchval(
+                    "UPDATE users SET fishing_exp = fishing_exp + $2 WHERE u_id = $1 RETURNING fishing_exp",
                     ctx.author.id,
                     exp_gain,
                 )
+        await ctx.bot.leaderboards.set("fishing", ctx.author.id, fishing_exp)
 
         e = discord.Embed(
             title=f"Here's what you got from fishing with your {rod}!",
@@ -251,18 +236,7 @@ class Fishing(commands.Cog):
         e.set_footer(
             text=f"You have used an Energy Point - You have {energy} remaining!"
         )
-        #
-        user = await ctx.bot.mongo_find(
-            "users",
-            {"user": ctx.author.id},
-            default={"user": ctx.author.id, "progress": {}},
-        )
-        progress = user["progress"]
-        progress["fish"] = progress.get("fish", 0) + 1
-        await ctx.bot.mongo_update(
-            "users", {"user": ctx.author.id}, {"progress": progress}
-        )
-        #
+        ctx.bot.mission_progress.increment(ctx.author.id, "fish")
         try:
             await embed.edit(embed=e)
         except discord.NotFound:
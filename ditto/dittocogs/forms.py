@@ -63,34 +63,24 @@ class Forms(commands.Cog):
 
         Ex. `;lunarize 12` (12 being lunala #)
         """
+        selected = await ctx.loader.selected()
+        if selected is None:
+            await ctx.send("You need to select a Necrozma first!")
+            return
+        _id = selected["id"]
         async with ctx.bot.db[0].acquire() as pconn:
-            _id = await pconn.fetchval(
-                "SELECT selected FROM users WHERE u_id = $1", ctx.author.id
-            )
-
-            if _id is None:
-                await ctx.send("You need to select a Necrozma first!")
-                return
-            selected_pokename = await pconn.fetchval(
-                "SELECT pokname FROM pokes WHERE id = $1", _id
-            )
-
-            selected_pokename = selected_pokename.lower()
+            selected_pokename = selected["pokname"].lower()
             if selected_pokename != "necrozma":
                 await ctx.send(f"You can not Lunarize a {selected_pokename}")
                 return
-            helditem = await pconn.fetchval(
-                "SELECT hitem FROM pokes WHERE id = $1", _id
-            )
+            helditem = selected["hitem"]
             if helditem != "n-lunarizer":
                 await ctx.send(
                     "Your Necrozma is not holding a N-lunarizer.\nYou need to buy it from the Shop."
                 )
 
                 return
-            num = await pconn.fetchval(
-                "SELECT pokes[$1] FROM users WHERE u_id = $2", val, ctx.author.id
-            )
+            num = await ctx.bot.commondb.poke_at(ctx.author.id, val, pconn=pconn)
 
             lunala = await pconn.fetchval(
                 "SELECT pokname FROM pokes WHERE id = $1", num
@@ -117,27 +107,19 @@ class Forms(commands.Cog):
 
         Ex. `;solarize 12` (12 being the solgaleo #)
         """
-        async with ctx.bot.db[0].acquire() as pconn:
-            _id = await pconn.fetchval(
-                "SELECT selected FROM users WHERE u_id = $1", ctx.author.id
-            )
-
-            num = await pconn.fetchval(
-                "SELECT pokes[$1] FROM users WHERE u_id = $2", val, ctx.author.id
-            )
-
-            details = await pconn.fetchrow(
-                "SELECT pokname, hitem FROM pokes WHERE id = $1", _id
+        selected = await ctx.loader.selected()
+        if selected is None:
+            await ctx.send(
+                "You do not have a pokemon selected!\nSelect one with `/select` first."
             )
 
-            if details is None:
-                await ctx.send(
-                    "You do not have a pokemon selected!\nSelect one with `/select` first."
-                )
+            return
+        _id = selected["id"]
+        async with ctx.bot.db[0].acquire() as pconn:
+            num = await ctx.bot.commondb.poke_at(ctx.author.id, val, pconn=pconn)
 
-                return
-            pokename, helditem = details
-            pokename = pokename.lower()
+            pokename = selected["pokname"].lower()
+            helditem = selected["hitem"]
             if pokename != "necrozma":
                 await ctx.send(f"You can not Solarize a {pokename}")
                 return
@@ -183,32 +165,21 @@ class Forms(commands.Cog):
 
     @commands.hybrid_command()
     async def fuse(self, ctx, form, val: int):
-        async with ctx.bot.db[0].acquire() as pconn:
-            data = await pconn.fetchrow(
-                "SELECT selected, pokes[$2] FROM users WHERE u_id = $1",
-                ctx.author.id,
-                val,
-            )
-            
-            if data is None:
-                await ctx.send("You have not started!\nStart with `/start` first.")
-                return
-            _id, num = data
-            details = await pconn.fetchrow(
-                "SELECT pokname, hitem FROM pokes WHERE id = $1", _id
-            )
-            data = await pconn.fetchrow(
-                "SELECT pokname, hitem FROM pokes WHERE id = $1", _id
+        if await ctx.loader.user() is None:
+            await ctx.send("You have not started!\nStart with `/start` first.")
+            return
+        selected = await ctx.loader.selected()
+        if selected is None:
+            await ctx.send(
+                "You do not have a pokemon selected!\nSelect one with `/select` first."
             )
 
-            if data is None:
-                await ctx.send(
-                    "You do not have a pokemon selected!\nSelect one with `/select` first."
-                )
-
-                return
-            pokename, helditem = data
-            pokename = pokename.lower()
+            return
+        _id = selected["id"]
+        async with ctx.bot.db[0].acquire() as pconn:
+            num = await ctx.bot.commondb.poke_at(ctx.author.id, val, pconn=pconn)
+            pokename = selected["pokname"].lower()
+            helditem = selected["hitem"]
             data = await pconn.fetchrow(
                 "SELECT pokname, pokelevel FROM pokes WHERE id = $1", num
             )
@@ -338,16 +309,13 @@ class Forms(commands.Cog):
 
     @commands.hybrid_command()
     async def deform(self, ctx):
+        selected = await ctx.loader.selected()
+        if selected is None:
+            await ctx.send("You have no Pokemon Selected")
+            return
+        _id = selected["id"]
+        pokename = selected["pokname"]
         async with ctx.bot.db[0].acquire() as pconn:
-            _id = await pconn.fetchval(
-                "SELECT selected FROM users WHERE u_id = $1", ctx.author.id
-            )
-            pokename = await pconn.fetchval(
-                "SELECT pokname FROM pokes WHERE id = $1", _id
-            )
-            if pokename is None:
-                await ctx.send("You have no Pokemon Selected")
-                return
             if not is_formed(pokename) or pokename.endswith("-alola"):
                 await ctx.send("This Pokemon is not a form!")
                 return
@@ -375,27 +343,17 @@ class Forms(commands.Cog):
         if "mega" in val.lower():
             await ctx.send(f"Use `/mega` for mega evolutions.")
             return
+        selected = await ctx.loader.selected()
+        if selected is None:
+            await ctx.send("No Pokemon Selected")
+            return
+        _id = selected["id"]
+        happiness = selected["happiness"]
+        level = selected["pokelevel"]
+        helditem = selected["hitem"]
+        moves = selected["moves"]
         async with ctx.bot.db[0].acquire() as pconn:
-            _id = await pconn.fetchval(
-                "SELECT selected FROM users WHERE u_id = $1", ctx.author.id
-            )
-            pokename = await pconn.fetchval(
-                "SELECT pokname FROM pokes WHERE id = $1", _id
-            )
-            happiness = await pconn.fetchval(
-                "SELECT happiness FROM pokes WHERE id = $1", _id
-            )
-            level = await pconn.fetchval(
-                "SELECT pokelevel FROM pokes WHERE id = $1", _id
-            )
-            helditem = await pconn.fetchval(
-                "SELECT hitem FROM pokes WHERE id = $1", _id
-            )
-            moves = await pconn.fetchval("SELECT moves FROM pokes WHERE id = $1", _id)
-            if pokename is None:
-                await ctx.send("No Pokemon Selected")
-                return
-            pokename = pokename.lower()
+            pokename = selected["pokname"].lower()
             conditions = pokename == "kyurem"
             if conditions:
                 await ctx.send(
@@ -1013,16 +971,14 @@ class Forms(commands.Cog):
 
     @mega_cmds.command()
     async def evolve(self, ctx):
+        details = await ctx.loader.selected()
         async with ctx.bot.db[0].acquire() as pconn:
-            _id = await pconn.fetchval(
-                "SELECT selected FROM users WHERE u_id = $1", ctx.author.id
-            )
-            details = await pconn.fetchrow("SELECT * FROM pokes WHERE id = $1", _id)
             if details is None:
                 await ctx.send(
                     "You do not have a pokemon selected!\nSelect one with `/select` first."
                 )
                 return
+            _id = details["id"]
             pokename = details["pokname"]
             helditem = details["hitem"]
             moves = details["moves"]
@@ -1069,19 +1025,15 @@ class Forms(commands.Cog):
 
     @mega_cmds.command()
     async def devolve(self, ctx):
-        async with ctx.bot.db[0].acquire() as pconn:
-            _id = await pconn.fetchval(
-                "SELECT selected FROM users WHERE u_id = $1", ctx.author.id
-            )
-            pokename = await pconn.fetchval(
-                "SELECT pokname FROM pokes WHERE id = $1", _id
+        selected = await ctx.loader.selected()
+        if selected is None:
+            await ctx.send(
+                "You do not have a pokemon selected!\nSelect one with `/select` first."
             )
-            if pokename is None:
-                await ctx.send(
-                    "You do not have a pokemon selected!\nSelect one with `/select` first."
-                )
-                return
-            pokename = pokename.lower()
+            return
+        _id = selected["id"]
+        async with ctx.bot.db[0].acquire() as pconn:
+            pokename = selected["pokname"].lower()
             if "mega" not in pokename:
                 await ctx.send("This Pokemon is not a Mega Pokemon!")
                 return
@@ -1112,19 +1064,15 @@ class Forms(commands.Cog):
 
     @mega_cmds.command()
     async def x(self, ctx):
-        async with ctx.bot.db[0].acquire() as pconn:
-            _id = await pconn.fetchval(
-                "SELECT selected FROM users WHERE u_id = $1", ctx.author.id
-            )
-            details = await pconn.fetchrow(
-                "SELECT pokname, hitem FROM pokes WHERE id = $1", _id
+        selected = await ctx.loader.selected()
+        if selected is None:
+            await ctx.send(
+                "You do not have a pokemon selected!\nSelect one with `/select` first."
             )
-            if details is None:
-                await ctx.send(
-                    "You do not have a pokemon selected!\nSelect one with `/select` first."
-                )
-                return
-            pokename, helditem = details
+            return
+        _id = selected["id"]
+        async with ctx.bot.db[0].acquire() as pconn:
+            pokename, helditem = selected["pokname"], selected["hitem"]
             if pokename.lower() not in self.XYS:
                 await ctx.send("That pokemon cannot be mega evolved into an x form!")
                 return
@@ -1164,19 +1112,15 @@ class Forms(commands.Cog):
 
     @mega_cmds.command()
     async def y(self, ctx):
-        async with ctx.bot.db[0].acquire() as pconn:
-            _id = await pconn.fetchval(
-                "SELECT selected FROM users WHERE u_id = $1", ctx.author.id
-            )
-            details = await pconn.fetchrow(
-                "SELECT pokname, hitem FROM pokes WHERE id = $1", _id
+        selected = await ctx.loader.selected()
+        if selected is None:
+            await ctx.send(
+                "You don't have a pokemon selected!\nSelect one with `/select` first."
             )
-            if details is None:
-                await ctx.send(
-                    "You don't have a pokemon selected!\nSelect one with `/select` first."
-                )
-                return
-            pokename, helditem = details
+            return
+        _id = selected["id"]
+        async with ctx.bot.db[0].acquire() as pconn:
+            pokename, helditem = selected["pokname"], selected["hitem"]
             if pokename.lower() not in self.XYS:
                 await ctx.send("That pokemon cannot be mega evolved into a y form!")
                 return
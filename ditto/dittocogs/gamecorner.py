@@ -556,13 +556,9 @@ class GameCorner(commands.Cog):
         # Helper function to give rewards
         async def give_reward(ctx, items, reward, luck):
             async with ctx.bot.db[0].acquire() as pconn:
-                items["coin-case"] += reward["coin-case"]
-                items["coin-case"] = max(items["coin-case"], 0)
-                items["coin-case"] = ceil(items["coin-case"])
-                await pconn.execute(
-                    "UPDATE users SET inventory = $1::json WHERE u_id = $2",
-                    items,
-                    ctx.author.id,
+                # A loss bigger than the coin case empties it
+                await ctx.bot.commondb.add_items_clamped(
+                    ctx.author.id, {"coin-case": ceil(reward["coin-case"])}, pconn=pconn
                 )
                 await pconn.execute(
                     "UPDATE users SET energy = energy - 1 WHERE u_id = $1",
@@ -712,11 +708,8 @@ class GameCorner(commands.Cog):
                 f"Your winnings before hitting Jackpot - {winnings}\nTotal winnings after hitting Jackpot {jackpot_winnings}!!!"
             )
             async with ctx.bot.db[0].acquire() as pconn:
-                items["coin-case"] += jackpot_winnings
-                await pconn.execute(
-                    "UPDATE users SET inventory = $1::json WHERE u_id = $2",
-                    items,
-                    ctx.author.id,
+                await ctx.bot.commondb.add_items(
+                    ctx.author.id, {"coin-case": jackpot_winnings}, pconn=pconn
                 )
                 await pconn.execute(
                     "UPDATE users SET energy = energy - 1 WHERE u_id = $1",
@@ -730,11 +723,8 @@ class GameCorner(commands.Cog):
             await ctx.send("Congratulations!\nYou hit two rows!")
             await ctx.send(f"Your Total winnings! {winnings}")
             async with ctx.bot.db[0].acquire() as pconn:
-                items["coin-case"] += winnings
-                await pconn.execute(
-                    "UPDATE users SET inventory = $1::json wHERE u_id = $2",
-                    items,
-                    ctx.author.id,
+                await ctx.bot.commondb.add_items(
+                    ctx.author.id, {"coin-case": winnings}, pconn=pconn
                 )
                 await pconn.execute(
                     "UPDATE users SET energy = energy - 1 WHERE u_id = $1",
@@ -745,12 +735,11 @@ class GameCorner(commands.Cog):
                 )
         else:
             async with ctx.bot.db[0].acquire() as pconn:
-                items["coin-case"] -= bet
-                await pconn.execute(
-                    "UPDATE users SET inventory = $1::json wHERE u_id = $2",
-                    items,
-                    ctx.author.id,
-                )
+                if not await ctx.bot.commondb.take_items(
+                    ctx.author.id, {"coin-case": bet}, pconn=pconn
+                ):
+                    await ctx.send("You don't have enough coins")
+                    return
                 await pconn.execute(
                     "UPDATE users SET energy = energy - 1 WHERE u_id = $1",
                     ctx.author.id,
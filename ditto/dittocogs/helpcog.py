@@ -422,7 +422,7 @@ class HelpCog(commands.Cog):
         e.add_field(
             name="Options",
             value=(
-                f"Available Options are - `.name, .nickname, .nature, .type, .types, .level, .shiny, .iv, .ev, .page, .owned, .legendary, .pseudo, .ultra beast, .price, .item, .egg-group`\n\n"
+                f"Available Options are - `.name, .nickname, .nature, .type, .types, .level, .shiny, .iv, .ev, .attack, .defense, .spatk, .spdef, .speed, .hp-stat, .stats, .page, .owned, .legendary, .pseudo, .ultra beast, .price, .item, .egg-group`\n\n"
             ),
         )
         e.add_field(
@@ -433,6 +433,8 @@ class HelpCog(commands.Cog):
                 f"{ctx.prefix}filter pokemon .name gyarados-mega .iv descending .shiny\n\n"
                 "[Search for all Pokemon Above level 50 and order by EVs]\n"
                 f"{ctx.prefix}filter pokemon .level > 50 .ev d\n\n"
+                "[Order my Pokemon by their Speed stat, fastest first]\n"
+                f"{ctx.prefix}f p .speed d\n\n"
                 "[Search for my Market listings]\n"
                 f"{ctx.prefix}filter market .owned\n\n"
                 "[Search for all my shiny legendaries]\n"
@@ -16,17 +16,14 @@ class Items(commands.Cog):
     @staticmethod
     async def prep_item_remove(ctx):
         """Handles ensuring a user can unequip an item. Returns None if they cannot, (held_item, pokname, items) if they can."""
-        async with ctx.bot.db[0].acquire() as pconn:
-            data = await pconn.fetchrow(
-                "SELECT pokes.hitem, pokes.pokname, users.items::json FROM pokes INNER JOIN users ON pokes.id = (SELECT selected FROM users WHERE u_id = $1) AND users.u_id = $1",
-                ctx.author.id,
-            )
-        if data is None:
+        selected = await ctx.loader.selected()
+        if selected is None:
             await ctx.send(
                 "You do not have a pokemon selected!\nSelect one with `/select` first."
             )
             return None
-        held_item, name, items = data
+        held_item, name = selected["hitem"], selected["pokname"]
+        items = dict((await ctx.loader.user())["items"])
         if held_item in ("None", None, "none"):
             await ctx.send("Your selected Pokemon is not holding any item!")
             return None
@@ -50,6 +47,16 @@ class Items(commands.Cog):
             return None
         return (held_item, name, items)
 
+    @staticmethod
+    async def take_item(ctx, item_name, pconn):
+        """Takes one `item_name` from the author's items. Returns False, after telling them, if they have none left."""
+        if await ctx.bot.commondb.take_items(
+            ctx.author.id, {item_name: 1}, column="items", pconn=pconn
+        ):
+            return True
+        await ctx.send(f"You do not have any {item_name}!")
+        return False
+
     @commands.hybrid_command()
     async def unequip(self, ctx):
         data = await self.prep_item_remove(ctx)
@@ -57,16 +64,14 @@ class Items(commands.Cog):
             return
         held_item, name, items = data
         async with ctx.bot.db[0].acquire() as pconn:
-            items[held_item] = items.get(held_item, 0) + 1
-            await pconn.execute(
-                "UPDATE users SET items = $1::json WHERE u_id = $2",
-                items,
-                ctx.author.id,
+            await ctx.bot.commondb.add_items(
+                ctx.author.id, {held_item: 1}, column="items", pconn=pconn
             )
             await pconn.execute(
                 "UPDATE pokes SET hitem = 'None' WHERE id = (SELECT selected FROM users WHERE u_id = $1)",
                 ctx.author.id,
             )
+        ctx.loader.invalidate()
         await ctx.send(f"Successfully unequipped a {held_item} from selected Pokemon")
 
     @commands.hybrid_command()
@@ -86,35 +91,30 @@ class Items(commands.Cog):
                 f"That item cannot be equiped! Use it on your poke with `/apply {item_name}`."
             )
             return
-        async with ctx.bot.db[0].acquire() as conn:
-            dets = await conn.fetchval(
-                "SELECT items::json FROM users WHERE u_id = $1", ctx.author.id
-            )
-        if dets.get(item_name, 0) == 0:
+        user = await ctx.loader.user()
+        if user is None:
+            await ctx.send("You have not started!\nStart with `/start` first.")
+            return
+        if user["items"].get(item_name, 0) == 0:
             await ctx.send(f"You do not have any {item_name}!")
             return
-        dets[item_name] = dets[item_name] - 1
-        async with ctx.bot.db[0].acquire() as pconn:
-            _id = await pconn.fetchval(
-                "SELECT selected FROM users WHERE u_id = $1", ctx.author.id
-            )
-            data = await pconn.fetchrow(
-                "SELECT pokname, hitem FROM pokes WHERE id = $1", _id
+        selected = await ctx.loader.selected()
+        if selected is None:
+            await ctx.send(
+                "You do not have a pokemon selected!\nSelect one with `/select` first."
             )
-            if data is None:
-                await ctx.send(
-                    "You do not have a pokemon selected!\nSelect one with `/select` first."
-                )
-                return
-            pokename, hitem = data
-            if hitem.lower() != "none":
-                await ctx.send(
-                    f"Your pokemon is already holding the {hitem}! Unequip it with `/unequip` first!."
-                )
-                return
-            ab_index = await pconn.fetchval(
-                "SELECT ability_index FROM pokes WHERE id = $1", _id
+            return
+        _id = selected["id"]
+        pokename, hitem = selected["pokname"], selected["hitem"]
+        if hitem.lower() != "none":
+            await ctx.send(
+                f"Your pokemon is already holding the {hitem}! Unequip it with `/unequip` first!."
             )
+            return
+        ab_index = selected["ability_index"]
+        # Everything below writes to the user or their poke
+        ctx.loader.invalidate()
+        async with ctx.bot.db[0].acquire() as pconn:
             if item_name == "ability-capsule":
                 form_info = await ctx.bot.db[1].forms.find_one(
                     {"identifier": pokename.lower()}
@@ -133,35 +133,29 @@ class Items(commands.Cog):
                     new_index = ab_ids.index(new_ab)
                 except IndexError:
                     new_index = 0
+                if not await self.take_item(ctx, item_name, pconn):
+                    return
                 await pconn.execute(
                     "UPDATE pokes SET ability_index = $1 WHERE id = $2", new_index, _id
                 )
                 ab_id = ab_ids[new_index]
                 new_ability = await ctx.bot.db[1].abilities.find_one({"id": ab_id})
 
-                await pconn.execute(
-                    "UPDATE users SET items = $1::json WHERE u_id = $2",
-                    dets,
-                    ctx.author.id,
-                )
                 await ctx.send(
                     f"You have Successfully changed your Pokémons ability to {new_ability['identifier']}"
                 )
                 return
             if item_name == "daycare-space":
-                await pconn.execute(
-                    "UPDATE users SET items = $1::json, daycarelimit = daycarelimit + 1 WHERE u_id = $2",
-                    dets,
-                    ctx.author.id,
-                )
+                if not await ctx.bot.commondb.update_user(
+                    ctx.author.id, items={item_name: -1}, daycarelimit=1, pconn=pconn
+                ):
+                    await ctx.send(f"You do not have any {item_name}!")
+                    return
                 await ctx.send("You have successfully equipped an Extra Daycare Space!")
                 return
             if item_name == "ev-reset":
-                await pconn.execute(
-                    "UPDATE users SET items = $1::json WHERE u_id = $2",
-                    dets,
-                    ctx.author.id,
-                )
+                if not await self.take_item(ctx, item_name, pconn):
+                    return
                 await pconn.execute(
                     "UPDATE pokes SET hpev = 0, atkev = 0, defev = 0, spatkev = 0, spdefev = 0, speedev = 0 WHERE id = $1",
                     _id,
@@ -177,62 +171,60 @@ class Items(commands.Cog):
                 return
             if item_name in {"zinc", "hp-up", "protein", "calcium", "iron", "carbos"}:
                 try:
-                    if item_name == "calcium":
-                        await pconn.execute(
-                            "UPDATE pokes SET spatkev = spatkev + 10 WHERE id = $1", _id
-                        )
-                    elif item_name == "carbos":
-                        await pconn.execute(
-                            "UPDATE pokes SET speedev = speedev + 10 WHERE id = $1", _id
-                        )
-                    elif item_name == "hp-up":
-                        await pconn.execute(
-                            "UPDATE pokes SET hpev = hpev + 10 WHERE id = $1", _id
-                        )
-                    elif item_name == "iron":
-                        await pconn.execute(
-                            "UPDATE pokes SET defev = defev + 10 WHERE id = $1", _id
-                        )
-                    elif item_name == "protein":
-                        await pconn.execute(
-                            "UPDATE pokes SET atkev = atkev + 10 WHERE id = $1", _id
-                        )
-                    elif item_name == "zinc":
-                        await pconn.execute(
-                            "UPDATE pokes SET spdefev = spdefev + 10 WHERE id = $1", _id
-                        )
-                    await pconn.execute(
-                        "UPDATE users SET items = $1::json WHERE u_id = $2",
-                        dets,
-                        ctx.author.id,
-                    )
+                    # Taking the item is rolled back if the EVs are already maxed
+                    async with pconn.transaction():
+                        if not await self.take_item(ctx, item_name, pconn):
+                            return
+                        if item_name == "calcium":
+                            await pconn.execute(
+                                "UPDATE pokes SET spatkev = spatkev + 10 WHERE id = $1", _id
+                            )
+                        elif item_name == "carbos":
+                            await pconn.execute(
+                                "UPDATE pokes SET speedev = speedev + 10 WHERE id = $1", _id
+                            )
+                        elif item_name == "hp-up":
+                            await pconn.execute(
+                                "UPDATE pokes SET hpev = hpev + 10 WHERE id = $1", _id
+                            )
+                        elif item_name == "iron":
+                            await pconn.execute(
+                                "UPDATE pokes SET defev = defev + 10 WHERE id = $1", _id
+                            )
+                        elif item_name == "protein":
+                            await pconn.execute(
+                                "UPDATE pokes SET atkev = atkev + 10 WHERE id = $1", _id
+                            )
+                        elif item_name == "zinc":
+                            await pconn.execute(
+                                "UPDATE pokes SET spdefev = spdefev + 10 WHERE id = $1", _id
+                            )
                 except:
                     await ctx.send("Your Pokemon has maxed all 510 EVs")
                     return
                 await ctx.send(f"You have successfully used your {item_name}")
                 return
             if item_name.endswith("-rod"):
+                if not await self.take_item(ctx, item_name, pconn):
+                    return
                 await pconn.execute(
-                    "UPDATE users SET items = $1::json, held_item = $3 WHERE u_id = $2",
-                    dets,
+                    "UPDATE users SET held_item = $2 WHERE u_id = $1",
                     ctx.author.id,
                     item_name,
                 )
                 await ctx.send(f"You have successfully equiped your {item_name}")
                 return
-            name = await pconn.fetchval("SELECT pokname FROM pokes WHERE id = $1", _id)
+            if not await self.take_item(ctx, item_name, pconn):
+                return
             await pconn.execute(
                 "UPDATE pokes set hitem = $2 WHERE id = $1", _id, item_name
             )
-            await pconn.execute(
-                "UPDATE users SET items = $1::json WHERE u_id = $2", dets, ctx.author.id
-            )
             await ctx.send(
                 f"You have successfully given your selected Pokemon a {item_name}"
             )
             await evolve(
                 ctx.bot,
-                dict(await pconn.fetchrow("SELECT * FROM pokes WHERE id = $1", _id)),
+                {**selected, "hitem": item_name},
                 ctx.author,
                 channel=ctx.channel,
             )
@@ -249,6 +241,7 @@ class Items(commands.Cog):
                 ctx.author.id,
                 "None",
             )
+        ctx.loader.invalidate()
         await ctx.send(f"Successfully Dropped the {held_item}")
 
     @commands.hybrid_command()
@@ -258,15 +251,11 @@ class Items(commands.Cog):
             return
         held_item, name, items = data
         async with ctx.bot.db[0].acquire() as pconn:
-            poke = await pconn.fetchval(
-                "SELECT pokes[$1] FROM users WHERE u_id = $2",
-                pokemon_number,
-                ctx.author.id,
-            )
+            poke = await ctx.bot.commondb.poke_at(ctx.author.id, pokemon_number, pconn=pconn)
             if poke is None:
                 await ctx.send("You do not have that Pokemon!")
                 return
-            details = await pconn.fetchrow("SELECT * FROM pokes WHERE id = $1", poke)
+            details = await ctx.loader.poke(poke)
             if details["hitem"].capitalize() != "None":
                 await ctx.send("That Pokemon is already holding an item")
                 return
@@ -278,6 +267,7 @@ class Items(commands.Cog):
             await pconn.execute(
                 "UPDATE pokes SET hitem = $1 WHERE id = $2", held_item, poke
             )
+        ctx.loader.invalidate(poke)
         await ctx.send(
             f"You have successfully transfered the {held_item} from your {name} to your {pokename}!"
         )
@@ -296,41 +286,35 @@ class Items(commands.Cog):
                 f"That item cannot be used on a poke! Try equiping it with `/equip {item_name}`."
             )
             return
-        async with ctx.bot.db[0].acquire() as pconn:
-            dets = await pconn.fetchval(
-                "SELECT items::json FROM users WHERE u_id = $1", ctx.author.id
-            )
-        if dets is None:
+        user = await ctx.loader.user()
+        if user is None:
             await ctx.send("You have not started!\nStart with `/start first.")
             return
-        if dets.get(item_name, 0) == 0:
+        if user["items"].get(item_name, 0) == 0:
             await ctx.send(f"You do not have any {item_name}!")
             return
-        dets[item_name] = dets[item_name] - 1
-        async with ctx.bot.db[0].acquire() as pconn:
-            _id = await pconn.fetchval(
-                "SELECT selected FROM users WHERE u_id = $1", ctx.author.id
-            )
-            poke = await pconn.fetchrow("SELECT * FROM pokes WHERE id = $1", _id)
+        poke = await ctx.loader.selected()
         if poke is None:
             await ctx.send(
                 "You do not have a pokemon selected! Select one with `/select` first."
             )
             return
+        # Taken before evolving, so it can't be used twice at once, and given back if it does nothing
+        async with ctx.bot.db[0].acquire() as pconn:
+            if not await self.take_item(ctx, item_name, pconn):
+                return
+        ctx.loader.invalidate()
         evo_result = await evolve(
             ctx.bot,
-            dict(poke),
+            poke,
             ctx.author,
             channel=ctx.channel,
             active_item=item_name,
         )
         if evo_result is False or not evo_result.used_active_item():
+            await ctx.bot.commondb.add_items(ctx.author.id, {item_name: 1}, column="items")
             await ctx.send(f"The {item_name} had no effect!")
             return
-        async with ctx.bot.db[0].acquire() as pconn:
-            await pconn.execute(
-                "UPDATE users SET items = $1::json WHERE u_id = $2", dets, ctx.author.id
-            )
         await ctx.send(f"Your {item_name} was consumed!")
 
     @commands.hybrid_group(name="buy")
@@ -412,16 +396,11 @@ class Items(commands.Cog):
                 await ctx.send(f"You have successfully bought the {item}!")
                 return
             if item in activeItemList:
-                dets = await pconn.fetchval(
-                    "SELECT items::json FROM users WHERE u_id = $1", ctx.author.id
-                )
-                dets[item] = dets.get(item, 0) + 1
-                await pconn.execute(
-                    "UPDATE users SET mewcoins = mewcoins - $1, items = $2::json WHERE u_id = $3",
-                    price,
-                    dets,
-                    ctx.author.id,
-                )
+                if not await ctx.bot.commondb.update_user(
+                    ctx.author.id, items={item: 1}, mewcoins=-price, pconn=pconn
+                ):
+                    await ctx.send(f"You don't have {price}ℳ")
+                    return
                 await ctx.send(
                     f"You have successfully bought a {item}! Use it with `/apply {item}`."
                 )
@@ -503,7 +482,7 @@ class Items(commands.Cog):
             )
             evolved = await evolve(
                 ctx.bot,
-                dict(await pconn.fetchrow("SELECT * FROM pokes WHERE id = $1", _id)),
+                (await ctx.bot.commondb.get_pokes([_id], "evolve", pconn=pconn))[0],
                 ctx.author,
                 channel=ctx.channel,
             )
@@ -581,19 +560,15 @@ class Items(commands.Cog):
         except TypeError:
             await ctx.send("That Item is not in the market")
             return
+        selected = await ctx.loader.selected()
+        if selected is None:
+            await ctx.send(
+                "You don't have a pokemon selected!\nSelect one with `/select` first."
+            )
+            return
+        _id, pokename = selected["id"], selected["pokname"]
         async with ctx.bot.db[0].acquire() as pconn:
             total_price = amount * 100
-            _id = await pconn.fetchval(
-                "SELECT selected FROM users WHERE u_id = $1", ctx.author.id
-            )
-            pokename = await pconn.fetchval(
-                "SELECT pokname FROM pokes WHERE id = $1", _id
-            )
-            if pokename is None:
-                await ctx.send(
-                    "You don't have a pokemon selected!\nSelect one with `/select` first."
-                )
-                return
             async with pconn.transaction():
                 try:
                     await pconn.execute(
@@ -651,17 +626,11 @@ class Items(commands.Cog):
 
     @buy_cmds.command()
     async def candy(self, ctx, amount: int = 1):
-        async with ctx.bot.db[0].acquire() as pconn:
-            _id = await pconn.fetchval(
-                "SELECT selected FROM users WHERE u_id = $1", ctx.author.id
-            )
-            if _id is None:
-                await ctx.send("You need to select a pokemon first!")
-                return
-            det = await pconn.fetchrow("SELECT * FROM pokes WHERE id = $1", _id)
-            credits = await pconn.fetchval(
-                "SELECT mewcoins FROM users WHERE u_id = $1", ctx.author.id
-            )
+        det = await ctx.loader.selected()
+        if det is None:
+            await ctx.send("You need to select a pokemon first!")
+            return
+        credits = (await ctx.loader.user())["mewcoins"]
         name = det["pokname"]
         poke_id = det["id"]
         level = det["pokelevel"]
@@ -699,8 +668,8 @@ class Items(commands.Cog):
                 price,
                 ctx.author.id,
             )
-            pokemon_details = await pconn.fetchrow(
-                "SELECT * FROM pokes WHERE id = $1", poke_id
+            (pokemon_details,) = await ctx.bot.commondb.get_pokes(
+                [poke_id], "evolve", pconn=pconn
             )
         level_total = level + use_amount
         await ctx.send(
@@ -708,7 +677,7 @@ class Items(commands.Cog):
         )
         await evolve(
             ctx.bot,
-            dict(pokemon_details),
+            pokemon_details,
             ctx.author,
             channel=ctx.channel,
             override_lvl_100=True,
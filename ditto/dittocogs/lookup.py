@@ -1,9 +1,10 @@
 import contextlib
+import difflib
 from collections import defaultdict
 
-import aiohttp
 import discord
 from discord.ext import commands
+from dittocore.dex import TYPE_IDS
 
 ELEMENTS = {
     "normal": 0xA9A87A,
@@ -59,9 +60,178 @@ class AbilityView(discord.ui.View):
         await interaction.response.edit_message(embed=self.poke_embed, view=None)
 
 
+DAMAGE_CLASSES = {1: "Status", 2: "Physical", 3: "Special"}
+
+
+def _title(identifier):
+    return identifier.title().replace("-", " ")
+
+
+class LookupEngine:
+    """
+    Answers /lookup from the dex, without touching a database or an external api.
+
+    The embed content for each move, ability and type combination is built the first time it
+    is asked for and then memoised, since the underlying data never changes while the bot runs.
+    """
+
+    def __init__(self, dex):
+        self.dex = dex
+        self.moves = dex.move_identifiers()
+        self.abilities = dex.ability_identifiers()
+        self.type_names = {type_id: dex.type_identifier(type_id).title() for type_id in TYPE_IDS}
+        self.type_ids = {name: type_id for type_id, name in self.type_names.items()}
+        # (kind, key) -> built embed content, dropped along with the engine when the dex reloads
+        self._cache = {}
+
+    def _cached(self, kind, key, build):
+        try:
+            return self._cache[kind, key]
+        except KeyError:
+            value = self._cache[kind, key] = build(key)
+            return value
+
+    @staticmethod
+    def _match(name, identifiers):
+        """Returns the identifier `name` refers to, allowing for typos, or None."""
+        name = name.lower().strip().replace(" ", "-")
+        if name in identifiers:
+            return name
+        matches = difflib.get_close_matches(name, identifiers, n=1, cutoff=0.75)
+        return matches[0] if matches else None
+
+    def match_move(self, name):
+        return self._match(name, self.moves)
+
+    def match_ability(self, name):
+        return self._match(name, self.abilities)
+
+    def move(self, identifier) -> dict:
+        """The embed for a move, as a dict for discord.Embed.from_dict."""
+        return self._cached("move", identifier, self._build_move)
+
+    def _build_move(self, identifier) -> dict:
+        move = self.dex.move_by_identifier(identifier)
+        type_name = self.dex.type_identifier(move.type_id)
+        desc = ""
+        desc += f"**Damage Class:** `{DAMAGE_CLASSES.get(move.damage_class_id, 'Unknown')}` "
+        if move.power:
+            desc += f"| **Power:** `{move.power}`"
+        desc += f"\n**Accuracy:** `{move.accuracy}` "
+        desc += f"| **Type:** `{type_name.title()}` "
+        desc += f"| **PP:** `{move.pp}` "
+        if move.priority:
+            desc += f"\n**Priority:** `{move.priority}`"
+
+        effects = ""
+        meta = self.dex.move_meta(move.id)
+        if meta is not None:
+            if meta.min_hits and meta.max_hits:
+                if meta.min_hits == meta.max_hits:
+                    effects += f"- Hits {meta.min_hits} times.\n"
+                else:
+                    effects += f"- Hits {meta.min_hits}-{meta.max_hits} times.\n"
+            if meta.drain > 0:
+                effects += f"- Drains {meta.drain}% of the damage dealt.\n"
+            elif meta.drain < 0:
+                effects += f"- User receives {-meta.drain}% of the damage dealt as recoil.\n"
+            if meta.healing > 0:
+                effects += f"- Heals the user by {meta.healing}% of its max HP.\n"
+            if meta.crit_rate:
+                effects += "- Has an increased chance for a critical hit.\n"
+            if meta.flinch_chance:
+                effects += f"- Has a {meta.flinch_chance}% chance to make the target flinch.\n"
+            if meta.ailment_chance:
+                effects += f"- Has a {meta.ailment_chance}% chance to inflict a status condition.\n"
+            if meta.stat_chance:
+                effects += f"- Has a {meta.stat_chance}% chance to change stats.\n"
+
+        embed = {
+            "title": _title(identifier),
+            "color": ELEMENTS.get(type_name, 0x000001),
+            "description": desc,
+        }
+        if effects:
+            embed["fields"] = [{"name": "Effect", "value": effects, "inline": False}]
+        return embed
+
+    def ability(self, identifier) -> tuple:
+        """The (base embed, pokemon embed) for an ability, as dicts for discord.Embed.from_dict."""
+        return self._cached("ability", identifier, self._build_ability)
+
+    def _build_ability(self, identifier) -> tuple:
+        pokemon = []
+        for pokemon_id in sorted(self.dex.pokemon_with_ability(self.dex.ability_id(identifier))):
+            forms = self.dex.forms_of(pokemon_id)
+            if forms:
+                pokemon.append(_title(forms[0].identifier))
+        base = {
+            "title": _title(identifier),
+            "color": 0xF699CD,
+            "description": f"**Pokemon with this ability:** `{len(pokemon)}`",
+        }
+        poke_embed = {
+            "title": "Pokemon with " + _title(identifier),
+            "color": 0xF699CD,
+            "description": "".join(name + "\n" for name in pokemon)[:4096],
+        }
+        return base, poke_embed
+
+    def types(self, type_ids: tuple) -> dict:
+        """The matchup embed for one or two defending types, as a dict for discord.Embed.from_dict."""
+        return self._cached("types", type_ids, self._build_types)
+
+    def _build_types(self, type_ids: tuple) -> dict:
+        atk_effs = defaultdict(list)
+        if len(type_ids) == 1:
+            for d in TYPE_IDS:
+                atk_effs[self.dex.type_effectiveness(type_ids[0], d)].append(self.type_names[d])
+
+        def_effs = defaultdict(list)
+        for a in TYPE_IDS:
+            def_effs[self.dex.type_effectiveness(a, *type_ids)].append(self.type_names[a])
+
+        desc = ""
+        for eff, label in (
+            (4, "x4 damage from"),
+            (2, "x2 damage from"),
+            (1, "x1 damage from"),
+            (1 / 2, "x1/2 damage from"),
+            (1 / 4, "x1/4 damage from"),
+            (0, "Immune to damage from"),
+        ):
+            if eff in def_effs:
+                desc += f"**{label}:** `{', '.join(def_effs[eff])}`\n"
+
+        desc += "\n"
+
+        for eff, label in (
+            (2, "x2 damage to"),
+            (1, "x1 damage to"),
+            (1 / 2, "x1/2 damage to"),
+            (0, "Does nothing to"),
+        ):
+            if eff in atk_effs:
+                desc += f"**{label}:** `{', '.join(atk_effs[eff])}`\n"
+
+        return {
+            "title": ", ".join(self.type_names[t] for t in type_ids),
+            "color": 0xF699CD,
+            "description": desc,
+        }
+
+
 class Lookup(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self._engine = None
+
+    @property
+    def engine(self):
+        # The dex is loaded in setup_hook, which can finish after cogs are added
+        if self._engine is None or self._engine.dex is not self.bot.dex:
+            self._engine = LookupEngine(self.bot.dex)
+        return self._engine
 
     @commands.hybrid_group(name="lookup")
     async def lookup_cmds(self, ctx):
@@ -69,206 +239,40 @@ class Lookup(commands.Cog):
 
     @lookup_cmds.command()
     async def move(self, ctx, move: str):
-        move = move.lower().replace(" ", "-")
-
-        # Validate the move exists, to make the API happy and to prevent injections
-        exists = await ctx.bot.db[1].moves.find_one({"identifier": move})
-        if exists is None:
+        identifier = self.engine.match_move(move)
+        if identifier is None:
             await ctx.send("That move does not exist!")
             return
-
-        # Call the API to fetch the data for the move
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"https://pokeapi.co/api/v2/move/{move}"
-            ) as response:
-                if response.status != 200:
-                    await ctx.send("That move does not exist!")
-                    return
-                data = await response.json()
-
-        # Build the embed
-        prio = data["priority"]
-        pp = data["pp"]
-        type = data["type"]["name"].title()
-        acc = data["accuracy"]
-        power = data["power"]
-        dclass = data["damage_class"]["name"].title()
-        desc = ""
-        desc += f"**Damage Class:** `{dclass}` "
-        if power:
-            desc += f"| **Power:** `{power}`"
-        desc += f"\n**Accuracy:** `{acc}` "
-        desc += f"| **Type:** `{type}` "
-        desc += f"| **PP:** `{pp}` "
-        if prio:
-            desc += f"\n**Priority:** `{prio}`"
-
-        embed = discord.Embed(
-            title=move.title().replace("-", " "),
-            color=ELEMENTS.get(data["type"]["name"], 0x000001),
-            description=desc,
-        )
-        effects = "".join(
-            "- " + effect["short_effect"] + "\n"
-            for effect in data["effect_entries"]
-            if effect["language"]["name"] == "en"
-        )
-
-        if data["effect_chance"]:
-            effects = effects.replace("$effect_chance", str(data["effect_chance"]))
-        if effects:
-            embed.add_field(name="Effect", value=effects, inline=False)
-
+        embed = discord.Embed.from_dict(self.engine.move(identifier))
+        if identifier != move.lower().replace(" ", "-"):
+            embed.set_footer(text=f'Closest match to "{move}"')
         await ctx.send(embed=embed)
 
     @lookup_cmds.command()
     async def ability(self, ctx, ability: str):
-        ability = ability.lower().replace(" ", "-")
-
-        # Validate the ability exists, to make the API happy and to prevent injections
-        exists = await ctx.bot.db[1].abilities.find_one({"identifier": ability})
-        if exists is None:
+        identifier = self.engine.match_ability(ability)
+        if identifier is None:
             await ctx.send("That ability does not exist!")
             return
-
-        # Call the API to fetch the data for the ability
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"https://pokeapi.co/api/v2/ability/{ability}"
-            ) as response:
-                if response.status != 200:
-                    await ctx.send("That ability does not exist!")
-                    return
-                data = await response.json()
-
-        # Build the base embed
-        desc = ""
-        embed = discord.Embed(
-            title=ability.title().replace("-", " "),
-            color=0xF699CD,
-            description=desc,
-        )
-        effects = "".join(
-            "- " + effect["short_effect"] + "\n"
-            for effect in data["effect_entries"]
-            if effect["language"]["name"] == "en"
-        )
-
-        if not effects:
-            for effect in data["flavor_text_entries"]:
-                if effect["language"]["name"] == "en":
-                    effects += effect["flavor_text"] + "\n"
-        if effects:
-            embed.add_field(name="Effect", value=effects, inline=False)
-
-        # Build the embed of pokemon
-        desc = "".join(
-            pokemon["pokemon"]["name"].title() + "\n" for pokemon in data["pokemon"]
-        )
-
-        poke_embed = discord.Embed(
-            title="Pokemon with " + ability.title().replace("-", " "),
-            color=0xF699CD,
-            description=desc,
-        )
-
-        await AbilityView(ctx, embed, poke_embed).start()
+        base, poke_embed = self.engine.ability(identifier)
+        embed = discord.Embed.from_dict(base)
+        if identifier != ability.lower().replace(" ", "-"):
+            embed.set_footer(text=f'Closest match to "{ability}"')
+        await AbilityView(ctx, embed, discord.Embed.from_dict(poke_embed)).start()
 
     @lookup_cmds.command()
     async def type(self, ctx, type1: str, type2: str = None):
-        type_ids = {
-            1: "Normal",
-            2: "Fighting",
-            3: "Flying",
-            4: "Poison",
-            5: "Ground",
-            6: "Rock",
-            7: "Bug",
-            8: "Ghost",
-            9: "Steel",
-            10: "Fire",
-            11: "Water",
-            12: "Grass",
-            13: "Electric",
-            14: "Psychic",
-            15: "Ice",
-            16: "Dragon",
-            17: "Dark",
-            18: "Fairy",
-        }
-        type_effectiveness = {}
-        for te in await ctx.bot.db[1].type_effectiveness.find({}).to_list(None):
-            if te["damage_type_id"] in type_ids and te["target_type_id"] in type_ids:
-                type_effectiveness[
-                    (type_ids[te["damage_type_id"]], type_ids[te["target_type_id"]])
-                ] = (te["damage_factor"] / 100)
-        type1 = type1.title()
-        types = [type1]
+        types = [type1.title()]
         if type2:
             types.append(type2.title())
 
         for t in types:
-            if t not in type_ids.values():
+            if t not in self.engine.type_ids:
                 await ctx.send(f"{t} is not a valid type.")
                 return
 
-        atk_effs = defaultdict(list)
-        if not type2:
-            for d in type_ids.values():
-                eff = 1
-                eff *= type_effectiveness[(type1, d)]
-                atk_effs[eff].append(d)
-
-        def_effs = defaultdict(list)
-        for a in type_ids.values():
-            eff = 1
-            for d in types:
-                eff *= type_effectiveness[(a, d)]
-            def_effs[eff].append(a)
-
-        desc = ""
-
-        if 4 in def_effs:
-            formatted = ", ".join(def_effs[4])
-            desc += f"**x4 damage from:** `{formatted}`\n"
-        if 2 in def_effs:
-            formatted = ", ".join(def_effs[2])
-            desc += f"**x2 damage from:** `{formatted}`\n"
-        if 1 in def_effs:
-            formatted = ", ".join(def_effs[1])
-            desc += f"**x1 damage from:** `{formatted}`\n"
-        if 1 / 2 in def_effs:
-            formatted = ", ".join(def_effs[1 / 2])
-            desc += f"**x1/2 damage from:** `{formatted}`\n"
-        if 1 / 4 in def_effs:
-            formatted = ", ".join(def_effs[1 / 4])
-            desc += f"**x1/4 damage from:** `{formatted}`\n"
-        if 0 in def_effs:
-            formatted = ", ".join(def_effs[0])
-            desc += f"**Immune to damage from:** `{formatted}`\n"
-
-        desc += "\n"
-
-        if 2 in atk_effs:
-            formatted = ", ".join(atk_effs[2])
-            desc += f"**x2 damage to:** `{formatted}`\n"
-        if 1 in atk_effs:
-            formatted = ", ".join(atk_effs[1])
-            desc += f"**x1 damage to:** `{formatted}`\n"
-        if 1 / 2 in atk_effs:
-            formatted = ", ".join(atk_effs[1 / 2])
-            desc += f"**x1/2 damage to:** `{formatted}`\n"
-        if 0 in atk_effs:
-            formatted = ", ".join(atk_effs[0])
-            desc += f"**Does nothing to:** `{formatted}`\n"
-
-        embed = discord.Embed(
-            title=", ".join(types),
-            color=0xF699CD,
-            description=desc,
-        )
-        await ctx.send(embed=embed)
+        embed = self.engine.types(tuple(self.engine.type_ids[t] for t in types))
+        await ctx.send(embed=discord.Embed.from_dict(embed))
 
 
 async def setup(bot):
@@ -1,4 +1,3 @@
-import asyncio
 import contextlib
 
 import discord
@@ -29,15 +28,6 @@ class Market(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
-        self.init_task = asyncio.create_task(self.initialize())
-
-    async def initialize(self):
-        await self.bot.redis_manager.redis.execute(
-            "LPUSH",
-            "marketlock",
-            # I don't think we'll get to a market listing this high
-            "1231231346546515131351351351315",
-        )
 
     @commands.hybrid_group()
     async def m(self, ctx):
@@ -56,14 +46,14 @@ class Market(commands.Cog):
             return
         async with ctx.bot.db[0].acquire() as pconn:
             data = await pconn.fetchrow(
-                "SELECT pokes[$1], marketlimit, mewcoins, tradelock FROM users WHERE u_id = $2",
-                poke,
+                "SELECT marketlimit, mewcoins, tradelock FROM users WHERE u_id = $1",
                 ctx.author.id,
             )
             if data is None:
                 await ctx.send(f"You have not started!\nStart with `/start`")
                 return
-            poke_id, marketlimit, credits, tradeban = data
+            marketlimit, credits, tradeban = data
+            poke_id = await ctx.bot.commondb.poke_at(ctx.author.id, poke, pconn=pconn)
             if tradeban:
                 await ctx.send("You are not allowed to trade.")
                 return
@@ -152,176 +142,157 @@ class Market(commands.Cog):
     @tradelock
     async def market_buy(self, ctx, listing_id: int):
         """Buy a pokemon currently listed on the market."""
-        in_lock = [
-            int(id_)
-            for id_ in await self.bot.redis_manager.redis.execute(
-                "LRANGE", "marketlock", "0", "-1"
+        async with ctx.bot.db[0].acquire() as pconn:
+            details = await pconn.fetchrow(
+                "SELECT market.owner, market.price, market.buyer, pokes.pokname, pokes.pokelevel "
+                "FROM market LEFT JOIN pokes ON pokes.id = market.poke WHERE market.id = $1",
+                listing_id,
             )
-            if id_.decode("utf-8").isdigit()
-        ]
-        if listing_id in in_lock:
-            await ctx.send(
-                "Someone is already in the process of buying that pokemon. You can try again later."
+        if not details:
+            await ctx.send("That listing does not exist.")
+            return
+        owner, price, buyer, pokename, pokelevel = details
+        if owner == ctx.author.id:
+            await ctx.send("You can not buy your own pokemon.")
+            return
+        if buyer is not None:
+            await ctx.send("That listing has already ended.")
+            return
+        if pokename is None:
+            await ctx.send("That pokemon does not exist?")
+            raise ValueError(
+                f"Listing {listing_id} is an open market listing for a poke that does not exist."
             )
+        pokename = pokename.capitalize()
+        if not await ConfirmView(
+            ctx,
+            f"Are you sure you want to buy a level {pokelevel} {pokename} for {price} credits?",
+        ).wait():
+            await ctx.send("Purchase cancelled.")
             return
-        await self.bot.redis_manager.redis.execute(
-            "LPUSH", "marketlock", str(listing_id)
+
+        refusal, owner, price, deposit = await self.buy_listing(ctx.author.id, listing_id)
+        if refusal is not None:
+            await ctx.send(refusal)
+            return
+        with contextlib.suppress(discord.HTTPException):
+            await ctx.author.send(
+                f"You have Successfully Bought A {pokename} for {price} credits."
+            )
+        await ctx.send(f"You have Successfully Bought A {pokename} for {price} credits.")
+        with contextlib.suppress(discord.HTTPException):
+            user = await ctx.bot.fetch_user(owner)
+            await user.send(
+                f"<@{owner}> Your {pokename} has been sold for {price} credits.\n"
+                f"You received your {deposit} credit deposit back as well."
+            )
+        await ctx.bot.log(
+            1008748026799587408,
+            f"**ID** - `{listing_id}`\n<a:plus:1008763677509431446> : {ctx.author.name}(`{ctx.author.id}`) **BOUGHT** a **{pokename}**. Seller - (<@{owner}>)`{owner}`.\n-----------------------------",
         )
-        try:
-            async with ctx.bot.db[0].acquire() as pconn:
-                details = await pconn.fetchrow(
-                    "SELECT poke, owner, price, buyer FROM market WHERE id = $1",
+
+    async def buy_listing(self, buyer_id: int, listing_id: int):
+        """
+        Buys a listing for `buyer_id` in a single transaction.
+
+        Returns (None, owner, price, deposit) once the purchase has committed, or
+        (the reason to give the buyer, None, None, None) if nothing was bought.
+        Nothing is sent to discord from inside the transaction, so the listing and
+        user rows are never held locked across an http request.
+        """
+        # The listing row is locked for the whole transaction, and anyone else trying
+        # to buy it at the same time skips it instead of waiting.
+        async with self.bot.db[0].acquire() as pconn:
+            async with self.bot.commondb.transaction(pconn):
+                listing = await pconn.fetchrow(
+                    "SELECT poke, owner, price FROM market WHERE id = $1 AND buyer IS NULL "
+                    "FOR UPDATE SKIP LOCKED",
                     listing_id,
                 )
-                if not details:
-                    await ctx.send("That listing does not exist.")
-                    await self.bot.redis_manager.redis.execute(
-                        "LREM", "marketlock", "1", str(listing_id)
-                    )
-                    return
-                poke, owner, price, buyer = details
-                if owner == ctx.author.id:
-                    await ctx.send("You can not buy your own pokemon.")
-                    await self.bot.redis_manager.redis.execute(
-                        "LREM", "marketlock", "1", str(listing_id)
+                if listing is None:
+                    return (
+                        "That listing has already ended, or someone else is buying it right now.",
+                        None,
+                        None,
+                        None,
                     )
-                    return
-                if buyer is not None:
-                    await ctx.send("That listing has already ended.")
-                    await self.bot.redis_manager.redis.execute(
-                        "LREM", "marketlock", "1", str(listing_id)
-                    )
-                    return
-                details = await pconn.fetchrow(
-                    "SELECT pokname, pokelevel FROM pokes WHERE id = $1", poke
-                )
-            if not details:
-                await ctx.send("That pokemon does not exist?")
-                await self.bot.redis_manager.redis.execute(
-                    "LREM", "marketlock", "1", str(listing_id)
-                )
-                raise ValueError(
-                    f"Poke id {poke} is open market listing {listing_id} but does not exist."
-                )
-            pokename, pokelevel = details
-            pokename = pokename.capitalize()
-            if not await ConfirmView(
-                ctx,
-                f"Are you sure you want to buy a level {pokelevel} {pokename} for {price} credits?",
-            ).wait():
-                await ctx.send("Purchase cancelled.")
-                return
-            async with ctx.bot.db[0].acquire() as pconn:
-                
-                data = await pconn.fetchrow(
-                    "SELECT mewcoins, tradelock FROM users WHERE u_id = $1",
-                    ctx.author.id,
+                poke, owner, price = listing
+                # Lock both users in a fixed order, so two people buying from each other can't deadlock.
+                # Their pokemon are locked before their rows, the same order catches and trades use.
+                await self.bot.commondb.lock_owners(pconn, buyer_id, owner)
+                rows = await pconn.fetch(
+                    "SELECT u_id, mewcoins, tradelock FROM users WHERE u_id = ANY($1::bigint[]) "
+                    "ORDER BY u_id FOR UPDATE",
+                    [buyer_id, owner],
                 )
+                data = next((row for row in rows if row["u_id"] == buyer_id), None)
                 if data is None:
-                    await ctx.send("You have not started!\nStart with `/start` first.")
-                    await self.bot.redis_manager.redis.execute(
-                        "LREM", "marketlock", "1", str(listing_id)
-                    )
-                    return
-                credits, tradeban = data
-                if tradeban:
-                    await ctx.send("You are not allowed to trade.")
-                    await self.bot.redis_manager.redis.execute(
-                        "LREM", "marketlock", "1", str(listing_id)
-                    )
-                    return
-                if price > credits:
-                    await ctx.send("You don't have enough credits to buy that pokemon.")
-                    await self.bot.redis_manager.redis.execute(
-                        "LREM", "marketlock", "1", str(listing_id)
-                    )
-                    return
+                    return "You have not started!\nStart with `/start` first.", None, None, None
+                if data["tradelock"]:
+                    return "You are not allowed to trade.", None, None, None
+                if price > data["mewcoins"]:
+                    return "You don't have enough credits to buy that pokemon.", None, None, None
+                deposit = int(price * DEPOSIT_RATE)
                 await pconn.execute(
                     "UPDATE market SET buyer = $1 WHERE id = $2",
-                    ctx.author.id,
+                    buyer_id,
                     listing_id,
                 )
+                # Debit the buyer, and pay the seller the price plus their deposit back
                 await pconn.execute(
-                    "UPDATE users SET pokes = array_append(pokes, $1), mewcoins = mewcoins - $2 WHERE u_id = $3",
-                    poke,
+                    "UPDATE users SET mewcoins = mewcoins + CASE WHEN u_id = $1 THEN -$3::bigint ELSE $4::bigint END "
+                    "WHERE u_id = ANY(ARRAY[$1, $2]::bigint[])",
+                    buyer_id,
+                    owner,
                     price,
-                    ctx.author.id,
+                    price + deposit,
                 )
-                deposit = int(price * DEPOSIT_RATE)
-                gain = price + deposit
+                await self.bot.commondb.append_poke(buyer_id, poke, pconn=pconn)
                 await pconn.execute(
-                    "UPDATE users SET mewcoins = mewcoins + $1 WHERE u_id = $2",
-                    gain,
+                    "UPDATE achievements SET market_purchased = market_purchased + (u_id = $1)::int, "
+                    "market_sold = market_sold + (u_id = $2)::int WHERE u_id = ANY(ARRAY[$1, $2]::bigint[])",
+                    buyer_id,
                     owner,
                 )
-                await pconn.execute("UPDATE achievements SET market_purchased = market_purchased + 1 WHERE u_id = $1", ctx.author.id)
-                await pconn.execute("UPDATE achievements SET market_sold = market_sold + 1 WHERE u_id = $1", owner)
-            with contextlib.suppress(discord.HTTPException):
-                await ctx.author.send(
-                    f"You have Successfully Bought A {pokename} for {price} credits."
-                )
-            await ctx.send(
-                f"You have Successfully Bought A {pokename} for {price} credits."
-            )
-            with contextlib.suppress(discord.HTTPException):
-                user = await ctx.bot.fetch_user(owner)
-                await user.send(
-                    f"<@{owner}> Your {pokename} has been sold for {price} credits.\n"
-                    f"You received your {deposit} credit deposit back as well."
-                )
-            await ctx.bot.log(
-                1008748026799587408,
-                f"**ID** - `{listing_id}`\n<a:plus:1008763677509431446> : {ctx.author.name}(`{ctx.author.id}`) **BOUGHT** a **{pokename}**. Seller - (<@{owner}>)`{owner}`.\n-----------------------------",
-            )
-        except Exception:
-            raise
-        finally:
-            await self.bot.redis_manager.redis.execute(
-                "LREM", "marketlock", "1", str(listing_id)
-            )  # As a just in case
-            
-
+        return None, owner, price, deposit
 
     @m.command()
     async def market_remove(self, ctx, listing_id: int):
         """Remove a pokemon from the market."""
-        in_lock = [
-            int(id_)
-            for id_ in await self.bot.redis_manager.redis.execute(
-                "LRANGE", "marketlock", "0", "-1"
-            )
-            if id_.decode("utf-8").isdigit()
-        ]
-        if listing_id in in_lock:
-            await ctx.send(
-                "Someone is already in the process of buying that pokemon. You can try again later."
-            )
-            return
+        # Refusals are only sent once the transaction is over, so the listing is never
+        # held locked across a discord request
+        refusal = None
         async with ctx.bot.db[0].acquire() as pconn:
-            details = await pconn.fetchrow(
-                "SELECT poke, owner, buyer FROM market WHERE id = $1", listing_id
-            )
-            if not details:
-                await ctx.send("That listing does not exist.")
-                return
-            poke, owner, buyer = details
-            if owner != ctx.author.id:
-                await ctx.send("You do not own that listing.")
-                return
-            if buyer is not None:
-                await ctx.send("That listing has already ended.")
-                return
-            await pconn.execute(
-                "UPDATE market SET buyer = $1 WHERE id = $2", 0, listing_id
-            )
-            await pconn.execute(
-                "UPDATE users SET pokes = array_append(pokes, $1) WHERE u_id = $2",
-                poke,
-                ctx.author.id,
-            )
-            pokename = await pconn.fetchval(
-                "SELECT pokname FROM pokes WHERE id = $1", poke
-            )
+            async with ctx.bot.commondb.transaction(pconn):
+                details = await pconn.fetchrow(
+                    "SELECT poke, owner, buyer FROM market WHERE id = $1 FOR UPDATE SKIP LOCKED",
+                    listing_id,
+                )
+                if not details:
+                    if await pconn.fetchval(
+                        "SELECT 1 FROM market WHERE id = $1", listing_id
+                    ):
+                        refusal = "Someone is already in the process of buying that pokemon. You can try again later."
+                    else:
+                        refusal = "That listing does not exist."
+                else:
+                    poke, owner, buyer = details
+                    if owner != ctx.author.id:
+                        refusal = "You do not own that listing."
+                    elif buyer is not None:
+                        refusal = "That listing has already ended."
+                    else:
+                        await pconn.execute(
+                            "UPDATE market SET buyer = $1 WHERE id = $2", 0, listing_id
+                        )
+                        await ctx.bot.commondb.append_poke(ctx.author.id, poke, pconn=pconn)
+            if refusal is None:
+                pokename = await pconn.fetchval(
+                    "SELECT pokname FROM pokes WHERE id = $1", poke
+                )
+        if refusal is not None:
+            await ctx.send(refusal)
+            return
         await ctx.send(f"You have removed your {pokename} from the market")
         await ctx.bot.log(
             1008748026799587408,
@@ -1,16 +1,16 @@
 import concurrent
 import contextlib
 import random
-import time
 import traceback
-from collections import defaultdict
+from collections import Counter
 from discord import app_commands
 from discord.ui import Modal, TextInput
 import discord
 from discord.ext import commands
-from pokemon_utils.utils import evolve
+from dittocore.commondb import UserNotStartedError
+from dittocore.rate_limits import fixed_window
+from pokemon_utils.evolution import evolve_many
 from utils.checks import check_mod
-from collections import defaultdict
 
 GUILD_DEFAULT = {
     "prefix": ";",
@@ -160,7 +160,8 @@ class NominateView(discord.ui.View):
 class Misc(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.user_cache = defaultdict(int)
+        # One message tick per user every 5 seconds
+        self.user_cache = bot.rate_limits.local("message_ticks", fixed_window(1, 5))
         self.submitted = []
         self.nominations = []
 
@@ -229,136 +230,82 @@ class Misc(commands.Cog):
             return
 
         if message.channel.id == 1004266790949486724:
-            #
-            user = await self.bot.mongo_find(
-                "users",
-                {"user": message.author.id},
-                default={"user": message.author.id, "progress": {}},
-            )
-            progress = user["progress"]
-            progress["chat-general"] = progress.get("chat-general", 0) + 1
-            await self.bot.mongo_update(
-                "users", {"user": message.author.id}, {"progress": progress}
-            )
-            #
-        if time.time() < self.user_cache[message.author.id]:
+            self.bot.mission_progress.increment(message.author.id, "chat-general")
+        if self.user_cache.hit(message.author.id):
             return
-        self.user_cache[message.author.id] = time.time() + 5
-        async with self.bot.db[0].acquire() as pconn:
+        self.bot.message_ticks.tick(message)
+
+    @commands.Cog.listener()
+    async def on_message_ticks(self, events):
+        """Announces the eggs hatched and pokemon leveled by a flush of message ticks."""
+        leveled = {}
+        evolved = {}
+        leveled_ids = [event.user_id for event in events if event.leveled]
+        if leveled_ids:
             try:
-                if (
-                    await pconn.fetchval(
-                        "SELECT true FROM users WHERE u_id = $1", message.author.id
+                async with self.bot.db[0].acquire() as pconn:
+                    rows = await pconn.fetch(
+                        "SELECT users.u_id, users.silenced, pokes.* FROM users INNER JOIN pokes ON pokes.id = users.selected WHERE users.u_id = ANY($1)",
+                        leveled_ids,
                     )
-                    is None
+                leveled = {row["u_id"]: row for row in rows}
+                for poke, edge in await evolve_many(
+                    self.bot, [(row, user_id) for user_id, row in leveled.items()]
                 ):
-                    return
-                (
-                    hatched_party_pokemon,
-                    hatched_pokemon,
-                    level_pokemon,
-                ) = await pconn.fetchrow(
-                    "SELECT party_counter($1), selected_counter($1), level_pokemon($1)",
-                    message.author.id,
+                    evolved[poke["u_id"]] = edge
+            except Exception as e:
+                self.bot.logger.exception("Error in evolve", exc_info=e)
+        for event in events:
+            try:
+                await self._announce_ticks(
+                    event, leveled.get(event.user_id), evolved.get(event.user_id)
                 )
             except Exception:
-                return
-            response = ""
-            if hatched_party_pokemon:
-                for egg_name in hatched_party_pokemon:
-                    #
-                    user = await self.bot.mongo_find(
-                        "users",
-                        {"user": message.author.id},
-                        default={"user": message.author.id, "progress": {}},
-                    )
-                    progress = user["progress"]
-                    progress["hatch"] = progress.get("hatch", 0) + 1
-                    await self.bot.mongo_update(
-                        "users", {"user": message.author.id}, {"progress": progress}
-                    )
-                    #
-                    response += f"Congratulations!\nYour {egg_name} Egg has hatched!\n"
-                    chest_chance = not random.randint(0, 200)
-                    if chest_chance:
-                        inventory = await pconn.fetchval(
-                            "SELECT inventory::json FROM users WHERE u_id = $1",
-                            message.author.id,
-                        )
-                        item = "common chest"
-                        inventory[item] = inventory.get(item, 0) + 1
-                        await pconn.execute(
-                            "UPDATE users SET inventory = $1::json where u_id = $2",
-                            inventory,
-                            message.author.id,
-                        )
-                        response += "It was holding a common chest!\n"
-            if hatched_pokemon:
-                #
-                user = await self.bot.mongo_find(
-                    "users",
-                    {"user": message.author.id},
-                    default={"user": message.author.id, "progress": {}},
-                )
-                progress = user["progress"]
-                progress["hatch"] = progress.get("hatch", 0) + 1
-                await self.bot.mongo_update(
-                    "users", {"user": message.author.id}, {"progress": progress}
-                )
-                #
-                response += (
-                    f"Congratulations!\nYour {hatched_pokemon} Egg has hatched!\n"
-                )
+                self.bot.logger.exception("Error announcing message ticks")
+
+    async def _announce_ticks(self, event, pokemon_details, evolution):
+        response = ""
+        async with self.bot.db[0].acquire() as pconn:
+            for egg_name in event.hatched_party + event.hatched:
+                self.bot.mission_progress.increment(event.user_id, "hatch")
+                response += f"Congratulations!\nYour {egg_name} Egg has hatched!\n"
                 chest_chance = not random.randint(0, 200)
                 if chest_chance:
-                    inventory = await pconn.fetchval(
-                        "SELECT inventory::json FROM users WHERE u_id = $1",
-                        message.author.id,
-                    )
-                    item = "common chest"
-                    inventory[item] = inventory.get(item, 0) + 1
-                    await pconn.execute(
-                        "UPDATE users SET inventory = $1::json where u_id = $2",
-                        inventory,
-                        message.author.id,
+                    await self.bot.commondb.add_items(
+                        event.user_id, {"common chest": 1}, pconn=pconn
                     )
                     response += "It was holding a common chest!\n"
-            if level_pokemon:
-                pokemon_details = await pconn.fetchrow(
-                    "SELECT users.silenced, pokes.* FROM users INNER JOIN pokes on pokes.id = (SELECT selected FROM users WHERE u_id = $1) AND users.u_id = $1",
-                    message.author.id,
-                )
-                silenced = pokemon_details.get("silenced")
-                guild_details = await self.bot.db[1].guilds.find_one(
-                    {"id": message.guild.id}
+        if event.leveled and pokemon_details is not None:
+            silenced = pokemon_details["silenced"]
+            guild_details = self.bot.guild_settings.get(event.channel.guild.id)
+            if guild_details:
+                silenced = silenced or guild_details["silence_levels"]
+            if not silenced:
+                for name, times in Counter(event.leveled).items():
+                    if times == 1:
+                        response += f"{event.author.mention} Your {name} has leveled up!\n"
+                    else:
+                        response += f"{event.author.mention} Your {name} has leveled up {times} times!\n"
+        if response:
+            with contextlib.suppress(discord.HTTPException):
+                await event.channel.send(
+                    embed=discord.Embed(description=response, color=0xFF49E6)
                 )
-                if guild_details:
-                    silenced = silenced or guild_details["silence_levels"]
-                if not silenced:
-                    response += f"{message.author.mention} Your {level_pokemon} has leveled up!\n"
-                try:
-                    await evolve(
-                        self.bot,
-                        pokemon_details,
-                        message.author,
-                        channel=message.channel,
-                    )
-                except Exception as e:
-                    self.bot.logger.exception("Error in evolve", exc_info=e)
-            if response:
-                with contextlib.suppress(discord.HTTPException):
-                    await message.channel.send(
-                        embed=discord.Embed(description=response, color=0xFF49E6)
+        if evolution is not None:
+            with contextlib.suppress(discord.HTTPException):
+                await event.channel.send(
+                    embed=discord.Embed(
+                        title="Congratulations!!!",
+                        description=f"{event.author.name}, your {pokemon_details['pokname']} has evolved into {evolution.evolved_name}!",
+                        color=self.bot.get_random_color(),
                     )
-                return
+                )
 
     @commands.Cog.listener()
     async def on_guild_join(self, guild):
         if self.bot.user.id != 1000125868938633297:
             return
-        guild_data = GUILD_DEFAULT.copy()
-        guild_data["id"] = guild.id
-        await self.bot.db[1].guilds.insert_one(guild_data)
+        await self.bot.guild_settings.update(guild.id, GUILD_DEFAULT.copy())
         owner = await self.bot.fetch_user(guild.owner_id)
         guild_name = guild.name
         owner_id = owner.id
@@ -389,7 +336,7 @@ class Misc(commands.Cog):
     @commands.Cog.listener()
     async def on_guild_remove(self, guild):
         if self.bot.user.id == 1000125868938633297:
-            await self.bot.db[1].guilds.delete_one({"id": guild.id})
+            await self.bot.guild_settings.remove(guild.id)
 
     @commands.hybrid_command()
     async def donate(self, ctx):
@@ -431,8 +378,6 @@ class Misc(commands.Cog):
                 1004571779886501969,
                 f"{ctx.author.name} - {ctx.author.id} used {ctx.command.name} command\nArguments - {ctx.args}\n{ctx.kwargs}",
             )
-        if ctx.command.cog_name == "Settings":
-            await self.bot.load_guild_settings()
 
     @commands.Cog.listener()
     async def on_command_error(self, ctx, error):
@@ -476,6 +421,12 @@ class Misc(commands.Cog):
             except:
                 pass
             return
+        # Hybrid commands wrap the error twice when used as a slash command
+        original = getattr(error, "original", error)
+        if isinstance(getattr(original, "original", original), UserNotStartedError):
+            with contextlib.suppress(discord.HTTPException):
+                await ctx.send("You have not started!\nStart with `/start` first!")
+            return
         if isinstance(error, commands.errors.CommandInvokeError):
             # This should get the actual error behind the CommandInvokeError
             error = error.__cause__ or error
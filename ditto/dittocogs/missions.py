@@ -21,14 +21,9 @@ class Missions(commands.Cog):
             )
             return
         primary, secondary = raw["missions"]
-        user = await ctx.bot.mongo_find(
-            "users",
-            {"user": ctx.author.id},
-            default={"user": ctx.author.id, "progress": {}},
-        )
+        progress = await ctx.bot.mission_progress.get(ctx.author.id)
         primary_text = ctx.bot.primaries.get(primary[0])[0]
         secondary_text = ctx.bot.secondaries.get(secondary[0])[0]
-        progress = user["progress"]
         primary_completed = (
             "<a:cuscheck:534740177147396097>"
             if progress.get(primary[0], 0) >= primary[1]
@@ -64,43 +59,28 @@ class Missions(commands.Cog):
 
     @mission_cmds.command()
     async def claim(self, ctx):
-        user = await ctx.bot.mongo_find(
-            "users",
-            {"user": ctx.author.id},
-            default={"user": ctx.author.id, "progress": {}},
-        )
+        progress = await ctx.bot.mission_progress.get(ctx.author.id)
         primary, secondary = (await ctx.bot.db[1].missions.find_one())["missions"]
-        progress = user["progress"]
 
         if (
             progress.get(primary[0], 0) >= primary[1]
             and progress.get(secondary[0], 0) >= secondary[1]
         ):
+            if not await ctx.bot.mission_progress.claim(ctx.author.id):
+                await ctx.send(
+                    "**You have already claimed rewards for today!\nPlease wait till missions reset.**"
+                )
+                return
             async with ctx.bot.db[0].acquire() as pconn:
-                user = await ctx.bot.mongo_find(
-                    "users",
-                    {"user": ctx.author.id},
-                    default={"user": ctx.author.id, "progress": {}},
+                await pconn.execute(
+                    "UPDATE users SET mewcoins = mewcoins + 10000 WHERE u_id = $1",
+                    ctx.author.id,
                 )
-                progress = user["progress"]
-                if progress.get("collected", False) == True:
-                    await ctx.send(
-                        "**You have already claimed rewards for today!\nPlease wait till missions reset.**"
-                    )
-                else:
-                    await pconn.execute(
-                        "UPDATE users SET mewcoins = mewcoins + 10000 WHERE u_id = $1",
-                        ctx.author.id,
-                    )
-                    progress.update({"collected": True})
-                    await ctx.bot.mongo_update(
-                        "users", {"user": ctx.author.id}, {"progress": progress}
-                    )
-                    await ctx.send(
-                        embed=make_embed(
-                            title=f"Congratulations!\nYou have claimed 10,000 credits!"
-                        )
-                    )
+            await ctx.send(
+                embed=make_embed(
+                    title=f"Congratulations!\nYou have claimed 10,000 credits!"
+                )
+            )
         else:
             await ctx.send("Today's missions have not been completed!")
 
@@ -120,14 +120,11 @@ class Moves(commands.Cog):
         if slot > 4 or slot < 1:
             return
         move = move.replace(" ", "-").lower()
+        dets = await ctx.loader.selected()
+        if not dets:
+            await ctx.send("You do not have that Pokemon!")
+            return
         async with ctx.bot.db[0].acquire() as pconn:
-            dets = await pconn.fetchrow(
-                "SELECT * FROM pokes WHERE id = (SELECT selected FROM users WHERE u_id = $1)",
-                ctx.author.id,
-            )
-            if not dets:
-                await ctx.send("You do not have that Pokemon!")
-                return
             poke = dets["pokname"]
             moves = await get_moves(ctx, poke.lower())
             if moves is None:
@@ -148,13 +145,12 @@ class Moves(commands.Cog):
             await ctx.send(
                 f"You have successfully learnt {move} as your slot {slot} move"
             )
+            ctx.loader.invalidate(dets["id"])
+            learned = list(dets["moves"])
+            learned[slot - 1] = move.lower()
             await evolve(
                 ctx.bot,
-                dict(
-                    await pconn.fetchrow(
-                        "SELECT * FROM pokes WHERE id = $1", dets["id"]
-                    )
-                ),
+                {**dets, "moves": learned},
                 ctx.author,
                 channel=ctx.channel,
             )
@@ -162,24 +158,19 @@ class Moves(commands.Cog):
     @commands.hybrid_command()
     async def moves(self, ctx):
         """Show moves your pokemon has learned"""
-        async with ctx.bot.db[0].acquire() as pconn:
-            details = await pconn.fetchrow(
-                "SELECT * FROM pokes WHERE id = (SELECT selected FROM users WHERE u_id = $1)",
-                ctx.author.id,
+        details = await ctx.loader.selected()
+        if details is None:
+            await ctx.send(
+                "You do not have a selected pokemon. Select one with `/select` first."
             )
-            if details is None:
-                await ctx.send(
-                    "You do not have a selected pokemon. Select one with `/select` first."
-                )
 
-                return
-            details["pokname"]
-            m1, m2, m3, m4 = (
-                details["moves"][0],
-                details["moves"][1],
-                details["moves"][2],
-                details["moves"][3],
-            )
+            return
+        m1, m2, m3, m4 = (
+            details["moves"][0],
+            details["moves"][1],
+            details["moves"][2],
+            details["moves"][3],
+        )
         embed = discord.Embed(title="Moves", color=0xFFB6C1)
 
         embed.add_field(name="**Move 1**:", value=f"{m1}")
@@ -192,11 +183,8 @@ class Moves(commands.Cog):
 
     @commands.hybrid_command()
     async def moveset(self, ctx):
-        async with ctx.bot.db[0].acquire() as pconn:
-            pokename = await pconn.fetchval(
-                "SELECT pokname FROM pokes WHERE id = (SELECT selected FROM users WHERE u_id = $1)",
-                ctx.author.id,
-            )
+        selected = await ctx.loader.selected()
+        pokename = None if selected is None else selected["pokname"]
         if not pokename:
             await ctx.send("You have not selected a Pokemon")
             return
@@ -22,19 +22,15 @@ class Party(commands.Cog):
             if party_nums is None:
                 await ctx.send(f"You have not Started!\nStart with `/start` first!")
                 return
-            for idx, _id in enumerate(party_nums):
-                t_name = await pconn.fetchval(
-                    "SELECT pokname FROM pokes WHERE id = $1", _id
-                )
-                if t_name is None:
+            pokes = await ctx.bot.commondb.get_pokes(party_nums, "name", pconn=pconn)
+            positions = await ctx.bot.commondb.positions_of(
+                ctx.author.id, [poke.id for poke in pokes if poke is not None], pconn=pconn
+            )
+            for idx, poke in enumerate(pokes):
+                if poke is None:
                     t_name = "None"
                 else:
-                    num = await pconn.fetchval(
-                        "SELECT array_position(pokes, $1) FROM users WHERE u_id = $2",
-                        _id,
-                        ctx.author.id,
-                    )
-                    t_name = f"{t_name} [{num}]"
+                    t_name = f"{poke.pokname} [{positions.get(poke.id)}]"
                 embed.add_field(name=(f"Slot {idx+1} Pokemon"), value=(f"{t_name}"))
         embed.set_footer(
             text="Your Current Pokemon Party | use /party add <slot_number> to add a selected Pokemon"
@@ -56,9 +52,7 @@ class Party(commands.Cog):
                 await ctx.send(f"You have not started!\nStart with `/start` first!")
                 return
             if poke is not None:
-                _id = await pconn.fetchval(
-                    "SELECT pokes[$1] FROM users WHERE u_id = $2", poke, ctx.author.id
-                )
+                _id = await ctx.bot.commondb.poke_at(ctx.author.id, poke, pconn=pconn)
             else:
                 _id = await pconn.fetchval(
                     "SELECT selected FROM users WHERE u_id = $1", ctx.author.id
@@ -96,17 +96,15 @@ class Pokemon(commands.Cog):
 
     async def _build_pokedex(self, ctx, include_owned: bool):
         """Helper func to build & send the pokedex."""
-        async with self.bot.db[0].acquire() as pconn:
-            pokes = await pconn.fetchval(
-                "SELECT pokes FROM users WHERE u_id = $1", ctx.author.id
-            )
-            if pokes is None:
-                return
+        async with self.bot.commondb.ownership_conn(ctx.author.id) as pconn:
             owned = await pconn.fetch(
-                "SELECT DISTINCT pokname FROM pokes WHERE id = ANY($1) AND pokname != ANY($2)",
-                pokes,
+                "SELECT DISTINCT pokname FROM ownership INNER JOIN pokes ON pokes.id = ownership.poke_id "
+                "WHERE ownership.u_id = $1 AND pokname != ANY($2)",
+                ctx.author.id,
                 custom_poke,
             )
+        if not owned:
+            return
         allpokes = self.bot.db[1].pfile.find(
             projection={"identifier": True, "_id": False}
         )
@@ -142,10 +140,7 @@ class Pokemon(commands.Cog):
         """Select a pokemon by ID number from your pokemon list"""
         async with self.bot.db[0].acquire() as pconn:
             if poke_id in {"newest", "new", "latest"}:
-                _id = await pconn.fetchval(
-                    "SELECT pokes[array_upper(pokes, 1)] FROM users WHERE u_id = $1",
-                    ctx.author.id,
-                )
+                _id = await ctx.bot.commondb.latest_poke(ctx.author.id, pconn=pconn)
             else:
                 try:
                     poke_id = int(poke_id)
@@ -155,9 +150,7 @@ class Pokemon(commands.Cog):
                 if poke_id > 2147483647:
                     await ctx.send("You do not have that many pokemon!")
                     return
-                _id = await pconn.fetchval(
-                    "SELECT pokes[$1] FROM users WHERE u_id = $2", poke_id, ctx.author.id
-                )
+                _id = await ctx.bot.commondb.poke_at(ctx.author.id, poke_id, pconn=pconn)
             if _id is None:
                 await ctx.send("You have not started or that Pokemon does not exist!")
                 return
@@ -177,30 +170,24 @@ class Pokemon(commands.Cog):
         pokes = []
         if pokemon.lower() in ("new", "latest"):
             async with self.bot.db[0].acquire() as pconn:
-                poke = await pconn.fetchval(
-                    "SELECT pokes[array_upper(pokes, 1)] FROM users WHERE u_id = $1 AND array_length(pokes, 1) > 1",
-                    ctx.author.id,
+                poke = await ctx.bot.commondb.latest_poke(
+                    ctx.author.id, exclude_first=True, pconn=pconn
                 )
                 if poke is None:
                     await ctx.send("You don't have any pokemon you can release!")
                     return
                 pokes.append(poke)
         else:
-            async with self.bot.db[0].acquire() as pconn:
-                stmt = await pconn.prepare(
-                    "SELECT pokes[$1] FROM users WHERE u_id = $2"
-                )
-                for p in pokemon.split():
-                    try:
-                        p = int(p)
-                        if p <= 1:
-                            continue
-                        id = await stmt.fetchval(p, ctx.author.id)
-                        if not id:
-                            continue
-                        pokes.append(id)
-                    except ValueError:
-                        continue
+            positions = []
+            for p in pokemon.split():
+                try:
+                    p = int(p)
+                except ValueError:
+                    continue
+                if 1 < p <= 2147483647:
+                    positions.append(p)
+            found = await self.bot.commondb.pokes_at(ctx.author.id, positions)
+            pokes = [found[p] for p in dict.fromkeys(positions) if p in found]
             if not pokes:
                 await ctx.send("You did not specify any valid pokemon!")
                 return
@@ -259,15 +246,13 @@ class Pokemon(commands.Cog):
     @commands.hybrid_command()
     async def p(self, ctx):
         async with ctx.bot.db[0].acquire() as pconn:
-            pokes = await pconn.fetchval(
-                "SELECT pokes FROM users WHERE u_id = $1", ctx.author.id
+            user_order = await pconn.fetchrow(
+                "SELECT user_order FROM users WHERE u_id = $1", ctx.author.id
             )
-            if pokes is None:
+            if user_order is None:
                 await ctx.send(f"You have not Started!\nStart with `/start` first!")
                 return
-            user_order = await pconn.fetchval(
-                "SELECT user_order FROM users WHERE u_id = $1", ctx.author.id
-            )
+            user_order = user_order["user_order"]
 
         orders = {
             "iv": "ORDER by ivs DESC",
@@ -277,17 +262,17 @@ class Pokemon(commands.Cog):
             "kek": "",
         }
         order = orders.get(user_order)
-        query = f"""SELECT *, COALESCE(atkiv,0) + COALESCE(defiv,0) + COALESCE(spatkiv,0) + COALESCE(spdefiv,0) + COALESCE(speediv,0) + COALESCE(hpiv,0) AS ivs, COALESCE(atkev,0) + COALESCE(defev,0) + COALESCE(spatkev,0) + COALESCE(spdefev,0) + COALESCE(speedev,0) + COALESCE(hpev,0) AS evs FROM pokes WHERE id = ANY ($1) {order}"""
+        query = f"""SELECT pokes.*, ownership.position, COALESCE(atkiv,0) + COALESCE(defiv,0) + COALESCE(spatkiv,0) + COALESCE(spdefiv,0) + COALESCE(speediv,0) + COALESCE(hpiv,0) AS ivs, COALESCE(atkev,0) + COALESCE(defev,0) + COALESCE(spatkev,0) + COALESCE(spdefev,0) + COALESCE(speedev,0) + COALESCE(hpev,0) AS evs FROM ownership INNER JOIN pokes ON pokes.id = ownership.poke_id WHERE ownership.u_id = $1 {order or "ORDER BY ownership.position"}"""
 
-        async with self.bot.db[0].acquire() as pconn:
+        async with self.bot.commondb.ownership_conn(ctx.author.id) as pconn:
             async with pconn.transaction():
-                cur = await pconn.cursor(query, pokes)
+                cur = await pconn.cursor(query, ctx.author.id)
                 records = await cur.fetch(15 * 250)
 
         desc = ""
         async for record in AsyncIter(records):
             nr = record["pokname"]
-            pn = pokes.index(record["id"]) + 1
+            pn = record["position"]
             record["poknick"]
             iv = record["ivs"]
             shiny = record["shiny"]
@@ -315,9 +300,8 @@ class Pokemon(commands.Cog):
         """View the tags for a pokemon."""
         async with self.bot.db[0].acquire() as pconn:
             if poke.lower() in {"new", "latest"}:
-                gid = await pconn.fetchval(
-                    "SELECT pokes[array_upper(pokes, 1)] FROM users WHERE u_id = $1 AND array_length(pokes, 1) > 1",
-                    ctx.author.id,
+                gid = await ctx.bot.commondb.latest_poke(
+                    ctx.author.id, exclude_first=True, pconn=pconn
                 )
             else:
                 try:
@@ -325,9 +309,7 @@ class Pokemon(commands.Cog):
                 except ValueError:
                     await ctx.send("You need to provide a valid pokemon number.")
                     return
-                gid = await pconn.fetchval(
-                    "SELECT pokes[$1] FROM users WHERE u_id = $2", poke, ctx.author.id
-                )
+                gid = await ctx.bot.commondb.poke_at(ctx.author.id, poke, pconn=pconn)
             if gid is None:
                 await ctx.send("That pokemon does not exist!")
                 return
@@ -357,9 +339,8 @@ class Pokemon(commands.Cog):
         async with ctx.bot.db[0].acquire() as pconn:
             for poke in pokes:
                 if poke.lower() in ("new", "latest"):
-                    gid = await pconn.fetchval(
-                        "SELECT pokes[array_upper(pokes, 1)] FROM users WHERE u_id = $1 AND array_length(pokes, 1) > 1",
-                        ctx.author.id,
+                    gid = await ctx.bot.commondb.latest_poke(
+                        ctx.author.id, exclude_first=True, pconn=pconn
                     )
                 else:
                     try:
@@ -367,11 +348,7 @@ class Pokemon(commands.Cog):
                     except ValueError:
                         failed.append(str(poke))
                         continue
-                    gid = await pconn.fetchval(
-                        "SELECT pokes[$1] FROM users WHERE u_id = $2",
-                        poke,
-                        ctx.author.id,
-                    )
+                    gid = await ctx.bot.commondb.poke_at(ctx.author.id, poke, pconn=pconn)
                 if gid is None:
                     failed.append(str(poke))
                     continue
@@ -410,9 +387,8 @@ class Pokemon(commands.Cog):
         async with ctx.bot.db[0].acquire() as pconn:
             for poke in pokes:
                 if poke.lower() in ("new", "latest"):
-                    gid = await pconn.fetchval(
-                        "SELECT pokes[array_upper(pokes, 1)] FROM users WHERE u_id = $1 AND array_length(pokes, 1) > 1",
-                        ctx.author.id,
+                    gid = await ctx.bot.commondb.latest_poke(
+                        ctx.author.id, exclude_first=True, pconn=pconn
                     )
                 else:
                     try:
@@ -420,11 +396,7 @@ class Pokemon(commands.Cog):
                     except ValueError:
                         not_exist.append(str(poke))
                         continue
-                    gid = await pconn.fetchval(
-                        "SELECT pokes[$1] FROM users WHERE u_id = $2",
-                        poke,
-                        ctx.author.id,
-                    )
+                    gid = await ctx.bot.commondb.poke_at(ctx.author.id, poke, pconn=pconn)
                 if gid is None:
                     not_exist.append(str(poke))
                     continue
@@ -541,9 +513,9 @@ class Pokemon(commands.Cog):
             return
 
         if pokemon in {"newest", "latest", "atest", "ewest", "new"}:
-            async with ctx.bot.db[0].acquire() as pconn:
+            async with ctx.bot.commondb.ownership_conn(ctx.author.id) as pconn:
                 records = await pconn.fetchrow(
-                    "SELECT * FROM pokes WHERE id = (SELECT pokes[array_upper(pokes, 1)] FROM users WHERE u_id = $1)",
+                    "SELECT * FROM pokes WHERE id = (SELECT poke_id FROM ownership WHERE u_id = $1 ORDER BY position DESC LIMIT 1)",
                     ctx.author.id,
                 )
             if records is None:
@@ -563,9 +535,9 @@ class Pokemon(commands.Cog):
             if pokemon > 4000000000:
                 await ctx.send("You probably don't have that many pokemon...")
                 return
-            async with ctx.bot.db[0].acquire() as pconn:
+            async with ctx.bot.commondb.ownership_conn(ctx.author.id) as pconn:
                 records = await pconn.fetchrow(
-                    "SELECT * FROM pokes WHERE id = (SELECT pokes[$1] FROM users WHERE u_id = $2)",
+                    "SELECT * FROM pokes WHERE id = (SELECT poke_id FROM ownership WHERE u_id = $2 AND position = $1)",
                     pokemon,
                     ctx.author.id,
                 )
@@ -770,9 +742,9 @@ class Pokemon(commands.Cog):
             return
 
         if pokemon in {"newest", "latest", "atest", "ewest", "new"}:
-            async with ctx.bot.db[0].acquire() as pconn:
+            async with ctx.bot.commondb.ownership_conn(ctx.author.id) as pconn:
                 records = await pconn.fetchrow(
-                    "SELECT * FROM pokes WHERE id = (SELECT pokes[array_upper(pokes, 1)] FROM users WHERE u_id = $1)",
+                    "SELECT * FROM pokes WHERE id = (SELECT poke_id FROM ownership WHERE u_id = $1 ORDER BY position DESC LIMIT 1)",
                     ctx.author.id,
                 )
             await ctx.send(embed=await get_pokemon_qinfo(ctx, records))
@@ -786,9 +758,9 @@ class Pokemon(commands.Cog):
             if pokemon < 1:
                 await ctx.send("That is not a valid pokemon number!")
                 return
-            async with ctx.bot.db[0].acquire() as pconn:
+            async with ctx.bot.commondb.ownership_conn(ctx.author.id) as pconn:
                 records = await pconn.fetchrow(
-                    "SELECT * FROM pokes WHERE id = (SELECT pokes[$1] FROM users WHERE u_id = $2)",
+                    "SELECT * FROM pokes WHERE id = (SELECT poke_id FROM ownership WHERE u_id = $2 AND position = $1)",
                     pokemon,
                     ctx.author.id,
                 )
@@ -906,9 +878,9 @@ class Pokemon(commands.Cog):
             return
 
         if pokemon in {"newest", "latest", "atest", "ewest", "new"}:
-            async with ctx.bot.db[0].acquire() as pconn:
+            async with ctx.bot.commondb.ownership_conn(ctx.author.id) as pconn:
                 records = await pconn.fetchrow(
-                    "SELECT * FROM pokes WHERE id = (SELECT pokes[array_upper(pokes, 1)] FROM users WHERE u_id = $1)",
+                    "SELECT * FROM pokes WHERE id = (SELECT poke_id FROM ownership WHERE u_id = $1 ORDER BY position DESC LIMIT 1)",
                     ctx.author.id,
                 )
             await ctx.send(embed=await get_pokemon_qinfo(ctx, records))
@@ -922,9 +894,9 @@ class Pokemon(commands.Cog):
             if pokemon < 1:
                 await ctx.send("That is not a valid pokemon number!")
                 return
-            async with ctx.bot.db[0].acquire() as pconn:
+            async with ctx.bot.commondb.ownership_conn(ctx.author.id) as pconn:
                 records = await pconn.fetchrow(
-                    "SELECT * FROM pokes WHERE id = (SELECT pokes[$1] FROM users WHERE u_id = $2)",
+                    "SELECT * FROM pokes WHERE id = (SELECT poke_id FROM ownership WHERE u_id = $2 AND position = $1)",
                     pokemon,
                     ctx.author.id,
                 )
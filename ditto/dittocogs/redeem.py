@@ -390,69 +390,47 @@ class Redeem(commands.Cog):
                 )
                 return
             async with ctx.bot.db[0].acquire() as pconn:
-                await pconn.execute(
-                    "UPDATE users SET redeems = redeems - $1 where u_id = $2",
-                    price,
-                    ctx.author.id,
-                )
+                if not await ctx.bot.commondb.update_user(
+                    ctx.author.id, redeems=-price, pconn=pconn
+                ):
+                    await ctx.send(
+                        f"You cannot afford the {price} redeem it would cost to purchase that pack!"
+                    )
+                    return
                 await pconn.execute("UPDATE achievements SET redeems_used = redeems_used + $2 WHERE u_id = $1", ctx.author.id, price)
             daycarelimit = pack["daycare-limit"]
             pack.pop("price", None)
             pack.pop("daycare-limit", None)
-            async with ctx.bot.db[0].acquire() as pconn:
-                current_inv = await pconn.fetchval(
-                    "SELECT inventory::json FROM users WHERE u_id = $1", ctx.author.id
-                )
-                current_items = await pconn.fetchval(
-                    "SELECT items::json FROM users WHERE u_id = $1", ctx.author.id
-                )
-            # current_inv.pop('coin-case', None) if 'coin-case' in current_inv else None
-            extra_creds = 0
+            inventory_deltas = {}
+            item_deltas = {}
+            bike = False
             for item in pack:
-                try:
-                    if item.endswith("-z"):
-                        current_items[item] = current_items.get(item, 0) + 1
-                        async with ctx.bot.db[0].acquire() as pconn:
-                            await pconn.execute(
-                                "UPDATE users SET items = $1::json where u_id = $2",
-                                current_items,
-                                ctx.author.id,
-                            )
-                    elif item == "bike":
-                        async with ctx.bot.db[0].acquire() as pconn:
-                            await pconn.execute(
-                                "UPDATE users SET bike = $2 where u_id = $1",
-                                ctx.author.id,
-                                True,
-                            )
-                    else:
-                        extra = max(
-                            0,
-                            (current_inv.get(item, 0) + pack[item])
-                            - (multiplier_max.get(item, 9999999999999999999999999)),
-                        )
-                        extra_creds += extra * self.CREDITS_PER_MULTI
-                        current_inv[item] = min(
-                            current_inv.get(item, 0) + pack[item],
-                            multiplier_max.get(item, 9999999999999999999999999),
-                        )
-                except:
-                    continue
+                if item.endswith("-z"):
+                    item_deltas[item] = 1
+                elif item == "bike":
+                    bike = True
+                else:
+                    inventory_deltas[item] = pack[item]
             async with ctx.bot.db[0].acquire() as pconn:
-                try:
+                async with pconn.transaction():
+                    # Multipliers past their cap are paid out as credits instead
+                    left_over = await ctx.bot.commondb.add_items_clamped(
+                        ctx.author.id, inventory_deltas, caps=multiplier_max, pconn=pconn
+                    )
+                    extra_creds = sum(left_over.values()) * self.CREDITS_PER_MULTI
+                    await ctx.bot.commondb.update_user(
+                        ctx.author.id,
+                        items=item_deltas,
+                        daycarelimit=daycarelimit,
+                        mewcoins=extra_creds,
+                        pconn=pconn,
+                    )
+                if bike:
                     await pconn.execute(
-                        "UPDATE users SET inventory = $1::json, daycarelimit = daycarelimit + $3, mewcoins = mewcoins + $4 WHERE u_id = $2",
-                        current_inv,
+                        "UPDATE users SET bike = $2 where u_id = $1",
                         ctx.author.id,
-                        daycarelimit,
-                        extra_creds,
+                        True,
                     )
-                except Exception as e:
-                    raise e
-                    # await ctx.send(
-                    #     "You do not have enough Redeems or you have stacked up your perks to the limit!"
-                    # )
-                    # return
 
             e = discord.Embed(title=f"{perk.capitalize()} Pack", color=0xFFB6C1)
             e.description = "You have Successfully purchased these: "
@@ -491,20 +469,12 @@ class Redeem(commands.Cog):
                 await ctx.send("50,000 Has been credited to your balance!")
         elif val == "honey":
             async with ctx.bot.db[0].acquire() as pconn:
-                inv = await pconn.fetchval(
-                    "SELECT inventory::json FROM users WHERE u_id = $1", ctx.author.id
-                )
-                inv["honey"] = inv.get("honey", 0) + 1
-                try:
-                    await pconn.execute(
-                        "UPDATE users SET inventory = $1::json, redeems = redeems - 5 WHERE u_id = $2",
-                        inv,
-                        ctx.author.id,
-                    )
-                    await pconn.execute("UPDATE achievements SET redeems_used = redeems_used + 5 WHERE u_id = $1", ctx.author.id)
-                except:
+                if not await ctx.bot.commondb.update_user(
+                    ctx.author.id, inventory={"honey": 1}, redeems=-5, pconn=pconn
+                ):
                     await ctx.send("You do not have enough redeems")
                     return
+                await pconn.execute("UPDATE achievements SET redeems_used = redeems_used + 5 WHERE u_id = $1", ctx.author.id)
                 await ctx.send("You redeemed 1x honey!")
         elif val.startswith("ev"):
             async with ctx.bot.db[0].acquire() as pconn:
@@ -522,53 +492,36 @@ class Redeem(commands.Cog):
                 )
         elif val.lower().endswith("capsules") or val.lower().endswith("capsule"):
             async with ctx.bot.db[0].acquire() as pconn:
-                inv = await pconn.fetchval(
-                    "SELECT inventory::json FROM users WHERE u_id = $1", ctx.author.id
-                )
-                inv["nature-capsules"] = inv.get("nature-capsules", 0) + 5
-                try:
-                    await pconn.execute(
-                        "UPDATE users SET redeems = redeems - 1, inventory = $1::json WHERE u_id = $2",
-                        inv,
-                        ctx.author.id,
-                    )
-                    await pconn.execute("UPDATE achievements SET redeems_used = redeems_used + 1 WHERE u_id = $1", ctx.author.id)
-                except:
+                if not await ctx.bot.commondb.update_user(
+                    ctx.author.id, inventory={"nature-capsules": 5}, redeems=-1, pconn=pconn
+                ):
                     await ctx.send("You do not have enough redeems")
                     return
+                await pconn.execute("UPDATE achievements SET redeems_used = redeems_used + 1 WHERE u_id = $1", ctx.author.id)
                 await ctx.send("You have Successfully purchased 5 Nature Capsules")
         elif val.capitalize().replace(" ", "-") in totalList:
             pokemon = val.capitalize().replace(" ", "-")
             threshold = 4000
-            async with ctx.bot.db[0].acquire() as pconn:
-                inventory, items, redeems = await pconn.fetchrow(
-                    "SELECT inventory::json, items::json, redeems FROM users WHERE u_id = $1",
-                    ctx.author.id,
-                )
+            counts = await ctx.bot.commondb.item_counts(ctx.author.id, ["shiny-multiplier"])
 
             threshold = round(
-                threshold - threshold * (inventory["shiny-multiplier"] / 100)
+                threshold - threshold * (counts["shiny-multiplier"] / 100)
             )
             shiny = random.choice([False for _ in range(threshold)] + [True])
 
-            if redeems < 1:
-                await ctx.send("You do not have enough redeems")
-                return
             item = None
+            if (
+                max(1, int(random.random() * 30))
+                == max(1, int(random.random() * 30))
+                and pokemon.lower() in REDEEM_DROPS
+            ):
+                item = REDEEM_DROPS[pokemon.lower()]
             async with ctx.bot.db[0].acquire() as pconn:
-                if (
-                    max(1, int(random.random() * 30))
-                    == max(1, int(random.random() * 30))
-                    and pokemon.lower() in REDEEM_DROPS
+                if not await ctx.bot.commondb.update_user(
+                    ctx.author.id, items={item: 1} if item else None, redeems=-1, pconn=pconn
                 ):
-                    item = REDEEM_DROPS[pokemon.lower()]
-                    items[item] = items.get(item, 0) + 1
-                await pconn.execute(
-                    "UPDATE users SET redeems = redeems - 1, items = $1::json, inventory = $2::json WHERE u_id = $3",
-                    items,
-                    inventory,
-                    ctx.author.id,
-                )
+                    await ctx.send("You do not have enough redeems")
+                    return
                 await pconn.execute("UPDATE achievements SET redeems_used = redeems_used + 1 WHERE u_id = $1", ctx.author.id)
             pokedata = await ctx.bot.commondb.create_poke(
                 ctx.bot, ctx.author.id, pokemon, shiny=shiny
@@ -587,18 +540,7 @@ class Redeem(commands.Cog):
             )
 
             return
-        #
-        user = await ctx.bot.mongo_find(
-            "users",
-            {"user": ctx.author.id},
-            default={"user": ctx.author.id, "progress": {}},
-        )
-        progress = user["progress"]
-        progress["redeem"] = progress.get("redeem", 0) + 1
-        await ctx.bot.mongo_update(
-            "users", {"user": ctx.author.id}, {"progress": progress}
-        )
-        #
+        ctx.bot.mission_progress.increment(ctx.author.id, "redeem")
 
     @redeem.command(with_app_command=True)  # This has to be registered
     @tradelock
@@ -633,28 +575,32 @@ class Redeem(commands.Cog):
             return
         pokemon = pokemon.capitalize().replace(" ", "-")
         threshold = 4000
-        async with ctx.bot.db[0].acquire() as pconn:
-            details = await pconn.fetchrow(
-                "SELECT inventory::json, items::json, redeems FROM users WHERE u_id = $1",
-                ctx.author.id,
-            )
-        if details is None:
+        counts = await ctx.bot.commondb.item_counts(ctx.author.id, ["shiny-multiplier"])
+        if counts is None:
             await ctx.send("You have not started!\nStart with `/start` first.")
             return
-        inventory, items, redeems = details
-        threshold = round(threshold - threshold * (inventory["shiny-multiplier"] / 100))   
-        if redeems < amount:
-            await ctx.send("You do not have enough redeems")
+        threshold = round(threshold - threshold * (counts["shiny-multiplier"] / 100))
+        if amount < 1:
+            await ctx.send("You need to redeem at least one!")
             return
         if amount > 1000:
             await ctx.send("For performance reasons, redeem multiple is capped at 1000 redeems at a time. Please adjust your command accordingly and send again.")
             return
         else:
+            # The redeems are taken before anything is created, so two of these at once can't overspend
+            async with ctx.bot.db[0].acquire() as pconn:
+                if not await ctx.bot.commondb.update_user(
+                    ctx.author.id, redeems=-amount, pconn=pconn
+                ):
+                    await ctx.send("You do not have enough redeems")
+                    return
+                await pconn.execute("UPDATE achievements SET redeems_used = redeems_used + $2 WHERE u_id = $1", ctx.author.id, amount)
             await ctx.bot.get_partial_messageable(1004755418511310878).send(
                 f"``User:`` {ctx.author} | ``ID:`` {ctx.author.id}\nHas redeemed {amount} {pokemon} with redeemmultiple ON <t:{int((time.time()))}:F> about <t:{int((time.time()))}:R\n----------------------------------"
             )
             await ctx.send(f"Redeeming {amount} {pokemon}...")
             iters = 0
+            items = {}
             for i in range(amount):
                 item = None
                 shiny = not random.randrange(threshold)
@@ -668,28 +614,13 @@ class Redeem(commands.Cog):
                 if item:
                     await ctx.send(f"Dropped - {iters}x {item}")
             async with ctx.bot.db[0].acquire() as pconn:
-                await pconn.execute(
-                    "UPDATE users SET redeems = redeems - $1, items = $2::json, inventory = $3::json WHERE u_id = $4",
-                    amount,
-                    items,
-                    inventory,
-                    ctx.author.id,
+                await ctx.bot.commondb.add_items(
+                    ctx.author.id, items, column="items", pconn=pconn
                 )
-                await pconn.execute("UPDATE achievements SET redeems_used = redeems_used + $2 WHERE u_id = $1", ctx.author.id, amount)
                 #await ctx.bot.get_partial_messageable(1004755418511310878).send(
                 #   f"``User:`` {ctx.author} | ``ID:`` {ctx.author.id}\nHas redeemed a {pokedata.emoji}{pokemon} (`{pokedata.id}`) with redeem-multiple command.\n----------------------------------"
                 #)
-                #
-                user = await ctx.bot.mongo_find(
-                    "users",
-                    {"user": ctx.author.id},
-                    default={"user": ctx.author.id, "progress": {}},
-                )
-                progress = user["progress"]
-                progress["redeem"] = progress.get("redeem", 0) + amount
-                await ctx.bot.mongo_update(
-                    "users", {"user": ctx.author.id}, {"progress": progress}
-                )
+                ctx.bot.mission_progress.increment(ctx.author.id, "redeem", amount)
                 
             await ctx.send(f"Successfully redeemed {amount} {pokemon}!")
 
@@ -741,28 +672,12 @@ class Redeem(commands.Cog):
                     "Silver Patreon",
                     "MewBot Patreon",
                 ):
-                    inventory = await pconn.fetchval(
-                        "SELECT inventory::json FROM users WHERE u_id = $1",
-                        ctx.author.id,
+                    await ctx.bot.commondb.add_items(
+                        ctx.author.id, {"legend chest": 1}, pconn=pconn
                     )
 
-                    inventory["legend chest"] = inventory.get("legend chest", 0) + 1
-                    await pconn.execute(
-                        "UPDATE users SET inventory = $1::json where u_id = $2",
-                        inventory,
-                        ctx.author.id,
-                    )
-
-                inventory = await pconn.fetchval(
-                    "SELECT inventory::json FROM users WHERE u_id = $1", ctx.author.id
-                )
-
-                inventory["mythic chest"] = inventory.get("mythic chest", 0) + 1
-
-                await pconn.execute(
-                    "UPDATE users SET inventory = $1::json where u_id = $2",
-                    inventory,
-                    ctx.author.id,
+                await ctx.bot.commondb.add_items(
+                    ctx.author.id, {"mythic chest": 1}, pconn=pconn
                 )
 
                 await pconn.execute(
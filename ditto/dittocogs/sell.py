@@ -86,10 +86,7 @@ class Sell(commands.Cog):
         """Sell eggs from your daycare"""
         async with ctx.bot.db[0].acquire() as pconn:
             if egg_num in {"newest", "new", "latest"}:
-                egg_id = await pconn.fetchval(
-                    "SELECT pokes[array_upper(pokes, 1)] FROM users WHERE u_id = $1",
-                    ctx.author.id,
-                )
+                egg_id = await ctx.bot.commondb.latest_poke(ctx.author.id, pconn=pconn)
             else:
                 try:
                     egg_num = int(egg_num)
@@ -100,11 +97,7 @@ class Sell(commands.Cog):
                     await ctx.send("That isn't a valid pokemon number.")
                     return
                 # Check for num entered
-                egg_id = await pconn.fetchval(
-                    "SELECT pokes[$1] FROM users WHERE u_id = $2",
-                    egg_num,
-                    ctx.author.id,
-                )
+                egg_id = await ctx.bot.commondb.poke_at(ctx.author.id, egg_num, pconn=pconn)
             if egg_id is None:
                 await ctx.send("You do not have that many pokemon.")
                 return
@@ -23,11 +23,10 @@ class Settings(commands.Cog):
         self.bot = bot
 
     async def get_current(self, ctx):
-        current_setting = await ctx.bot.mongo_find("guilds", {"id": ctx.guild.id})
+        current_setting = ctx.bot.guild_settings.get(ctx.guild.id)
         if not current_setting:
             current_setting = default_factory()
-            current_setting["id"] = ctx.guild.id
-            await ctx.bot.mongo_update("guilds", {"id": ctx.guild.id}, current_setting)
+            await ctx.bot.guild_settings.update(ctx.guild.id, current_setting)
         return current_setting
 
     # @commands.hybrid_command()
@@ -44,9 +43,8 @@ class Settings(commands.Cog):
         if not val:
             await ctx.send("That isF not a valid prefix!")
             return
-        await ctx.bot.mongo_update("guilds", {"id": ctx.guild.id}, {"prefix": val})
+        await ctx.bot.guild_settings.update(ctx.guild.id, {"prefix": val})
         await ctx.send(f"Prefix has been set to {val}")
-        await ctx.bot.load_guild_settings()
 
     @commands.hybrid_group(name="auto")
     async def auto_cmds(self, ctx):
@@ -65,10 +63,8 @@ class Settings(commands.Cog):
             )
             return
         current_setting = await self.get_current(ctx)
-        await ctx.bot.mongo_update(
-            "guilds",
-            {"id": ctx.guild.id},
-            {"delete_spawns": not current_setting["delete_spawns"]},
+        await ctx.bot.guild_settings.update(
+            ctx.guild.id, {"delete_spawns": not current_setting["delete_spawns"]}
         )
         await ctx.send(
             f"Spawns will {'not be deleted' if current_setting['delete_spawns'] else 'be deleted'} in all channels"
@@ -87,10 +83,8 @@ class Settings(commands.Cog):
             )
             return
         current_setting = await self.get_current(ctx)
-        await ctx.bot.mongo_update(
-            "guilds",
-            {"id": ctx.guild.id},
-            {"pin_spawns": not current_setting["pin_spawns"]},
+        await ctx.bot.guild_settings.update(
+            ctx.guild.id, {"pin_spawns": not current_setting["pin_spawns"]}
         )
         await ctx.send(
             f"Rare Spawns will {'not be pinned' if current_setting['pin_spawns'] else 'be pinned'} in all channels"
@@ -112,11 +106,7 @@ class Settings(commands.Cog):
         current_setting = await self.get_current(ctx)
         channels = set(current_setting["redirects"])
         channels.add(channel.id)
-        await ctx.bot.mongo_update(
-            "guilds",
-            {"id": ctx.guild.id},
-            {"redirects": list(channels)},
-        )
+        await ctx.bot.guild_settings.update(ctx.guild.id, {"redirects": list(channels)})
         await ctx.send(f"Successfully added {channel} to the spawn redirects list.")
 
     @redirect.command()
@@ -136,11 +126,7 @@ class Settings(commands.Cog):
             )
             return
         channels.remove(channel.id)
-        await ctx.bot.mongo_update(
-            "guilds",
-            {"id": ctx.guild.id},
-            {"redirects": list(channels)},
-        )
+        await ctx.bot.guild_settings.update(ctx.guild.id, {"redirects": list(channels)})
         await ctx.send(f"Successfully removed {channel} from the spawn redirects list.")
 
     @redirect.command()
@@ -151,7 +137,7 @@ class Settings(commands.Cog):
             )
             return
         await self.get_current(ctx)
-        await ctx.bot.mongo_update("guilds", {"id": ctx.guild.id}, {"redirects": []})
+        await ctx.bot.guild_settings.update(ctx.guild.id, {"redirects": []})
         await ctx.send("All spawn redirects were removed.")
 
     @commands.hybrid_group(name="commands")
@@ -173,13 +159,11 @@ class Settings(commands.Cog):
             await ctx.send(f"Commands are already disabled in {channel}.")
             return
         disabled.add(channel.id)
-        await ctx.bot.mongo_update(
-            "guilds",
-            {"id": ctx.guild.id},
-            {"disabled_channels": list(disabled)},
+        await ctx.bot.guild_settings.update(
+            ctx.guild.id, {"disabled_channels": list(disabled)}
         )
+        await ctx.bot.bans.add("channels", channel.id)
         await ctx.send(f"Successfully disabled commands in {channel}.")
-        await ctx.bot.load_bans()
 
     @command.command()
     async def enable(self, ctx, channel: discord.TextChannel = None):
@@ -196,13 +180,11 @@ class Settings(commands.Cog):
             return
         disabled = set(current_setting["disabled_channels"])
         disabled.remove(channel.id)
-        await ctx.bot.mongo_update(
-            "guilds",
-            {"id": ctx.guild.id},
-            {"disabled_channels": list(disabled)},
+        await ctx.bot.guild_settings.update(
+            ctx.guild.id, {"disabled_channels": list(disabled)}
         )
+        await ctx.bot.bans.remove("channels", channel.id)
         await ctx.send(f"Successfully enabled commands in {channel}.")
-        await ctx.bot.load_bans()
 
     @commands.hybrid_group()
     async def spawns(self, ctx):
@@ -216,7 +198,7 @@ class Settings(commands.Cog):
             )
             return
 
-        guild = await self.bot.mongo_find("guilds", {"id": ctx.guild.id})
+        guild = self.bot.guild_settings.get(ctx.guild.id)
 
         if not guild:
             await ctx.send(
@@ -225,14 +207,10 @@ class Settings(commands.Cog):
             return
 
         if not guild.get("modal_view"):
-            await self.bot.mongo_update(
-                "guilds", {"id": ctx.guild.id}, {"modal_view": True}
-            )
+            await self.bot.guild_settings.update(ctx.guild.id, {"modal_view": True})
             await ctx.send("Modal view is now enabled for this server.")
         else:
-            await self.bot.mongo_update(
-                "guilds", {"id": ctx.guild.id}, {"modal_view": False}
-            )
+            await self.bot.guild_settings.update(ctx.guild.id, {"modal_view": False})
             await ctx.send("Modal view is now disabled for this server.")
 
         return
@@ -252,12 +230,9 @@ class Settings(commands.Cog):
             await ctx.send(f"Spawns are already disabled in {channel}.")
             return
         disabled.add(channel.id)
-        await ctx.bot.mongo_update(
-            "guilds",
-            {"id": ctx.guild.id},
-            {"disabled_spawn_channels": list(disabled)},
+        await ctx.bot.guild_settings.update(
+            ctx.guild.id, {"disabled_spawn_channels": list(disabled)}
         )
-        await ctx.bot.load_bans()
         await ctx.send(f"Successfully disabled spawns in {channel}.")
 
     @spawns.command()
@@ -275,12 +250,9 @@ class Settings(commands.Cog):
             return
         disabled = set(current_setting["disabled_spawn_channels"])
         disabled.remove(channel.id)
-        await ctx.bot.mongo_update(
-            "guilds",
-            {"id": ctx.guild.id},
-            {"disabled_spawn_channels": list(disabled)},
+        await ctx.bot.guild_settings.update(
+            ctx.guild.id, {"disabled_spawn_channels": list(disabled)}
         )
-        await ctx.bot.load_bans()
         await ctx.send(f"Successfully enabled spawns in {channel}.")
 
     @spawns.command()
@@ -292,10 +264,8 @@ class Settings(commands.Cog):
             )
             return
         current_setting = await self.get_current(ctx)
-        await ctx.bot.mongo_update(
-            "guilds",
-            {"id": ctx.guild.id},
-            {"small_images": not current_setting["small_images"]},
+        await ctx.bot.guild_settings.update(
+            ctx.guild.id, {"small_images": not current_setting["small_images"]}
         )
         await ctx.send(
             f"Spawn messages will now be {'normal sized' if current_setting['small_images'] else 'small'} in this server."
@@ -353,11 +323,7 @@ class Settings(commands.Cog):
             return
         current_setting = await self.get_current(ctx)
         state = not current_setting["silence_levels"]
-        await ctx.bot.mongo_update(
-            "guilds",
-            {"id": ctx.guild.id},
-            {"silence_levels": state},
-        )
+        await ctx.bot.guild_settings.update(ctx.guild.id, {"silence_levels": state})
         state = "off" if state else "on"
         await ctx.send(
             f"Successfully toggled {state} level up messages in this server!"
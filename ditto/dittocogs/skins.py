@@ -4,6 +4,7 @@ import time
 
 import discord
 from discord.ext import commands
+from dittocore.dex import TYPE_IDS
 from utils.checks import tradelock
 from utils.misc import (
     ConfirmView,
@@ -90,15 +91,14 @@ class Skins(commands.Cog):
     async def skin_apply(self, ctx, poke: int, skin: str) -> None:
         """Apply a skin to a pokemon."""
         async with ctx.bot.db[0].acquire() as pconn:
-            data = await pconn.fetchrow(
-                "SELECT skins::json, pokes[$1] FROM users WHERE u_id = $2",
-                poke,
+            skins = await pconn.fetchval(
+                "SELECT skins::json FROM users WHERE u_id = $1",
                 ctx.author.id,
             )
-            if data is None:
+            if skins is None:
                 await ctx.send("You have not started!\nStart with `/start` first.")
                 return
-            skins, pid = data
+            pid = await ctx.bot.commondb.poke_at(ctx.author.id, poke, pconn=pconn)
             data = await pconn.fetchrow(
                 "SELECT pokname, skin, shiny, radiant FROM pokes WHERE id = $1", pid
             )
@@ -131,12 +131,11 @@ class Skins(commands.Cog):
                 await ctx.send("Cancelling.")
                 return
 
-            data = await pconn.fetchrow(
-                "SELECT skins::json, pokes[$1] FROM users WHERE u_id = $2",
-                poke,
+            new_skins = await pconn.fetchval(
+                "SELECT skins::json FROM users WHERE u_id = $1",
                 ctx.author.id,
             )
-            new_skins, new_pid = data
+            new_pid = await ctx.bot.commondb.poke_at(ctx.author.id, poke, pconn=pconn)
             if skins != new_skins or pid != new_pid:
                 await ctx.send("Something got desynced. Please try again.")
                 return
@@ -383,26 +382,26 @@ class RaidSpawn(discord.ui.View):
         self.channel = channel
         self.poke = poke
         self.skin = skin
-        self.registered = []
+        self.registered = set()
         self.attacked = {}
         self.state = "registering"
         self.message = None
 
     async def interaction_check(self, interaction):
         if self.state == "registering":
-            if interaction.user in self.registered:
+            if interaction.user.id in self.registered:
                 await interaction.response.send_message(
                     content="You have already joined!", ephemeral=True
                 )
                 return False
             return True
         elif self.state == "attacking":
-            if interaction.user in self.attacked:
+            if interaction.user.id in self.attacked:
                 await interaction.response.send_message(
                     content="You have already attacked!", ephemeral=True
                 )
                 return False
-            if interaction.user not in self.registered:
+            if interaction.user.id not in self.registered:
                 await interaction.response.send_message(
                     content="You didn't join the battle! You can't attack this one.",
                     ephemeral=True,
@@ -419,7 +418,7 @@ class RaidSpawn(discord.ui.View):
         pokeurl = "https://skylarr1227.github.io/images/" + await get_battle_file_name(
             self.poke, self.bot, skin=self.skin
         )
-        guild = await self.bot.mongo_find("guilds", {"id": self.channel.guild.id})
+        guild = self.bot.guild_settings.get(self.channel.guild.id)
         if guild is None:
             small_images = False
         else:
@@ -451,64 +450,28 @@ class RaidSpawn(discord.ui.View):
             await self.message.edit(embed=embed, view=None)
             return
 
-        # Calculate valid moves of each effectiveness tier
-        form_info = await self.bot.db[1].forms.find_one(
-            {"identifier": self.poke.lower()}
-        )
-        type_ids = (
-            await self.bot.db[1].ptypes.find_one({"id": form_info["pokemon_id"]})
-        )["types"]
-        type_effectiveness = {}
-        for te in await self.bot.db[1].type_effectiveness.find({}).to_list(None):
-            type_effectiveness[(te["damage_type_id"], te["target_type_id"])] = te[
-                "damage_factor"
-            ]
-        super_types = []
-        normal_types = []
-        un_types = []
-        for attacker_type in range(1, 19):
-            effectiveness = 1
-            for defender_type in type_ids:
-                effectiveness *= (
-                    type_effectiveness[(attacker_type, defender_type)] / 100
-                )
+        # Sort the damaging moves of every type into tiers by how well they hit the raid poke
+        form = self.bot.dex.form(self.poke)
+        type_ids = self.bot.dex.types_of(form.pokemon_id)
+        super_moves = []
+        normal_moves = []
+        un_moves = []
+        for attacker_type, effectiveness in zip(
+            TYPE_IDS, self.bot.dex.effectiveness_against(*type_ids)
+        ):
             if effectiveness > 1:
-                super_types.append(attacker_type)
+                tier = super_moves
             elif effectiveness < 1:
-                un_types.append(attacker_type)
+                tier = un_moves
             else:
-                normal_types.append(attacker_type)
-        super_raw = (
-            await self.bot.db[1]
-            .moves.find(
-                {"type_id": {"$in": super_types}, "damage_class_id": {"$ne": 1}}
-            )
-            .to_list(None)
-        )
-        super_moves = [
-            x["identifier"].capitalize().replace("-", " ") for x in super_raw
-        ]
-        normal_raw = (
-            await self.bot.db[1]
-            .moves.find(
-                {"type_id": {"$in": normal_types}, "damage_class_id": {"$ne": 1}}
-            )
-            .to_list(None)
-        )
-        normal_moves = [
-            x["identifier"].capitalize().replace("-", " ") for x in normal_raw
-        ]
-        un_raw = (
-            await self.bot.db[1]
-            .moves.find({"type_id": {"$in": un_types}, "damage_class_id": {"$ne": 1}})
-            .to_list(None)
-        )
-        un_moves = [x["identifier"].capitalize().replace("-", " ") for x in un_raw]
+                tier = normal_moves
+            tier.extend(self.bot.dex.damaging_moves_of_type(attacker_type))
 
         # Add the moves to the view
-        moves = []
-        moves.append(RaidMove(random.choice(super_moves), 2))
-        moves.append(RaidMove(random.choice(normal_moves), 1))
+        moves = [
+            RaidMove(random.choice(super_moves), 2),
+            RaidMove(random.choice(normal_moves), 1),
+        ]
         for move in random.sample(un_moves, k=2):
             moves.append(RaidMove(move, 0))
         random.shuffle(moves)
@@ -552,12 +515,13 @@ class RaidSpawn(discord.ui.View):
             return
 
         async with self.bot.db[0].acquire() as pconn:
-            for attacker, damage in self.attacked.items():
-                await pconn.execute(
-                    "UPDATE users SET skin_tokens = skin_tokens + $1 WHERE u_id = $2",
-                    damage * 2,
-                    attacker.id,
-                )
+            await pconn.execute(
+                "UPDATE users SET skin_tokens = skin_tokens + r.tokens "
+                "FROM unnest($1::bigint[], $2::int[]) AS r(u_id, tokens) "
+                "WHERE users.u_id = r.u_id",
+                list(self.attacked),
+                [damage * 2 for damage in self.attacked.values()],
+            )
         embed = discord.Embed(
             title="The Alpha Pokémon was defeated! Attackers have been awarded skin tokens.",
             color=color,
@@ -576,7 +540,7 @@ class RaidJoin(discord.ui.Button):
         super().__init__(label="Join", style=discord.ButtonStyle.green)
 
     async def callback(self, interaction):
-        self.view.registered.append(interaction.user)
+        self.view.registered.add(interaction.user.id)
         await interaction.response.send_message(
             content="You have joined the battle!", ephemeral=True
         )
@@ -586,11 +550,11 @@ class RaidMove(discord.ui.Button):
     """A move button for attacking an alpha pokemon raid."""
 
     def __init__(self, move, damage):
+        self.move = move.identifier.capitalize().replace("-", " ")
         super().__init__(
-            label=move,
+            label=self.move,
             style=discord.ButtonStyle.gray,
         )
-        self.move = move
         self.damage = damage
         if damage == 2:
             self.effective = (
@@ -602,7 +566,7 @@ class RaidMove(discord.ui.Button):
             self.effective = "It shrugged off your attack..."
 
     async def callback(self, interaction):
-        self.view.attacked[interaction.user] = self.damage
+        self.view.attacked[interaction.user.id] = self.damage
         await interaction.response.send_message(
             content=f"You attack the alpha pokemon with {self.move}... {self.effective}",
             ephemeral=True,
@@ -1,17 +1,18 @@
 import asyncio
 import contextlib
 import random
-import time
-from collections import defaultdict
 
 import discord
 from discord.ext import commands
+from dittocore.rate_limits import fixed_window
 from utils.misc import get_file_name
 
-from dittocogs.fishing import is_key
 from dittocogs.json_files import *
 from dittocogs.json_files import make_embed
 from dittocogs.pokemon_list import *
+from pokemon_utils.catch_dispatcher import CatchDispatcher, catch_options, normalise
+from pokemon_utils.catch_rewards import CatchRewardPipeline
+from pokemon_utils.spawn_table import SpawnTable
 
 
 def despawn_embed(e, status):
@@ -27,18 +28,18 @@ class SpawnView(discord.ui.View):
         delspawn: bool,
         pinspawn: bool,
         spawn_channel: discord.TextChannel,
-        legendchance: int,
-        ubchance: int,
+        rare: bool,
         shiny: bool,
+        catch_rewards: CatchRewardPipeline,
     ):
         self.modal = SpawnModal(
             pokemon,
             delspawn,
             pinspawn,
             spawn_channel,
-            legendchance,
-            ubchance,
+            rare,
             shiny,
+            catch_rewards,
             self,
         )
         super().__init__(timeout=360)
@@ -65,9 +66,9 @@ class SpawnModal(discord.ui.Modal, title="Catch!"):
         delspawn: bool,
         pinspawn: bool,
         spawn_channel: discord.TextChannel,
-        legendchance: int,
-        ubchance: int,
+        rare: bool,
         shiny: bool,
+        catch_rewards: CatchRewardPipeline,
         view: discord.ui.View,
     ):
         self.pokemon = pokemon
@@ -75,9 +76,9 @@ class SpawnModal(discord.ui.Modal, title="Catch!"):
         self.delspawn = delspawn
         self.pinspawn = pinspawn
         self.spawn_channel = spawn_channel
-        self.legendchance = legendchance
-        self.ubchance = ubchance
+        self.rare = rare
         self.shiny = shiny
+        self.catch_rewards = catch_rewards
         self.view = view
         super().__init__()
 
@@ -98,139 +99,41 @@ class SpawnModal(discord.ui.Modal, title="Catch!"):
                 "Someone's already guessed this pokemon!", ephemeral=True
             )
 
-        # Add additional valid names to support variations in naming
-        catch_options = [pokemon]
-        if pokemon == "mr-mime":
-            catch_options.append("mr.-mime")
-        elif pokemon == "mime-jr":
-            catch_options.append("mime-jr.")
-        elif pokemon.endswith("-alola"):
-            catch_options.append(f"alola-{pokemon[:-6]}")
-            catch_options.append(f"alolan-{pokemon[:-6]}")
-        elif pokemon.endswith("-galar"):
-            catch_options.append(f"galar-{pokemon[:-6]}")
-            catch_options.append(f"galarian-{pokemon[:-6]}")
-        elif pokemon.endswith("-hisui"):
-            catch_options.append(f"hisui-{pokemon[:-6]}")
-            catch_options.append(f"hisuian-{pokemon[:-6]}")
-
-        if str(self.name).lower().replace(
-            " ", "-"
-        ) not in catch_options or interaction.client.botbanned(interaction.user.id):
+        # Additional valid names support variations in naming
+        if normalise(str(self.name)) not in catch_options(
+            pokemon
+        ) or interaction.client.botbanned(interaction.user.id):
             return await interaction.followup.send(
                 "Incorrect name! Try again :(", ephemeral=True
             )
 
         # Someone caught the poke, create it
-        async with interaction.client.db[0].acquire() as pconn:
-            inventory = await pconn.fetchval(
-                "SELECT inventory::json from users WHERE u_id = $1",
-                interaction.user.id,
-            )
-            if inventory is None:
-                return await interaction.followup.send(
-                    "You have not started!\nStart with `/start` first!", ephemeral=True
-                )
-
         self.guessed = True
-
-        pokemon = pokemon.capitalize()
-
-        ivmulti = inventory.get("iv-multiplier", 0)
-        # 0%-10% chance from 0-50 iv multis
-        boosted = random.randrange(500) < ivmulti
-        plevel = random.randint(1, 60)
-        pokedata = await interaction.client.commondb.create_poke(
-            interaction.client,
+        rewards = await self.catch_rewards.catch(
             interaction.user.id,
             pokemon,
             shiny=self.shiny,
-            boosted=boosted,
-            level=plevel,
+            premium=interaction.client.premium_server(interaction.message.guild.id),
         )
-        ivpercent = round((pokedata.iv_sum / 186) * 100, 2)
-        credits = None
-
-        async with interaction.client.db[0].acquire() as pconn:
-            items = await pconn.fetchval(
-                "SELECT items::json FROM users WHERE u_id = $1",
-                interaction.message.author.id,
-            )
-
-            if not items:
-                items = {}
-            #
-            user = await interaction.client.mongo_find(
-                "users",
-                {"user": interaction.user.id},
-                default={"user": interaction.user.id, "progress": {}},
-            )
-            progress = user["progress"]
-            progress["catch-count"] = progress.get("catch-count", 0) + 1
-            await interaction.client.mongo_update(
-                "users", {"user": interaction.user.id}, {"progress": progress}
+        if rewards is None:
+            self.guessed = False
+            return await interaction.followup.send(
+                "You have not started!\nStart with `/start` first!", ephemeral=True
             )
-            #
-            berry_chance = max(1, int(random.random() * 350))
-            expensive_chance = max(1, int(random.random() * 25))
-            if berry_chance in range(1, 8):
-                cheaps = [
-                    t["item"]
-                    for t in SHOP
-                    if t["price"] <= 8000 and not is_key(t["item"])
-                ]
-                expensives = [
-                    t["item"]
-                    for t in SHOP
-                    if t["price"] in range(8000, 20000) and not is_key(t["item"])
-                ]
-                if berry_chance == 1:
-                    berry = random.choice(cheaps)
-                elif berry_chance == expensive_chance:
-                    berry = random.choice(expensives)
-                else:
-                    berry = random.choice(list(berryList))
-                # items = user_info["items"]
-                items[berry] = items.get(berry, 0) + 1
-                await pconn.execute(
-                    "UPDATE users SET items = $1::json WHERE u_id = $2",
-                    items,
-                    interaction.user.id,
-                )
 
-            else:
-                berry_chance = None
-            #
-            chest_chance = not random.randint(0, 200)
-            if chest_chance:
-                inventory = await pconn.fetchval(
-                    "SELECT inventory::json FROM users WHERE u_id = $1",
-                    interaction.user.id,
-                )
-                chest = "common chest"
-                inventory[chest] = inventory.get(chest, 0) + 1
-                await pconn.execute(
-                    "UPDATE users SET inventory = $1::json where u_id = $2",
-                    inventory,
-                    interaction.user.id,
-                )
-            if interaction.client.premium_server(interaction.message.guild.id):
-                credits = random.randint(100, 250)
-                await pconn.execute(
-                    "UPDATE users SET mewcoins = mewcoins + $1 where u_id = $2",
-                    credits,
-                    interaction.user.id,
-                )
+        pokemon = pokemon.capitalize()
+        pokedata = rewards.poke
+        ivpercent = round((pokedata.iv_sum / 186) * 100, 2)
         author = interaction.user.mention
         teext = f"Congratulations {author}, you have caught a {pokedata.emoji}{pokemon} ({ivpercent}% iv)!\n"
-        if boosted:
+        if rewards.boosted:
             teext += "It was boosted by your IV multiplier!\n"
-        if berry_chance:
-            teext += f"It also dropped a {berry}!\n"
-        if chest_chance:
-            teext += f"It also dropped a {chest}!\n"
-        if credits:
-            teext += f"You also found {credits} credits!\n"
+        if rewards.berry:
+            teext += f"It also dropped a {rewards.berry}!\n"
+        if rewards.chest:
+            teext += f"It also dropped a {rewards.chest}!\n"
+        if rewards.credits:
+            teext += f"You also found {rewards.credits} credits!\n"
 
         await interaction.followup.send(embed=(make_embed(title="", description=teext)))
         with contextlib.suppress(discord.HTTPException):
@@ -245,7 +148,7 @@ class SpawnModal(discord.ui.Modal, title="Catch!"):
                     and self.spawn_channel.permissions_for(
                         interaction.message.guild.me
                     ).manage_messages
-                ) and any([self.legendchance < 2, self.ubchance < 2]):
+                ) and self.rare:
                     await self.embedmsg.pin()
         self.view.stop()
 
@@ -257,11 +160,18 @@ class SpawnModal(discord.ui.Modal, title="Catch!"):
 class Spawn(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.spawn_cache = defaultdict(
-            int
-        )  # This doesn't need to be put in Redis, because it's a cache of Guild ID's, which aren't cross-cluster
+        # This doesn't need to be put in Redis, because it's keyed by Guild ID's, which aren't cross-cluster
+        self.spawn_cache = bot.rate_limits.local("spawns", fixed_window(1, 5))
         self.always_spawn = False
         self.modal_view = False
+        self.spawn_table = SpawnTable(bot.dex)
+        self.catch_rewards = CatchRewardPipeline(bot)
+        # Routes messages to the spawns waiting to be caught in their channel
+        self.catches = CatchDispatcher(bot)
+        self.catches.start()
+
+    def cog_unload(self):
+        self.catches.close()
 
     # @check_owner()
     # @commands.hybrid_command(name="lop")
@@ -273,27 +183,19 @@ class Spawn(commands.Cog):
     #        self.always_spawn = True
     #        await ctx.send("Always spawning enabled.")
 
-    async def get_type(self, type_id):
-        data = await self.bot.db[1].ptypes.find({"types": type_id}).to_list(None)
-        data = [x["id"] for x in data]
-        data = (
-            await self.bot.db[1].forms.find({"pokemon_id": {"$in": data}}).to_list(None)
-        )
-        data = [x["identifier"].title() for x in data]
-        return list(set(data) & set(totalList))
-
     @commands.Cog.listener()
     async def on_message(self, message):
         await self.bot.wait_until_ready()
         if not message.guild:
             return
+        self.catches.dispatch(message)
         if message.author.bot:
             return
         # if self.bot.botbanned(message.author.id):
         # return
         if message.guild.id in (264445053596991498, 446425626988249089):
             return
-        if time.time() < self.spawn_cache[message.guild.id]:
+        if self.spawn_cache.retry_after(message.guild.id):
             return
         if random.random() >= 0.05 and not self.always_spawn:
             return
@@ -301,11 +203,11 @@ class Spawn(commands.Cog):
             return
         if isinstance(message.channel, discord.VoiceChannel):
             return
-        self.spawn_cache[message.guild.id] = time.time() + 5
+        self.spawn_cache.hit(message.guild.id)
         
         # See if we are allowed to spawn in this channel & get the spawn channel
         try:
-            guild = await self.bot.mongo_find("guilds", {"id": message.guild.id})
+            guild = self.bot.guild_settings.get(message.guild.id)
             (
                 redirects,
                 delspawn,
@@ -351,70 +253,29 @@ class Spawn(commands.Cog):
         if not spawn_channel.permissions_for(message.guild.me).embed_links:
             return
         # Check the "environment" to determine spawn rates
-        override_with_ghost = False
-        override_with_ice = False
         async with self.bot.db[0].acquire() as pconn:
-            inventory = await pconn.fetchval(
-                "SELECT inventory::json FROM users WHERE u_id = $1",
-                message.author.id,
+            counts = await self.bot.commondb.item_counts(
+                message.author.id, ["shiny-multiplier"], pconn=pconn
             )
-            threshold = 4000
-            if inventory is not None:
-                threshold = round(
-                    threshold - threshold * (inventory.get("shiny-multiplier", 0) / 100)
-                )
-            shiny = random.choice([False for i in range(threshold)] + [True])
+            shiny_multiplier = 0
+            if counts is not None:
+                shiny_multiplier = counts["shiny-multiplier"]
+            shiny = self.spawn_table.roll_shiny(shiny_multiplier)
 
             honey = await pconn.fetchval(
                 "SELECT type FROM honey WHERE channel = $1 LIMIT 1",
                 message.channel.id,
             )
-            if honey is None:
-                honey = 0
-            elif honey == "ghost":
-                honey = 0
-                override_with_ghost = bool(random.randrange(4))
-            elif honey == "cheer":
-                honey = 0
-                override_with_ice = True
-            else:
-                honey = 50
-
-            legendchance = int(random.random() * (round(4000 - 7600 * honey / 100)))
-            ubchance = int(random.random() * (round(3000 - 5700 * honey / 100)))
-            pseudochance = int(random.random() * (round(1000 - 1900 * honey / 100)))
-            starterchance = int(random.random() * (round(500 - 950 * honey / 100)))
 
         # Pick which type of pokemon to spawn
-        if message.guild.id == 999953429751414784 and False:
-            pass
-        elif override_with_ghost:
-            pokemon = random.choice(await self.get_type(8))
-        elif override_with_ice:
-            pokemon = random.choice(await self.get_type(15))
-        elif legendchance < 2:
-            pokemon = random.choice(LegendList)
-        elif ubchance < 2:
-            pokemon = random.choice(ubList)
-        elif pseudochance < 2:
-            pokemon = random.choice(pseudoList)
-        elif starterchance < 2:
-            pokemon = random.choice(starterList)
-        else:
-            pokemon = random.choice(pList)
+        pokemon, tier = self.spawn_table.roll(honey)
+        rare = tier.is_rare()
         pokemon = pokemon.lower()
 
         # Get the data for the pokemon that is about to spawn
-        form_info = await self.bot.db[1].forms.find_one({"identifier": pokemon})
+        form_info = self.bot.dex.form(pokemon)
         if form_info is None:
             raise ValueError(f'Bad pokemon name "{pokemon}" passed to spawn.py')
-        pokemon_info = await self.bot.db[1].pfile.find_one(
-            {"id": form_info["pokemon_id"]}
-        )
-        if not pokemon_info and "alola" in pokemon:
-            pokemon_info = await self.bot.db[1].pfile.find_one(
-                {"identifier": pokemon.lower().split("-")[0]}
-            )
         try:
             pokeurl = await get_file_name(pokemon, self.bot, shiny)
         except Exception:
@@ -443,9 +304,9 @@ class Spawn(commands.Cog):
                    delspawn=delspawn,
                    pinspawn=pinspawn,
                    spawn_channel=spawn_channel,
-                   legendchance=legendchance,
-                   ubchance=ubchance,
+                   rare=rare,
                    shiny=shiny,
+                   catch_rewards=self.catch_rewards,
                )
                msg = await spawn_channel.send(embed=embed, view=view)
     
@@ -454,37 +315,16 @@ class Spawn(commands.Cog):
            except discord.HTTPException:
                return
         else:
-            catch_options = [pokemon]
-            if pokemon == "mr-mime":
-                catch_options.append("mr.-mime")
-            elif pokemon == "mime-jr":
-                catch_options.append("mime-jr.")
-            elif pokemon.endswith("-alola"):
-                catch_options.append("alola-" + pokemon[:-6])
-                catch_options.append("alolan-" + pokemon[:-6])
-            elif pokemon.endswith("-galar"):
-                catch_options.append("galar-" + pokemon[:-6])
-                catch_options.append("galarian-" + pokemon[:-6])
-            elif pokemon.endswith("-hisui"):
-                catch_options.append("hisui-" + pokemon[:-6])
-                catch_options.append("hisuian-" + pokemon[:-6])
-
+            options = catch_options(pokemon)
             embedmsg = await spawn_channel.send(
                 embed=embed,
             )
 
-            def check(m):
-                if(m.content is None):
-                    return False
-                return (
-                    m.channel.id == spawn_channel.id
-                    and any([m.content.lower().replace(" ","-").endswith(catch_option) for catch_option in catch_options]) # The message ends with the pokemon's name
-                    and not self.bot.botbanned(m.author.id)
-                )
-
             while True:
                 try:
-                    msg = await self.bot.wait_for("message", check=check, timeout=600)
+                    msg = await self.catches.add(
+                        spawn_channel.id, options, timeout=600
+                    ).wait()
                 except asyncio.TimeoutError:
                     try:
                         await embedmsg.edit(
@@ -493,114 +333,33 @@ class Spawn(commands.Cog):
                     except discord.HTTPException:
                         pass
                     return
-                async with self.bot.db[0].acquire() as pconn:
-                    inventory = await pconn.fetchval(
-                        "SELECT inventory::json from users WHERE u_id = $1",
-                        msg.author.id,
+                # Someone caught the poke, create it
+                rewards = await self.catch_rewards.catch(
+                    msg.author.id,
+                    pokemon,
+                    shiny=shiny,
+                    premium=self.bot.premium_server(message.guild.id),
+                )
+                if rewards is None:
+                    await spawn_channel.send(
+                        "You have not started!\nStart with `/start` first!"
                     )
-                    if inventory is None:
-                        await spawn_channel.send(
-                            "You have not started!\nStart with `/start` first!"
-                        )
-                    else:
-                        break
+                else:
+                    break
 
             pokemon = pokemon.capitalize()
-
-            # Someone caught the poke, create it
-            ivmulti = inventory.get("iv-multiplier", 0)
-            # 0%-10% chance from 0-50 iv multis
-            boosted = random.randrange(500) < ivmulti
-            plevel = random.randint(1, 60)
-            pokedata = await self.bot.commondb.create_poke(
-                self.bot,
-                msg.author.id,
-                pokemon,
-                shiny=shiny,
-                boosted=boosted,
-                level=plevel,
-            )
+            pokedata = rewards.poke
             ivpercent = round((pokedata.iv_sum / 186) * 100, 2)
-            credits = None
-
-            async with self.bot.db[0].acquire() as pconn:
-                items = await pconn.fetchval(
-                    "SELECT items::json FROM users WHERE u_id = $1", msg.author.id
-                )
-                #
-                user = await self.bot.mongo_find(
-                    "users",
-                    {"user": msg.author.id},
-                    default={"user": msg.author.id, "progress": {}},
-                )
-                progress = user["progress"]
-                progress["catch-count"] = progress.get("catch-count", 0) + 1
-                await self.bot.mongo_update(
-                    "users", {"user": msg.author.id}, {"progress": progress}
-                )
-                if shiny:
-                    await pconn.execute("UPDATE achievements SET shiny_caught = shiny_caught + 1 WHERE u_id = $1", msg.author.id)
-                else:
-                    await pconn.execute("UPDATE achievements SET pokemon_caught = pokemon_caught + 1 WHERE u_id = $1", msg.author.id)
-                berry_chance = max(1, int(random.random() * 350))
-                expensive_chance = max(1, int(random.random() * 25))
-                if berry_chance in range(1, 8):
-                    cheaps = [
-                        t["item"]
-                        for t in SHOP
-                        if t["price"] <= 8000 and not is_key(t["item"])
-                    ]
-                    expensives = [
-                        t["item"]
-                        for t in SHOP
-                        if t["price"] in range(8000, 20000) and not is_key(t["item"])
-                    ]
-                    if berry_chance == 1:
-                        berry = random.choice(cheaps)
-                    elif berry_chance == expensive_chance:
-                        berry = random.choice(expensives)
-                    else:
-                        berry = random.choice(list(berryList))
-                    # items = user_info["items"]
-                    items[berry] = items.get(berry, 0) + 1
-                    await pconn.execute(
-                        f"UPDATE users SET items = $1::json WHERE u_id = $2",
-                        items,
-                        msg.author.id,
-                    )
-                else:
-                    berry_chance = None
-                #
-                chest_chance = not random.randint(0, 200)
-                if chest_chance:
-                    inventory = await pconn.fetchval(
-                        "SELECT inventory::json FROM users WHERE u_id = $1",
-                        msg.author.id,
-                    )
-                    chest = "common chest"
-                    inventory[chest] = inventory.get(chest, 0) + 1
-                    await pconn.execute(
-                        "UPDATE users SET inventory = $1::json where u_id = $2",
-                        inventory,
-                        msg.author.id,
-                    )
-                if self.bot.premium_server(message.guild.id):
-                    credits = random.randint(100, 250)
-                    await pconn.execute(
-                        "UPDATE users SET mewcoins = mewcoins + $1 where u_id = $2",
-                        credits,
-                        msg.author.id,
-                    )
             author = msg.author.mention
             teext = f"Congratulations {author}, you have caught a {pokedata.emoji}{pokemon} ({ivpercent}% iv)!\n"
-            if boosted:
+            if rewards.boosted:
                 teext += "It was boosted by your IV multiplier!\n"
-            if berry_chance:
-                teext += f"It also dropped a {berry}!\n"
-            if chest_chance:
-                teext += f"It also dropped a {chest}!\n"
-            if credits:
-                teext += f"You also found {credits} credits!\n"
+            if rewards.berry:
+                teext += f"It also dropped a {rewards.berry}!\n"
+            if rewards.chest:
+                teext += f"It also dropped a {rewards.chest}!\n"
+            if rewards.credits:
+                teext += f"You also found {rewards.credits} credits!\n"
 
             await spawn_channel.send(embed=(make_embed(title="", description=teext)))
             try:
@@ -616,7 +375,7 @@ class Spawn(commands.Cog):
                             message.guild.me
                         ).manage_messages
                     ):
-                        if any([legendchance < 2, ubchance < 2]):
+                        if rare:
                             await embedmsg.pin()
             except discord.HTTPException:
                 pass
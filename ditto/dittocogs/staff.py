@@ -156,15 +156,8 @@ class staff(commands.Cog):
             await asyncio.sleep(86400 - (time.time() % 86400))
             ts = time.time()
             data = {}
-            async with self.bot.db[0].acquire() as pconn:
-                details = await pconn.fetch(
-                    """SELECT u_id, cardinality(pokes) as pokenum FROM users ORDER BY pokenum DESC LIMIT 50"""
-                )
-
-            pokes = [record["pokenum"] for record in details]
-            ids = [record["u_id"] for record in details]
-            for idx, id in enumerate(ids):
-                pokenum = pokes[idx]
+            details = await self.bot.leaderboards.top("pokemon", 0, 50)
+            for idx, (id, pokenum) in enumerate(details):
                 with suppress(Exception):
                     (await self.bot.fetch_user(id)).name
                 num = idx + 1
@@ -174,18 +167,7 @@ class staff(commands.Cog):
             await self.bot.db[1].leaderboard.insert_one(data)
 
     async def load_bans_cross_cluster(self):
-        launcher_res = await self.bot.handler("statuses", 1, scope="launcher")
-        if not launcher_res:
-            return
-        processes = len(launcher_res[0])
-        body = "await bot.load_bans()"
-        await self.bot.handler(
-            "_eval",
-            processes,
-            args={"body": body, "cluster_id": "-1"},
-            scope="bot",
-            _timeout=10,
-        )
+        await self.bot.bans.reload_everywhere()
 
     @check_admin()
     @commands.hybrid_command()
@@ -207,6 +189,51 @@ class staff(commands.Cog):
         )
         await ctx.send(embed=sync_message)
 
+    @check_admin()
+    @commands.hybrid_command()
+    @discord.app_commands.guilds(OS, OSGYMS, OSAUCTIONS, VK_SERVER)
+    @discord.app_commands.default_permissions(administrator=True)
+    async def migrateownership(self, ctx, batch_size: int = 500) -> None:
+        """Staff only: Move every user's pokes array into the ownership table"""
+        # Safe to run while the bot is live, each user is moved under the same lock catches and trades take.
+        message = await ctx.send("Migrating pokemon ownership...")
+        last_id = 0
+        migrated = 0
+        while True:
+            async with self.bot.db[0].acquire() as pconn:
+                user_ids = await pconn.fetch(
+                    "SELECT u_id FROM users WHERE u_id > $1 AND cardinality(pokes) > 0 ORDER BY u_id LIMIT $2",
+                    last_id,
+                    batch_size,
+                )
+            if not user_ids:
+                break
+            for record in user_ids:
+                await self.bot.commondb.migrate_ownership(record["u_id"])
+            migrated += len(user_ids)
+            last_id = user_ids[-1]["u_id"]
+            with suppress(discord.HTTPException):
+                await message.edit(content=f"Migrated {migrated:,} users so far...")
+            await asyncio.sleep(1)
+        # Stops checking every owner for an array left to move from now on
+        await self.bot.commondb.check_backfilled()
+        await ctx.channel.send(
+            f"{ctx.author.mention} Finished migrating pokemon ownership for {migrated:,} users."
+        )
+
+    @check_admin()
+    @commands.hybrid_command()
+    @discord.app_commands.guilds(OS, OSGYMS, OSAUCTIONS, VK_SERVER)
+    @discord.app_commands.default_permissions(administrator=True)
+    async def rebuildleaderboards(self, ctx) -> None:
+        """Staff only: Recompute every leaderboard from the database"""
+        message = await ctx.send("Rebuilding leaderboards...")
+        for board in self.bot.leaderboards.BOARDS:
+            await self.bot.leaderboards.rebuild(board)
+            with suppress(discord.HTTPException):
+                await message.edit(content=f"Rebuilt the {board} leaderboard...")
+        await ctx.channel.send(f"{ctx.author.mention} Finished rebuilding the leaderboards.")
+
     @check_mod()
     @commands.hybrid_command()
     @discord.app_commands.guilds(OS, OSGYMS, OSAUCTIONS, VK_SERVER)
@@ -409,10 +436,7 @@ class staff(commands.Cog):
     @commands.hybrid_command(aliases=["detradelock", "deltradelock"])
     async def resettradelock(self, ctx, user: int):
         """Reset the redis market tradelock for a user"""
-        result = await ctx.bot.redis_manager.redis.execute(
-            "LREM", "tradelock", "1", str(user)
-        )
-        if result == 0:
+        if not await ctx.bot.trade_locks.force_release(user):
             await ctx.send(
                 "That user was not in the Redis tradelock.  Are you sure you have the right user?"
             )
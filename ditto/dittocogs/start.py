@@ -289,13 +289,14 @@ class Start(commands.Cog):
                 0,
                 0,
                 "kek",
-                {the_id},
+                [],
                 True,
                 '{"coin-case": 0, "nature-capsules" : 10, "honey" : 0, "battle-multiplier": 5, "shiny-multiplier": 5 }',
                 True,
             )
 
             await pconn.execute(query3, *args2)
+            await ctx.bot.commondb.append_poke(ctx.author.id, the_id, pconn=pconn)
             new_embed = discord.Embed(
                 title="Welcome to DittoBOT", color=ctx.bot.get_random_color()
             )
@@ -165,10 +165,12 @@ ATTEMPT_TRADE = "Confirm Trade"
 
 
 class TradeMainView(discord.ui.View):
-    def __init__(self, ctx, p1: int, p2: int):
+    def __init__(self, ctx, p1: int, p2: int, leases=()):
         self.ctx = ctx
         self.p1 = p1
         self.p2 = p2
+        # The TradeLeases tradelocking both players, released when the trade ends
+        self.leases = leases
         self.can_trade = False
         self.attempting = False
         self.cancelled = False
@@ -201,15 +203,19 @@ class TradeMainView(discord.ui.View):
             )
         self.cancelled = True
 
-    async def _attrs(self, pconn, poke):
-        if poke.cached_info:
-            name = poke.cached_info
-        else:
-            name = await pconn.fetchrow(
-                "SELECT pokname, tradable, shiny, radiant FROM pokes WHERE id = $1",
-                poke.poke_id,
-            )
-            poke.cached_info = name
+    async def _cache_info(self):
+        """Loads the details of every poke in the trade that has none yet, with one query."""
+        missing = [poke for poke in self.pokes if not poke.cached_info]
+        if not missing:
+            return
+        details = await self.ctx.bot.commondb.get_pokes(
+            [poke.poke_id for poke in missing], "trade"
+        )
+        for poke, info in zip(missing, details):
+            poke.cached_info = info
+
+    def _attrs(self, poke):
+        name = poke.cached_info
 
         attrs = []
 
@@ -228,14 +234,11 @@ class TradeMainView(discord.ui.View):
         """
         async with self.ctx.bot.db[0].acquire() as pconn:
             try:
-                pokename = await pconn.fetchval(
-                    "SELECT pokname FROM pokes WHERE id = $1",
-                    _id,
-                )
-                helditem = await pconn.fetchval(
-                    "SELECT hitem FROM pokes WHERE id = $1", _id
+                (details,) = await self.ctx.bot.commondb.get_pokes(
+                    [_id], ("pokname", "hitem"), pconn=pconn
                 )
-                pokename = pokename.lower()
+                pokename = details.pokname.lower()
+                helditem = details.hitem
                 try:
                     pid = [t["id"] for t in PFILE if t["identifier"] == pokename][0]
                 except:
@@ -298,50 +301,50 @@ class TradeMainView(discord.ui.View):
         msg = []
 
         poke_trade = TradeList(self.pokes)
+        await self._cache_info()
 
-        async with self.ctx.bot.db[0].acquire() as pconn:
-            msg.append(f"**(<@{self.p1}>)**\n*Pokemon*")
+        msg.append(f"**(<@{self.p1}>)**\n*Pokemon*")
 
-            flag = False
-            p1_has = False
+        flag = False
+        p1_has = False
 
-            for poke in poke_trade.iter(self.p1):
-                flag = True
-                p1_has = True
+        for poke in poke_trade.iter(self.p1):
+            flag = True
+            p1_has = True
 
-                name, attrs = await self._attrs(pconn, poke)
+            name, attrs = self._attrs(poke)
 
-                msg.append(f"{name['pokname']} (GlobalID:{poke.poke_id})")
-                if attrs:
-                    attr = ""
-                    msg.append(f"{attrs}")
+            msg.append(f"{name['pokname']} (GlobalID:{poke.poke_id})")
+            if attrs:
+                attr = ""
+                msg.append(f"{attrs}")
 
-            if not p1_has:
-                msg.append("No pokemon added to trade")
+        if not p1_has:
+            msg.append("No pokemon added to trade")
 
-            if self.credits.p1 > 0:
-                msg.append(f"*Credits*\n{self.credits.p1} credits")
-                flag = True
+        if self.credits.p1 > 0:
+            msg.append(f"*Credits*\n{self.credits.p1} credits")
+            flag = True
 
-            p2_has = False
+        p2_has = False
 
-            msg.append(f"\n**(<@{self.p2}>)**\n*Pokemon*")
-            for poke in poke_trade.iter(self.p2):
-                flag = True
-                p2_has = True
+        msg.append(f"\n**(<@{self.p2}>)**\n*Pokemon*")
+        for poke in poke_trade.iter(self.p2):
+            flag = True
+            p2_has = True
 
-                name, attrs = await self._attrs(pconn, poke)
+            name, attrs = self._attrs(poke)
 
-                msg.append(f"{name['pokname']} (GlobalID:{poke.poke_id})")
-                if attrs:
-                    msg.append(f"{attrs}")
+            msg.append(f"{name['pokname']} (GlobalID:{poke.poke_id})")
+            if attrs:
+                msg.append(f"{attrs}")
 
-            if not p2_has:
-                msg.append("No pokemon added to trade")
+        if not p2_has:
+            msg.append("No pokemon added to trade")
 
-            if self.credits.p2 > 0:
-                msg.append(f"*Credits*\n{self.credits.p2} credits")
-                flag = True
+        if self.credits.p2 > 0:
+            msg.append(f"*Credits*\n{self.credits.p2} credits")
+            flag = True
 
         self.can_trade = flag
 
@@ -385,9 +388,11 @@ class TradeMainView(discord.ui.View):
                 )
                 return
 
-            async with self.ctx.bot.db[0].acquire() as pconn:
+            async with self.ctx.bot.commondb.ownership_conn(
+                interaction.user.id
+            ) as pconn:
                 details = await pconn.fetchrow(
-                    "SELECT id, pokname, pokelevel, shiny, radiant, tradable FROM pokes WHERE id = (SELECT pokes[$1] FROM users WHERE u_id = $2)",
+                    "SELECT id, pokname, pokelevel, shiny, radiant, tradable FROM pokes WHERE id = (SELECT poke_id FROM ownership WHERE u_id = $2 AND position = $1)",
                     poke,
                     interaction.user.id,
                 )
@@ -417,7 +422,9 @@ class TradeMainView(discord.ui.View):
                 )
                 return
 
-            self.pokes.append(Poke(interaction.user.id, details["id"]))
+            trade_poke = Poke(interaction.user.id, details["id"])
+            trade_poke.cached_info = details
+            self.pokes.append(trade_poke)
 
         await modal.out_interaction.response.send_message(
             f"Added {modal.output} to your trade list (message will update in a second or two!)",
@@ -446,9 +453,11 @@ class TradeMainView(discord.ui.View):
         ext_check = None
 
         for poke in modal.output:
-            async with self.ctx.bot.db[0].acquire() as pconn:
+            async with self.ctx.bot.commondb.ownership_conn(
+                interaction.user.id
+            ) as pconn:
                 details = await pconn.fetchrow(
-                    "SELECT id, pokname, pokelevel, shiny, radiant, tradable FROM pokes WHERE id = (SELECT pokes[$1] FROM users WHERE u_id = $2)",
+                    "SELECT id, pokname, pokelevel, shiny, radiant, tradable FROM pokes WHERE id = (SELECT poke_id FROM ownership WHERE u_id = $2 AND position = $1)",
                     poke,
                     interaction.user.id,
                 )
@@ -512,12 +521,8 @@ class TradeMainView(discord.ui.View):
         await self.update_msg()
 
     async def unlock_trade(self):
-        await self.ctx.bot.redis_manager.redis.execute(
-            "LREM", "tradelock", "1", str(self.p1)
-        )
-        await self.ctx.bot.redis_manager.redis.execute(
-            "LREM", "tradelock", "1", str(self.p2)
-        )
+        for lease in self.leases:
+            await lease.release()
 
     @discord.ui.button(
         label=ATTEMPT_TRADE, style=discord.ButtonStyle.primary, row=2, disabled=True
@@ -605,12 +610,12 @@ class TradeMainView(discord.ui.View):
 
         # Recheck pokes
         async with self.ctx.bot.db[0].acquire() as pconn:
-            for poke in TradeList(self.pokes).iter(self.p1):
-                is_owner = await pconn.fetchval(
-                    "SELECT u_id FROM users WHERE pokes @> $1",
-                    [poke.poke_id],
+            sent = [poke.poke_id for poke in TradeList(self.pokes).iter(self.p1)]
+            if sent:
+                owned = await self.ctx.bot.commondb.owned_pokes(
+                    self.p1, sent, pconn=pconn
                 )
-                if is_owner != self.p1:
+                if len(owned) != len(set(sent)):
                     await interaction.followup.send(
                         f"<@{self.p1}> no longer owns one or more of the pokemon they were trading, canceling trade!"
                     )
@@ -618,12 +623,12 @@ class TradeMainView(discord.ui.View):
                     self.stop()
                     return
 
-            for poke in TradeList(self.pokes).iter(self.p2):
-                is_owner = await pconn.fetchval(
-                    "SELECT u_id FROM users WHERE pokes @> $1",
-                    [poke.poke_id],
+            sent = [poke.poke_id for poke in TradeList(self.pokes).iter(self.p2)]
+            if sent:
+                owned = await self.ctx.bot.commondb.owned_pokes(
+                    self.p2, sent, pconn=pconn
                 )
-                if is_owner != self.p2:
+                if len(owned) != len(set(sent)):
                     await interaction.followup.send(
                         f"<@{self.p2}> no longer owns one or more of the pokemon they were trading, canceling trade!"
                     )
@@ -700,38 +705,16 @@ class TradeMainView(discord.ui.View):
             )
 
             # Pokemon
-            for poke in TradeList(self.pokes).iter(self.p1):
-                # Remove pokemon from player 1 and give to player 2
-                await pconn.execute(
-                    "UPDATE users set pokes = array_remove(pokes, $1) WHERE u_id = $2",
-                    poke.poke_id,
-                    self.p1,
-                )
-                await pconn.execute(
-                    "UPDATE users set pokes = array_append(pokes, $1) WHERE u_id = $2",
-                    poke.poke_id,
-                    self.p2,
-                )
+            for sender, receiver in ((self.p1, self.p2), (self.p2, self.p1)):
+                sent = [poke.poke_id for poke in TradeList(self.pokes).iter(sender)]
+                if not sent:
+                    continue
+                # Remove the pokemon from the sender and give them to the receiver
+                await self.ctx.bot.commondb.remove_pokes(sender, sent, pconn=pconn)
+                await self.ctx.bot.commondb.append_pokes(receiver, sent, pconn=pconn)
                 await pconn.execute(
-                    "UPDATE pokes SET market_enlist = false WHERE id = $1",
-                    poke.poke_id,
-                )
-
-            for poke in TradeList(self.pokes).iter(self.p2):
-                # Remove pokemon from player 2 and give to player 1
-                await pconn.execute(
-                    "UPDATE users set pokes = array_remove(pokes, $1) WHERE u_id = $2",
-                    poke.poke_id,
-                    self.p2,
-                )
-                await pconn.execute(
-                    "UPDATE users set pokes = array_append(pokes, $1) WHERE u_id = $2",
-                    poke.poke_id,
-                    self.p1,
-                )
-                await pconn.execute(
-                    "UPDATE pokes SET market_enlist = false WHERE id = $1",
-                    poke.poke_id,
+                    "UPDATE pokes SET market_enlist = false WHERE id = ANY($1)",
+                    sent,
                 )
 
             # Just in case
@@ -758,13 +741,6 @@ class TradeMainView(discord.ui.View):
 class Trade(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.init_task = asyncio.create_task(self.initialize())
-        # 2 different users could make a trade to the same person, who does `;accept` and gets both before either notices the other started.
-        # Since this issue only happens in a single guild, a cluster-local tradelock can prevent it.
-        self.start_tradelock = []
-
-    async def initialize(self):
-        await self.bot.redis_manager.redis.execute("LPUSH", "tradelock", "123")
 
     # @commands.hybrid_command()
     # async def tradediag(self, ctx):
@@ -990,9 +966,7 @@ class Trade(commands.Cog):
             ):
                 await ctx.send("A user is not allowed to Trade")
                 return
-            poke_id = await pconn.fetchval(
-                "SELECT pokes[$1] FROM users WHERE u_id = $2", val, ctx.author.id
-            )
+            poke_id = await ctx.bot.commondb.poke_at(ctx.author.id, val, pconn=pconn)
             name = await pconn.fetchrow(
                 "SELECT market_enlist, pokname, shiny, radiant, fav, tradable FROM pokes WHERE id = $1",
                 poke_id,
@@ -1026,11 +1000,7 @@ class Trade(commands.Cog):
 
         await ctx.bot.commondb.remove_poke(ctx.author.id, poke_id)
         async with ctx.bot.db[0].acquire() as pconn:
-            await pconn.execute(
-                "UPDATE users SET pokes = array_append(pokes, $1) WHERE u_id = $2",
-                poke_id,
-                user.id,
-            )
+            await ctx.bot.commondb.append_poke(user.id, poke_id, pconn=pconn)
             await ctx.send(f"{ctx.author.name} has given {user.name} a {name}")
             await ctx.bot.get_partial_messageable(1004571710323957830).send(
                 f"\N{SMALL BLUE DIAMOND}- {ctx.author.name} - ``{ctx.author.id}`` has given \n{user.name} - `{user.id}`\n```{poke_id} {name}```\n"
@@ -1052,13 +1022,7 @@ class Trade(commands.Cog):
         if ctx.author.id == user.id:
             await ctx.send("You cannot trade with yourself!")
             return
-        current_traders = [
-            int(id_)
-            for id_ in await self.bot.redis_manager.redis.execute(
-                "LRANGE", "tradelock", "0", "-1"
-            )
-            if id_.decode("utf-8").isdigit()
-        ]
+        current_traders = await self.bot.trade_locks.locked(ctx.author.id, user.id)
         if ctx.author.id in current_traders:
             await ctx.send(f"{ctx.author.name} is currently in a trade!")
             return
@@ -1097,66 +1061,55 @@ class Trade(commands.Cog):
                     f"{user.display_name} has not started!\nStart with `/start` first!"
                 )
                 return
-        await self.bot.redis_manager.redis.execute(
-            "LPUSH", "tradelock", str(ctx.author.id)
-        )
-        #prefix = "/"
-
-        async def _unlock(ctx, msg):
-            await self.bot.redis_manager.redis.execute(
-                "LREM", "tradelock", "1", str(ctx.author.id)
-            )
-            await msg.edit(
-                content=f"{user.mention} took too long to accept the trade..."
-            )
+        author_lease = await self.bot.trade_locks.acquire(ctx.author.id)
+        if author_lease is None:
+            await ctx.send(f"{ctx.author.name} is currently in a trade!")
             return
+        # Leases renew themselves, so any failure before the view owns them must release them here.
+        user_lease = None
+        try:
+            async def _unlock(ctx, msg):
+                await author_lease.release()
+                await msg.edit(
+                    content=f"{user.mention} took too long to accept the trade..."
+                )
+                return
 
-        cview = ConfirmView(
-            ctx,
-            f"{ctx.author.mention} has requested a trade with {user.mention}!\n*Waiting for {user.mention} to confirm...*",
-            on_timeout=_unlock,
-            allowed_interactors=[user.id],
-        )
-
-        if not await cview.wait():
-            await self.bot.redis_manager.redis.execute(
-                "LREM", "tradelock", "1", str(ctx.author.id)
+            cview = ConfirmView(
+                ctx,
+                f"{ctx.author.mention} has requested a trade with {user.mention}!\n*Waiting for {user.mention} to confirm...*",
+                on_timeout=_unlock,
+                allowed_interactors=[user.id],
             )
-            await cview.message.edit(content="Trade Rejected!")
-            return
 
-        await ctx.send(
-            f"Trade between {ctx.author.mention} and {user.mention}!", ephemeral=True
-        )
+            if not await cview.wait():
+                await author_lease.release()
+                await cview.message.edit(content="Trade Rejected!")
+                return
 
-        if user.id in self.start_tradelock:
-            await self.bot.redis_manager.redis.execute(
-                "LREM", "tradelock", "1", str(ctx.author.id)
+            await ctx.send(
+                f"Trade between {ctx.author.mention} and {user.mention}!", ephemeral=True
             )
-            await ctx.send(f"{user.name} is currently in a trade!")
-            return
-        self.start_tradelock.append(user.id)
-        current_traders = [
-            int(id_)
-            for id_ in await self.bot.redis_manager.redis.execute(
-                "LRANGE", "tradelock", "0", "-1"
+
+            # Locking the receiver is atomic, so if two trades to the same user are accepted at once only one gets them.
+            user_lease = await self.bot.trade_locks.acquire(user.id)
+            if user_lease is None:
+                await author_lease.release()
+                await ctx.send(f"{user.name} is currently in a Trade!")
+                return
+            view = TradeMainView(
+                ctx, ctx.author.id, user.id, leases=(author_lease, user_lease)
             )
-            if id_.decode("utf-8").isdigit()
-        ]
-        if user.id in current_traders:
-            await self.bot.redis_manager.redis.execute(
-                "LREM", "tradelock", "1", str(ctx.author.id)
+            msg = await ctx.send(
+                "Use the buttons to add pokemon/credits/redeems to the current trade. Multiple ID's can be added at once-seperated by spaces.",
+                view=view,
             )
-            await ctx.send(f"{user.name} is currently in a Trade!")
-            return
-        await self.bot.redis_manager.redis.execute("LPUSH", "tradelock", str(user.id))
-        self.start_tradelock.remove(user.id)
-        view = TradeMainView(ctx, ctx.author.id, user.id)
-        msg = await ctx.send(
-            "Use the buttons to add pokemon/credits/redeems to the current trade. Multiple ID's can be added at once-seperated by spaces.",
-            view=view,
-        )
-        view.set_message(msg)
+            view.set_message(msg)
+        except BaseException:
+            await author_lease.release()
+            if user_lease is not None:
+                await user_lease.release()
+            raise
 
 
 async def setup(bot):
@@ -0,0 +1,176 @@
+import asyncio
+from uuid import uuid4
+
+import orjson
+
+STATE_KEY = "bans:state"
+
+KINDS = ("users", "guilds", "channels")
+
+_MASK = (1 << 64) - 1
+# Keeps the same id in different kinds from cancelling out in the checksum
+_SALTS = {"users": 0x51ED27A4C2B3F10D, "guilds": 0x2C9F6A1E7B0D4835, "channels": 0x7A3B90E1D54C6F29}
+
+
+def _weight(kind: str, id: int) -> int:
+    return ((id ^ _SALTS[kind]) * 0x9E3779B97F4A7C15) & _MASK
+
+
+class BanRegistry:
+    """
+    Bot banned users, server banned guilds and command disabled channels.
+
+    Each kind is a set, so a membership check is one hash lookup. Changes are
+    written to mongo, applied to the local sets and published as a single delta,
+    which every other cluster applies in O(1) instead of reloading everything.
+    Deltas carry a version from redis, and the sets keep a running checksum, so a
+    cluster that missed a delta notices on the next one or on the periodic
+    reconcile, and reloads from mongo.
+    """
+
+    def __init__(self, bot, *, reconcile_interval: int = 300):
+        self.bot = bot
+        self.reconcile_interval = reconcile_interval
+        self.users = set()
+        self.guilds = set()
+        self.channels = set()
+        self.version = 0
+        self.checksum = 0
+        self._task = None
+        self._reloading = None
+
+    @property
+    def redis(self):
+        return self.bot.db[2]
+
+    def start(self):
+        self._task = asyncio.create_task(self._reconcile_forever())
+
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def is_banned(self, user_id: int, guild_id: int = None) -> bool:
+        return user_id in self.users or (guild_id is not None and guild_id in self.guilds)
+
+    async def _read_mongo(self):
+        blacklist = await self.bot.db[1].blacklist.find_one() or {}
+        channels = set()
+        async for document in self.bot.db[1].guilds.find(
+            {"disabled_channels.0": {"$exists": True}}, {"_id": 0, "disabled_channels": 1}
+        ):
+            channels.update(document["disabled_channels"])
+        return set(blacklist.get("users", ())), set(blacklist.get("guilds", ())), channels
+
+    async def load(self):
+        """(Re)loads every kind from mongo, and adopts the fleet's current version."""
+        # The version is read first, so a delta published during the load is not skipped
+        version = await self._remote_version()
+        users, guilds, channels = await self._read_mongo()
+        checksum = 0
+        for kind, ids in (("users", users), ("guilds", guilds), ("channels", channels)):
+            for id in ids:
+                checksum ^= _weight(kind, id)
+        self.users, self.guilds, self.channels = users, guilds, channels
+        self.checksum = checksum
+        self.version = version
+
+    def reload_soon(self):
+        """Schedules a reload, unless one is already running."""
+        if self._reloading is None or self._reloading.done():
+            self._reloading = asyncio.create_task(self.load())
+
+    def apply(self, kind: str, op: str, id: int) -> bool:
+        """Applies a change to the local sets only, returns False if it changed nothing."""
+        ids = getattr(self, kind)
+        if op == "add":
+            if id in ids:
+                return False
+            ids.add(id)
+        else:
+            if id not in ids:
+                return False
+            ids.discard(id)
+        self.checksum ^= _weight(kind, id)
+        return True
+
+    async def add(self, kind: str, id: int):
+        """
+        Bans a user or guild, or disables commands in a channel, on every cluster.
+
+        Channels are persisted in their guild's settings, which the caller updates
+        through `bot.guild_settings` first.
+        """
+        await self._change(kind, "add", id)
+
+    async def remove(self, kind: str, id: int):
+        """Undoes `add` on every cluster."""
+        await self._change(kind, "remove", id)
+
+    async def _change(self, kind: str, op: str, id: int):
+        if kind not in KINDS:
+            raise ValueError(f"Unknown ban kind {kind!r}")
+        if kind != "channels":
+            update = "$addToSet" if op == "add" else "$pull"
+            await self.bot.db[1].blacklist.update_one({}, {update: {kind: id}}, upsert=True)
+        if not self.apply(kind, op, id):
+            return
+        await self._publish({"kind": kind, "op": op, "id": id})
+
+    async def reload_everywhere(self):
+        """Makes every cluster reload from mongo, for changes made outside the registry."""
+        await self.load()
+        await self._publish({"kind": None})
+
+    async def _remote_version(self) -> int:
+        if self.redis is None:
+            return self.version
+        version = await self.redis.execute("HGET", STATE_KEY, "version")
+        return int(version or 0)
+
+    async def _publish(self, delta: dict):
+        if self.redis is None:
+            return
+        version = await self.redis.execute("HINCRBY", STATE_KEY, "version", 1)
+        self.version = version
+        await self.redis.execute("HSET", STATE_KEY, "checksum", self.checksum)
+        payload = {
+            "scope": "bot",
+            "action": "ban_registry_update",
+            "command_id": str(uuid4()),
+            "args": {"cluster_id": self.bot.cluster["id"], "version": version, **delta},
+        }
+        await self.redis.execute("PUBLISH", "dittobot_clusters", orjson.dumps(payload))
+
+    def receive(self, args: dict):
+        """Applies a delta published by another cluster."""
+        version = args["version"]
+        missed = version != self.version + 1
+        self.version = max(self.version, version)
+        if args["kind"] is None or missed:
+            self.reload_soon()
+            return
+        self.apply(args["kind"], args["op"], args["id"])
+
+    async def reconcile(self):
+        """Reloads from mongo if this cluster's version or checksum disagree with the last change published."""
+        version, checksum = await self.redis.execute("HMGET", STATE_KEY, "version", "checksum")
+        if version is None:
+            return
+        if int(version) == self.version and int(checksum or 0) == self.checksum:
+            return
+        await self.load()
+        # Two clusters changing bans at once can leave the stored checksum stale, mongo decides
+        if int(version) == self.version and int(checksum or 0) != self.checksum:
+            await self.redis.execute("HSET", STATE_KEY, "checksum", self.checksum)
+
+    async def _reconcile_forever(self):
+        while True:
+            await asyncio.sleep(self.reconcile_interval)
+            if self.redis is None:
+                continue
+            try:
+                await self.reconcile()
+            except Exception:
+                self.bot.logger.exception("Failed to reconcile bans")
@@ -1,7 +1,11 @@
+import contextlib
 import random
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Set, Union
 
 import discord
 from dittocogs.pokemon_list import natlist
+from pokemon_utils.classes import POKE_FIELDS, PROJECTIONS, Poke
 from utils.misc import get_emoji
 
 
@@ -12,6 +16,91 @@ class UserNotStartedError(Exception):
     """
 
 
+# How many users known to have been migrated are remembered, until the backfill is finished
+MIGRATED_CACHE_SIZE = 100000
+
+OWNERSHIP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ownership (
+    u_id bigint NOT NULL,
+    position integer NOT NULL,
+    poke_id bigint NOT NULL UNIQUE,
+    PRIMARY KEY (u_id, position) DEFERRABLE INITIALLY IMMEDIATE
+)
+"""
+
+
+# Multipliers can't be bought or given past these counts
+MULTIPLIER_CAPS = {
+    "shiny-multiplier": 50,
+    "battle-multiplier": 50,
+    "iv-multiplier": 50,
+    "breeding-multiplier": 50,
+}
+
+# Clamps each delta to what fits between 0 and its cap (NULL for none), from the locked row
+CLAMPED_ITEMS_QUERY = """
+WITH current AS (
+    SELECT COALESCE({column}::jsonb, '{{}}') AS counts FROM users WHERE u_id = $1 FOR UPDATE
+), fitted AS (
+    SELECT name, amount, CASE
+        WHEN amount >= 0 THEN GREATEST(0, LEAST(amount, cap - COALESCE((counts ->> name)::bigint, 0)))
+        ELSE LEAST(0, GREATEST(amount, -COALESCE((counts ->> name)::bigint, 0)))
+    END AS fits
+    FROM current, unnest($2::text[], $3::bigint[], $4::bigint[]) AS delta(name, amount, cap)
+), updated AS (
+    UPDATE users SET {column} = (current.counts || (
+        SELECT jsonb_object_agg(name, COALESCE((current.counts ->> name)::bigint, 0) + fits)
+        FROM fitted
+    ))::json
+    FROM current
+    WHERE u_id = $1
+)
+SELECT name, amount - fits FROM fitted
+"""
+
+
+class UserTradelockedError(Exception):
+    """Raised when a TradeLock cannot be taken because a user is already tradelocked."""
+
+
+POKE_COLUMNS = (
+    "pokname",
+    "hpiv",
+    "atkiv",
+    "defiv",
+    "spatkiv",
+    "spdefiv",
+    "speediv",
+    "hpev",
+    "atkev",
+    "defev",
+    "spatkev",
+    "spdefev",
+    "speedev",
+    "pokelevel",
+    "moves",
+    "hitem",
+    "exp",
+    "nature",
+    "expcap",
+    "poknick",
+    "shiny",
+    "price",
+    "market_enlist",
+    "fav",
+    "ability_index",
+    "gender",
+    "caught_by",
+    "radiant",
+    "skin",
+)
+
+INSERT_POKE_QUERY = f"""
+INSERT INTO pokes ({", ".join(POKE_COLUMNS)})
+VALUES ({", ".join(f"${i}" for i in range(1, len(POKE_COLUMNS) + 1))}) RETURNING id
+"""
+
+
 class Pokemon:
     """Dataclass to hold information about a created pokemon."""
 
@@ -21,32 +110,403 @@ class Pokemon:
         self.iv_sum = iv_sum
         self.emoji = emoji
 
+    @classmethod
+    def from_values(cls, id, values):
+        """Builds a Pokemon from the column values returned by CommonDB.roll_poke."""
+        iv_sum = sum(
+            values[iv]
+            for iv in ("hpiv", "atkiv", "defiv", "spatkiv", "spdefiv", "speediv")
+        )
+        emoji = get_emoji(
+            shiny=values["shiny"], radiant=values["radiant"], skin=values["skin"]
+        )
+        return cls(id, values["gender"], iv_sum, emoji)
+
 
 class CommonDB:
     def __init__(self, bot):
         self.bot = bot
+        # Users whose pokes are known to be in the ownership table already, least recently used first
+        self._migrated = OrderedDict()
+        # Set once no user has a users.pokes array left, after which nobody is checked
+        self._backfilled = False
+        # Pokemon leaderboard changes made in each open transaction, sent once it commits
+        self._board_deltas = {}
+
+    # Ownership
+    #
+    # A user's pokemon live in the `ownership` table, one row per poke, numbered
+    # 1..N by `position` in the order they were obtained. Positions are the numbers
+    # users see, so they are kept dense: removing a poke shifts every later one down.
+    #
+    # `users.pokes` is the old int array. A user's array is moved into `ownership`
+    # the first time their pokemon are touched (or by the migrateownership command),
+    # after which it is left empty. Writers for a user are serialized on an advisory
+    # lock keyed by the user id, so a migration never races a catch or trade.
+    #
+    # Keeping positions dense makes removing a poke rewrite the position of every later
+    # one, so releasing an early poke from a huge collection costs O(collection size).
+    # Removing it from the old array was O(collection size) too, though cheaper per poke.
+
+    async def setup_ownership(self):
+        """Creates the ownership table if it does not exist yet."""
+        async with self.bot.db[0].acquire() as pconn:
+            await pconn.execute(OWNERSHIP_SCHEMA)
+        await self.check_backfilled()
+
+    async def check_backfilled(self) -> bool:
+        """Stops checking users for a pokes array to migrate once nobody has one left. Returns whether that is the case."""
+        if not self._backfilled:
+            async with self.bot.db[0].acquire() as pconn:
+                remaining = await pconn.fetchval(
+                    "SELECT EXISTS (SELECT 1 FROM users WHERE cardinality(pokes) > 0)"
+                )
+            if not remaining:
+                self._backfilled = True
+                self._migrated.clear()
+        return self._backfilled
+
+    def _is_migrated(self, user_id: int) -> bool:
+        if self._backfilled:
+            return True
+        if user_id in self._migrated:
+            self._migrated.move_to_end(user_id)
+            return True
+        return False
+
+    def _mark_migrated(self, user_id: int):
+        if self._backfilled:
+            return
+        self._migrated[user_id] = None
+        if len(self._migrated) > MIGRATED_CACHE_SIZE:
+            self._migrated.popitem(last=False)
+
+    async def _lock_owner(self, pconn, user_id: int):
+        """
+        Locks a user's pokemon until the current transaction ends.
+
+        Moves the user's `users.pokes` array into `ownership` if that has not happened yet.
+        """
+        await pconn.execute("SELECT pg_advisory_xact_lock($1)", user_id)
+        if self._is_migrated(user_id):
+            return
+        pokes = await pconn.fetchval(
+            "SELECT pokes FROM users WHERE u_id = $1 AND cardinality(pokes) > 0 FOR UPDATE",
+            user_id,
+        )
+        if pokes:
+            # Arrays can hold the same id twice, only the first one keeps its position.
+            await pconn.execute(
+                "INSERT INTO ownership (u_id, position, poke_id) "
+                "SELECT $1, COALESCE((SELECT max(position) FROM ownership WHERE u_id = $1), 0) "
+                "+ row_number() OVER (ORDER BY idx), poke_id "
+                "FROM unnest($2::bigint[]) WITH ORDINALITY AS moved(poke_id, idx) "
+                "WHERE NOT EXISTS (SELECT 1 FROM ownership WHERE ownership.poke_id = moved.poke_id)",
+                user_id,
+                list(dict.fromkeys(pokes)),
+            )
+            await pconn.execute(
+                "UPDATE users SET pokes = '{}' WHERE u_id = $1", user_id
+            )
+        else:
+            # Only cached once the array is seen empty, as the move above can still be rolled back
+            self._mark_migrated(user_id)
+
+    async def lock_owners(self, pconn, *user_ids: int):
+        """
+        Locks several users' pokemon until the current transaction ends, in u_id order.
+
+        Take these before locking the same users' rows, as every ownership writer does.
+        """
+        for user_id in sorted(set(user_ids)):
+            await self._lock_owner(pconn, user_id)
+
+    @contextlib.asynccontextmanager
+    async def transaction(self, pconn):
+        """
+        Starts a transaction on `pconn`, like pconn.transaction().
+
+        Use this instead when the transaction gives or takes pokes, so their pokemon
+        leaderboard changes are only sent once the outermost transaction commits.
+        A rollback then never leaves the board off until the next rebuild.
+        """
+        deltas = self._board_deltas.get(pconn)
+        if deltas is not None:
+            mark = len(deltas)
+            try:
+                async with pconn.transaction():
+                    yield pconn
+            except BaseException:
+                # Rolled back to the savepoint, along with everything counted since
+                del deltas[mark:]
+                raise
+            return
+        deltas = self._board_deltas[pconn] = []
+        try:
+            async with pconn.transaction():
+                yield pconn
+        finally:
+            del self._board_deltas[pconn]
+        totals = {}
+        for user_id, amount in deltas:
+            totals[user_id] = totals.get(user_id, 0) + amount
+        for user_id, amount in totals.items():
+            await self.bot.leaderboards.add("pokemon", user_id, amount)
+
+    @contextlib.asynccontextmanager
+    async def owner_transaction(self, user_id: int, pconn=None):
+        """Yields a connection in a transaction that holds `user_id`'s ownership lock."""
+        if pconn is None:
+            async with self.bot.db[0].acquire() as pconn:
+                async with self.transaction(pconn):
+                    await self._lock_owner(pconn, user_id)
+                    yield pconn
+        else:
+            async with self.transaction(pconn):
+                await self._lock_owner(pconn, user_id)
+                yield pconn
+
+    @contextlib.asynccontextmanager
+    async def ownership_conn(self, user_id: int, pconn=None):
+        """
+        Yields a connection to read `user_id`'s pokemon with, migrating them first if needed.
+
+        Use this to run queries that join on the ownership table directly.
+        """
+        if not self._is_migrated(user_id):
+            async with self.owner_transaction(user_id, pconn) as pconn:
+                yield pconn
+        elif pconn is None:
+            async with self.bot.db[0].acquire() as pconn:
+                yield pconn
+        else:
+            yield pconn
+
+    async def migrate_ownership(self, user_id: int):
+        """Moves a user's `users.pokes` array into the ownership table, if it has not been already."""
+        self._migrated.pop(user_id, None)
+        async with self.owner_transaction(user_id):
+            pass
+
+    async def append_pokes(self, user_id: int, poke_ids: List[int], *, pconn=None):
+        """Gives pokes to a user, after all of the pokes they already have."""
+        async with self.owner_transaction(user_id, pconn) as pconn:
+            await pconn.execute(
+                "INSERT INTO ownership (u_id, position, poke_id) "
+                "SELECT $1, COALESCE((SELECT max(position) FROM ownership WHERE u_id = $1), 0) + idx, poke_id "
+                "FROM unnest($2::bigint[]) WITH ORDINALITY AS added(poke_id, idx)",
+                user_id,
+                poke_ids,
+            )
+            self._board_deltas[pconn].append((user_id, len(poke_ids)))
+
+    async def append_poke(self, user_id: int, poke_id: int, *, pconn=None):
+        """Gives a poke to a user, as their newest poke."""
+        await self.append_pokes(user_id, [poke_id], pconn=pconn)
+
+    async def remove_pokes(
+        self, user_id: int, poke_ids: List[int], *, pconn=None
+    ) -> List[int]:
+        """
+        Takes pokes away from a user, shifting the positions of later pokes down to fill the gaps.
+
+        Returns the ids that were actually removed. This does not touch selected or party,
+        use remove_poke for that.
+        """
+        async with self.owner_transaction(user_id, pconn) as pconn:
+            removed = await pconn.fetch(
+                "DELETE FROM ownership WHERE u_id = $1 AND poke_id = ANY($2) "
+                "RETURNING position, poke_id",
+                user_id,
+                poke_ids,
+            )
+            if not removed:
+                return []
+            positions = [record["position"] for record in removed]
+            await pconn.execute(
+                "UPDATE ownership SET position = position - ("
+                "SELECT count(*) FROM unnest($2::integer[]) AS gaps(position) "
+                "WHERE gaps.position < ownership.position"
+                ") WHERE u_id = $1 AND position > $3",
+                user_id,
+                positions,
+                min(positions),
+            )
+            self._board_deltas[pconn].append((user_id, -len(removed)))
+        return [record["poke_id"] for record in removed]
+
+    async def poke_at(self, user_id: int, position: int, *, pconn=None) -> Optional[int]:
+        """Returns the id of the poke at a user's `position`, or None if there is none."""
+        async with self.ownership_conn(user_id, pconn) as pconn:
+            return await pconn.fetchval(
+                "SELECT poke_id FROM ownership WHERE u_id = $1 AND position = $2",
+                user_id,
+                position,
+            )
+
+    async def pokes_at(
+        self, user_id: int, positions: List[int], *, pconn=None
+    ) -> Dict[int, int]:
+        """Returns a {position: poke id} dict for each of `positions` the user has."""
+        async with self.ownership_conn(user_id, pconn) as pconn:
+            records = await pconn.fetch(
+                "SELECT position, poke_id FROM ownership WHERE u_id = $1 AND position = ANY($2)",
+                user_id,
+                positions,
+            )
+        return {record["position"]: record["poke_id"] for record in records}
+
+    async def latest_poke(
+        self, user_id: int, *, exclude_first: bool = False, pconn=None
+    ) -> Optional[int]:
+        """
+        Returns the id of a user's newest poke, or None if they have none.
+
+        If `exclude_first`, the poke at position 1 is never returned.
+        """
+        async with self.ownership_conn(user_id, pconn) as pconn:
+            return await pconn.fetchval(
+                "SELECT poke_id FROM ownership WHERE u_id = $1 AND position > $2 "
+                "ORDER BY position DESC LIMIT 1",
+                user_id,
+                1 if exclude_first else 0,
+            )
+
+    async def position_of(self, user_id: int, poke_id: int, *, pconn=None) -> Optional[int]:
+        """Returns the position of `poke_id` in a user's pokes, or None if they do not own it."""
+        async with self.ownership_conn(user_id, pconn) as pconn:
+            return await pconn.fetchval(
+                "SELECT position FROM ownership WHERE u_id = $1 AND poke_id = $2",
+                user_id,
+                poke_id,
+            )
+
+    async def positions_of(
+        self, user_id: int, poke_ids: List[int], *, pconn=None
+    ) -> Dict[int, int]:
+        """Returns a {poke id: position} dict for each of `poke_ids` the user owns."""
+        async with self.ownership_conn(user_id, pconn) as pconn:
+            records = await pconn.fetch(
+                "SELECT poke_id, position FROM ownership WHERE u_id = $1 AND poke_id = ANY($2)",
+                user_id,
+                poke_ids,
+            )
+        return {record["poke_id"]: record["position"] for record in records}
+
+    async def owned_pokes(
+        self, user_id: int, poke_ids: List[int], *, pconn=None
+    ) -> Set[int]:
+        """Returns the subset of `poke_ids` that the user owns."""
+        async with self.ownership_conn(user_id, pconn) as pconn:
+            records = await pconn.fetch(
+                "SELECT poke_id FROM ownership WHERE u_id = $1 AND poke_id = ANY($2)",
+                user_id,
+                poke_ids,
+            )
+        return {record["poke_id"] for record in records}
+
+    async def owned_names(
+        self, user_id: int, pokenames: List[str], *, radiant: bool = False, pconn=None
+    ) -> Set[str]:
+        """Returns the subset of `pokenames` the user owns at least one of, counting only radiants if `radiant`."""
+        async with self.ownership_conn(user_id, pconn) as pconn:
+            records = await pconn.fetch(
+                "SELECT DISTINCT pokes.pokname FROM ownership JOIN pokes ON pokes.id = ownership.poke_id "
+                "WHERE ownership.u_id = $1 AND pokes.pokname = ANY($2) AND (pokes.radiant OR NOT $3)",
+                user_id,
+                pokenames,
+                radiant,
+            )
+        return {record["pokname"] for record in records}
+
+    async def count_pokes(self, user_id: int, *, pconn=None) -> int:
+        """Returns how many pokes a user has."""
+        async with self.ownership_conn(user_id, pconn) as pconn:
+            count = await pconn.fetchval(
+                "SELECT max(position) FROM ownership WHERE u_id = $1", user_id
+            )
+        return count or 0
+
+    async def page_pokes(
+        self, user_id: int, start: int, count: int, *, pconn=None
+    ) -> List[int]:
+        """Returns the ids of up to `count` of a user's pokes, starting from position `start`."""
+        async with self.ownership_conn(user_id, pconn) as pconn:
+            records = await pconn.fetch(
+                "SELECT poke_id FROM ownership WHERE u_id = $1 AND position >= $2 "
+                "ORDER BY position LIMIT $3",
+                user_id,
+                start,
+                count,
+            )
+        return [record["poke_id"] for record in records]
+
+    async def user_pokes(self, user_id: int, *, pconn=None) -> List[int]:
+        """Returns the ids of all of a user's pokes, in position order."""
+        async with self.ownership_conn(user_id, pconn) as pconn:
+            records = await pconn.fetch(
+                "SELECT poke_id FROM ownership WHERE u_id = $1 ORDER BY position",
+                user_id,
+            )
+        return [record["poke_id"] for record in records]
+
+    # Pokes
+
+    async def get_pokes(
+        self,
+        poke_ids: Sequence[int],
+        columns: Union[str, Sequence[str]] = "all",
+        *,
+        pconn=None,
+    ) -> List[Optional[Poke]]:
+        """
+        Returns a Poke for each of `poke_ids`, in the same order, with one query.
+
+        `columns` is either the name of a projection in PROJECTIONS, or the pokes
+        columns to select. `id` is always selected. Ids that do not exist give None.
+        """
+        if isinstance(columns, str):
+            columns = PROJECTIONS[columns]
+        columns = tuple(columns)
+        if "id" not in columns:
+            columns = ("id",) + columns
+        unknown = set(columns).difference(POKE_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown pokes columns {', '.join(sorted(unknown))}")
+        if not poke_ids:
+            return []
+        query = f"SELECT {', '.join(columns)} FROM pokes WHERE id = ANY($1)"
+        if pconn is None:
+            async with self.bot.db[0].acquire() as pconn:
+                records = await pconn.fetch(query, list(poke_ids))
+        else:
+            records = await pconn.fetch(query, list(poke_ids))
+        by_id = {}
+        for record in records:
+            poke = Poke.from_record(record, columns)
+            by_id[poke.id] = poke
+        return [by_id.get(poke_id) for poke_id in poke_ids]
 
     async def remove_poke(self, user_id: int, poke_id: int, delete: bool = False):
         """
-        Helper func to remove a pokemon from a user's array.
+        Helper func to remove a pokemon from a user.
 
         This func handles de-selecting the pokemon and removing it from the user's party.
         """
-        async with self.bot.db[0].acquire() as pconn:
+        async with self.owner_transaction(user_id) as pconn:
             data = await pconn.fetchrow(
-                "SELECT pokes, selected, party FROM users WHERE u_id = $1", user_id
+                "SELECT selected, party FROM users WHERE u_id = $1", user_id
             )
             if data is None:
                 raise UserNotStartedError
-            pokes, selected, party = data
-            if poke_id not in pokes:
+            if not await self.remove_pokes(user_id, [poke_id], pconn=pconn):
                 return
+            selected, party = data
             selected = None if selected == poke_id else selected
             party = [0 if p == poke_id else p for p in party]
             await pconn.execute(
-                "UPDATE users SET pokes = array_remove(pokes, $2), selected = $3, party = $4 WHERE u_id = $1",
+                "UPDATE users SET selected = $2, party = $3 WHERE u_id = $1",
                 user_id,
-                poke_id,
                 selected,
                 party,
             )
@@ -57,6 +517,182 @@ class CommonDB:
                     "UPDATE pokes SET fav = false WHERE id = $1", poke_id
                 )
 
+    # Inventory
+    #
+    # `users.inventory` and `users.items` are json objects of item name -> count.
+    # Every change goes through update_user, which applies all of its deltas in one
+    # UPDATE with jsonb operators, so nothing is read into python first and two
+    # changes at once can never overwrite each other.
+
+    async def update_user(
+        self,
+        user_id: int,
+        *,
+        inventory: Dict[str, int] = None,
+        items: Dict[str, int] = None,
+        caps: Dict[str, int] = None,
+        pconn=None,
+        **counters: int,
+    ) -> bool:
+        """
+        Atomically applies deltas to a user's inventory, items, and integer columns such as mewcoins or redeems.
+
+        Either every delta is applied, or none are: returns False without changing anything
+        if a negative delta would take an item count or column below 0, or a positive delta
+        would take an item past its limit in `caps`.
+        Raises UserNotStartedError if the user has not started.
+
+        Usage:
+        await commondb.update_user(user_id, inventory={"rare chest": -1}, mewcoins=5000)
+        await commondb.update_user(user_id, inventory={"radiant gem": -5, "iv-multiplier": 1}, caps={"iv-multiplier": 50})
+        """
+        caps = caps or {}
+        args = [user_id]
+        sets = []
+        checks = []
+        for column, deltas in (("inventory", inventory), ("items", items)):
+            deltas = {name: delta for name, delta in (deltas or {}).items() if delta}
+            if not deltas:
+                continue
+            args.extend((list(deltas), list(deltas.values())))
+            delta_rows = f"unnest(${len(args) - 1}::text[], ${len(args)}::bigint[]) AS delta(name, amount)"
+            sets.append(
+                f"{column} = (COALESCE({column}::jsonb, '{{}}') || ("
+                f"SELECT jsonb_object_agg(name, COALESCE(({column}::jsonb ->> name)::bigint, 0) + amount) "
+                f"FROM {delta_rows}))::json"
+            )
+            # One plain comparison per bounded item, so a concurrent update rechecks them
+            # against the row it ends up updating
+            for name, delta in deltas.items():
+                if delta < 0:
+                    args.extend((name, delta))
+                    checks.append(
+                        f"COALESCE(({column}::jsonb ->> ${len(args) - 1}::text)::bigint, 0) "
+                        f"+ ${len(args)} >= 0"
+                    )
+                elif name in caps:
+                    args.extend((name, delta, caps[name]))
+                    checks.append(
+                        f"COALESCE(({column}::jsonb ->> ${len(args) - 2}::text)::bigint, 0) "
+                        f"+ ${len(args) - 1} <= ${len(args)}"
+                    )
+        for column, delta in counters.items():
+            if not column.isidentifier():
+                raise ValueError(f"{column!r} is not a users column")
+            if not delta:
+                continue
+            args.append(delta)
+            sets.append(f"{column} = {column} + ${len(args)}")
+            if delta < 0:
+                checks.append(f"{column} + ${len(args)} >= 0")
+
+        if sets:
+            query = (
+                f"WITH updated AS (UPDATE users SET {', '.join(sets)} "
+                f"WHERE {' AND '.join(['u_id = $1'] + checks)} RETURNING u_id) "
+                "SELECT EXISTS (SELECT 1 FROM updated), EXISTS (SELECT 1 FROM users WHERE u_id = $1)"
+            )
+        else:
+            query = "SELECT true, EXISTS (SELECT 1 FROM users WHERE u_id = $1)"
+        if pconn is None:
+            async with self.bot.db[0].acquire() as pconn:
+                applied, started = await pconn.fetchrow(query, *args)
+        else:
+            applied, started = await pconn.fetchrow(query, *args)
+        if not started:
+            raise UserNotStartedError
+        return applied
+
+    async def add_items(
+        self, user_id: int, deltas: Dict[str, int], *, column: str = "inventory", pconn=None
+    ) -> bool:
+        """
+        Adds to the count of each item in `deltas`, in a user's inventory (or items, with column="items").
+
+        Returns False without changing anything if a negative delta would take a count below 0.
+        """
+        if column not in ("inventory", "items"):
+            raise ValueError(f"{column!r} is not an item column")
+        return await self.update_user(user_id, pconn=pconn, **{column: deltas})
+
+    async def take_items(
+        self, user_id: int, amounts: Dict[str, int], *, column: str = "inventory", pconn=None
+    ) -> bool:
+        """
+        Takes `amounts` of each item from a user's inventory (or items, with column="items").
+
+        Returns False without taking anything if the user does not have enough of every item.
+        """
+        if column not in ("inventory", "items"):
+            raise ValueError(f"{column!r} is not an item column")
+        return await self.update_user(
+            user_id,
+            pconn=pconn,
+            **{column: {name: -amount for name, amount in amounts.items()}},
+        )
+
+    async def add_items_clamped(
+        self,
+        user_id: int,
+        deltas: Dict[str, int],
+        *,
+        caps: Dict[str, int] = None,
+        column: str = "inventory",
+        pconn=None,
+    ) -> Dict[str, int]:
+        """
+        Adds to item counts like add_items, but clamps instead of failing.
+
+        Counts stop at 0 on the way down and at their limit in `caps` on the way up,
+        in the same statement that reads them. Returns how much of each delta did not fit.
+        Raises UserNotStartedError if the user has not started.
+        """
+        if column not in ("inventory", "items"):
+            raise ValueError(f"{column!r} is not an item column")
+        deltas = {name: delta for name, delta in deltas.items() if delta}
+        if not deltas:
+            return {}
+        caps = caps or {}
+        query = CLAMPED_ITEMS_QUERY.format(column=column)
+        args = (
+            user_id,
+            list(deltas),
+            list(deltas.values()),
+            [caps.get(name) for name in deltas],
+        )
+        if pconn is None:
+            async with self.bot.db[0].acquire() as pconn:
+                rows = await pconn.fetch(query, *args)
+        else:
+            rows = await pconn.fetch(query, *args)
+        if not rows:
+            raise UserNotStartedError
+        return {name: left_over for name, left_over in rows if left_over}
+
+    async def item_counts(
+        self, user_id: int, names: Sequence[str], *, column: str = "inventory", pconn=None
+    ) -> Optional[Dict[str, int]]:
+        """
+        Returns the count of each of `names` in a user's inventory (or items, with column="items").
+
+        Only the asked for counts are read, not the whole object. Returns None if the user has not started.
+        """
+        if column not in ("inventory", "items"):
+            raise ValueError(f"{column!r} is not an item column")
+        query = (
+            f"SELECT ARRAY(SELECT COALESCE(({column}::jsonb ->> name)::bigint, 0) "
+            f"FROM unnest($2::text[]) WITH ORDINALITY AS asked(name, idx) ORDER BY idx) "
+            "FROM users WHERE u_id = $1"
+        )
+        if pconn is None:
+            async with self.bot.db[0].acquire() as pconn:
+                counts = await pconn.fetchval(query, user_id, list(names))
+        else:
+            counts = await pconn.fetchval(query, user_id, list(names))
+        if counts is None:
+            return None
+        return dict(zip(names, counts))
+
     async def shadow_hunt_check(self, user_id: int, pokemon: str):
         """
         Rolls for a shadow pokemon.
@@ -102,30 +738,63 @@ class CommonDB:
 
         Returns a Pokemon object if the poke was created, and None otherwise.
         """
-        form_info = await bot.db[1].forms.find_one({"identifier": pokemon.lower()})
-        pokemon_info = await bot.db[1].pfile.find_one({"id": form_info["pokemon_id"]})
-        try:
-            gender_rate = pokemon_info["gender_rate"]
-        except Exception:
-            bot.logger.warn(f'No Gender Rate for {pokemon_info["identifier"]}')
+        values = self.roll_poke(
+            bot,
+            user_id,
+            pokemon,
+            boosted=boosted,
+            radiant=radiant,
+            shiny=shiny,
+            skin=skin,
+            gender=gender,
+            level=level,
+        )
+        if values is None:
             return None
+        if not (values["shiny"] or values["radiant"] or values["skin"]):
+            override_with_shadow = await self.shadow_hunt_check(user_id, pokemon)
+            if override_with_shadow:
+                values["skin"] = "shadow"
+                await bot.get_partial_messageable(1005737655025291334).send(
+                    f"`{user_id} - {pokemon}`"
+                )
+        async with bot.db[0].acquire() as pconn:
+            pokeid = await pconn.fetchval(
+                INSERT_POKE_QUERY, *(values[column] for column in POKE_COLUMNS)
+            )
+            await self.append_poke(user_id, pokeid, pconn=pconn)
+        return Pokemon.from_values(pokeid, values)
 
-        ab_ids = (
-            await bot.db[1]
-            .poke_abilities.find({"pokemon_id": form_info["pokemon_id"]})
-            .to_list(length=3)
-        )
-        ab_ids = [doc["ability_id"] for doc in ab_ids]
+    def roll_poke(
+        self,
+        bot,
+        user_id: int,
+        pokemon: str,
+        *,
+        boosted: bool = False,
+        radiant: bool = False,
+        shiny: bool = False,
+        skin: str = None,
+        gender: str = None,
+        level: int = 1,
+    ) -> Optional[Dict]:
+        """
+        Rolls a new poke for user without writing anything.
+
+        Returns a dict with a value for every column in POKE_COLUMNS, or None if the poke can't be created.
+        Shadow hunts are not rolled here, since they need the user's hunt.
+        """
+        form_info = bot.dex.form(pokemon)
+        pokemon_info = bot.dex.species(form_info.pokemon_id)
+        if pokemon_info is None or pokemon_info.gender_rate is None:
+            bot.logger.warn(f"No Gender Rate for {pokemon}")
+            return None
+        gender_rate = pokemon_info.gender_rate
+
+        ab_ids = bot.dex.abilities_of(form_info.pokemon_id)[:3]
 
         min_iv = 12 if boosted else 1
         max_iv = 31 if boosted or random.randint(0, 1) else 29
-        hpiv = random.randint(min_iv, max_iv)
-        atkiv = random.randint(min_iv, max_iv)
-        defiv = random.randint(min_iv, max_iv)
-        spaiv = random.randint(min_iv, max_iv)
-        spdiv = random.randint(min_iv, max_iv)
-        speiv = random.randint(min_iv, max_iv)
-        nature = random.choice(natlist)
         if not gender:
             # Gender
             if "idoran-" in pokemon:
@@ -151,64 +820,38 @@ class CommonDB:
             skin = skin.lower()
         elif radiant:
             shiny = False
-        elif not shiny:
-            override_with_shadow = await self.shadow_hunt_check(user_id, pokemon)
-            if override_with_shadow:
-                skin = "shadow"
-                await bot.get_partial_messageable(1005737655025291334).send(
-                    f"`{user_id} - {pokemon}`"
-                )
-        emoji = get_emoji(
-            shiny=shiny,
-            radiant=radiant,
-            skin=skin,
-        )
-        query2 = """
-                INSERT INTO pokes (pokname, hpiv, atkiv, defiv, spatkiv, spdefiv, speediv, hpev, atkev, defev, spatkev, spdefev, speedev, pokelevel, moves, hitem, exp, nature, expcap, poknick, shiny, price, market_enlist, fav, ability_index, gender, caught_by, radiant, skin)
 
-                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18, $19, $20, $21, $22, $23, $24, $25, $26, $27, $28, $29) RETURNING id
-                """
-        args = (
-            pokemon.capitalize(),
-            hpiv,
-            atkiv,
-            defiv,
-            spaiv,
-            spdiv,
-            speiv,
-            0,
-            0,
-            0,
-            0,
-            0,
-            0,
-            level,
-            ["tackle", "tackle", "tackle", "tackle"],
-            "None",
-            1,
-            nature,
-            level**2,
-            "None",
-            shiny,
-            0,
-            False,
-            False,
-            random.randrange(len(ab_ids)),
-            gender,
-            user_id,
-            radiant,
-            skin,
-        )
-        async with bot.db[0].acquire() as pconn:
-            pokeid = await pconn.fetchval(query2, *args)
-            await pconn.execute(
-                "UPDATE users SET pokes = array_append(pokes, $2) WHERE u_id = $1",
-                user_id,
-                pokeid,
-            )
-        return Pokemon(
-            pokeid, gender, sum((hpiv, atkiv, defiv, spaiv, spdiv, speiv)), emoji
-        )
+        return {
+            "pokname": pokemon.capitalize(),
+            "hpiv": random.randint(min_iv, max_iv),
+            "atkiv": random.randint(min_iv, max_iv),
+            "defiv": random.randint(min_iv, max_iv),
+            "spatkiv": random.randint(min_iv, max_iv),
+            "spdefiv": random.randint(min_iv, max_iv),
+            "speediv": random.randint(min_iv, max_iv),
+            "hpev": 0,
+            "atkev": 0,
+            "defev": 0,
+            "spatkev": 0,
+            "spdefev": 0,
+            "speedev": 0,
+            "pokelevel": level,
+            "moves": ["tackle", "tackle", "tackle", "tackle"],
+            "hitem": "None",
+            "exp": 1,
+            "nature": random.choice(natlist),
+            "expcap": level**2,
+            "poknick": "None",
+            "shiny": shiny,
+            "price": 0,
+            "market_enlist": False,
+            "fav": False,
+            "ability_index": random.randrange(len(ab_ids)),
+            "gender": gender,
+            "caught_by": user_id,
+            "radiant": radiant,
+            "skin": skin,
+        }
 
     class TradeLock:
         """
@@ -220,20 +863,22 @@ class CommonDB:
 
         Any number of users can be passed after the bot param,
         and they will all be tradelocked for the entire duration of the context manager.
+        Raises UserTradelockedError on enter, without locking anyone, if any of them is already tradelocked.
         """
 
         def __init__(self, bot, *users: discord.User):
             self.bot = bot
             self.users = users
+            self.lease = None
 
         async def __aenter__(self):
-            for user in self.users:
-                await self.bot.redis_manager.redis.execute(
-                    "LPUSH", "tradelock", str(user.id)
-                )
+            self.lease = await self.bot.trade_locks.acquire(
+                *(user.id for user in self.users)
+            )
+            if self.lease is None:
+                raise UserTradelockedError
+            return self.lease
 
         async def __aexit__(self, exc_type, exc_value, traceback):
-            for user in self.users:
-                await self.bot.redis_manager.redis.execute(
-                    "LREM", "tradelock", "1", str(user.id)
-                )
+            await self.lease.release()
+
@@ -0,0 +1,529 @@
+import os
+from collections import defaultdict
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Mapping, Optional, Tuple
+
+import ujson
+
+# Mongo has no collection for these that is shipped with the data files,
+# the names match the ones DittoMisc.get_egg_emote knows how to render.
+EGG_GROUP_IDENTIFIERS = {
+    1: "monster",
+    2: "water1",
+    3: "bug",
+    4: "flying",
+    5: "field",
+    6: "fairy",
+    7: "grass",
+    8: "humanlike",
+    9: "water3",
+    10: "mineral",
+    11: "amorphous",
+    12: "water2",
+    13: "ditto",
+    14: "dragon",
+    15: "undiscovered",
+}
+
+# The 18 real types, custom types like shadow sit outside this range
+TYPE_IDS = range(1, 19)
+
+
+def _nullable(value):
+    """The csv dumps use "" for null, normalize those to None."""
+    return None if value == "" else value
+
+
+@dataclass(frozen=True)
+class Form:
+    id: int
+    identifier: str
+    form_identifier: str
+    pokemon_id: int
+    form_order: int
+    is_default: int
+    is_battle_only: int
+    is_mega: int
+
+    @classmethod
+    def from_raw(cls, raw):
+        return cls(
+            id=raw["id"],
+            identifier=raw["identifier"],
+            form_identifier=raw.get("form_identifier") or "",
+            pokemon_id=raw["pokemon_id"],
+            form_order=raw.get("form_order") or 1,
+            is_default=raw.get("is_default") or 0,
+            is_battle_only=raw.get("is_battle_only") or 0,
+            is_mega=raw.get("is_mega") or 0,
+        )
+
+
+@dataclass(frozen=True)
+class Species:
+    id: int
+    identifier: str
+    generation_id: int
+    evolves_from_species_id: Optional[int]
+    evolution_chain_id: int
+    gender_rate: int
+    capture_rate: int
+    base_happiness: int
+    is_baby: int
+    hatch_counter: int
+    growth_rate_id: int
+
+    @classmethod
+    def from_raw(cls, raw):
+        return cls(
+            id=raw["id"],
+            identifier=raw["identifier"],
+            generation_id=_nullable(raw.get("generation_id")),
+            evolves_from_species_id=_nullable(raw.get("evolves_from_species_id")),
+            evolution_chain_id=_nullable(raw.get("evolution_chain_id")),
+            gender_rate=raw.get("gender_rate"),
+            capture_rate=_nullable(raw.get("capture_rate")),
+            base_happiness=_nullable(raw.get("base_happiness")),
+            is_baby=raw.get("is_baby") or 0,
+            hatch_counter=_nullable(raw.get("hatch_counter")),
+            growth_rate_id=_nullable(raw.get("growth_rate_id")),
+        )
+
+
+@dataclass(frozen=True)
+class Move:
+    id: int
+    identifier: str
+    type_id: int
+    power: Optional[int]
+    pp: Optional[int]
+    accuracy: Optional[int]
+    priority: int
+    damage_class_id: int
+    effect_chance: Optional[int]
+
+    @classmethod
+    def from_raw(cls, raw):
+        return cls(
+            id=raw["id"],
+            identifier=raw["identifier"],
+            type_id=raw.get("type_id"),
+            power=_nullable(raw.get("power")),
+            pp=_nullable(raw.get("pp")),
+            accuracy=_nullable(raw.get("accuracy")),
+            priority=raw.get("priority") or 0,
+            damage_class_id=raw.get("damage_class_id"),
+            effect_chance=_nullable(raw.get("effect_chance")),
+        )
+
+
+@dataclass(frozen=True)
+class MoveMeta:
+    move_id: int
+    min_hits: Optional[int]
+    max_hits: Optional[int]
+    drain: int
+    healing: int
+    crit_rate: int
+    ailment_chance: int
+    flinch_chance: int
+    stat_chance: int
+
+    @classmethod
+    def from_raw(cls, raw):
+        return cls(
+            move_id=raw["move_id"],
+            min_hits=_nullable(raw.get("min_hits")),
+            max_hits=_nullable(raw.get("max_hits")),
+            drain=raw.get("drain") or 0,
+            healing=raw.get("healing") or 0,
+            crit_rate=raw.get("crit_rate") or 0,
+            ailment_chance=raw.get("ailment_chance") or 0,
+            flinch_chance=raw.get("flinch_chance") or 0,
+            stat_chance=raw.get("stat_chance") or 0,
+        )
+
+
+@dataclass(frozen=True)
+class Nature:
+    id: int
+    identifier: str
+    increased_stat_id: int
+    decreased_stat_id: int
+
+    @classmethod
+    def from_raw(cls, raw):
+        return cls(
+            id=raw["id"],
+            identifier=raw["identifier"],
+            increased_stat_id=raw["increased_stat_id"],
+            decreased_stat_id=raw["decreased_stat_id"],
+        )
+
+
+class Dex:
+    """
+    Immutable, in-process index of the static pokemon reference data.
+
+    Built once per cluster from the json files in shared/data, with the
+    reference collections in mongo layered on top (mongo holds the custom
+    forms and the evolution regions that are not shipped as files).
+    Every lookup afterwards is a dict access, nothing here touches a database.
+    """
+
+    def __init__(self, tables: dict):
+        forms = tables["forms"]
+        species = tables["species"]
+        ptypes = tables["ptypes"]
+        egg_groups = tables["egg_groups"]
+        abilities = tables["poke_abilities"]
+
+        self._forms: Mapping[str, Form] = MappingProxyType(forms)
+        self._species: Mapping[int, Species] = MappingProxyType(species)
+        self._species_by_identifier: Mapping[str, Species] = MappingProxyType(
+            {s.identifier: s for s in species.values()}
+        )
+        self._types: Mapping[int, str] = MappingProxyType(tables["types"])
+        self._type_ids: Mapping[str, int] = MappingProxyType(
+            {v: k for k, v in tables["types"].items()}
+        )
+        self._ptypes: Mapping[int, Tuple[int, ...]] = MappingProxyType(ptypes)
+        self._egg_groups: Mapping[int, Tuple[int, ...]] = MappingProxyType(egg_groups)
+        self._egg_group_names: Mapping[int, str] = MappingProxyType(
+            tables["egg_group_names"]
+        )
+        self._stats: Mapping[int, Tuple[int, ...]] = MappingProxyType(tables["stats"])
+        self._poke_abilities: Mapping[int, Tuple[int, ...]] = MappingProxyType(
+            abilities
+        )
+        self._abilities: Mapping[int, str] = MappingProxyType(tables["abilities"])
+        self._ability_ids: Mapping[str, int] = MappingProxyType(
+            {v: k for k, v in tables["abilities"].items()}
+        )
+        self._evolutions: Mapping[int, Mapping] = MappingProxyType(
+            {k: MappingProxyType(v) for k, v in tables["evolutions"].items()}
+        )
+        self._moves: Mapping[int, Move] = MappingProxyType(tables["moves"])
+        self._moves_by_identifier: Mapping[str, Move] = MappingProxyType(
+            {m.identifier: m for m in tables["moves"].values()}
+        )
+        self._move_meta: Mapping[int, MoveMeta] = MappingProxyType(tables["move_meta"])
+        self._type_chart: Mapping[Tuple[int, int], float] = MappingProxyType(
+            tables["type_chart"]
+        )
+        # type_matrix[attacker - 1][defender - 1], so a row is one attacking type
+        self._type_matrix: Tuple[Tuple[float, ...], ...] = tuple(
+            tuple(tables["type_chart"].get((attacker, defender), 1.0) for defender in TYPE_IDS)
+            for attacker in TYPE_IDS
+        )
+        self._items: Mapping[str, int] = MappingProxyType(tables["items"])
+        self._item_identifiers: Mapping[int, str] = MappingProxyType(
+            {v: k for k, v in tables["items"].items()}
+        )
+        self._natures: Mapping[str, Nature] = MappingProxyType(tables["natures"])
+        self._stat_types: Mapping[int, str] = MappingProxyType(tables["stat_types"])
+
+        forms_by_pokemon = defaultdict(list)
+        for form in forms.values():
+            forms_by_pokemon[form.pokemon_id].append(form)
+        self._forms_by_pokemon: Mapping[int, Tuple[Form, ...]] = MappingProxyType(
+            {k: tuple(v) for k, v in forms_by_pokemon.items()}
+        )
+
+        chains = defaultdict(list)
+        evolves_into = defaultdict(list)
+        for s in species.values():
+            chains[s.evolution_chain_id].append(s)
+            if s.evolves_from_species_id:
+                evolves_into[s.evolves_from_species_id].append(s)
+        # Babies first, matching the order evolve() has always walked the chain in
+        self._chains: Mapping[int, Tuple[Species, ...]] = MappingProxyType(
+            {
+                k: tuple(sorted(v, key=lambda s: s.is_baby, reverse=True))
+                for k, v in chains.items()
+            }
+        )
+        self._evolves_into: Mapping[int, Tuple[Species, ...]] = MappingProxyType(
+            {k: tuple(v) for k, v in evolves_into.items()}
+        )
+
+        by_type = defaultdict(set)
+        for pokemon_id, type_ids in ptypes.items():
+            for type_id in type_ids:
+                by_type[type_id].add(pokemon_id)
+        self._pokemon_by_type: Mapping[int, FrozenSet[int]] = MappingProxyType(
+            {k: frozenset(v) for k, v in by_type.items()}
+        )
+
+        # Status moves (damage class 1) never deal damage, so they are left out
+        damaging = defaultdict(list)
+        for move in tables["moves"].values():
+            if move.damage_class_id != 1:
+                damaging[move.type_id].append(move)
+        self._damaging_moves_by_type: Mapping[int, Tuple[Move, ...]] = MappingProxyType(
+            {k: tuple(v) for k, v in damaging.items()}
+        )
+
+        by_ability = defaultdict(set)
+        for pokemon_id, ability_ids in abilities.items():
+            for ability_id in ability_ids:
+                by_ability[ability_id].add(pokemon_id)
+        self._pokemon_by_ability: Mapping[int, FrozenSet[int]] = MappingProxyType(
+            {k: frozenset(v) for k, v in by_ability.items()}
+        )
+
+        by_egg_group = defaultdict(set)
+        for species_id, group_ids in egg_groups.items():
+            for group_id in group_ids:
+                by_egg_group[group_id].add(species_id)
+        self._species_by_egg_group: Mapping[int, FrozenSet[int]] = MappingProxyType(
+            {k: frozenset(v) for k, v in by_egg_group.items()}
+        )
+
+    # --- Construction ---
+
+    @staticmethod
+    def _tables_from_files(resources) -> dict:
+        def load(name):
+            with open(os.path.join(resources, name)) as f:
+                return ujson.load(f)
+
+        tables = {
+            "forms": {},
+            "species": {},
+            "types": {},
+            "ptypes": {},
+            "egg_groups": defaultdict(list),
+            "egg_group_names": dict(EGG_GROUP_IDENTIFIERS),
+            "stats": {},
+            "poke_abilities": defaultdict(list),
+            "abilities": {},
+            "evolutions": {},
+            "moves": {},
+            "move_meta": {},
+            "type_chart": {},
+            "items": {},
+            "natures": {},
+            "stat_types": {},
+        }
+        for raw in load("forms.json"):
+            tables["forms"][raw["identifier"]] = Form.from_raw(raw)
+        for raw in load("pokemonfile.json"):
+            tables["species"][raw["id"]] = Species.from_raw(raw)
+        for raw in load("types.json"):
+            tables["types"][raw["id"]] = raw["identifier"]
+        for pokemon_id, slots in load("ptypes.json").items():
+            tables["ptypes"][int(pokemon_id)] = tuple(
+                x["type_id"] for x in sorted(slots, key=lambda x: x["slot"])
+            )
+        for raw in load("egg_groups.json"):
+            tables["egg_groups"][raw["species_id"]].append(raw["egg_group_id"])
+        for pokemon_id, stats in load("statfile").items():
+            tables["stats"][int(pokemon_id)] = tuple(
+                x["base_stat"] for x in sorted(stats, key=lambda x: x["stat_id"])
+            )
+        for raw in load("pokemon_abilities.json"):
+            tables["poke_abilities"][raw["pokemon_id"]].append(raw["ability_id"])
+        for raw in load("abilities.json"):
+            tables["abilities"][raw["id"]] = raw["identifier"]
+        for raw in load("evofile.json"):
+            tables["evolutions"][raw["evolved_species_id"]] = {"region": None} | raw
+        for raw in load("moves.json"):
+            tables["moves"][raw["id"]] = Move.from_raw(raw)
+        for raw in load("move_meta.json"):
+            tables["move_meta"][raw["move_id"]] = MoveMeta.from_raw(raw)
+        for raw in load("tchart.json"):
+            tables["type_chart"][(raw["damage_type_id"], raw["target_type_id"])] = (
+                raw["damage_factor"] / 100
+            )
+        for raw in load("items.json"):
+            tables["items"][raw["identifier"]] = raw["id"]
+        for raw in load("natures.json"):
+            tables["natures"][raw["identifier"]] = Nature.from_raw(raw)
+        for raw in load("stat_types.json"):
+            tables["stat_types"][raw["id"]] = raw["identifier"]
+
+        tables["egg_groups"] = {k: tuple(v) for k, v in tables["egg_groups"].items()}
+        tables["poke_abilities"] = {
+            k: tuple(v) for k, v in tables["poke_abilities"].items()
+        }
+        return tables
+
+    @staticmethod
+    async def _overlay_mongo(tables: dict, mongo):
+        """Layers the mongo reference collections over the file tables, mongo wins on conflicts."""
+        async for raw in mongo.forms.find():
+            tables["forms"][raw["identifier"]] = Form.from_raw(raw)
+        async for raw in mongo.pfile.find():
+            tables["species"][raw["id"]] = Species.from_raw(raw)
+        async for raw in mongo.types.find():
+            tables["types"][raw["id"]] = raw["identifier"]
+        async for raw in mongo.ptypes.find():
+            tables["ptypes"][raw["id"]] = tuple(raw["types"])
+        async for raw in mongo.egg_groups.find():
+            tables["egg_groups"][raw["species_id"]] = tuple(raw["egg_groups"])
+        async for raw in mongo.egg_groups_info.find():
+            tables["egg_group_names"][raw["id"]] = raw["identifier"]
+        async for raw in mongo.pokemon_stats.find():
+            tables["stats"][raw["pokemon_id"]] = tuple(raw["stats"])
+        poke_abilities = defaultdict(list)
+        async for raw in mongo.poke_abilities.find():
+            poke_abilities[raw["pokemon_id"]].append(raw["ability_id"])
+        tables["poke_abilities"] |= {k: tuple(v) for k, v in poke_abilities.items()}
+        async for raw in mongo.abilities.find():
+            tables["abilities"][raw["id"]] = raw["identifier"]
+        async for raw in mongo.evofile.find():
+            raw.pop("_id", None)
+            tables["evolutions"][raw["evolved_species_id"]] = {"region": None} | raw
+        async for raw in mongo.moves.find():
+            tables["moves"][raw["id"]] = Move.from_raw(raw)
+        async for raw in mongo.type_effectiveness.find():
+            tables["type_chart"][(raw["damage_type_id"], raw["target_type_id"])] = (
+                raw["damage_factor"] / 100
+            )
+        async for raw in mongo.items.find():
+            tables["items"][raw["identifier"]] = raw["id"]
+        async for raw in mongo.natures.find():
+            tables["natures"][raw["identifier"]] = Nature.from_raw(raw)
+        async for raw in mongo.stat_types.find():
+            tables["stat_types"][raw["id"]] = raw["identifier"]
+
+    @classmethod
+    def from_files(cls, resources):
+        """Builds a Dex from the json files only."""
+        return cls(cls._tables_from_files(resources))
+
+    @classmethod
+    async def load(cls, resources, mongo=None):
+        """Builds a Dex from the json files, then the mongo collections if a db is given."""
+        tables = cls._tables_from_files(resources)
+        if mongo is not None:
+            await cls._overlay_mongo(tables, mongo)
+        return cls(tables)
+
+    # --- Forms & species ---
+
+    def form(self, identifier: str) -> Optional[Form]:
+        return self._forms.get(identifier.lower())
+
+    def all_forms(self) -> Tuple[Form, ...]:
+        return tuple(self._forms.values())
+
+    def forms_of(self, pokemon_id: int) -> Tuple[Form, ...]:
+        return self._forms_by_pokemon.get(pokemon_id, ())
+
+    def species(self, species_id: int) -> Optional[Species]:
+        return self._species.get(species_id)
+
+    def species_by_identifier(self, identifier: str) -> Optional[Species]:
+        return self._species_by_identifier.get(identifier.lower())
+
+    def evolution_chain(self, chain_id: int) -> Tuple[Species, ...]:
+        """Every species in an evolution chain, babies first."""
+        return self._chains.get(chain_id, ())
+
+    def evolves_into(self, species_id: int) -> Tuple[Species, ...]:
+        return self._evolves_into.get(species_id, ())
+
+    def evolution(self, evolved_species_id: int) -> Optional[Mapping]:
+        """The raw evofile requirements to evolve *into* the given species."""
+        return self._evolutions.get(evolved_species_id)
+
+    # --- Types ---
+
+    def types_of(self, pokemon_id: int) -> Tuple[int, ...]:
+        return self._ptypes.get(pokemon_id, ())
+
+    def type_identifier(self, type_id: int) -> Optional[str]:
+        return self._types.get(type_id)
+
+    def type_id(self, identifier: str) -> Optional[int]:
+        return self._type_ids.get(identifier.lower())
+
+    def pokemon_with_type(self, type_id: int) -> FrozenSet[int]:
+        return self._pokemon_by_type.get(type_id, frozenset())
+
+    def type_effectiveness(self, attacking_type_id: int, *defending_type_ids: int) -> float:
+        """The damage multiplier of an attacking type against one or more defending types."""
+        multiplier = 1.0
+        for type_id in defending_type_ids:
+            multiplier *= self._type_chart.get((attacking_type_id, type_id), 1.0)
+        return multiplier
+
+    def effectiveness_against(self, *defending_type_ids: int) -> Tuple[float, ...]:
+        """The multiplier of every type in TYPE_IDS against one or more defending types, in TYPE_IDS order."""
+        multipliers = [1.0] * len(TYPE_IDS)
+        for type_id in defending_type_ids:
+            if type_id not in TYPE_IDS:
+                continue
+            column = type_id - 1
+            for idx, row in enumerate(self._type_matrix):
+                multipliers[idx] *= row[column]
+        return tuple(multipliers)
+
+    # --- Egg groups ---
+
+    def egg_groups_of(self, species_id: int) -> Tuple[int, ...]:
+        return self._egg_groups.get(species_id, ())
+
+    def egg_group_identifier(self, egg_group_id: int) -> Optional[str]:
+        return self._egg_group_names.get(egg_group_id)
+
+    def species_in_egg_group(self, egg_group_id: int) -> FrozenSet[int]:
+        return self._species_by_egg_group.get(egg_group_id, frozenset())
+
+    # --- Stats, abilities, natures ---
+
+    def base_stats(self, pokemon_id: int) -> Optional[Tuple[int, ...]]:
+        """Base stats as (hp, atk, def, spatk, spdef, speed)."""
+        return self._stats.get(pokemon_id)
+
+    def abilities_of(self, pokemon_id: int) -> Tuple[int, ...]:
+        return self._poke_abilities.get(pokemon_id, ())
+
+    def ability_identifier(self, ability_id: int) -> Optional[str]:
+        return self._abilities.get(ability_id)
+
+    def ability_id(self, identifier: str) -> Optional[int]:
+        return self._ability_ids.get(identifier.lower())
+
+    def ability_identifiers(self) -> Tuple[str, ...]:
+        return tuple(self._ability_ids)
+
+    def pokemon_with_ability(self, ability_id: int) -> FrozenSet[int]:
+        return self._pokemon_by_ability.get(ability_id, frozenset())
+
+    def all_natures(self) -> Tuple[Nature, ...]:
+        return tuple(self._natures.values())
+
+    def nature(self, identifier: str) -> Optional[Nature]:
+        return self._natures.get(identifier.lower())
+
+    def stat_identifier(self, stat_id: int) -> Optional[str]:
+        return self._stat_types.get(stat_id)
+
+    # --- Moves & items ---
+
+    def move(self, move_id: int) -> Optional[Move]:
+        return self._moves.get(move_id)
+
+    def move_by_identifier(self, identifier: str) -> Optional[Move]:
+        return self._moves_by_identifier.get(identifier.lower())
+
+    def move_identifiers(self) -> Tuple[str, ...]:
+        return tuple(self._moves_by_identifier)
+
+    def damaging_moves_of_type(self, type_id: int) -> Tuple[Move, ...]:
+        """Every physical or special move of a type."""
+        return self._damaging_moves_by_type.get(type_id, ())
+
+    def move_meta(self, move_id: int) -> Optional[MoveMeta]:
+        return self._move_meta.get(move_id)
+
+    def item_id(self, identifier: str) -> Optional[int]:
+        return self._items.get(identifier.lower())
+
+    def item_identifier(self, item_id: int) -> Optional[str]:
+        return self._item_identifiers.get(item_id)
+
@@ -24,10 +24,23 @@ from utils.checks import OWNER_IDS, OWNER_ID_LIST
 from utils.misc import EnableCommandsView, get_prefix
 from motor.core import AgnosticClient
 from motor.motor_asyncio import AsyncIOMotorClient
+from pokemon_utils.evolution import EvolutionGraph
+from pokemon_utils.stats import StatEngine
 
+from dittocore.ban_registry import BanRegistry
 from dittocore.commondb import CommonDB
+from dittocore.dex import Dex
 from dittocore.dna_misc import DittoMisc
+from dittocore.guild_settings import GuildSettings
+from dittocore.leaderboards import Leaderboards
+from dittocore.loader import DittoContext
+from dittocore.message_ticks import MessageTicks
+from dittocore.mission_progress import MissionProgress
+from dittocore.rate_limits import RateLimits, fixed_window
 from dittocore.redis_handler import RedisHandler
+from dittocore.telemetry import Telemetry
+from dittocore.trade_locks import TradeLocks
+from dittocore.web import WebClient
 
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
@@ -68,11 +81,23 @@ class Ditto(commands.AutoShardedBot):
         )
         self.misc = DittoMisc(self)
         self.commondb = CommonDB(self)
+        self.guild_settings = GuildSettings(self)
+        self.bans = BanRegistry(self)
+        self.trade_locks = TradeLocks(self)
+        self.leaderboards = Leaderboards(self)
+        self.telemetry = Telemetry(self)
+        self.message_ticks = MessageTicks(self)
+        self.mission_progress = MissionProgress(self)
+        self.web = WebClient(self)
+        self.rate_limits = RateLimits(self)
         airbrake_handler = pybrake.LoggingHandler(notifier=notifier, level=logging.WARN)
         self.logger = logging.getLogger("dittobot")
         self.logger.addHandler(airbrake_handler)
         self.notifier = notifier
         self.db = [None, None, None]
+        self.dex = None
+        self.evolutions = None
+        self.stat_engine = None
         self.started_at = time.monotonic()
         self.pokemon_names = {}
         self.loaded_extensions = False
@@ -86,7 +111,7 @@ class Ditto(commands.AutoShardedBot):
         self.token = os.environ["MTOKEN"]
         self.will_restart = False
         self.app_directory = cluster_info["ad"]
-        self.command_cooldown = defaultdict(int)
+        self.command_cooldown = self.rate_limits.local("commands", fixed_window(1, 3))
         self.emote_server = None
         self.is_maintenance = False
         self.is_discord_issue = False
@@ -154,13 +179,12 @@ class Ditto(commands.AutoShardedBot):
         self.logger.info("Before identify hook fired.  Requesting gateway queue")
 
         try:
-            async with aiohttp.ClientSession() as session:
-                resp = await session.get("http://178.28.0.12:5000")
-                if resp.status != 200:
-                    self.logger.error(
-                        f"Gateway queue returned non-200 status code: {resp.status}"
-                    )
-        except aiohttp.ClientConnectionError:
+            resp = await self.web.get("http://178.28.0.12:5000", retries=0)
+            if resp.status != 200:
+                self.logger.error(
+                    f"Gateway queue returned non-200 status code: {resp.status}"
+                )
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
             self.logger.error("Gateway queue unreachable, please ensure it is running")
             if not initial:
                 await asyncio.sleep(5)
@@ -219,11 +243,9 @@ class Ditto(commands.AutoShardedBot):
             return False
 
         # Don't send commands where they are not supposed to work
-        channel_disabled = ctx.channel.id in self.disabled_channels
+        channel_disabled = ctx.channel.id in self.bans.channels
         # is_old_os = ctx.guild.id == 999953429751414784
-        botbanned = ctx.author.id in self.banned_users
-        serverbanned = ctx.guild.id in self.banned_guilds
-        if (botbanned or serverbanned) and ctx.author.id not in OWNER_IDS:
+        if self.bans.is_banned(ctx.author.id, ctx.guild.id) and ctx.author.id not in OWNER_IDS:
             await ctx.send("You are not allowed to use commands.", ephemeral=True)
             return False
         if channel_disabled and ctx.author.id not in OWNER_IDS:
@@ -247,19 +269,19 @@ class Ditto(commands.AutoShardedBot):
             return False
 
         # Cluster-wide command cooldown
-        if (
-            self.command_cooldown[ctx.author.id] + 3 > time.time()
-            and ctx.author.id not in OWNER_IDS
-        ):
+        if ctx.author.id not in OWNER_IDS and self.command_cooldown.hit(ctx.author.id):
             await ctx.send("You're using commands too fast!", ephemeral=True)
             return False
-        self.command_cooldown[ctx.author.id] = time.time()
 
         # Just in case
         await ctx.defer()
 
         return True
 
+    async def get_context(self, origin, /, *, cls=DittoContext):
+        # Every command gets ctx.loader, for loading the author and their selected poke once
+        return await super().get_context(origin, cls=cls)
+
     def are_clusters_ready(self):
         return self._clusters_ready.is_set()
 
@@ -286,6 +308,7 @@ class Ditto(commands.AutoShardedBot):
         self.logger.info("Initializing Cogs & DB Connection...")
         self.logger.info("Initializing JSK...")
         await self.load_jsk()
+        await self.web.start()
         self.db[0] = await asyncpg.create_pool(
             DATABASE_URL,
             min_size=10,
@@ -300,9 +323,23 @@ class Ditto(commands.AutoShardedBot):
         #    OXI_DATABASE_URL, min_size=2, max_size=10, command_timeout=10, init=self.init
         # )
         await self.redis_manager.start()
+        await self.commondb.setup_ownership()
+        self.leaderboards.start()
+        self.telemetry.start()
+        self.message_ticks.start()
+        self.mission_progress.start()
+        self.dex = await Dex.load(self.app_directory / "shared" / "data", self.db[1])
+        self.logger.info("Loaded dex.")
+        self.evolutions = EvolutionGraph(self.dex)
+        self.stat_engine = StatEngine(self.dex)
+        if self.evolutions.missing_evofiles:
+            self.logger.warning(
+                f"Evofiles do not exist for some pokes - {', '.join(self.evolutions.missing_evofiles)}"
+            )
         await self.load_guild_settings()
         # await self.load_extensions()
         await self.load_bans()
+        self.bans.start()
         self.logger.info("Initialization Completed!")
         return await super().setup_hook()
 
@@ -320,6 +357,19 @@ class Ditto(commands.AutoShardedBot):
         except:
             pass
 
+        # Apply the egg steps and exp still held in memory before the pool goes away
+        try:
+            await self.message_ticks.close()
+        except Exception:
+            self.logger.exception("Failed to flush message ticks")
+        try:
+            await self.mission_progress.close()
+        except Exception:
+            self.logger.exception("Failed to flush mission progress")
+
+        self.bans.close()
+        await self.web.close()
+
         if self.db[0]:
             await self.db[0].close()
         if self.db[2]:
@@ -375,33 +425,32 @@ class Ditto(commands.AutoShardedBot):
         users_tiers = []
         members = []
         RED = "{LARGE RED CIRCLE}"
-        async with aiohttp.ClientSession() as session:
-            # Loop through the pages returned from the API, stop at 25 to prevent an infinte loop
-            for _ in range(25):
-                async with session.get(api_url, headers=headers) as r:
-                    if r.status != 200:
-                        data = await r.text()
-                        self.logger.warning(
-                            f"Got a non 200 status code from the patreon API.{RED}\n\n{data}\n"
-                        )
-                        await self.get_partial_messageable(1005563356985442415).send(
-                            f"Got a `{r.status}` status code from the patreon API."
-                        )
-                        raise RuntimeError(
-                            "Got a non 200 status code from the patreon API."
-                        )
-                    data = await r.json()
-                # Two sets of data are returned from the API, "data" and "included".
-                # "data" is of type patreon.Member and allows us to check their patreon status and get their patreon.User.id.
-                # "included" is anything after "?include=" in the api url.
-                # Currently it includes the objects for any patreon.User and patreon.Tier that shows up in "data".
-                # Discord UIDs can be acquired from patreon.User and display names can be acquired from patreon.Tier
-                members += data["data"]
-                users_tiers += data["included"]
-                # If there are no more links, we have reached the last page, so break out
-                if "links" not in data:
-                    break
-                api_url = data["links"]["next"]
+        # Loop through the pages returned from the API, stop at 25 to prevent an infinte loop
+        for _ in range(25):
+            r = await self.web.get(api_url, headers=headers)
+            if r.status != 200:
+                data = r.text()
+                self.logger.warning(
+                    f"Got a non 200 status code from the patreon API.{RED}\n\n{data}\n"
+                )
+                await self.get_partial_messageable(1005563356985442415).send(
+                    f"Got a `{r.status}` status code from the patreon API."
+                )
+                raise RuntimeError(
+                    "Got a non 200 status code from the patreon API."
+                )
+            data = r.json()
+            # Two sets of data are returned from the API, "data" and "included".
+            # "data" is of type patreon.Member and allows us to check their patreon status and get their patreon.User.id.
+            # "included" is anything after "?include=" in the api url.
+            # Currently it includes the objects for any patreon.User and patreon.Tier that shows up in "data".
+            # Discord UIDs can be acquired from patreon.User and display names can be acquired from patreon.Tier
+            members += data["data"]
+            users_tiers += data["included"]
+            # If there are no more links, we have reached the last page, so break out
+            if "links" not in data:
+                break
+            api_url = data["links"]["next"]
 
         # Mapping of {patreon user id: patreon tier id}
         active_patrons = {}
@@ -481,26 +530,25 @@ class Ditto(commands.AutoShardedBot):
                         self.linecount += len(f.readlines())
 
     async def load_bans(self):
-        pipeline = [
-            {"$unwind": "$disabled_channels"},
-            {"$group": {"_id": None, "clrs": {"$push": "$disabled_channels"}}},
-            {"$project": {"_id": 0, "disabled_channels": "$clrs"}},
-        ]
-        async for doc in self.db[1].guilds.aggregate(pipeline):
-            self.disabled_channels = doc["disabled_channels"]
+        await self.bans.load()
 
-        self.banned_users = (await self.db[1].blacklist.find_one())["users"]
-        self.banned_guilds = (await self.db[1].blacklist.find_one())["guilds"]
+    @property
+    def banned_users(self):
+        return self.bans.users
+
+    @property
+    def banned_guilds(self):
+        return self.bans.guilds
 
+    @property
+    def disabled_channels(self):
+        return self.bans.channels
 
     def botbanned(self, id):
-        return id in self.banned_users  # and (id not in (790722073248661525))
+        return id in self.bans.users  # and (id not in (790722073248661525))
 
     async def load_guild_settings(self):
-        self.guild_settings = {}
-        cursor = self.mongo_pokemon_db.guilds.find()
-        async for document in cursor:
-            self.guild_settings[document.pop("id")] = document
+        await self.guild_settings.load()
 
     async def pubsub_request(self, target_shard="all", **kwargs):
         if self.db[2]:
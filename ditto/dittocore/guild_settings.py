@@ -0,0 +1,79 @@
+from uuid import uuid4
+
+import orjson
+
+
+class GuildSettings:
+    """
+    Write-through cache of the per-guild settings documents in mongo.
+
+    Every guild document is loaded once at startup. Reads never touch mongo,
+    writes go to mongo first, then to the local cache, and are then published
+    on the dittobot_clusters channel so every other cluster applies the same change.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._settings = {}
+
+    def __contains__(self, guild_id):
+        return guild_id in self._settings
+
+    def __getitem__(self, guild_id):
+        return self._settings[guild_id]
+
+    def __len__(self):
+        return len(self._settings)
+
+    def get(self, guild_id: int, default=None):
+        """Returns the settings dict for a guild, or default if it has none."""
+        return self._settings.get(guild_id, default)
+
+    async def load(self):
+        """(Re)loads every guild document from mongo."""
+        settings = {}
+        async for document in self.bot.db[1].guilds.find():
+            document.pop("_id", None)
+            settings[document.pop("id")] = document
+        self._settings = settings
+
+    def apply(self, guild_id: int, changes):
+        """
+        Applies a change to the local cache only.
+
+        `changes` is merged into the guild's settings, or drops the guild when None.
+        A new dict is stored each time, so callers holding an old one never see it change.
+        """
+        if changes is None:
+            self._settings.pop(guild_id, None)
+            return
+        self._settings[guild_id] = {**self._settings.get(guild_id, {}), **changes}
+
+    async def update(self, guild_id: int, changes: dict):
+        """Writes `changes` to mongo, the local cache, and every other cluster."""
+        await self.bot.mongo_update("guilds", {"id": guild_id}, changes)
+        self.apply(guild_id, changes)
+        await self._publish(guild_id, changes)
+
+    async def remove(self, guild_id: int):
+        """Deletes a guild's settings from mongo, the local cache, and every other cluster."""
+        await self.bot.db[1].guilds.delete_one({"id": guild_id})
+        self.apply(guild_id, None)
+        await self._publish(guild_id, None)
+
+    async def _publish(self, guild_id: int, changes):
+        if self.bot.db[2] is None:
+            return
+        payload = {
+            "scope": "bot",
+            "action": "guild_settings_update",
+            "command_id": str(uuid4()),
+            "args": {
+                "cluster_id": self.bot.cluster["id"],
+                "guild_id": guild_id,
+                "changes": changes,
+            },
+        }
+        await self.bot.db[2].execute(
+            "PUBLISH", "dittobot_clusters", orjson.dumps(payload)
+        )
@@ -0,0 +1,256 @@
+import asyncio
+import time
+from typing import List, Optional, Tuple
+
+# Users that never show up on any leaderboard, on top of every Developer.
+LEADERBOARD_IMMUNE_USERS = [
+    195938951188578304,  # gomp
+    3746,  # not a real user, just used to store pokes and such
+]
+
+# Vote streaks only count while the user has voted in this many seconds.
+VOTE_WINDOW = 36 * 60 * 60
+
+# Applies a score change unless the user is excluded from leaderboards.
+# ARGV is the user id, the amount, and "incr" to add the amount or "set" to replace the score.
+# While the board is being rebuilt (KEYS[3] exists), the change is also kept in KEYS[4]
+# (increments) or KEYS[5] (replaced scores), so the rebuilt board can replay it.
+UPDATE_SCRIPT = """
+if redis.call('SISMEMBER', KEYS[2], ARGV[1]) == 1 then
+    return nil
+end
+local rebuilding = redis.call('EXISTS', KEYS[3]) == 1
+if ARGV[3] == 'incr' then
+    if rebuilding then
+        redis.call('ZINCRBY', KEYS[4], ARGV[2], ARGV[1])
+    end
+    return redis.call('ZINCRBY', KEYS[1], ARGV[2], ARGV[1])
+end
+if rebuilding then
+    redis.call('ZADD', KEYS[5], ARGV[2], ARGV[1])
+end
+return redis.call('ZADD', KEYS[1], ARGV[2], ARGV[1])
+"""
+
+# Swaps a rebuilt board in, then replays the changes made while it was being built.
+# KEYS are the rebuilt board, the live board, the increments, the replaced scores and the
+# rebuild marker.
+SWAP_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('RENAME', KEYS[1], KEYS[2])
+else
+    redis.call('DEL', KEYS[2])
+end
+if redis.call('EXISTS', KEYS[3]) == 1 then
+    redis.call('ZUNIONSTORE', KEYS[2], 2, KEYS[2], KEYS[3])
+end
+local replaced = redis.call('ZRANGE', KEYS[4], 0, -1, 'WITHSCORES')
+for idx = 1, #replaced, 2 do
+    redis.call('ZADD', KEYS[2], replaced[idx + 1], replaced[idx])
+end
+redis.call('DEL', KEYS[3], KEYS[4], KEYS[5])
+"""
+
+# Queries that rebuild each board from scratch, as (u_id, score) rows
+REBUILD_QUERIES = {
+    "pokemon": (
+        "SELECT users.u_id, cardinality(pokes) + COALESCE(owned.count, 0) FROM users "
+        "LEFT JOIN (SELECT u_id, count(*) FROM ownership GROUP BY u_id) AS owned ON owned.u_id = users.u_id "
+        "WHERE cardinality(pokes) + COALESCE(owned.count, 0) > 0"
+    ),
+    "fishing": "SELECT u_id, fishing_exp FROM users WHERE fishing_exp > 0",
+    "vote": "SELECT u_id, vote_streak, last_vote FROM users WHERE last_vote >= $1",
+}
+
+
+def _key(board: str) -> str:
+    return f"leaderboard:{board}"
+
+
+def _rebuild_keys(board: str) -> Tuple[str, str, str, str]:
+    """The rebuilt board, its rebuild marker, and the increments and replaced scores made meanwhile."""
+    key = _key(board)
+    return f"{key}:rebuild", f"{key}:rebuilding", f"{key}:increments", f"{key}:replaced"
+
+
+EXCLUDED_KEY = "leaderboard:excluded"
+VOTE_EXPIRY_KEY = "leaderboard:vote:last_vote"
+REBUILD_LOCK_KEY = "leaderboard:rebuilding"
+# Stops changes being kept for replay if a rebuild dies without swapping its board in
+REBUILD_MARKER_TTL = 60 * 60
+
+
+class Leaderboards:
+    """
+    Leaderboards kept as redis sorted sets, one per board, scored by user id.
+
+    The paths that change a score update its set as they go, so reading a page or a
+    user's rank is O(log n) instead of sorting the users table. The sets are rebuilt
+    from postgres on a timer to correct any drift, e.g. from a transaction that
+    rolled back after its increment was sent.
+
+    Votes are recorded outside the bot, so the vote board only changes when it is
+    rebuilt, apart from streaks that run out being pruned as it is read.
+    """
+
+    BOARDS = tuple(REBUILD_QUERIES)
+
+    def __init__(self, bot, *, rebuild_every: int = 6 * 60 * 60, batch_size: int = 10000):
+        self.bot = bot
+        self.rebuild_every = rebuild_every
+        self.batch_size = batch_size
+
+    @property
+    def redis(self):
+        return self.bot.redis_manager.redis
+
+    def start(self):
+        asyncio.create_task(self._rebuild_forever())
+
+    async def _update(self, board: str, user_id: int, amount, mode: str):
+        if self.redis is None:
+            return
+        _, marker, increments, replaced = _rebuild_keys(board)
+        try:
+            await self.redis.execute(
+                "EVAL",
+                UPDATE_SCRIPT,
+                5,
+                _key(board),
+                EXCLUDED_KEY,
+                marker,
+                increments,
+                replaced,
+                user_id,
+                amount,
+                mode,
+            )
+        except Exception:
+            # A missed update is fixed by the next rebuild, it should never fail a command
+            self.bot.logger.exception(f"Failed to update the {board} leaderboard")
+
+    async def add(self, board: str, user_id: int, amount: int):
+        """Adds `amount` (which can be negative) to a user's score."""
+        if amount:
+            await self._update(board, user_id, amount, "incr")
+
+    async def set(self, board: str, user_id: int, score: int):
+        """Replaces a user's score."""
+        await self._update(board, user_id, score, "set")
+
+    async def _prune_votes(self):
+        """Drops every user whose vote streak has run out from the vote board."""
+        expired = await self.redis.execute(
+            "ZRANGEBYSCORE", VOTE_EXPIRY_KEY, "-inf", f"({time.time() - VOTE_WINDOW}"
+        )
+        if expired:
+            await self.redis.execute("ZREM", _key("vote"), *expired)
+            await self.redis.execute("ZREM", VOTE_EXPIRY_KEY, *expired)
+
+    async def count(self, board: str) -> int:
+        if board == "vote":
+            await self._prune_votes()
+        return await self.redis.execute("ZCARD", _key(board))
+
+    async def top(self, board: str, start: int, stop: int) -> List[Tuple[int, int]]:
+        """Returns (user id, score) for ranks `start` to `stop` (exclusive, 0-based), best first."""
+        if board == "vote":
+            await self._prune_votes()
+        flat = await self.redis.execute(
+            "ZREVRANGE", _key(board), start, stop - 1, "WITHSCORES"
+        )
+        return [
+            (int(flat[idx]), int(float(flat[idx + 1])))
+            for idx in range(0, len(flat), 2)
+        ]
+
+    async def rank(self, board: str, user_id: int) -> Optional[Tuple[int, int]]:
+        """Returns a user's (1-based rank, score), or None if they are not on the board."""
+        if board == "vote":
+            await self._prune_votes()
+        rank = await self.redis.execute("ZREVRANK", _key(board), user_id)
+        if rank is None:
+            return None
+        score = await self.redis.execute("ZSCORE", _key(board), user_id)
+        return rank + 1, int(float(score))
+
+    async def rebuild(self, board: str):
+        """
+        Recomputes a board from postgres, then swaps it in at once.
+
+        Changes made to the live board while the rebuild reads postgres are kept aside
+        and replayed onto the rebuilt board as it is swapped in, so none are dropped.
+        One made in the moment between the marker being set and postgres being read
+        can be counted twice, until the next rebuild.
+        """
+        tmp_key, marker, increments, replaced = _rebuild_keys(board)
+        tmp_expiry = f"{VOTE_EXPIRY_KEY}:rebuild"
+        tmp_excluded = f"{EXCLUDED_KEY}:rebuild"
+        await self.redis.execute("DEL", tmp_key, tmp_expiry, tmp_excluded, increments, replaced)
+        args = (time.time() - VOTE_WINDOW,) if board == "vote" else ()
+        async with self.bot.db[0].acquire() as pconn:
+            excluded = {
+                record["u_id"]
+                for record in await pconn.fetch(
+                    "SELECT u_id FROM users WHERE staff = 'Developer'"
+                )
+            }
+            excluded.update(LEADERBOARD_IMMUNE_USERS)
+            # Built aside and renamed over, so readers never see the set empty
+            await self.redis.execute("SADD", tmp_excluded, *excluded)
+            await self.redis.execute("RENAME", tmp_excluded, EXCLUDED_KEY)
+            await self.redis.execute("SET", marker, 1, "EX", REBUILD_MARKER_TTL)
+            try:
+                await self._read_board(pconn, board, args, excluded, tmp_key, tmp_expiry)
+            except BaseException:
+                await self.redis.execute("DEL", marker, increments, replaced, tmp_key, tmp_expiry)
+                raise
+        await self.redis.execute(
+            "EVAL", SWAP_SCRIPT, 5, tmp_key, _key(board), increments, replaced, marker
+        )
+        if board == "vote":
+            # Times left from the last rebuild are never newer than these, expired ones are pruned on read
+            await self.redis.execute(
+                "ZUNIONSTORE", VOTE_EXPIRY_KEY, 2, VOTE_EXPIRY_KEY, tmp_expiry, "AGGREGATE", "MAX"
+            )
+            await self.redis.execute("DEL", tmp_expiry)
+
+    async def _read_board(self, pconn, board: str, args, excluded, tmp_key: str, tmp_expiry: str):
+        """Copies a board's rows from postgres into the rebuild keys, a batch at a time."""
+        async with pconn.transaction():
+            cursor = await pconn.cursor(REBUILD_QUERIES[board], *args)
+            while True:
+                rows = await cursor.fetch(self.batch_size)
+                if not rows:
+                    break
+                rows = [row for row in rows if row[0] not in excluded]
+                if not rows:
+                    continue
+                members = []
+                for row in rows:
+                    members.extend((row[1], row[0]))
+                await self.redis.execute("ZADD", tmp_key, *members)
+                if board == "vote":
+                    expiries = []
+                    for row in rows:
+                        expiries.extend((row[2], row[0]))
+                    await self.redis.execute("ZADD", tmp_expiry, *expiries)
+
+    async def rebuild_all(self):
+        for board in self.BOARDS:
+            await self.rebuild(board)
+
+    async def _rebuild_forever(self):
+        """Rebuilds every board on a timer, on whichever cluster gets to it first."""
+        while True:
+            # The lock outlives the rebuild, so the other clusters skip this round
+            locked = await self.redis.execute(
+                "SET", REBUILD_LOCK_KEY, self.bot.cluster["id"], "NX", "EX", self.rebuild_every
+            )
+            if locked:
+                try:
+                    await self.rebuild_all()
+                except Exception:
+                    self.bot.logger.exception("Failed to rebuild the leaderboards")
+            await asyncio.sleep(self.rebuild_every)
+
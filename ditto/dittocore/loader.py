@@ -0,0 +1,102 @@
+import asyncio
+from functools import cached_property
+from typing import Dict, Optional, Set
+
+from discord.ext import commands
+
+# The users columns most commands check before touching their selected poke
+USER_COLUMNS = (
+    "u_id",
+    "selected",
+    "mewcoins",
+    "evpoints",
+    "items::json AS items",
+    "inventory::json AS inventory",
+)
+
+
+class SelectedLoader:
+    """
+    The invoking user's row and selected poke, loaded at most once per command.
+
+    The first call to `user` or `selected` runs one query that joins the user to
+    their selected poke, concurrent callers wait on that same query, and later
+    callers get the memoised rows. Pokes looked up by id in the same tick are
+    fetched together with one query. Call `invalidate` after writing to anything
+    that was loaded, so the next call reads it again.
+    """
+
+    def __init__(self, bot, user_id: int):
+        self.bot = bot
+        self.user_id = user_id
+        self._loading: Optional[asyncio.Future] = None
+        self._pokes: Dict[int, asyncio.Future] = {}
+        self._pending: Set[int] = set()
+
+    async def _load(self):
+        async with self.bot.db[0].acquire() as pconn:
+            row = await pconn.fetchrow(
+                f"SELECT {', '.join('users.' + column for column in USER_COLUMNS)}, pokes AS poke "
+                "FROM users LEFT JOIN pokes ON pokes.id = users.selected WHERE users.u_id = $1",
+                self.user_id,
+            )
+        if row is None:
+            return None, None
+        return row, row["poke"]
+
+    def _loaded(self) -> asyncio.Future:
+        if self._loading is None:
+            self._loading = asyncio.ensure_future(self._load())
+        return self._loading
+
+    async def user(self):
+        """The user's row with the USER_COLUMNS, or None if they have not started."""
+        return (await asyncio.shield(self._loaded()))[0]
+
+    async def selected(self):
+        """Every column of the user's selected poke, or None if they have none selected."""
+        return (await asyncio.shield(self._loaded()))[1]
+
+    async def poke(self, poke_id: int):
+        """Every column of a poke by id, or None if it does not exist."""
+        selected = await self.selected() if self._loading is not None else None
+        if selected is not None and selected["id"] == poke_id:
+            return selected
+        future = self._pokes.get(poke_id)
+        if future is None:
+            future = self._pokes[poke_id] = asyncio.get_running_loop().create_future()
+            if not self._pending:
+                asyncio.create_task(self._fetch_pending())
+            self._pending.add(poke_id)
+        return await asyncio.shield(future)
+
+    async def _fetch_pending(self):
+        # Let everything else running this tick ask for its pokes first
+        await asyncio.sleep(0)
+        poke_ids, self._pending = list(self._pending), set()
+        futures = [self._pokes[poke_id] for poke_id in poke_ids]
+        try:
+            async with self.bot.db[0].acquire() as pconn:
+                rows = await pconn.fetch("SELECT * FROM pokes WHERE id = ANY($1)", poke_ids)
+        except Exception as e:
+            for poke_id, future in zip(poke_ids, futures):
+                self._pokes.pop(poke_id, None)
+                if not future.done():
+                    future.set_exception(e)
+            return
+        by_id = {row["id"]: row for row in rows}
+        for poke_id, future in zip(poke_ids, futures):
+            if not future.done():
+                future.set_result(by_id.get(poke_id))
+
+    def invalidate(self, poke_id: int = None):
+        """Forgets the user and selected poke, and `poke_id` if given, so they are read again."""
+        self._loading = None
+        if poke_id is not None and poke_id not in self._pending:
+            self._pokes.pop(poke_id, None)
+
+
+class DittoContext(commands.Context):
+    @cached_property
+    def loader(self) -> SelectedLoader:
+        return SelectedLoader(self.bot, self.author.id)
@@ -0,0 +1,222 @@
+import asyncio
+import time
+from typing import Dict, List
+
+import asyncpg
+
+# Advances every user by their number of ticks in one statement, one row per tick.
+# party_counter, selected_counter and level_pokemon are database functions that each apply
+# a single message's worth of egg steps / exp, so they are run once per tick.
+# Users are stepped through in the order of $1, which the caller sorts, so their rows
+# are locked in u_id order.
+FLUSH_QUERY = """
+SELECT t.u_id, steps.hatched_party, steps.hatched, steps.leveled
+FROM unnest($1::bigint[], $2::int[]) AS t(u_id, ticks)
+CROSS JOIN LATERAL (
+    SELECT
+        party_counter(t.u_id) AS hatched_party,
+        selected_counter(t.u_id) AS hatched,
+        level_pokemon(t.u_id) AS leveled
+    FROM generate_series(1, t.ticks)
+) AS steps
+WHERE EXISTS (SELECT 1 FROM users WHERE users.u_id = t.u_id)
+"""
+
+
+class TickEvents:
+    """What a user's ticks did in one flush, along with where to announce it."""
+
+    def __init__(self, user_id: int, author, channel):
+        self.user_id = user_id
+        self.author = author
+        self.channel = channel
+        self.hatched_party: List[str] = []
+        self.hatched: List[str] = []
+        self.leveled: List[str] = []
+
+
+class MessageTicks:
+    """
+    Write-behind accumulator for the egg steps and exp users earn by chatting.
+
+    Messages only bump a per-user counter in memory. Every `interval` seconds the counters
+    are swapped out and queued, and a single statement applies the whole batch.
+    If the database falls behind and the queue is full, ticks stay in memory and are merged
+    into the next batch instead of piling up. A user never has more than `max_ticks` waiting,
+    anything past that is dropped, so a long outage can't turn into one huge statement.
+
+    If postgres rejects a batch, it is retried in halves until the users whose rows fail are
+    found, and only their ticks are dropped. Any other failure, like a lost connection, puts
+    the users that were not applied back for the next window.
+
+    Once a batch is applied, a `message_ticks` event is dispatched with the list of TickEvents
+    for the users that hatched or leveled something.
+    """
+
+    def __init__(
+        self,
+        bot,
+        *,
+        interval: int = 10,
+        batch_size: int = 5000,
+        max_pending: int = 4,
+        max_ticks: int = 12,
+    ):
+        self.bot = bot
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_ticks = max_ticks
+        self._ticks: Dict[int, int] = {}
+        self._sources: Dict[int, tuple] = {}
+        self._queue = asyncio.Queue(maxsize=max_pending)
+        self._tasks = []
+        self.flushes = 0
+        self.flushed_ticks = 0
+        self.deferred = 0
+        self.failures = 0
+        self.dropped_ticks = 0
+        self.dropped_users = 0
+        self.last_batch_size = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+
+    def start(self):
+        self._tasks = [
+            asyncio.create_task(self._collect_forever()),
+            asyncio.create_task(self._flush_forever()),
+        ]
+
+    def tick(self, message):
+        """Counts one message towards its author's next flush."""
+        user_id = message.author.id
+        self._add(user_id, 1)
+        self._sources[user_id] = (message.author, message.channel)
+
+    def _add(self, user_id: int, count: int):
+        total = self._ticks.get(user_id, 0) + count
+        if total > self.max_ticks:
+            self.dropped_ticks += total - self.max_ticks
+            total = self.max_ticks
+        self._ticks[user_id] = total
+
+    def _take_batches(self):
+        """Swaps out the pending ticks, split into batches of at most `batch_size` users."""
+        ticks, self._ticks = self._ticks, {}
+        sources, self._sources = self._sources, {}
+        items = list(ticks.items())
+        return [
+            (dict(items[idx : idx + self.batch_size]), sources)
+            for idx in range(0, len(items), self.batch_size)
+        ]
+
+    async def _collect_forever(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            if not self._ticks:
+                continue
+            if self._queue.full():
+                # Keep counting in memory, the next window picks these up
+                self.deferred += 1
+                continue
+            for batch in self._take_batches():
+                try:
+                    self._queue.put_nowait(batch)
+                except asyncio.QueueFull:
+                    self._restore(*batch)
+
+    def _restore(self, ticks, sources):
+        """Puts ticks that could not be queued or applied back into the accumulator."""
+        for user_id, count in ticks.items():
+            self._add(user_id, count)
+            self._sources.setdefault(user_id, sources[user_id])
+
+    async def _flush_forever(self):
+        while True:
+            batch = await self._queue.get()
+            if batch is None:
+                return
+            ticks, sources = batch
+            events = await self.flush(ticks, sources)
+            if events:
+                self.bot.dispatch("message_ticks", events)
+
+    async def flush(self, ticks: Dict[int, int], sources: Dict[int, tuple]) -> List[TickEvents]:
+        """Applies a batch of ticks, returns the TickEvents of users that hatched or leveled something."""
+        started = time.perf_counter()
+        rows = await self._apply(sorted(ticks), ticks, sources)
+        elapsed = (time.perf_counter() - started) * 1000
+        self.flushes += 1
+        self.last_batch_size = len(ticks)
+        self.last_flush_ms = elapsed
+        self.max_flush_ms = max(self.max_flush_ms, elapsed)
+
+        events = {}
+        for user_id, hatched_party, hatched, leveled in rows:
+            if not (hatched_party or hatched or leveled):
+                continue
+            if user_id not in events:
+                events[user_id] = TickEvents(user_id, *sources[user_id])
+            if hatched_party:
+                events[user_id].hatched_party.extend(hatched_party)
+            if hatched:
+                events[user_id].hatched.append(hatched)
+            if leveled:
+                events[user_id].leveled.append(leveled)
+        return list(events.values())
+
+    async def _apply(self, user_ids: List[int], ticks: Dict[int, int], sources: Dict[int, tuple]):
+        """
+        Runs FLUSH_QUERY for `user_ids`, and returns its rows.
+
+        The statement is all or nothing, so when postgres rejects it the users are retried
+        in halves, until the ones it fails for are on their own and can be dropped.
+        """
+        try:
+            async with self.bot.db[0].acquire() as pconn:
+                rows = await pconn.fetch(
+                    FLUSH_QUERY, user_ids, [ticks[user_id] for user_id in user_ids]
+                )
+            self.flushed_ticks += sum(ticks[user_id] for user_id in user_ids)
+            return rows
+        except asyncpg.PostgresError:
+            if len(user_ids) == 1:
+                self.dropped_users += 1
+                self.dropped_ticks += ticks[user_ids[0]]
+                self.bot.logger.exception(f"Dropped the message ticks of {user_ids[0]}")
+                return []
+        except Exception:
+            self.failures += 1
+            self.bot.logger.exception("Failed to flush message ticks")
+            self._restore({user_id: ticks[user_id] for user_id in user_ids}, sources)
+            return []
+        half = len(user_ids) // 2
+        return await self._apply(user_ids[:half], ticks, sources) + await self._apply(
+            user_ids[half:], ticks, sources
+        )
+
+    def stats(self) -> dict:
+        return {
+            "flushes": self.flushes,
+            "flushed_ticks": self.flushed_ticks,
+            "pending_users": len(self._ticks),
+            "queued_batches": self._queue.qsize(),
+            "deferred": self.deferred,
+            "failures": self.failures,
+            "dropped_ticks": self.dropped_ticks,
+            "dropped_users": self.dropped_users,
+            "last_batch_size": self.last_batch_size,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "max_flush_ms": round(self.max_flush_ms, 2),
+        }
+
+    async def close(self):
+        """Stops the timer and waits until everything still pending has been applied."""
+        if not self._tasks:
+            return
+        collector, flusher = self._tasks
+        self._tasks = []
+        collector.cancel()
+        for batch in self._take_batches():
+            await self._queue.put(batch)
+        await self._queue.put(None)
+        await flusher
@@ -0,0 +1,103 @@
+import asyncio
+from collections import defaultdict
+from typing import Dict
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+
+class MissionProgress:
+    """
+    Daily mission progress, stored as `progress.<key>` counters on mongo's `users` documents.
+
+    Increments are added up per user in memory and written every `interval` seconds with a
+    single unordered bulk_write of `$inc` upserts, so a burst of catches or messages costs one
+    round trip per flush instead of a read and a write per event.
+    """
+
+    def __init__(self, bot, *, interval: int = 5, max_pending: int = 10000):
+        self.bot = bot
+        self.interval = interval
+        self.max_pending = max_pending
+        self._pending: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._flushing = None
+        self._task = None
+
+    @property
+    def collection(self):
+        return self.bot.db[1].users
+
+    def start(self):
+        self._task = asyncio.create_task(self._flush_forever())
+
+    def increment(self, user_id: int, key: str, amount: int = 1):
+        """Adds `amount` to a user's progress on `key`, written on the next flush."""
+        if not amount:
+            return
+        self._pending[user_id][key] += amount
+        if len(self._pending) >= self.max_pending and self._flushing is None:
+            self._flushing = asyncio.create_task(self.flush())
+
+    async def _flush_forever(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    def _restore(self, pending):
+        for user_id, counts in pending:
+            for key, amount in counts.items():
+                self._pending[user_id][key] += amount
+
+    async def flush(self):
+        """Writes every pending increment. Increments that fail to write are kept for the next flush."""
+        try:
+            if not self._pending:
+                return
+            pending = list(self._pending.items())
+            self._pending = defaultdict(lambda: defaultdict(int))
+            requests = [
+                UpdateOne(
+                    {"user": user_id},
+                    {"$inc": {f"progress.{key}": amount for key, amount in counts.items()}},
+                    upsert=True,
+                )
+                for user_id, counts in pending
+            ]
+            try:
+                await self.collection.bulk_write(requests, ordered=False)
+            except BulkWriteError as e:
+                # The write is unordered, so every request that is not listed as failed was applied
+                failed = {error["index"] for error in e.details.get("writeErrors", ())}
+                self.bot.logger.error(
+                    f"Failed to flush mission progress for {len(failed)} of {len(requests)} users"
+                )
+                self._restore(pending[idx] for idx in sorted(failed))
+            except Exception:
+                self.bot.logger.exception("Failed to flush mission progress")
+                self._restore(pending)
+        finally:
+            self._flushing = None
+
+    async def get(self, user_id: int) -> Dict[str, int]:
+        """Returns a user's progress, including increments that have not been flushed yet."""
+        user = await self.collection.find_one({"user": user_id}, {"progress": 1})
+        progress = dict((user or {}).get("progress", {}))
+        for key, amount in self._pending.get(user_id, {}).items():
+            progress[key] = progress.get(key, 0) + amount
+        return progress
+
+    async def claim(self, user_id: int) -> bool:
+        """Marks today's rewards as collected. Returns False if they already were."""
+        if user_id in self._pending:
+            await self.flush()
+        result = await self.collection.update_one(
+            {"user": user_id, "progress.collected": {"$ne": True}},
+            {"$set": {"progress.collected": True}},
+        )
+        return bool(result.modified_count)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
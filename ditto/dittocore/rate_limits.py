@@ -0,0 +1,251 @@
+import heapq
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Tuple
+
+FIXED = "fixed"
+SLIDING = "sliding"
+BUCKET = "bucket"
+
+
+@dataclass(frozen=True)
+class Policy:
+    """
+    How many hits a key gets and how fast they come back.
+
+    - fixed: `limit` hits, then nothing until `per` seconds after the first of them
+    - sliding: at most `limit` hits in any `per` seconds
+    - bucket: a bucket of `limit` tokens, refilled evenly over `per` seconds
+    """
+
+    kind: str
+    limit: int
+    per: float
+
+    def __post_init__(self):
+        if self.kind not in (FIXED, SLIDING, BUCKET):
+            raise ValueError(f"Unknown rate limit kind {self.kind!r}")
+
+
+def fixed_window(limit: int, per: float) -> Policy:
+    return Policy(FIXED, limit, per)
+
+
+def sliding_window(limit: int, per: float) -> Policy:
+    return Policy(SLIDING, limit, per)
+
+
+def token_bucket(limit: int, per: float) -> Policy:
+    return Policy(BUCKET, limit, per)
+
+
+class Counters:
+    def __init__(self):
+        self.hits = 0
+        self.rejections = 0
+        self.evictions = 0
+
+
+class Limiter:
+    """
+    A rate limit per key, kept in this process.
+
+    Each key's state is dropped once it no longer limits anything, using a heap of
+    expiry times that is drained on every call, so the table only holds keys that
+    were hit recently instead of every user or guild ever seen.
+    """
+
+    def __init__(self, name: str, policy: Policy, *, clock=time.monotonic):
+        self.name = name
+        self.policy = policy
+        self.clock = clock
+        self.counters = Counters()
+        # key -> (expires at, state)
+        self._entries: Dict[Hashable, Tuple[float, object]] = {}
+        # (expires at, key), stale pairs are skipped when popped
+        self._expiry: List[Tuple[float, Hashable]] = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _evict(self, now: float):
+        expiry = self._expiry
+        entries = self._entries
+        while expiry and expiry[0][0] <= now:
+            expires_at, key = heapq.heappop(expiry)
+            entry = entries.get(key)
+            if entry is not None and entry[0] == expires_at:
+                del entries[key]
+                self.counters.evictions += 1
+
+    def _store(self, key, expires_at: float, state):
+        self._entries[key] = (expires_at, state)
+        heapq.heappush(self._expiry, (expires_at, key))
+
+    def _retry_after(self, key, now: float) -> float:
+        entry = self._entries.get(key)
+        if entry is None:
+            return 0.0
+        expires_at, state = entry
+        policy = self.policy
+        if policy.kind == FIXED:
+            return expires_at - now if state >= policy.limit else 0.0
+        if policy.kind == SLIDING:
+            return state[0] + policy.per - now if len(state) >= policy.limit else 0.0
+        tokens, updated = state
+        tokens = min(policy.limit, tokens + (now - updated) * policy.limit / policy.per)
+        return (1 - tokens) * policy.per / policy.limit if tokens < 1 else 0.0
+
+    def retry_after(self, key) -> float:
+        """Seconds until "key" may be hit again, 0 if it may be hit now. Does not count as a hit."""
+        now = self.clock()
+        self._evict(now)
+        return self._retry_after(key, now)
+
+    def hit(self, key) -> float:
+        """
+        Records a hit on "key" if the policy allows it, and returns 0.
+
+        Otherwise nothing is recorded, and the seconds until a hit would be allowed are returned.
+        """
+        now = self.clock()
+        self._evict(now)
+        retry_after = self._retry_after(key, now)
+        if retry_after > 0:
+            self.counters.rejections += 1
+            return retry_after
+        self.counters.hits += 1
+        policy = self.policy
+        entry = self._entries.get(key)
+        if policy.kind == FIXED:
+            if entry is None:
+                self._store(key, now + policy.per, 1)
+            else:
+                self._entries[key] = (entry[0], entry[1] + 1)
+        elif policy.kind == SLIDING:
+            stamps = deque() if entry is None else entry[1]
+            while stamps and stamps[0] <= now - policy.per:
+                stamps.popleft()
+            stamps.append(now)
+            # The key is forgotten once its newest hit leaves the window
+            self._store(key, now + policy.per, stamps)
+        else:
+            tokens = policy.limit
+            if entry is not None:
+                tokens, updated = entry[1]
+                tokens = min(policy.limit, tokens + (now - updated) * policy.limit / policy.per)
+            tokens -= 1
+            # The key is forgotten once its bucket is full again
+            self._store(key, now + (policy.limit - tokens) * policy.per / policy.limit, (tokens, now))
+        return 0.0
+
+    def reset(self, key):
+        """Forgets every hit on "key"."""
+        self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "local",
+            "hits": self.counters.hits,
+            "rejections": self.counters.rejections,
+            "evictions": self.counters.evictions,
+            "size": len(self._entries),
+        }
+
+
+# Returns 0 for an allowed hit, or the milliseconds left in the window
+_FIXED_WINDOW_SCRIPT = """
+local hits = redis.call('INCR', KEYS[1])
+if hits == 1 then
+    redis.call('PEXPIRE', KEYS[1], ARGV[1])
+end
+if hits > tonumber(ARGV[2]) then
+    redis.call('DECR', KEYS[1])
+    return math.max(redis.call('PTTL', KEYS[1]), 1)
+end
+return 0
+"""
+
+
+class RedisLimiter:
+    """
+    A fixed window rate limit per key, shared by every cluster.
+
+    Each key is one redis counter that expires with its window, so redis never
+    holds more than the keys hit in the last `per` seconds.
+    """
+
+    def __init__(self, bot, name: str, policy: Policy):
+        if policy.kind != FIXED:
+            raise ValueError("Only fixed window limits can be kept in redis")
+        self.bot = bot
+        self.name = name
+        self.policy = policy
+        self.counters = Counters()
+
+    @property
+    def redis(self):
+        return self.bot.redis_manager.redis
+
+    def _key(self, key) -> str:
+        return f"ratelimit:{self.name}:{key}"
+
+    async def retry_after(self, key) -> float:
+        """Seconds until "key" may be hit again, 0 if it may be hit now. Does not count as a hit."""
+        hits = await self.redis.execute("GET", self._key(key))
+        ttl = await self.redis.execute("PTTL", self._key(key))
+        if hits is None or int(hits) < self.policy.limit or ttl <= 0:
+            return 0.0
+        return ttl / 1000
+
+    async def hit(self, key) -> float:
+        """Like `Limiter.hit`, across every cluster."""
+        retry_after = await self.redis.execute(
+            "EVAL",
+            _FIXED_WINDOW_SCRIPT,
+            1,
+            self._key(key),
+            int(self.policy.per * 1000),
+            self.policy.limit,
+        )
+        if retry_after:
+            self.counters.rejections += 1
+            return retry_after / 1000
+        self.counters.hits += 1
+        return 0.0
+
+    async def reset(self, key):
+        await self.redis.execute("DEL", self._key(key))
+
+    def stats(self) -> dict:
+        return {
+            "backend": "redis",
+            "hits": self.counters.hits,
+            "rejections": self.counters.rejections,
+        }
+
+
+class RateLimits:
+    """Every rate limit the bot uses, by name, so their counters can be exported together."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._limiters = {}
+
+    def local(self, name: str, policy: Policy) -> Limiter:
+        """The in-process limiter called "name", created on first use."""
+        limiter = self._limiters.get(name)
+        if limiter is None:
+            limiter = self._limiters[name] = Limiter(name, policy)
+        return limiter
+
+    def shared(self, name: str, policy: Policy) -> RedisLimiter:
+        """The limiter called "name" that every cluster shares, created on first use."""
+        limiter = self._limiters.get(name)
+        if limiter is None:
+            limiter = self._limiters[name] = RedisLimiter(self.bot, name, policy)
+        return limiter
+
+    def stats(self) -> dict:
+        return {name: limiter.stats() for name, limiter in self._limiters.items()}
@@ -11,48 +11,90 @@ from uuid import uuid4
 import aiohttp
 import discord
 import orjson
-from async_timeout import timeout
 from discord.ext import commands
 
 
+CLUSTER_CHANNEL = "dittobot_clusters"
+
+
+def reply_channel(cluster_id) -> str:
+    """The channel that replies to commands sent by a cluster are published on."""
+    return f"dittobot_replies:{cluster_id}"
+
+
 class RedisHandler:
-    """Class to receive events from Redis and manage other notifications"""
+    """
+    Class to receive events from Redis and manage other notifications
+
+    Commands are broadcast on dittobot_clusters with the sender's reply channel attached.
+    Each action's return value is published back on that channel only, so replies
+    never reach (and are never decoded by) the clusters that did not ask for them.
+    """
 
     def __init__(self, bot):
         self.bot = bot
         self.cluster = bot.cluster
         self.logger = bot.logger
         self.redis = None
+        self.reply_channel = reply_channel(self.cluster["id"])
 
-        self._messages = {}
+        # command_id -> (future, replies so far, expected_count)
+        self._pending = {}
 
     async def start(self):
         self.redis = self.bot.db[2]
+        # Subscribe before anything is sent, so no early reply is missed
+        await self.redis.execute_pubsub("SUBSCRIBE", CLUSTER_CHANNEL, self.reply_channel)
         asyncio.create_task(self.cluster_handler())
+        asyncio.create_task(self.reply_handler())
 
-    async def cluster_handler(self):
-        await self.redis.execute_pubsub("SUBSCRIBE", "dittobot_clusters")
-        channel = self.redis.pubsub_channels[b"dittobot_clusters"]
-
+    async def _messages(self, channel_name: str):
+        channel = self.redis.pubsub_channels[channel_name.encode()]
         while await channel.wait_message():
             try:
-                payload = await channel.get_json(encoding="utf-8")
+                yield orjson.loads(await channel.get())
             except orjson.JSONDecodeError:
                 continue  # not a valid JSON message
 
+    async def cluster_handler(self):
+        async for payload in self._messages(CLUSTER_CHANNEL):
             if payload.get("scope") != "bot":
                 continue
 
             if payload.get("action") and hasattr(self, payload.get("action")):
-                args = payload.get("args", {})
-                asyncio.create_task(
-                    getattr(self, payload["action"])(
-                        args, command_id=payload["command_id"]
-                    )
-                )
+                asyncio.create_task(self._run_action(payload))
+
+            # Replies from senders that predate reply channels
+            if payload.get("output"):
+                self._resolve(payload)
 
-            if payload.get("output") and payload["command_id"] in self._messages:
-                self._messages[payload["command_id"]].append(payload["output"])
+    async def reply_handler(self):
+        async for payload in self._messages(self.reply_channel):
+            if payload.get("output"):
+                self._resolve(payload)
+
+    async def _run_action(self, payload):
+        try:
+            output = await getattr(self, payload["action"])(
+                payload.get("args", {}), command_id=payload["command_id"]
+            )
+            if output is None:
+                return
+            reply = {"output": output, "command_id": payload["command_id"], "scope": "bot"}
+            await self.redis.execute(
+                "PUBLISH", payload.get("reply_to", CLUSTER_CHANNEL), orjson.dumps(reply)
+            )
+        except Exception:
+            self.logger.error(f"Exception in redis action {payload['action']}", exc_info=True)
+
+    def _resolve(self, payload):
+        pending = self._pending.get(payload.get("command_id"))
+        if pending is None:
+            return
+        future, replies, expected_count = pending
+        replies.append(payload["output"])
+        if len(replies) >= expected_count and not future.done():
+            future.set_result(replies)
 
     async def handler(
         self,
@@ -62,22 +104,33 @@ class RedisHandler:
         _timeout: int = 2,
         scope: str = "bot",
     ):
-        if args is None:
-            args = {}
+        """
+        Sends a command to every cluster (or the launcher) and gathers the replies.
+
+        Returns as soon as `expected_count` replies arrive, or with whatever arrived after `_timeout` seconds.
+        """
         command_id = str(uuid4())
-        self._messages[command_id] = []
+        future = asyncio.get_running_loop().create_future()
+        replies = []
+        self._pending[command_id] = (future, replies, expected_count)
 
-        payload = {"scope": scope, "action": action, "command_id": command_id}
+        payload = {
+            "scope": scope,
+            "action": action,
+            "command_id": command_id,
+            "reply_to": self.reply_channel,
+        }
         if args:
             payload["args"] = args
 
-        await self.redis.execute("PUBLISH", "dittobot_clusters", orjson.dumps(payload))
-
-        with suppress(asyncio.TimeoutError):
-            async with timeout(_timeout):
-                while len(self._messages[command_id]) < expected_count:
-                    await asyncio.sleep(0.1)
-        return self._messages.pop(command_id, None)
+        try:
+            await self.redis.execute("PUBLISH", CLUSTER_CHANNEL, orjson.dumps(payload))
+            if expected_count > 0:
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(future, _timeout)
+        finally:
+            self._pending.pop(command_id, None)
+        return replies
 
     async def shutdown(self, args, *, command_id):
         if args.get("cluster_id") == self.cluster["id"]:
@@ -103,23 +156,15 @@ class RedisHandler:
                 channels += len(g.channels)
                 users += g.member_count or 0
 
-            payload = {
-                "output": {
-                    "id": self.cluster["id"],
-                    "name": f"{self.cluster['name']}",
-                    "latency": latency,
-                    "guilds": guilds,
-                    "channels": channels,
-                    "users": users,
-                    "shards": self.cluster["shards"],
-                },
-                "command_id": command_id,
-                "scope": "bot",
+            return {
+                "id": self.cluster["id"],
+                "name": f"{self.cluster['name']}",
+                "latency": latency,
+                "guilds": guilds,
+                "channels": channels,
+                "users": users,
+                "shards": self.cluster["shards"],
             }
-
-            await self.redis.execute(
-                "PUBLISH", "dittobot_clusters", orjson.dumps(payload)
-            )
         except Exception as e:
             self.logger.error("Exception in send_cluster_info", exc_info=True)
 
@@ -145,18 +190,11 @@ class RedisHandler:
                 shard_groups[str(g.shard_id)]["channels"] += len(g.channels)
                 shard_groups[str(g.shard_id)]["users"] += g.member_count or 0
 
-            payload = {
-                "output": {
-                    "id": self.cluster["id"],
-                    "name": self.cluster["name"],
-                    "shards": shard_groups,
-                },
-                "command_id": command_id,
-                "scope": "bot",
+            return {
+                "id": self.cluster["id"],
+                "name": self.cluster["name"],
+                "shards": shard_groups,
             }
-            await self.redis.execute(
-                "PUBLISH", "dittobot_clusters", orjson.dumps(payload)
-            )
         except Exception as e:
             self.logger.error("Exception in send_shard_inf", exc_info=True)
 
@@ -174,15 +212,8 @@ class RedisHandler:
                 else:
                     output[cog] = {"success": True, "message": ""}
             if "silent" in args and args["silent"]:
-                return output
-            payload = {
-                "output": {"cluster_id": self.cluster["id"], "cogs": output},
-                "command_id": command_id,
-                "scope": "bot",
-            }
-            await self.redis.execute(
-                "PUBLISH", "dittobot_clusters", orjson.dumps(payload)
-            )
+                return None
+            return {"cluster_id": self.cluster["id"], "cogs": output}
         except Exception as e:
             self.logger.error("Exception in redis load", exc_info=True)
             return {}
@@ -201,15 +232,8 @@ class RedisHandler:
                 else:
                     output[cog] = {"success": True, "message": ""}
             if "silent" in args and args["silent"]:
-                return output
-            payload = {
-                "output": {"cluster_id": self.cluster["id"], "cogs": output},
-                "command_id": command_id,
-                "scope": "bot",
-            }
-            await self.redis.execute(
-                "PUBLISH", "dittobot_clusters", orjson.dumps(payload)
-            )
+                return None
+            return {"cluster_id": self.cluster["id"], "cogs": output}
         except Exception as e:
             self.logger.error("Exception in redis unload", exc_info=True)
             return {}
@@ -242,18 +266,11 @@ class RedisHandler:
             end = time.time()
             end - start
         except Exception as e:
-            payload = {
-                "output": {
-                    "cluster_id": self.cluster["id"],
-                    "type": "error",
-                    "message": f"{e.__class__.__name__}: {e}",
-                },
-                "command_id": command_id,
-                "scope": "bot",
+            return {
+                "cluster_id": self.cluster["id"],
+                "type": "error",
+                "message": f"{e.__class__.__name__}: {e}",
             }
-            return await self.redis.execute(
-                "PUBLISH", "dittobot_clusters", orjson.dumps(payload)
-            )
 
         func = env["func"]
         try:
@@ -261,58 +278,43 @@ class RedisHandler:
                 ret = await func()
         except Exception as e:
             value = stdout.getvalue()
-            payload = {
-                "output": {
-                    "cluster_id": self.cluster["id"],
-                    "type": "error",
-                    "message": f"{value}{traceback.format_exc()}",
-                },
-                "command_id": command_id,
-                "scope": "bot",
+            return {
+                "cluster_id": self.cluster["id"],
+                "type": "error",
+                "message": f"{value}{traceback.format_exc()}",
             }
-            return await self.redis.execute(
-                "PUBLISH", "dittobot_clusters", orjson.dumps(payload)
-            )
         value = stdout.getvalue()
         if ret is None:
             if value:
-                payload = {
-                    "output": {
-                        "cluster_id": self.cluster["id"],
-                        "type": "success",
-                        "message": str(value),
-                    },
-                    "command_id": command_id,
-                    "scope": "bot",
-                }
-                return await self.redis.execute(
-                    "PUBLISH", "dittobot_clusters", orjson.dumps(payload)
-                )
-        else:
-            payload = {
-                "output": {
+                return {
                     "cluster_id": self.cluster["id"],
                     "type": "success",
-                    "message": f"{value}{ret}",
-                },
-                "command_id": command_id,
-                "scope": "bot",
-            }
-            return await self.redis.execute(
-                "PUBLISH", "dittobot_clusters", orjson.dumps(payload)
-            )
-        payload = {
-            "output": {
+                    "message": str(value),
+                }
+        else:
+            return {
                 "cluster_id": self.cluster["id"],
                 "type": "success",
-                "message": "",
-            },
-            "command_id": command_id,
-            "scope": "bot",
+                "message": f"{value}{ret}",
+            }
+        return {
+            "cluster_id": self.cluster["id"],
+            "type": "success",
+            "message": "",
         }
-        return await self.redis.execute(
-            "PUBLISH", "dittobot_clusters", orjson.dumps(payload)
-        )
+
+    async def guild_settings_update(self, args, *, command_id: str):
+        # The sending cluster already applied the change to its own cache
+        if args["cluster_id"] == self.cluster["id"]:
+            return
+        self.bot.guild_settings.apply(args["guild_id"], args["changes"])
+
+    async def ban_registry_update(self, args, *, command_id: str):
+        # The sending cluster already applied the change to its own sets
+        if args["cluster_id"] == self.cluster["id"]:
+            return
+        self.bot.bans.receive(args)
 
     async def all_clusters_launched(self, args, *, command_id: str):
         self.bot._clusters_ready.set()
+
@@ -0,0 +1,159 @@
+import asyncio
+import heapq
+import time
+from collections import Counter
+from contextlib import suppress
+from typing import Dict, List, Optional, Tuple
+
+import orjson
+
+CLUSTERS_KEY = "telemetry:clusters"
+
+# How many of its biggest guilds each cluster reports
+TOP_GUILDS = 100
+
+
+def _key(cluster_id) -> str:
+    return f"telemetry:cluster:{cluster_id}"
+
+
+class Telemetry:
+    """
+    Fleet-wide stats, without asking every cluster to run code.
+
+    Every cluster writes a snapshot of its own numbers to a redis hash every
+    `interval` seconds, which expires after `ttl` so a dead cluster drops out.
+    Readers just fetch the live snapshots and add them up.
+    """
+
+    def __init__(self, bot, *, interval: int = 60, ttl: int = 180):
+        self.bot = bot
+        self.interval = interval
+        self.ttl = ttl
+
+    @property
+    def redis(self):
+        return self.bot.redis_manager.redis
+
+    def start(self):
+        asyncio.create_task(self._publish_forever())
+
+    def snapshot(self) -> Dict[str, bytes]:
+        """This cluster's numbers, encoded as hash fields."""
+        guilds = 0
+        members = 0
+        channels = 0
+        for guild in self.bot.guilds:
+            guilds += 1
+            members += guild.member_count or 0
+            channels += len(guild.channels)
+        top_guilds = heapq.nlargest(
+            TOP_GUILDS,
+            (
+                (guild.name, guild.member_count)
+                for guild in self.bot.guilds
+                if guild.member_count is not None
+            ),
+            key=lambda guild: guild[1],
+        )
+        latencies = {}
+        for shard_id, shard in self.bot.shards.items():
+            latencies[shard_id] = None
+            with suppress(OverflowError):
+                latencies[shard_id] = round(shard.latency * 1000)
+        return {
+            "name": self.bot.cluster["name"],
+            "updated_at": time.time(),
+            "guilds": guilds,
+            "members": members,
+            "channels": channels,
+            "top_guilds": orjson.dumps(top_guilds),
+            "shard_latencies": orjson.dumps(latencies, option=orjson.OPT_NON_STR_KEYS),
+            "commands_used": orjson.dumps(dict(self.bot.commands_used)),
+            "message_ticks": orjson.dumps(self.bot.message_ticks.stats()),
+            "http": orjson.dumps(self.bot.web.stats()),
+            "rate_limits": orjson.dumps(self.bot.rate_limits.stats()),
+        }
+
+    async def publish(self):
+        """Writes this cluster's snapshot to redis."""
+        cluster_id = self.bot.cluster["id"]
+        fields = []
+        for field, value in self.snapshot().items():
+            fields.extend((field, value))
+        await self.redis.execute("HSET", _key(cluster_id), *fields)
+        await self.redis.execute("EXPIRE", _key(cluster_id), self.ttl)
+        await self.redis.execute("ZADD", CLUSTERS_KEY, time.time(), cluster_id)
+
+    async def _publish_forever(self):
+        await self.bot.wait_until_ready()
+        while True:
+            try:
+                await self.publish()
+            except Exception:
+                self.bot.logger.exception("Failed to publish telemetry")
+            await asyncio.sleep(self.interval)
+
+    async def snapshots(self) -> List[dict]:
+        """Returns the latest snapshot of every live cluster, decoded."""
+        cutoff = time.time() - self.ttl
+        await self.redis.execute("ZREMRANGEBYSCORE", CLUSTERS_KEY, "-inf", cutoff)
+        cluster_ids = await self.redis.execute("ZRANGE", CLUSTERS_KEY, 0, -1)
+        raw = await asyncio.gather(
+            *(
+                self.redis.execute("HGETALL", _key(cluster_id.decode()))
+                for cluster_id in cluster_ids
+            )
+        )
+        snapshots = []
+        for cluster_id, flat in zip(cluster_ids, raw):
+            if not flat:
+                continue
+            fields = {
+                flat[idx].decode(): flat[idx + 1] for idx in range(0, len(flat), 2)
+            }
+            snapshots.append(
+                {
+                    "id": int(cluster_id),
+                    "name": fields["name"].decode(),
+                    "updated_at": float(fields["updated_at"]),
+                    "guilds": int(fields["guilds"]),
+                    "members": int(fields["members"]),
+                    "channels": int(fields["channels"]),
+                    "top_guilds": orjson.loads(fields["top_guilds"]),
+                    "shard_latencies": {
+                        int(shard_id): latency
+                        for shard_id, latency in orjson.loads(
+                            fields["shard_latencies"]
+                        ).items()
+                    },
+                    "commands_used": orjson.loads(fields["commands_used"]),
+                    "message_ticks": orjson.loads(fields.get("message_ticks", b"{}")),
+                    "http": orjson.loads(fields.get("http", b"{}")),
+                    "rate_limits": orjson.loads(fields.get("rate_limits", b"{}")),
+                }
+            )
+        return snapshots
+
+    async def guild_count(self) -> Optional[int]:
+        """The number of guilds across every live cluster, or None if no cluster has reported yet."""
+        snapshots = await self.snapshots()
+        if not snapshots:
+            return None
+        return sum(snapshot["guilds"] for snapshot in snapshots)
+
+    async def top_guilds(self, count: int = TOP_GUILDS) -> List[Tuple[str, int]]:
+        """The (name, member count) of the biggest guilds across every live cluster, biggest first."""
+        snapshots = await self.snapshots()
+        return heapq.nlargest(
+            count,
+            (tuple(guild) for snapshot in snapshots for guild in snapshot["top_guilds"]),
+            key=lambda guild: guild[1],
+        )
+
+    async def commands_used(self) -> Counter:
+        """How many times each command was used across every live cluster, since each one started."""
+        total = Counter()
+        for snapshot in await self.snapshots():
+            total.update(snapshot["commands_used"])
+        return total
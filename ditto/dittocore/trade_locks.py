@@ -0,0 +1,145 @@
+import asyncio
+from typing import Optional, Set
+from uuid import uuid4
+
+# Locks every key, or none of them if any is already held.
+# Returns 0 on success, or the (1-based) index of the first key that was already held.
+ACQUIRE_SCRIPT = """
+for i, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        return i
+    end
+end
+for _, key in ipairs(KEYS) do
+    redis.call('SET', key, ARGV[1], 'PX', ARGV[2])
+end
+return 0
+"""
+
+# Extends the lease on every key still held by the token, returns how many were.
+RENEW_SCRIPT = """
+local renewed = 0
+for _, key in ipairs(KEYS) do
+    if redis.call('GET', key) == ARGV[1] then
+        renewed = renewed + redis.call('PEXPIRE', key, ARGV[2])
+    end
+end
+return renewed
+"""
+
+# Deletes every key still held by the token, returns how many were.
+RELEASE_SCRIPT = """
+local released = 0
+for _, key in ipairs(KEYS) do
+    if redis.call('GET', key) == ARGV[1] then
+        released = released + redis.call('DEL', key)
+    end
+end
+return released
+"""
+
+
+def _key(user_id: int) -> str:
+    return f"tradelock:{user_id}"
+
+
+class TradeLease:
+    """
+    A tradelock held on one or more users.
+
+    The lease is renewed in the background until it is released,
+    so it does not run out during a long trade.
+    """
+
+    def __init__(self, locks: "TradeLocks", user_ids, token: str):
+        self.locks = locks
+        self.user_ids = tuple(user_ids)
+        self.token = token
+        self._renewer = asyncio.create_task(self._renew_forever())
+
+    async def _renew_forever(self):
+        while True:
+            await asyncio.sleep(self.locks.lease_ms / 3000)
+            try:
+                if not await self.locks.renew(self):
+                    # Every key expired or was reset by staff, there is nothing left to keep alive
+                    return
+            except Exception:
+                self.locks.bot.logger.exception("Failed to renew a tradelock lease")
+
+    async def release(self):
+        """Releases the lock on every user, if this lease still holds it."""
+        self._renewer.cancel()
+        await self.locks.release(self)
+
+
+class TradeLocks:
+    """
+    Per-user tradelocks stored in redis.
+
+    Each locked user has a `tradelock:<user_id>` key holding the token of the lease
+    that locked them, with an expiry that the lease keeps pushing back. If a cluster dies
+    mid-trade, its users unlock on their own once the expiry passes.
+    """
+
+    def __init__(self, bot, *, lease_ms: int = 60000):
+        self.bot = bot
+        self.lease_ms = lease_ms
+
+    @property
+    def redis(self):
+        return self.bot.redis_manager.redis
+
+    async def locked(self, *user_ids: int) -> Set[int]:
+        """Returns which of `user_ids` are currently tradelocked, in one round trip."""
+        if not user_ids:
+            return set()
+        tokens = await self.redis.execute("MGET", *(_key(uid) for uid in user_ids))
+        return {uid for uid, token in zip(user_ids, tokens) if token is not None}
+
+    async def is_locked(self, user_id: int) -> bool:
+        return bool(await self.locked(user_id))
+
+    async def acquire(self, *user_ids: int) -> Optional[TradeLease]:
+        """
+        Tradelocks every user in `user_ids` at once.
+
+        Returns the TradeLease, or None without locking anyone if any of them is already locked.
+        """
+        token = str(uuid4())
+        blocked = await self.redis.execute(
+            "EVAL",
+            ACQUIRE_SCRIPT,
+            len(user_ids),
+            *(_key(uid) for uid in user_ids),
+            token,
+            self.lease_ms,
+        )
+        if blocked:
+            return None
+        return TradeLease(self, user_ids, token)
+
+    async def renew(self, lease: TradeLease) -> int:
+        """Pushes back the expiry of a lease, returns how many of its users it still holds."""
+        return await self.redis.execute(
+            "EVAL",
+            RENEW_SCRIPT,
+            len(lease.user_ids),
+            *(_key(uid) for uid in lease.user_ids),
+            lease.token,
+            self.lease_ms,
+        )
+
+    async def release(self, lease: TradeLease) -> int:
+        """Unlocks the users of a lease, returns how many of them it still held."""
+        return await self.redis.execute(
+            "EVAL",
+            RELEASE_SCRIPT,
+            len(lease.user_ids),
+            *(_key(uid) for uid in lease.user_ids),
+            lease.token,
+        )
+
+    async def force_release(self, user_id: int) -> bool:
+        """Unlocks a user no matter who holds the lock. Returns False if they were not locked."""
+        return bool(await self.redis.execute("DEL", _key(user_id)))
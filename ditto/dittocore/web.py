@@ -0,0 +1,182 @@
+import asyncio
+import random
+import time
+from collections import defaultdict
+from typing import Optional
+
+import aiohttp
+import orjson
+from yarl import URL
+
+# Statuses worth trying again, the server or something in front of it was briefly unhappy
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+# Only methods that are safe to send twice are retried unless the caller asks otherwise
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+
+
+class ResponseTooLarge(Exception):
+    """Raised when a response body is bigger than the size cap of the request."""
+
+
+class WebResponse:
+    """A fully read response. The connection has already gone back to the pool."""
+
+    def __init__(self, url, status: int, headers, body: bytes):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    def json(self):
+        return orjson.loads(self.body)
+
+    def text(self, encoding: str = "utf-8") -> str:
+        return self.body.decode(encoding, errors="replace")
+
+
+class HostStats:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "avg_ms": round(self.total_ms / self.requests, 2) if self.requests else 0,
+            "max_ms": round(self.max_ms, 2),
+        }
+
+
+class WebClient:
+    """
+    The bot's one HTTP client for outbound requests.
+
+    Every request shares a single pooled session, so connections, DNS lookups and TLS sessions
+    are reused instead of being set up per call. Requests get a timeout, a per-host connection
+    limit, retries with exponential backoff on connection errors and retryable statuses, and a
+    cap on how much of the body is read. Latency and errors are counted per host.
+    """
+
+    def __init__(
+        self,
+        bot,
+        *,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        timeout: float = 15,
+        retries: int = 2,
+        backoff: float = 0.5,
+        max_size: int = 8 * 1024 * 1024,
+    ):
+        self.bot = bot
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_size = max_size
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._stats = defaultdict(HostStats)
+
+    async def start(self):
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=self.limit, limit_per_host=self.limit_per_host, ttl_dns_cache=300
+            ),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            json_serialize=lambda obj: orjson.dumps(obj).decode(),
+        )
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _read(self, resp, max_size: int) -> bytes:
+        if resp.content_length is not None and resp.content_length > max_size:
+            raise ResponseTooLarge(f"{resp.url} sent {resp.content_length} bytes")
+        body = bytearray()
+        async for chunk in resp.content.iter_chunked(64 * 1024):
+            body += chunk
+            if len(body) > max_size:
+                raise ResponseTooLarge(f"{resp.url} sent more than {max_size} bytes")
+        return bytes(body)
+
+    def _delay(self, attempt: int, resp=None) -> float:
+        if resp is not None and "Retry-After" in resp.headers:
+            try:
+                return min(float(resp.headers["Retry-After"]), self.timeout)
+            except ValueError:
+                pass
+        return self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        retries: int = None,
+        max_size: int = None,
+        **kwargs,
+    ) -> WebResponse:
+        """
+        Sends a request and reads the whole response.
+
+        Non 2xx responses are returned like any other, check `status`. Connection errors and
+        timeouts are raised once the retries run out, as are bodies bigger than `max_size`.
+        """
+        method = method.upper()
+        if retries is None:
+            retries = self.retries if method in IDEMPOTENT_METHODS else 0
+        max_size = self.max_size if max_size is None else max_size
+        stats = self._stats[URL(url).host]
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            stats.requests += 1
+            try:
+                async with self.session.request(method, url, **kwargs) as resp:
+                    if resp.status in RETRY_STATUSES and attempt < retries:
+                        stats.errors += 1
+                        delay = self._delay(attempt, resp)
+                    else:
+                        response = WebResponse(
+                            resp.url, resp.status, resp.headers, await self._read(resp, max_size)
+                        )
+                        if resp.status >= 500:
+                            stats.errors += 1
+                        return response
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                stats.errors += 1
+                if attempt >= retries:
+                    raise
+                delay = self._delay(attempt)
+            except Exception:
+                stats.errors += 1
+                raise
+            finally:
+                elapsed = (time.perf_counter() - started) * 1000
+                stats.total_ms += elapsed
+                stats.max_ms = max(stats.max_ms, elapsed)
+            attempt += 1
+            stats.retries += 1
+            await asyncio.sleep(delay)
+
+    async def get(self, url: str, **kwargs) -> WebResponse:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> WebResponse:
+        return await self.request("POST", url, **kwargs)
+
+    def stats(self) -> dict:
+        """Request counts and latency for every host requested so far."""
+        return {host: stats.as_dict() for host, stats in self._stats.items()}
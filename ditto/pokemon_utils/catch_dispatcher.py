@@ -0,0 +1,137 @@
+import asyncio
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+
+def catch_options(pokemon: str) -> Tuple[str, ...]:
+    """Every name a spawn of "pokemon" can be caught with, normalised like message content."""
+    options = [pokemon]
+    if pokemon == "mr-mime":
+        options.append("mr.-mime")
+    elif pokemon == "mime-jr":
+        options.append("mime-jr.")
+    elif pokemon.endswith("-alola"):
+        options.append("alola-" + pokemon[:-6])
+        options.append("alolan-" + pokemon[:-6])
+    elif pokemon.endswith("-galar"):
+        options.append("galar-" + pokemon[:-6])
+        options.append("galarian-" + pokemon[:-6])
+    elif pokemon.endswith("-hisui"):
+        options.append("hisui-" + pokemon[:-6])
+        options.append("hisuian-" + pokemon[:-6])
+    return tuple(options)
+
+
+def normalise(content: str) -> str:
+    return content.lower().replace(" ", "-")
+
+
+class ActiveSpawn:
+    """A spawn waiting to be caught in a channel."""
+
+    __slots__ = ("channel_id", "options", "deadline", "future")
+
+    def __init__(self, channel_id: int, options: Tuple[str, ...], deadline: int):
+        self.channel_id = channel_id
+        self.options = options
+        self.deadline = deadline
+        self.future = asyncio.get_running_loop().create_future()
+
+    async def wait(self):
+        """Returns the message that caught this spawn, or raises asyncio.TimeoutError once it expires."""
+        return await self.future
+
+
+class CatchDispatcher:
+    """
+    Routes messages to the spawns waiting in their channel.
+
+    Spawns are indexed by channel id, so a message costs one dict lookup no matter
+    how many spawns are live, plus an endswith against the names of the spawns in
+    its own channel. Expiries sit in a timer wheel of one bucket per `resolution`
+    seconds, swept by a single task instead of a timeout handle per spawn.
+    """
+
+    def __init__(self, bot, *, resolution: int = 1):
+        self.bot = bot
+        self.resolution = resolution
+        self._channels: Dict[int, List[ActiveSpawn]] = {}
+        self._wheel: Dict[int, List[ActiveSpawn]] = defaultdict(list)
+        self._tick = self._now()
+        self._task = None
+
+    def _now(self) -> int:
+        return int(time.monotonic() // self.resolution)
+
+    def start(self):
+        self._task = asyncio.create_task(self._sweep_forever())
+
+    def __len__(self):
+        return sum(len(spawns) for spawns in self._channels.values())
+
+    def add(self, channel_id: int, options: Tuple[str, ...], timeout: float) -> ActiveSpawn:
+        """Starts waiting for a message in "channel_id" that ends with one of "options"."""
+        deadline = self._now() + max(1, -(-int(timeout) // self.resolution))
+        spawn = ActiveSpawn(channel_id, options, deadline)
+        self._channels.setdefault(channel_id, []).append(spawn)
+        self._wheel[deadline].append(spawn)
+        return spawn
+
+    def _remove(self, spawn: ActiveSpawn):
+        spawns = self._channels.get(spawn.channel_id)
+        if spawns is None:
+            return
+        try:
+            spawns.remove(spawn)
+        except ValueError:
+            return
+        if not spawns:
+            del self._channels[spawn.channel_id]
+
+    def dispatch(self, message) -> int:
+        """Hands "message" to every spawn in its channel whose name it ends with, returns how many it caught."""
+        spawns = self._channels.get(message.channel.id)
+        if spawns is None or not message.content:
+            return 0
+        content = normalise(message.content)
+        caught = [spawn for spawn in spawns if content.endswith(spawn.options)]
+        if not caught or self.bot.botbanned(message.author.id):
+            return 0
+        for spawn in caught:
+            self._remove(spawn)
+            bucket = self._wheel.get(spawn.deadline)
+            if bucket is not None:
+                bucket.remove(spawn)
+            if not spawn.future.done():
+                spawn.future.set_result(message)
+        return len(caught)
+
+    def sweep(self, now: Optional[int] = None):
+        """Expires every spawn whose bucket is due."""
+        now = self._now() if now is None else now
+        while self._tick <= now:
+            for spawn in self._wheel.pop(self._tick, ()):
+                # Cancelled waiters still hold a place in their channel until they expire
+                self._remove(spawn)
+                if not spawn.future.done():
+                    spawn.future.set_exception(asyncio.TimeoutError())
+            self._tick += 1
+
+    async def _sweep_forever(self):
+        while True:
+            await asyncio.sleep(self.resolution)
+            self.sweep()
+
+    def close(self):
+        """Stops the sweeper, and cancels every spawn still waiting."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for spawns in self._wheel.values():
+            for spawn in spawns:
+                if not spawn.future.done():
+                    spawn.future.cancel()
+        self._wheel.clear()
+        self._channels.clear()
+
@@ -0,0 +1,181 @@
+import random
+from typing import Optional
+
+from dittocogs.fishing import is_key
+from dittocogs.json_files import SHOP
+from dittocogs.pokemon_list import berryList
+from dittocore.commondb import POKE_COLUMNS, Pokemon
+
+SHADOW_LOG_CHANNEL = 1005737655025291334
+
+# Adds one to the count of each key in a text[] param, on top of a json column
+_INCREMENT_KEYS = """(
+    COALESCE({column}::jsonb, '{{}}') || (
+        SELECT COALESCE(jsonb_object_agg(key, COALESCE(({column}::jsonb ->> key)::int, 0) + 1), '{{}}')
+        FROM unnest(${param}::text[]) AS key
+    )
+)::json"""
+
+_FIRST_REWARD_PARAM = len(POKE_COLUMNS) + 2
+
+# $1 is the user, $2.. are the poke's columns, and the rewards come after them
+CATCH_QUERY = f"""
+WITH new_poke AS (
+    INSERT INTO pokes ({", ".join(POKE_COLUMNS)})
+    VALUES ({", ".join(f"${i}" for i in range(2, _FIRST_REWARD_PARAM))})
+    RETURNING id
+), owned AS (
+    INSERT INTO ownership (u_id, position, poke_id)
+    SELECT $1, COALESCE((SELECT max(position) FROM ownership WHERE u_id = $1), 0) + 1, id
+    FROM new_poke
+), achieved AS (
+    UPDATE achievements SET
+        shiny_caught = shiny_caught + ${_FIRST_REWARD_PARAM + 5}::bool::int,
+        pokemon_caught = pokemon_caught + (NOT ${_FIRST_REWARD_PARAM + 5}::bool)::int
+    WHERE u_id = $1
+), rewarded AS (
+    UPDATE users SET
+        items = {_INCREMENT_KEYS.format(column="items", param=_FIRST_REWARD_PARAM)},
+        inventory = {_INCREMENT_KEYS.format(column="inventory", param=_FIRST_REWARD_PARAM + 1)},
+        mewcoins = mewcoins + ${_FIRST_REWARD_PARAM + 2}::bigint,
+        chain = CASE
+            WHEN ${_FIRST_REWARD_PARAM + 3}::bool THEN 0
+            WHEN ${_FIRST_REWARD_PARAM + 4}::bool THEN chain + 1
+            ELSE chain
+        END
+    WHERE u_id = $1
+)
+SELECT id FROM new_poke
+"""
+
+
+class CatchRewards:
+    """Everything a single catch gives out, rolled before anything is written."""
+
+    def __init__(self, values, *, boosted, shadow, hunting, berry, chest, credits):
+        self.values = values
+        self.boosted = boosted
+        self.shadow = shadow
+        self.hunting = hunting
+        self.berry = berry
+        self.chest = chest
+        self.credits = credits
+        self.poke = None
+
+
+class CatchRewardPipeline:
+    """
+    Gives a caught spawn and its drops to the user who caught it.
+
+    The poke, berry, chest, credits and shadow hunt are all rolled in memory from a
+    single read of the user, then written with one statement inside the user's
+    ownership transaction. Mission progress is batched by MissionProgress.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.cheaps = tuple(
+            t["item"] for t in SHOP if t["price"] <= 8000 and not is_key(t["item"])
+        )
+        self.expensives = tuple(
+            t["item"]
+            for t in SHOP
+            if t["price"] in range(8000, 20000) and not is_key(t["item"])
+        )
+        self.berries = tuple(berryList)
+
+    def roll(
+        self, user, user_id: int, pokemon: str, *, shiny: bool, premium: bool
+    ) -> CatchRewards:
+        """Rolls every reward for a catch, `user` being the catcher's row."""
+        # 0%-10% chance from 0-50 iv multis
+        boosted = random.randrange(500) < user["iv_multiplier"]
+        values = self.bot.commondb.roll_poke(
+            self.bot,
+            user_id,
+            pokemon,
+            shiny=shiny,
+            boosted=boosted,
+            level=random.randint(1, 60),
+        )
+        if values is None:
+            raise ValueError(f'Bad pokemon name "{pokemon}" passed to the catch pipeline')
+
+        hunting = not shiny and user["hunt"] == values["pokname"]
+        shadow = hunting and random.random() < (
+            (1 / 12000) * (4 ** (user["chain"] / 1000))
+        )
+        if shadow:
+            values["skin"] = "shadow"
+
+        berry_chance = max(1, int(random.random() * 350))
+        expensive_chance = max(1, int(random.random() * 25))
+        berry = None
+        if berry_chance in range(1, 8):
+            if berry_chance == 1:
+                berry = random.choice(self.cheaps)
+            elif berry_chance == expensive_chance:
+                berry = random.choice(self.expensives)
+            else:
+                berry = random.choice(self.berries)
+        chest = "common chest" if not random.randint(0, 200) else None
+        credits = random.randint(100, 250) if premium else 0
+
+        return CatchRewards(
+            values,
+            boosted=boosted,
+            shadow=shadow,
+            hunting=hunting,
+            berry=berry,
+            chest=chest,
+            credits=credits,
+        )
+
+    async def catch(
+        self, user_id: int, pokemon: str, *, shiny: bool = False, premium: bool = False
+    ) -> Optional[CatchRewards]:
+        """
+        Gives a caught pokemon and its rewards to a user.
+
+        Returns the CatchRewards, with `poke` set to the created Pokemon, or None if the user has not started.
+        """
+        rewards = await self._write(user_id, pokemon, shiny=shiny, premium=premium)
+        if rewards is None:
+            return None
+        await self.bot.leaderboards.add("pokemon", user_id, 1)
+
+        self.bot.mission_progress.increment(user_id, "catch-count")
+        if rewards.shadow:
+            await self.bot.get_partial_messageable(SHADOW_LOG_CHANNEL).send(
+                f"`{user_id} - {rewards.values['pokname']}`"
+            )
+        return rewards
+
+    async def _write(
+        self, user_id: int, pokemon: str, *, shiny: bool, premium: bool
+    ) -> Optional[CatchRewards]:
+        """The postgres half of a catch, one read of the user and one write of everything."""
+        async with self.bot.db[0].acquire() as pconn:
+            user = await pconn.fetchrow(
+                "SELECT COALESCE((inventory::jsonb ->> 'iv-multiplier')::int, 0) AS iv_multiplier, "
+                "hunt, chain FROM users WHERE u_id = $1",
+                user_id,
+            )
+            if user is None:
+                return None
+            rewards = self.roll(user, user_id, pokemon, shiny=shiny, premium=premium)
+            async with self.bot.commondb.owner_transaction(user_id, pconn) as pconn:
+                poke_id = await pconn.fetchval(
+                    CATCH_QUERY,
+                    user_id,
+                    *(rewards.values[column] for column in POKE_COLUMNS),
+                    [rewards.berry] if rewards.berry else [],
+                    [rewards.chest] if rewards.chest else [],
+                    rewards.credits,
+                    rewards.shadow,
+                    rewards.hunting,
+                    rewards.values["shiny"],
+                )
+        rewards.poke = Pokemon.from_values(poke_id, rewards.values)
+        return rewards
+
@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import Any, Optional
+from typing import Any, Optional, Tuple
 
 
 @dataclass
@@ -97,3 +97,131 @@ class FormInfo:
             self.pokemon_id == maybe_evolve_to["evolves_from_species_id"]
             for maybe_evolve_to in self.evoline
         )
+
+
+# Every column of the pokes table
+POKE_FIELDS = (
+    "id",
+    "pokname",
+    "hpiv",
+    "atkiv",
+    "defiv",
+    "spatkiv",
+    "spdefiv",
+    "speediv",
+    "hpev",
+    "atkev",
+    "defev",
+    "spatkev",
+    "spdefev",
+    "speedev",
+    "pokelevel",
+    "moves",
+    "hitem",
+    "exp",
+    "nature",
+    "expcap",
+    "poknick",
+    "price",
+    "market_enlist",
+    "happiness",
+    "fav",
+    "ability_index",
+    "counter",
+    "name",
+    "gender",
+    "caught_by",
+    "shiny",
+    "radiant",
+    "skin",
+    "tradable",
+    "tags",
+    "times_bred",
+)
+
+# Named column sets, so callers select what they read instead of every column
+PROJECTIONS = {
+    "all": POKE_FIELDS,
+    "name": ("id", "pokname"),
+    "trade": ("id", "pokname", "pokelevel", "hitem", "shiny", "radiant", "tradable"),
+    # What EvolutionGraph.candidates reads
+    "evolve": (
+        "id",
+        "pokname",
+        "pokelevel",
+        "hitem",
+        "gender",
+        "moves",
+        "happiness",
+        "atkiv",
+        "atkev",
+        "defiv",
+        "defev",
+        "radiant",
+    ),
+    "breeding": (
+        "id",
+        "pokname",
+        "hpiv",
+        "atkiv",
+        "defiv",
+        "spatkiv",
+        "spdefiv",
+        "speediv",
+        "pokelevel",
+        "shiny",
+        "hitem",
+        "happiness",
+        "ability_index",
+        "gender",
+        "nature",
+    ),
+}
+
+
+class Poke:
+    """
+    A row of the pokes table, holding only the columns that were selected.
+
+    Columns are read as attributes, or by name like the asyncpg Record it was
+    built from, so code written against records keeps working. Reading a column
+    that was not selected raises KeyError (or AttributeError for attributes).
+    """
+
+    __slots__ = POKE_FIELDS
+
+    def __init__(self, **columns):
+        for column, value in columns.items():
+            setattr(self, column, value)
+
+    @classmethod
+    def from_record(cls, record, columns: Tuple[str, ...] = None) -> "Poke":
+        """
+        Builds a Poke from an asyncpg Record, or any mapping of pokes columns.
+
+        Pass the `columns` that were selected to skip reading them from the record.
+        """
+        if columns is None:
+            columns = record.keys()
+        poke = cls.__new__(cls)
+        for column in columns:
+            setattr(poke, column, record[column])
+        return poke
+
+    def __getitem__(self, column: str):
+        try:
+            return getattr(self, column)
+        except AttributeError:
+            raise KeyError(column) from None
+
+    def __contains__(self, column: str) -> bool:
+        return hasattr(self, column)
+
+    def get(self, column: str, default=None):
+        return getattr(self, column, default)
+
+    def keys(self):
+        return [column for column in POKE_FIELDS if hasattr(self, column)]
+
+    def __repr__(self):
+        return f"<Poke id={self.get('id')} pokname={self.get('pokname')!r}>"
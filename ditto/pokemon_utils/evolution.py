@@ -0,0 +1,245 @@
+from dataclasses import dataclass
+from enum import IntFlag
+from types import MappingProxyType
+from typing import Iterable, List, Mapping, Optional, Tuple
+
+from dittocogs.pokemon_list import is_formed
+
+# Held items that stop a poke from evolving
+EVOLUTION_BLOCKERS = frozenset(("everstone", "eviolite"))
+
+
+class EvoReqs(IntFlag):
+    """Stores the requirements for a particular evolution."""
+
+    EMPTY = 0
+    PHYSICALSTATS = 1
+    GENDER = 2
+    LEVEL = 4
+    HAPPINESS = 8
+    MOVE = 16
+    HELDITEM = 32
+    ACTIVEITEM = 64
+    REGION = 128
+
+    def used_active_item(self):
+        return EvoReqs.ACTIVEITEM in self
+
+    @staticmethod
+    def from_raw(raw):
+        score = EvoReqs.EMPTY
+        if raw["relative_physical_stats"] is not None:
+            score |= EvoReqs.PHYSICALSTATS
+        if raw["gender_id"]:
+            score |= EvoReqs.GENDER
+        if raw["minimum_level"]:
+            score |= EvoReqs.LEVEL
+        if raw["minimum_happiness"]:
+            score |= EvoReqs.HAPPINESS
+        if raw["known_move_id"]:
+            score |= EvoReqs.MOVE
+        if raw["held_item_id"]:
+            score |= EvoReqs.HELDITEM
+        if raw["trigger_item_id"]:
+            score |= EvoReqs.ACTIVEITEM
+        if raw["region"]:
+            score |= EvoReqs.REGION
+        return score
+
+
+@dataclass(frozen=True)
+class EvoEdge:
+    """One evolution a poke can take, with its evofile requirements decoded."""
+
+    evolved_species_id: int
+    evolved_name: str
+    reqs: EvoReqs
+    gender_id: Optional[int]
+    minimum_level: Optional[int]
+    minimum_happiness: Optional[int]
+    known_move: Optional[str]
+    held_item_id: Optional[int]
+    trigger_item_id: Optional[int]
+    relative_physical_stats: Optional[int]
+    region: Optional[str]
+
+    @classmethod
+    def from_raw(cls, raw, dex):
+        known_move = None
+        if raw["known_move_id"]:
+            move = dex.move(raw["known_move_id"])
+            known_move = move.identifier if move is not None else None
+        return cls(
+            evolved_species_id=raw["evolved_species_id"],
+            evolved_name=dex.species(raw["evolved_species_id"]).identifier.capitalize(),
+            reqs=EvoReqs.from_raw(raw),
+            gender_id=raw["gender_id"],
+            minimum_level=raw["minimum_level"],
+            minimum_happiness=raw["minimum_happiness"],
+            known_move=known_move,
+            held_item_id=raw["held_item_id"],
+            trigger_item_id=raw["trigger_item_id"],
+            relative_physical_stats=raw["relative_physical_stats"],
+            region=raw["region"],
+        )
+
+    def meets(self, poke, held_item_id, active_item_id, override_lvl_100) -> bool:
+        """Checks that "poke" meets every requirement of this evolution except the owner's region."""
+        # They used an active item but this evo doesn't use an active item, don't use it.
+        if active_item_id is not None and not self.reqs.used_active_item():
+            return False
+        # If a pokemon is level 100, ONLY evolve via an override or active item.
+        if poke["pokelevel"] >= 100 and not (
+            override_lvl_100 or active_item_id is not None
+        ):
+            return False
+        if self.trigger_item_id and self.trigger_item_id != active_item_id:
+            return False
+        if self.held_item_id and self.held_item_id != held_item_id:
+            return False
+        if self.gender_id == 1 and poke["gender"] == "-m":
+            return False
+        if self.gender_id == 2 and poke["gender"] == "-f":
+            return False
+        if self.minimum_level and poke["pokelevel"] < self.minimum_level:
+            return False
+        if EvoReqs.MOVE in self.reqs and self.known_move not in poke["moves"]:
+            return False
+        if self.minimum_happiness and poke["happiness"] < self.minimum_happiness:
+            return False
+        if self.relative_physical_stats is not None:
+            # WARNING
+            # Currently this is only used by Tyrogue, which has identical base stats for atk and def.
+            # If this is used on a poke WITHOUT identical base stats, the base stat needs to be considered.
+            attack = poke["atkiv"] + poke["atkev"]
+            defense = poke["defiv"] + poke["defev"]
+            if self.relative_physical_stats == 1 and not attack > defense:
+                return False
+            elif self.relative_physical_stats == -1 and not attack < defense:
+                return False
+            elif self.relative_physical_stats == 0 and not attack == defense:
+                return False
+        # Temp blocker since previously radiants could never evolve to regional forms, so they were released separately
+        if self.region and poke["radiant"]:
+            return False
+        return True
+
+
+class EvolutionGraph:
+    """
+    Every evolution a poke can take, keyed by the poke's name.
+
+    Built once from the dex with each edge's requirements already decoded, and sorted
+    so the most explicit evolution comes first (IE: held item evos > level evos).
+    Working out whether a poke can evolve is pure, only an evolution that actually
+    happens needs the database.
+    """
+
+    def __init__(self, dex):
+        self.dex = dex
+        edges = {}
+        missing = []
+        for form in dex.all_forms():
+            name = form.identifier
+            # Don't try to evolve forms
+            if is_formed(name) or name.endswith(("-staff", "-custom")):
+                continue
+            species = dex.species_by_identifier(name)
+            if species is None:
+                continue
+            form_edges = []
+            for evolved in dex.evolves_into(form.pokemon_id):
+                if evolved.evolution_chain_id != species.evolution_chain_id:
+                    continue
+                raw = dex.evolution(evolved.id)
+                if raw is None:
+                    missing.append(evolved.identifier)
+                    continue
+                form_edges.append(EvoEdge.from_raw(raw, dex))
+            if form_edges:
+                # Stable, so equally explicit evos keep their evofile order
+                form_edges.sort(key=lambda edge: edge.reqs, reverse=True)
+                edges[name] = tuple(form_edges)
+        self._edges: Mapping[str, Tuple[EvoEdge, ...]] = MappingProxyType(edges)
+        self.missing_evofiles: Tuple[str, ...] = tuple(sorted(set(missing)))
+
+    def edges_from(self, pokname: str) -> Tuple[EvoEdge, ...]:
+        return self._edges.get(pokname.lower(), ())
+
+    def candidates(
+        self, poke, *, active_item_id=None, override_lvl_100=False
+    ) -> Tuple[EvoEdge, ...]:
+        """
+        The evolutions "poke" meets the requirements of right now, best first.
+
+        The owner's region is not checked, see `pick`. An empty tuple means the poke
+        can not evolve, which is the answer for almost every level up.
+        """
+        # Everstones block evolutions, don't try to evolve
+        if poke["hitem"] in EVOLUTION_BLOCKERS:
+            return ()
+        # Eggs, forms and fully evolved pokes have no edges
+        edges = self.edges_from(poke["pokname"])
+        if not edges:
+            return ()
+        held_item_id = self.dex.item_id(poke["hitem"] or "")
+        return tuple(
+            edge
+            for edge in edges
+            if edge.meets(poke, held_item_id, active_item_id, override_lvl_100)
+        )
+
+    @staticmethod
+    def pick(candidates: Iterable[EvoEdge], region=None) -> Optional[EvoEdge]:
+        """The best of the candidates that is allowed in the owner's region."""
+        for edge in candidates:
+            if not edge.region or edge.region == region:
+                return edge
+        return None
+
+
+async def evolve_many(bot, pokes, *, active_item_id=None, override_lvl_100=False):
+    """
+    Evolves every poke in "pokes" that can evolve, as (poke, owner id) pairs.
+
+    The owners' regions are read with one query, and every
+    evolution is written with one update. Returns a list of (poke, EvoEdge)
+    for the pokes that evolved.
+    """
+    graph = bot.evolutions
+    pending: List[Tuple[object, int, Tuple[EvoEdge, ...]]] = []
+    for poke, owner_id in pokes:
+        candidates = graph.candidates(
+            poke, active_item_id=active_item_id, override_lvl_100=override_lvl_100
+        )
+        if candidates:
+            pending.append((poke, owner_id, candidates))
+    if not pending:
+        return []
+
+    async with bot.db[0].acquire() as pconn:
+        regions = dict(
+            await pconn.fetch(
+                "SELECT u_id, region FROM users WHERE u_id = ANY($1)",
+                list({owner_id for _, owner_id, _ in pending}),
+            )
+        )
+        evolved = []
+        for poke, owner_id, candidates in pending:
+            region = regions.get(owner_id)
+            # Owners without a region (or a users row) never evolve, as before
+            if region is None:
+                continue
+            edge = graph.pick(candidates, region)
+            if edge is not None:
+                evolved.append((poke, edge))
+        if evolved:
+            await pconn.execute(
+                "UPDATE pokes SET pokname = r.pokname "
+                "FROM unnest($1::bigint[], $2::text[]) AS r(id, pokname) "
+                "WHERE pokes.id = r.id",
+                [poke["id"] for poke, _ in evolved],
+                [edge.evolved_name for _, edge in evolved],
+            )
+    return evolved
+
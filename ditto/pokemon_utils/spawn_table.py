@@ -0,0 +1,149 @@
+import random
+from enum import IntEnum
+
+from dittocogs.pokemon_list import (
+    LegendList,
+    pList,
+    pseudoList,
+    starterList,
+    totalList,
+    ubList,
+)
+
+GHOST_TYPE_ID = 8
+ICE_TYPE_ID = 15
+
+
+class SpawnTier(IntEnum):
+    NORMAL = 0
+    STARTER = 1
+    PSEUDO = 2
+    ULTRA_BEAST = 3
+    LEGENDARY = 4
+    GHOST = 5
+    ICE = 6
+
+    def is_rare(self):
+        return self in (SpawnTier.LEGENDARY, SpawnTier.ULTRA_BEAST)
+
+
+class AliasTable:
+    """Walker/Vose alias table, samples one of `outcomes` by `weights` in O(1)."""
+
+    def __init__(self, outcomes, weights):
+        total = sum(weights)
+        n = len(weights)
+        scaled = [w * n / total for w in weights]
+        self.outcomes = tuple(outcomes)
+        self.prob = [0.0] * n
+        self.alias = [0] * n
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1
+            (small if scaled[l] < 1 else large).append(l)
+        for i in large + small:
+            self.prob[i] = 1.0
+
+    def sample(self, rng=random):
+        i = int(rng.random() * len(self.prob))
+        if rng.random() < self.prob[i]:
+            return self.outcomes[i]
+        return self.outcomes[self.alias[i]]
+
+
+def _tier_weights(honey: int):
+    """
+    The chance of each tier, matching the old sequential rolls.
+
+    Each tier used to roll `int(random() * size) < 2` in the order
+    legend > ub > pseudo > starter, so a tier only wins if every tier before it missed.
+    """
+    sizes = (
+        (SpawnTier.LEGENDARY, round(4000 - 7600 * honey / 100)),
+        (SpawnTier.ULTRA_BEAST, round(3000 - 5700 * honey / 100)),
+        (SpawnTier.PSEUDO, round(1000 - 1900 * honey / 100)),
+        (SpawnTier.STARTER, round(500 - 950 * honey / 100)),
+    )
+    weights = {}
+    remaining = 1.0
+    for tier, size in sizes:
+        hit = min(1.0, 2 / size)
+        weights[tier] = remaining * hit
+        remaining -= weights[tier]
+    weights[SpawnTier.NORMAL] = remaining
+    return weights
+
+
+class SpawnTable:
+    """
+    Precomputed spawn pools and tier samplers for Spawn.on_message.
+
+    Pools are built once from pokemon_list and the dex, and each honey state
+    gets its own alias table over the tiers, so a roll is a few random() calls.
+    """
+
+    def __init__(self, dex):
+        self.pools = {
+            SpawnTier.NORMAL: tuple(pList),
+            SpawnTier.STARTER: tuple(starterList),
+            SpawnTier.PSEUDO: tuple(pseudoList),
+            SpawnTier.ULTRA_BEAST: tuple(ubList),
+            SpawnTier.LEGENDARY: tuple(LegendList),
+            SpawnTier.GHOST: self._type_pool(dex, GHOST_TYPE_ID),
+            SpawnTier.ICE: self._type_pool(dex, ICE_TYPE_ID),
+        }
+
+        base = _tier_weights(0)
+        honey = _tier_weights(50)
+        # Ghost honey overrides 3/4 of spawns, the rest roll like normal
+        ghost = {tier: weight / 4 for tier, weight in base.items()}
+        ghost[SpawnTier.GHOST] = 0.75
+        self._tables = {
+            None: AliasTable(base.keys(), base.values()),
+            "honey": AliasTable(honey.keys(), honey.values()),
+            "ghost": AliasTable(ghost.keys(), ghost.values()),
+        }
+
+    @staticmethod
+    def _type_pool(dex, type_id):
+        spawnable = set(totalList)
+        names = {
+            form.identifier.title()
+            for pokemon_id in dex.pokemon_with_type(type_id)
+            for form in dex.forms_of(pokemon_id)
+        }
+        return tuple(sorted(names & spawnable))
+
+    @staticmethod
+    def roll_shiny(shiny_multiplier: int = 0, rng=random) -> bool:
+        """1 in (threshold + 1), where shiny multipliers take a percentage off of 4000."""
+        threshold = max(0, round(4000 - 4000 * (shiny_multiplier / 100)))
+        return int(rng.random() * (threshold + 1)) == 0
+
+    def roll_tier(self, honey: str = None, rng=random) -> SpawnTier:
+        """
+        Picks the tier to spawn from for a channel's honey type.
+
+        `honey` is the type from the honey table, or None if the channel has none.
+        """
+        if honey == "cheer":
+            return SpawnTier.ICE
+        if honey is None:
+            table = self._tables[None]
+        elif honey == "ghost":
+            table = self._tables["ghost"]
+        else:
+            table = self._tables["honey"]
+        return table.sample(rng)
+
+    def roll(self, honey: str = None, rng=random):
+        """Returns a (pokemon name, SpawnTier) for a channel's honey type."""
+        tier = self.roll_tier(honey, rng)
+        pool = self.pools[tier]
+        return pool[int(rng.random() * len(pool))], tier
+
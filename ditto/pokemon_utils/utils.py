@@ -1,12 +1,10 @@
-from enum import IntFlag
-
-import dacite
 import discord
 from dittocogs.json_files import *
 from dittocogs.pokemon_list import *
 from utils.misc import get_emoji, get_pokemon_image
 
 from pokemon_utils.classes import *
+from pokemon_utils.evolution import EvoReqs, evolve_many
 
 
 hp_display = '<:hp:1012942710870642708>'
@@ -38,14 +36,11 @@ def edit_stats(stats, inc_stat, dec_stat):
 
 async def get_pokemon_qinfo(ctx, records, info_type=None):
     _id = records["id"]
-    async with ctx.bot.db[0].acquire() as pconn:
-        ids = await pconn.fetchval(
-            "SELECT pokes FROM users WHERE u_id = $1", ctx.author.id
-        )
+    async with ctx.bot.commondb.ownership_conn(ctx.author.id) as pconn:
+        pnum = await ctx.bot.commondb.position_of(ctx.author.id, _id, pconn=pconn)
+        id_count = await ctx.bot.commondb.count_pokes(ctx.author.id, pconn=pconn)
     if not info_type:
-        try:
-            pnum = ids.index(_id) + 1
-        except ValueError:
+        if pnum is None:
             # The user *probably* has a pokemon selected that they do not own, so clear the
             # user's selected pokemon for the future.
             async with ctx.bot.db[0].acquire() as pconn:
@@ -91,114 +86,38 @@ async def get_pokemon_qinfo(ctx, records, info_type=None):
 
     iurl = await get_pokemon_image(pn, ctx.bot, shiny, radiant=radiant, skin=skin)
 
-    nature = await ctx.bot.db[1].natures.find_one({"identifier": nature.lower()})
-    dec_stat_id = nature["decreased_stat_id"]
-    inc_stat_id = nature["increased_stat_id"]
-    dec_stat = await ctx.bot.db[1].stat_types.find_one({"id": dec_stat_id})
-    inc_stat = await ctx.bot.db[1].stat_types.find_one({"id": inc_stat_id})
-    dec_stat = dec_stat["identifier"].capitalize().replace("-", " ")
-    inc_stat = inc_stat["identifier"].capitalize().replace("-", " ")
-    stat_deltas = {
-        "Attack": 1,
-        "Defense": 1,
-        "Special attack": 1,
-        "Special defense": 1,
-        "Speed": 1,
-    }
-    if dec_stat != inc_stat:
-        stat_deltas[dec_stat] = 0.9
-        stat_deltas[inc_stat] = 1.1
-
-    form_info = await ctx.bot.db[1].forms.find_one({"identifier": pn.lower()})
+    nature = ctx.bot.dex.nature(nature)
+
+    form_info = ctx.bot.dex.form(pn)
     if pn.lower() != "egg":
-        type_ids = (
-            await ctx.bot.db[1].ptypes.find_one({"id": form_info["pokemon_id"]})
-        )["types"]
+        type_ids = ctx.bot.dex.types_of(form_info.pokemon_id)
         for _type in type_ids:
             types.append(
-                str(
-                    ctx.bot.misc.get_type_emote(
-                        (await ctx.bot.db[1].types.find_one({"id": _type}))[
-                            "identifier"
-                        ]
-                    )
-                )
+                str(ctx.bot.misc.get_type_emote(ctx.bot.dex.type_identifier(_type)))
             )
 
-        try:
-            egg_groups_ids = (
-                await ctx.bot.db[1].egg_groups.find_one(
-                    {"species_id": form_info["pokemon_id"]}
-                )
-            )["egg_groups"]
-        except:
-            egg_groups_ids = [15]
+        egg_groups_ids = ctx.bot.dex.egg_groups_of(form_info.pokemon_id) or (15,)
 
         for egg_group_id in egg_groups_ids:
             egg_groups.append(
                 str(
                     ctx.bot.misc.get_egg_emote(
-                        (
-                            await ctx.bot.db[1].egg_groups_info.find_one(
-                                {"id": egg_group_id}
-                            )
-                        )["identifier"]
+                        ctx.bot.dex.egg_group_identifier(egg_group_id)
                     )
                 )
             )
-        try:
-            stats = (
-                await ctx.bot.db[1].pokemon_stats.find_one(
-                    {"pokemon_id": form_info["pokemon_id"]}
-                )
-            )["stats"]
-        except:
-            await ctx.send(records)
-
-        async for record in ctx.bot.db[1].poke_abilities.find(
-            {"pokemon_id": form_info["pokemon_id"]}
-        ):
-            ab_ids.append(record["ability_id"])
+        ab_ids.extend(ctx.bot.dex.abilities_of(form_info.pokemon_id))
 
         try:
             ab_id = ab_ids[ab_index]
         except:
             ab_id = ab_ids[0]
 
-        abilities.append(
-            (await ctx.bot.db[1].abilities.find_one({"id": ab_id}))["identifier"]
-        )
+        abilities.append(ctx.bot.dex.ability_identifier(ab_id))
 
-        pokemonSpeed = stats[5]
-        pokemonSpd = stats[4]
-        pokemonSpa = stats[3]
-        pokemonDef = stats[2]
-        pokemonAtk = stats[1]
-        pokemonHp = stats[0]
         tlist = ", ".join(types)
         egg_groups = ", ".join(egg_groups)
 
-        round((((2 * pokemonHp + hpiv + (hpev / 4)) * plevel) / 100) + plevel + 10)
-        attack = round(
-            ((((2 * pokemonAtk + atkiv + (atkev / 4)) * plevel) / 100) + 5)
-            * stat_deltas["Attack"]
-        )
-        defense = round(
-            ((((2 * pokemonDef + defiv + (defev / 4)) * plevel) / 100) + 5)
-            * stat_deltas["Defense"]
-        )
-        specialattack = round(
-            ((((2 * pokemonSpa + spatkiv + (spaev / 4)) * plevel) / 100) + 5)
-            * stat_deltas["Special attack"]
-        )
-        specialdefense = round(
-            ((((2 * pokemonSpd + spdefiv + (spdev / 4)) * plevel) / 100) + 5)
-            * stat_deltas["Special defense"]
-        )
-        speed = round(
-            ((((2 * pokemonSpeed + speediv + (speedev / 4)) * plevel) / 100) + 5)
-            * stat_deltas["Speed"]
-        )
         t_ivs = hpiv + atkiv + defiv + spatkiv + spdefiv + speediv
         if "arceus-" in pn.lower():
             tlist = pn.split("-")[1]
@@ -218,7 +137,7 @@ async def get_pokemon_qinfo(ctx, records, info_type=None):
         pass
 
     abilities = ", ".join(abilities).capitalize().replace("-", " ")
-    nature = nature["identifier"].capitalize()
+    nature = nature.identifier.capitalize()
     pn = pn.capitalize()
     ivs, txt = (
         round(t_ivs / 186 * 100, 2) if not pn.lower() == "egg" else "?",
@@ -246,7 +165,6 @@ async def get_pokemon_qinfo(ctx, records, info_type=None):
     embed.description = f"""**Ability**: `{abilities}` | **Nature**: `{nature}`\n**Types**: {tlist}\n**Egg Groups**: {egg_groups}\n`HP`: **{hpiv}** | `Attack`: **{atkiv}** | `Defense`: **{defiv}**\n`SP.A`: **{spatkiv}** | `SP.D`: **{spdefiv}** | `Speed`: **{speediv}**\n__**Total IV%:**__ `{ivs}`\nHeld item : `{hi}{txt}`"""
     # embed.set_thumbnail(url=ctx.author.avatar_url)
     # embed.set_image(url=iurl)
-    id_count = len(ids)
     embed.set_footer(
         text=f"Number {pnum}/{id_count} | Global ID: {_id}" if not info_type else ""
     )
@@ -255,18 +173,15 @@ async def get_pokemon_qinfo(ctx, records, info_type=None):
 
 async def get_pokemon_info(ctx, records, info_type=None):
     _id = records["id"]
-    async with ctx.bot.db[0].acquire() as pconn:
-        ids = await pconn.fetchval(
-            "SELECT pokes FROM users WHERE u_id = $1", ctx.author.id
-        )
+    async with ctx.bot.commondb.ownership_conn(ctx.author.id) as pconn:
+        pnum = await ctx.bot.commondb.position_of(ctx.author.id, _id, pconn=pconn)
+        id_count = await ctx.bot.commondb.count_pokes(ctx.author.id, pconn=pconn)
         tnick = await pconn.fetchval(
             "SELECT tnick FROM users WHERE u_id = $1", records["caught_by"]
         )
     tnick = str(tnick)[:20]
     if not info_type:
-        try:
-            pnum = ids.index(_id) + 1
-        except ValueError:
+        if pnum is None:
             # The user *probably* has a pokemon selected that they do not own, so clear the
             # user's selected pokemon for the future.
             async with ctx.bot.db[0].acquire() as pconn:
@@ -320,114 +235,50 @@ async def get_pokemon_info(ctx, records, info_type=None):
     elif skin:
         skindisp = "<:sp6:875570797673086986><:sp5:875570797668876298><:sp4:875570797589172274><:sp3:875570797148770375><:sp2:875570797199118388><:sp1:875570797173948458>"
 
-    nature = await ctx.bot.db[1].natures.find_one({"identifier": nature.lower()})
-    dec_stat_id = nature["decreased_stat_id"]
-    inc_stat_id = nature["increased_stat_id"]
-    dec_stat = await ctx.bot.db[1].stat_types.find_one({"id": dec_stat_id})
-    inc_stat = await ctx.bot.db[1].stat_types.find_one({"id": inc_stat_id})
-    dec_stat = dec_stat["identifier"].capitalize().replace("-", " ")
-    inc_stat = inc_stat["identifier"].capitalize().replace("-", " ")
-    stat_deltas = {
-        "Attack": 1,
-        "Defense": 1,
-        "Special attack": 1,
-        "Special defense": 1,
-        "Speed": 1,
-    }
-    if dec_stat != inc_stat:
-        stat_deltas[dec_stat] = 0.9
-        stat_deltas[inc_stat] = 1.1
-
-    form_info = await ctx.bot.db[1].forms.find_one({"identifier": pn.lower()})
+    nature = ctx.bot.dex.nature(nature)
+    dec_stat = ctx.bot.dex.stat_identifier(nature.decreased_stat_id)
+    inc_stat = ctx.bot.dex.stat_identifier(nature.increased_stat_id)
+    dec_stat = dec_stat.capitalize().replace("-", " ")
+    inc_stat = inc_stat.capitalize().replace("-", " ")
+
+    form_info = ctx.bot.dex.form(pn)
     if pn.lower() != "egg":
-        type_ids = (
-            await ctx.bot.db[1].ptypes.find_one({"id": form_info["pokemon_id"]})
-        )["types"]
+        type_ids = ctx.bot.dex.types_of(form_info.pokemon_id)
         for _type in type_ids:
             types.append(
-                str(
-                    ctx.bot.misc.get_type_emote(
-                        (await ctx.bot.db[1].types.find_one({"id": _type}))[
-                            "identifier"
-                        ]
-                    )
-                )
+                str(ctx.bot.misc.get_type_emote(ctx.bot.dex.type_identifier(_type)))
             )
 
-        try:
-            egg_groups_ids = (
-                await ctx.bot.db[1].egg_groups.find_one(
-                    {"species_id": form_info["pokemon_id"]}
-                )
-            )["egg_groups"]
-        except:
-            egg_groups_ids = [15]
+        egg_groups_ids = ctx.bot.dex.egg_groups_of(form_info.pokemon_id) or (15,)
         for egg_group_id in egg_groups_ids:
             egg_groups.append(
                 str(
                     ctx.bot.misc.get_egg_emote(
-                        (
-                            await ctx.bot.db[1].egg_groups_info.find_one(
-                                {"id": egg_group_id}
-                            )
-                        )["identifier"]
+                        ctx.bot.dex.egg_group_identifier(egg_group_id)
                     )
                 )
             )
 
-        try:
-            stats = (
-                await ctx.bot.db[1].pokemon_stats.find_one(
-                    {"pokemon_id": form_info["pokemon_id"]}
-                )
-            )["stats"]
-        except:
-            await ctx.send(records)
-
-        async for record in ctx.bot.db[1].poke_abilities.find(
-            {"pokemon_id": form_info["pokemon_id"]}
-        ):
-            ab_ids.append(record["ability_id"])
+        ab_ids.extend(ctx.bot.dex.abilities_of(form_info.pokemon_id))
 
         try:
             ab_id = ab_ids[ab_index]
         except:
             ab_id = ab_ids[0]
 
-        abilities.append(
-            (await ctx.bot.db[1].abilities.find_one({"id": ab_id}))["identifier"]
-        )
+        abilities.append(ctx.bot.dex.ability_identifier(ab_id))
 
-        pokemonSpeed = stats[5]
-        pokemonSpd = stats[4]
-        pokemonSpa = stats[3]
-        pokemonDef = stats[2]
-        pokemonAtk = stats[1]
-        pokemonHp = stats[0]
         tlist = ", ".join(types)
         egg_groups = ", ".join(egg_groups)
 
-        hp = round((((2 * pokemonHp + hpiv + (hpev / 4)) * plevel) / 100) + plevel + 10)
-        attack = round(
-            ((((2 * pokemonAtk + atkiv + (atkev / 4)) * plevel) / 100) + 5)
-            * stat_deltas["Attack"]
-        )
-        defense = round(
-            ((((2 * pokemonDef + defiv + (defev / 4)) * plevel) / 100) + 5)
-            * stat_deltas["Defense"]
-        )
-        specialattack = round(
-            ((((2 * pokemonSpa + spatkiv + (spaev / 4)) * plevel) / 100) + 5)
-            * stat_deltas["Special attack"]
-        )
-        specialdefense = round(
-            ((((2 * pokemonSpd + spdefiv + (spdev / 4)) * plevel) / 100) + 5)
-            * stat_deltas["Special defense"]
-        )
-        speed = round(
-            ((((2 * pokemonSpeed + speediv + (speedev / 4)) * plevel) / 100) + 5)
-            * stat_deltas["Speed"]
-        )
+        (
+            hp,
+            attack,
+            defense,
+            specialattack,
+            specialdefense,
+            speed,
+        ) = ctx.bot.stat_engine.stats(records)
         t_ivs = hpiv + atkiv + defiv + spatkiv + spdefiv + speediv
         if "arceus-" in pn.lower():
             tlist = pn.split("-")[1]
@@ -452,7 +303,7 @@ async def get_pokemon_info(ctx, records, info_type=None):
         hp = 1
 
     abilities = ", ".join(abilities).capitalize().replace("-", " ")
-    nature = nature["identifier"].capitalize()
+    nature = nature.identifier.capitalize()
     pn = pn.capitalize()
     if pn.lower() != "egg":
         ivs = round(t_ivs / 186 * 100, 2)
@@ -537,7 +388,6 @@ async def get_pokemon_info(ctx, records, info_type=None):
     if ctx.author.avatar is not None:
         embed.set_thumbnail(url=ctx.author.avatar.url)
     embed.set_image(url=iurl)
-    id_count = len(ids)
     embed.set_footer(
         text=f"Number {pnum}/{id_count} | Global ID#: {_id}{txt}"
         if not info_type
@@ -546,117 +396,6 @@ async def get_pokemon_info(ctx, records, info_type=None):
     return embed
 
 
-class EvoReqs(IntFlag):
-    """Stores the requirements for a particular evolution."""
-
-    EMPTY = 0
-    PHYSICALSTATS = 1
-    GENDER = 2
-    LEVEL = 4
-    HAPPINESS = 8
-    MOVE = 16
-    HELDITEM = 32
-    ACTIVEITEM = 64
-    REGION = 128
-
-    def used_active_item(self):
-        return EvoReqs.ACTIVEITEM in self
-
-    @staticmethod
-    def from_raw(raw):
-        score = EvoReqs.EMPTY
-        if raw["relative_physical_stats"] is not None:
-            score |= EvoReqs.PHYSICALSTATS
-        if raw["gender_id"]:
-            score |= EvoReqs.GENDER
-        if raw["minimum_level"]:
-            score |= EvoReqs.LEVEL
-        if raw["minimum_happiness"]:
-            score |= EvoReqs.HAPPINESS
-        if raw["known_move_id"]:
-            score |= EvoReqs.MOVE
-        if raw["held_item_id"]:
-            score |= EvoReqs.HELDITEM
-        if raw["trigger_item_id"]:
-            score |= EvoReqs.ACTIVEITEM
-        if raw["region"]:
-            score |= EvoReqs.REGION
-        return score
-
-
-async def _check_evo_reqs(
-    bot, pokemon, held_item_id, active_item_id, region, evoreq, override_lvl_100
-):
-    """Checks that "poke" meets all of the criteria of "evoreq"."""
-    req_flags = EvoReqs.from_raw(evoreq)
-    # They used an active item but this evo doesn't use an active item, don't use it.
-    if active_item_id is not None and not req_flags.used_active_item():
-        return False
-    # If a pokemon is level 100, ONLY evolve via an override or active item.
-    if pokemon.pokelevel >= 100 and not (
-        override_lvl_100 or active_item_id is not None
-    ):
-        return False
-    if evoreq["trigger_item_id"]:
-        if evoreq["trigger_item_id"] != active_item_id:
-            return False
-    if evoreq["held_item_id"]:
-        if evoreq["held_item_id"] != held_item_id:
-            return False
-    if evoreq["gender_id"]:
-        if evoreq["gender_id"] == 1 and pokemon.gender == "-m":
-            return False
-        if evoreq["gender_id"] == 2 and pokemon.gender == "-f":
-            return False
-    if evoreq["minimum_level"]:
-        if pokemon.pokelevel < evoreq["minimum_level"]:
-            return False
-    if evoreq["known_move_id"]:
-        identifier = await bot.db[1].moves.find_one({"id": evoreq["known_move_id"]})
-        identifier = identifier["identifier"]
-        if identifier not in pokemon.moves:
-            return False
-    if evoreq["minimum_happiness"]:
-        if pokemon.happiness < evoreq["minimum_happiness"]:
-            return False
-    if evoreq["relative_physical_stats"] is not None:
-        # WARNING
-        # Currently this is only used by Tyrogue, which has identical base stats for atk and def.
-        # If this is used on a poke WITHOUT identical base stats, the base stat needs to be considered.
-        attack = pokemon.atkiv + pokemon.atkev
-        defense = pokemon.defiv + pokemon.defev
-        if evoreq["relative_physical_stats"] == 1 and not attack > defense:
-            return False
-        elif evoreq["relative_physical_stats"] == -1 and not attack < defense:
-            return False
-        elif evoreq["relative_physical_stats"] == 0 and not attack == defense:
-            return False
-    if evoreq["region"]:
-        if evoreq["region"] != region:
-            return False
-        # Temp blocker since previously radiants could never evolve to regional forms, so they were released separately
-        if pokemon.radiant:
-            return False
-    return True
-
-
-def _pick_evo(valid_evos):
-    """
-    Picks one of the valid evos, and returns that evo's id.
-
-    Prioritizes evos that are more explicit than implicit ones.
-    IE: held item evos > level evos
-    """
-    best_score = -1
-    best_id = None
-    for evo in valid_evos:
-        score = EvoReqs.from_raw(evo)
-        if score > best_score:
-            best_score = score
-            best_id = evo["evolved_species_id"]
-    return (best_id, best_score)
-
-
 async def evolve(
     bot, pokemon_data, owner, *, channel=None, active_item=None, override_lvl_100=False
 ):
@@ -666,135 +405,38 @@ async def evolve(
     Returns False if the poke did not evolve, and an instance of EvoReqs if it did.
     If channel is passed, also sends a message indicating that the poke evolved.
     """
-    pokemon = dacite.from_dict(data_class=Pokemon, data=pokemon_data)
-    original_name = pokemon.pokname
-    pokemon.pokname = pokemon.pokname.lower()
-
-    # Everstones block evolutions, don't try to evolve
-    if pokemon.hitem in ("everstone", "eviolite"):
-        return False
-
-    # The pokemon is an egg, eggs cannot evolve
-    if pokemon.pokname == "egg":
-        return False
-
-    # Don't try to evolve forms
-    if is_formed(pokemon.pokname) or any(
-        pokemon.pokname.endswith(x) for x in ("-staff", "-custom")
-    ):
-        return False
-
-    # Get the necessary info of this poke to find evos
-    pokemon_info = await bot.mongo_pokemon_db.forms.find_one(
-        {"identifier": pokemon.pokname}
-    )
-    if pokemon_info is None:
-        bot.logger.warning(
-            f"A poke exists that is not in the mongo forms table - {pokemon.pokname}"
-        )
-        return False
-    pokemon_info = dacite.from_dict(
-        data_class=FormInfo,
-        data=pokemon_info,
-    )
-    raw_pfile = await bot.mongo_pokemon_db.pfile.find_one(
-        {"identifier": pokemon_info.identifier}
-    )
-    if raw_pfile is None:
-        bot.logger.warning(
-            f"A non-formed poke exists that is not in the mongo pfile table - {pokemon.pokname}"
-        )
-        return False
-    pokemon_info.pfile = dacite.from_dict(data_class=PFile, data=raw_pfile)
-
-    # Get a list of pokes in this poke's evo chain
-    evoline = bot.mongo_pokemon_db.pfile.find(
-        {"evolution_chain_id": pokemon_info.pfile.evolution_chain_id}
-    )
-    async for record in evoline:
-        pokemon_info.evoline.append(record)
-    pokemon_info.evoline.sort(key=lambda doc: doc["is_baby"], reverse=True)
-
-    # Filter the potential evos to only include ones that are evolved from this poke
-    potential_evos = []
-    for x in pokemon_info.evoline:
-        if not x["evolves_from_species_id"] == pokemon_info.pokemon_id:
-            continue
-        val = await bot.db[1].evofile.find_one({"evolved_species_id": x["id"]})
-        if val is None:
-            bot.logger.warning(
-                f"An evofile does not exist for a poke - {x['identifier']}"
-            )
-        else:
-            potential_evos.append(val)
-
-    # This pokemon has no future evos, so it can't evolve into anything
-    if not potential_evos:
-        return False
-
-    # Prep held and active items
+    # Prep the active item
     if active_item is None:
         active_item_id = None
     else:
-        active_item_id = await bot.mongo_pokemon_db.items.find_one(
-            {"identifier": active_item}
-        )
+        active_item_id = bot.dex.item_id(active_item)
         if active_item_id is None:
             bot.logger.warning(
                 f"A poke is trying to use an active item that is not in the mongo table - {active_item}"
             )
-        else:
-            active_item_id = active_item_id["id"]
-    held_item_id = await bot.mongo_pokemon_db.items.find_one(
-        {"identifier": pokemon.hitem}
-    )
-    if held_item_id is not None:
-        held_item_id = held_item_id["id"]
-
-    # Get the owner's current region
-    async with bot.db[0].acquire() as pconn:
-        region = await pconn.fetchval(
-            "SELECT region FROM users WHERE u_id = $1", owner.id
-        )
-    if region is None:
-        return False
-
-    # Filter out evos that this poke does not meet the requirements for
-    valid_evos = []
-    for evoreq in potential_evos:
-        if await _check_evo_reqs(
-            bot, pokemon, held_item_id, active_item_id, region, evoreq, override_lvl_100
-        ):
-            valid_evos.append(evoreq)
 
-    # This poke does not meet the conditions of any potential evos
-    if not valid_evos:
+    evolved = await evolve_many(
+        bot,
+        [(pokemon_data, owner.id)],
+        active_item_id=active_item_id,
+        override_lvl_100=override_lvl_100,
+    )
+    if not evolved:
         return False
+    _, edge = evolved[0]
 
-    evo_id, evo_reqs = _pick_evo(valid_evos)
-    evo = await bot.mongo_pokemon_db.pfile.find_one({"id": evo_id})
-    evo = evo["identifier"].capitalize()
-
-    # We evolved, actually update the poke & notify the user
-    async with bot.db[0].acquire() as pconn:
-        await pconn.execute(
-            "UPDATE pokes SET pokname = $2, gender = $3 WHERE id = $1",
-            pokemon.id,
-            evo,
-            pokemon.gender,
-        )
     if channel:
         try:
             await channel.send(
                 embed=discord.Embed(
                     title="Congratulations!!!",
-                    description=f"{owner.name}, your {original_name} has evolved into {evo}!",
+                    description=f"{owner.name}, your {pokemon_data['pokname']} has evolved into {edge.evolved_name}!",
                     color=bot.get_random_color(),
                 )
             )
         except discord.HTTPException:
             pass
-    return evo_reqs
+    return edge.reqs
 
 
 async def devolve(ctx, pokeid):
@@ -808,15 +450,12 @@ async def devolve(ctx, pokeid):
         pokename = await pconn.fetchval(
             "SELECT pokname FROM pokes WHERE id = $1", pokeid
         )
-    pokedata = await ctx.bot.mongo_pokemon_db.pfile.find_one(
-        {"identifier": pokename.lower()}
-    )
-    preid = pokedata["evolves_from_species_id"]
+    pokedata = ctx.bot.dex.species_by_identifier(pokename)
+    preid = pokedata.evolves_from_species_id
     # The pokemon is the base evolution, or otherwise does not exist.
     if not preid:
         return False
-    preevo = await ctx.bot.mongo_pokemon_db.pfile.find_one({"id": preid})
-    new_name = preevo["identifier"].capitalize()
+    new_name = ctx.bot.dex.species(preid).identifier.capitalize()
     async with ctx.bot.db[0].acquire() as pconn:
         await pconn.execute(
             "UPDATE pokes SET pokname = $2 WHERE id = $1", pokeid, new_name
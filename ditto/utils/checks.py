@@ -169,18 +169,14 @@ def tradelock(coro_or_command):
 
     @wraps(coro)
     async def wrapped(self, ctx, *args, **kwargs):
-        current_traders = [
-            int(id_)
-            for id_ in await ctx.bot.redis_manager.redis.execute(
-                "LRANGE", "tradelock", "0", "-1"
-            )
-            if id_.decode("utf-8").isdigit()
-        ]
-        if ctx.author.id in current_traders:
+        lease = await ctx.bot.trade_locks.acquire(ctx.author.id)
+        if lease is None:
             await ctx.send(f"{ctx.author.name} is currently in a trade!")
             return
-        async with ctx.bot.commondb.TradeLock(ctx.bot, ctx.author):
+        try:
             await coro(self, ctx, *args, **kwargs)
+        finally:
+            await lease.release()
 
     if not is_command:
         return wrapped
@@ -211,21 +207,20 @@ def tradelock_with_receiver(coro_or_command):
             raise RuntimeError(
                 "The first argument for a command decorated with tradelock_with_receiver must be a discord.Member."
             )
-        current_traders = [
-            int(id_)
-            for id_ in await ctx.bot.redis_manager.redis.execute(
-                "LRANGE", "tradelock", "0", "-1"
+        lease = await ctx.bot.trade_locks.acquire(ctx.author.id, member.id)
+        if lease is None:
+            current_traders = await ctx.bot.trade_locks.locked(
+                ctx.author.id, member.id
             )
-            if id_.decode("utf-8").isdigit()
-        ]
-        if ctx.author.id in current_traders:
-            await ctx.send(f"{ctx.author.name} is currently in a trade!")
-            return
-        if member.id in current_traders:
-            await ctx.send(f"{member.name} is currently in a trade!")
+            if member.id in current_traders and ctx.author.id not in current_traders:
+                await ctx.send(f"{member.name} is currently in a trade!")
+            else:
+                await ctx.send(f"{ctx.author.name} is currently in a trade!")
             return
-        async with ctx.bot.commondb.TradeLock(ctx.bot, ctx.author, member):
+        try:
             await coro(self, ctx, member, *args, **kwargs)
+        finally:
+            await lease.release()
 
     if not is_command:
         return wrapped
@@ -9,7 +9,6 @@ from typing import Awaitable, Callable, List, Union
 
 import os
 
-import aiohttp
 import discord
 from discord.ext import commands
 from PIL import Image as im
@@ -503,7 +502,7 @@ async def get_pixel_spawn_url(pokemon_name):
 
 async def get_pixel_file_name(name, bot, shiny=False):
     name = name.lower()
-    identifier = await bot.db[1].forms.find_one({"identifier": name})
+    identifier = bot.dex.form(name)
     if not identifier:
         # I have NO idea how this can be handled yet, raising for now to avoid breaking other code while still making errors clearer.
         raise ValueError(
@@ -511,20 +510,20 @@ async def get_pixel_file_name(name, bot, shiny=False):
         )
 
     # suffix = get_suffix(name)
-    suffix = identifier["form_identifier"]
+    suffix = identifier.form_identifier
 
     if suffix and name.endswith(suffix):
-        form_id = int(identifier["form_order"] - 1)
+        form_id = int(identifier.form_order - 1)
         form_name = name[: -(len(suffix) + 1)]
-        pokemon_identifier = await bot.db[1].forms.find_one({"identifier": form_name})
+        pokemon_identifier = bot.dex.form(form_name)
         if not pokemon_identifier:
             # I have NO idea how this can be handled yet, raising for now to avoid breaking other code while still making errors clearer.
             raise ValueError(
                 f"Invalid name ({name}) passed to ditto/utils/misc.py get_file_name."
             )
-        pokemon_id = pokemon_identifier["pokemon_id"]
+        pokemon_id = pokemon_identifier.pokemon_id
     else:
-        pokemon_id = identifier["pokemon_id"]
+        pokemon_id = identifier.pokemon_id
         form_id = 0
     filetype = "png"
    # if skin is None:
@@ -540,7 +539,7 @@ async def get_pixel_file_name(name, bot, shiny=False):
 
 async def get_file_name(name, bot, shiny=False, *, radiant=False, skin=None):
     name = name.lower()
-    identifier = await bot.db[1].forms.find_one({"identifier": name})
+    identifier = bot.dex.form(name)
     if not identifier:
         # I have NO idea how this can be handled yet, raising for now to avoid breaking other code while still making errors clearer.
         raise ValueError(
@@ -548,20 +547,20 @@ async def get_file_name(name, bot, shiny=False, *, radiant=False, skin=None):
         )
 
     # suffix = get_suffix(name)
-    suffix = identifier["form_identifier"]
+    suffix = identifier.form_identifier
 
     if suffix and name.endswith(suffix):
-        form_id = int(identifier["form_order"] - 1)
+        form_id = int(identifier.form_order - 1)
         form_name = name[: -(len(suffix) + 1)]
-        pokemon_identifier = await bot.db[1].forms.find_one({"identifier": form_name})
+        pokemon_identifier = bot.dex.form(form_name)
         if not pokemon_identifier:
             # I have NO idea how this can be handled yet, raising for now to avoid breaking other code while still making errors clearer.
             raise ValueError(
                 f"Invalid name ({name}) passed to ditto/utils/misc.py get_file_name."
             )
-        pokemon_id = pokemon_identifier["pokemon_id"]
+        pokemon_id = pokemon_identifier.pokemon_id
     else:
-        pokemon_id = identifier["pokemon_id"]
+        pokemon_id = identifier.pokemon_id
         form_id = 0
     filetype = "png"
     if skin is None:
@@ -578,7 +577,7 @@ async def get_file_name(name, bot, shiny=False, *, radiant=False, skin=None):
 
 async def get_battle_file_name(name, bot, shiny=False, *, radiant=False, skin=None):
     name = name.lower()
-    identifier = await bot.db[1].forms.find_one({"identifier": name})
+    identifier = bot.dex.form(name)
     if not identifier:
         # I have NO idea how this can be handled yet, raising for now to avoid breaking other code while still making errors clearer.
         raise ValueError(
@@ -586,20 +585,20 @@ async def get_battle_file_name(name, bot, shiny=False, *, radiant=False, skin=No
         )
 
     # suffix = get_suffix(name)
-    suffix = identifier["form_identifier"]
+    suffix = identifier.form_identifier
 
     if suffix and name.endswith(suffix):
-        form_id = int(identifier["form_order"] - 1)
+        form_id = int(identifier.form_order - 1)
         form_name = name[: -(len(suffix) + 1)]
-        pokemon_identifier = await bot.db[1].forms.find_one({"identifier": form_name})
+        pokemon_identifier = bot.dex.form(form_name)
         if not pokemon_identifier:
             # I have NO idea how this can be handled yet, raising for now to avoid breaking other code while still making errors clearer.
             raise ValueError(
                 f"Invalid name ({name}) passed to ditto/utils/misc.py get_file_name."
             )
-        pokemon_id = pokemon_identifier["pokemon_id"]
+        pokemon_id = pokemon_identifier.pokemon_id
     else:
-        pokemon_id = identifier["pokemon_id"]
+        pokemon_id = identifier.pokemon_id
         form_id = 0
     filetype = "png"
     if skin is None:
@@ -664,19 +663,13 @@ async def get_battle_image(poke1, poke2, bot):
         poke2.name, bot, poke2.shiny, radiant=poke2.radiant
     )
 
-    async with aiohttp.request("get", base_url) as pBack:
+    pBack, pFront = await asyncio.gather(bot.web.get(base_url), bot.web.get(_base_url))
 
-        pBack = await pBack.read()
+    s = await run_in_tpe(im.open, BytesIO(pBack.body))
+    s = await run_in_tpe(s.convert, "RGBA")
 
-        s = await run_in_tpe(im.open, BytesIO(pBack))
-        s = await run_in_tpe(s.convert, "RGBA")
-
-    async with aiohttp.request("get", _base_url) as pFront:
-
-        pFront = await pFront.read()
-
-        g = await run_in_tpe(im.open, BytesIO(pFront))
-        g = await run_in_tpe(g.convert, "RGBA")
+    g = await run_in_tpe(im.open, BytesIO(pFront.body))
+    g = await run_in_tpe(g.convert, "RGBA")
 
     return s, g
 
@@ -1081,6 +1074,32 @@ class MenuView(discord.ui.View):
         return self.message
 
 
+class LazyMenuView(MenuView):
+    """
+    MenuView over a page source that builds each page when it is shown.
+
+    `pages` must support len() and provide an async `get_page(index)` which returns
+    a str or discord.Embed.
+    """
+
+    async def handle_page(self, edit_func):
+        page = await self.pages.get_page(self.page)
+        if isinstance(page, discord.Embed):
+            await edit_func(embed=page)
+        else:
+            await edit_func(content=page)
+
+    async def start(self):
+        if len(self.pages) < 1:
+            raise RuntimeError("Must provide at least 1 page.")
+        page = await self.pages.get_page(0)
+        if isinstance(page, discord.Embed):
+            self.message = await self.ctx.send(embed=page, view=self)
+        else:
+            self.message = await self.ctx.send(page, view=self)
+        return self.message
+
+
 class ConfirmView(discord.ui.View):
     """View to confirm or cancel an action."""
 
@@ -1305,9 +1324,7 @@ class EnableCommandsView(discord.ui.View):
 
     @discord.ui.button(label="Re-enable commands", style=discord.ButtonStyle.secondary)
     async def reenable(self, button, interaction):
-        current_setting = await self.ctx.bot.mongo_find(
-            "guilds", {"id": self.ctx.guild.id}
-        )
+        current_setting = self.ctx.bot.guild_settings.get(self.ctx.guild.id)
         # I'm not checking current_setting, since it shouldn't be possible to *not* have settings and get this view
         disabled = set(current_setting["disabled_channels"])
         if self.ctx.channel.id not in disabled:
@@ -1316,15 +1333,13 @@ class EnableCommandsView(discord.ui.View):
             )
             return
         disabled.remove(self.ctx.channel.id)
-        await self.ctx.bot.mongo_update(
-            "guilds",
-            {"id": self.ctx.guild.id},
-            {"disabled_channels": list(disabled)},
+        await self.ctx.bot.guild_settings.update(
+            self.ctx.guild.id, {"disabled_channels": list(disabled)}
         )
+        await self.ctx.bot.bans.remove("channels", self.ctx.channel.id)
         await interaction.response.send_message(
             content=f"Successfully enabled commands in {self.ctx.channel}."
         )
-        await self.ctx.bot.load_bans()
 
 
 def poke_spawn_check(inputted_name: str, pokemon: str) -> bool:
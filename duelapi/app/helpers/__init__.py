@@ -1,4 +1,5 @@
 from .healthbar import HealthBar
 from .extras import sresize
+from . import render_cache
 
-__all__ = ["sresize", "HealthBar"]
+__all__ = ["sresize", "HealthBar", "render_cache"]
@@ -6,6 +6,9 @@ from PIL import Image, ImageDraw, ImageFont
 class HealthBar:
     def __init__(self):
         self.radius = 30
+        self.font = ImageFont.truetype(
+            str(Path(__file__).parent.parent / "res" / "JMH Ava bold.otf"), 48
+        )
 
     def round_corner(self, radius, fill):
         """Draw a round corner."""
@@ -44,11 +47,10 @@ class HealthBar:
         health_bar = self.make_health_bar(diff)
         base_bar.paste(health_bar, (5, 4), mask=health_bar)
         draw = ImageDraw.Draw(base_bar)
-
-        font = ImageFont.truetype(
-            str(Path(__file__).parent.parent / "res" / "JMH Ava bold.otf"), 48
-        )
         draw.text(
-            (140, 19), f"{current_health}/{max_health}", fill=(0, 0, 0, 255), font=font
+            (140, 19),
+            f"{current_health}/{max_health}",
+            fill=(0, 0, 0, 255),
+            font=self.font,
         )
         return base_bar
@@ -0,0 +1,118 @@
+import io
+import logging
+import os
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import Image
+
+from .extras import sresize
+from .healthbar import HealthBar
+
+DIR = Path(__file__).parent.parent / "res"
+
+# Every cache is per worker, so these are kept small enough to multiply by gunicorn's worker count
+BACKGROUND_CACHE_SIZE = int(os.getenv("DUELAPI_BACKGROUND_CACHE", 16))
+SPRITE_CACHE_SIZE = int(os.getenv("DUELAPI_SPRITE_CACHE", 512))
+BAR_CACHE_SIZE = int(os.getenv("DUELAPI_BAR_CACHE", 1024))
+OUTPUT_CACHE_SIZE = int(os.getenv("DUELAPI_OUTPUT_CACHE", 64))
+
+# zlib level 1 is several times faster than Pillow's default of 6, for slightly larger files
+PNG_COMPRESS_LEVEL = int(os.getenv("DUELAPI_PNG_COMPRESS_LEVEL", 1))
+WEBP_QUALITY = int(os.getenv("DUELAPI_WEBP_QUALITY", 85))
+
+MEDIA_TYPES = {"png": "image/png", "webp": "image/webp"}
+
+# Weathers that share an overlay
+WEATHER_LAYERS = {
+    "rain": "rain",
+    "h-rain": "rain",
+    "hail": "hail",
+    "sun": "sun",
+    "h-sun": "sun",
+    "sandstorm": "sandstorm",
+    # TODO: wind
+}
+
+_health_bars = HealthBar()
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def overlay(name):
+    """A decoded RGBA overlay from the resources folder."""
+    return Image.open(str(DIR / f"{name}.png")).convert("RGBA")
+
+
+@lru_cache(maxsize=None)
+def substitute():
+    return sresize(Image.open(str(DIR / "sub.png"))).convert("RGBA")
+
+
+@lru_cache(maxsize=BACKGROUND_CACHE_SIZE)
+def _background(number, weather_layer, trick_room):
+    bg = Image.open(str(DIR / f"bg{number}.png"))
+
+    if trick_room:
+        layer = overlay("trick_room").resize(bg.size)
+        layer.putalpha(128)
+        bg.paste(layer)
+
+    if weather_layer:
+        layer = overlay(weather_layer).resize(bg.size)
+        bg.paste(layer, mask=layer)
+
+    if bg.size != (1280, 640):
+        bg = bg.resize((1280, 640), Image.ANTIALIAS)
+    bg.load()
+    return bg
+
+
+def background(number, weather, trick_room):
+    """
+    A copy of a background with its weather and trick room layers already applied.
+
+    The composite is built once per combination, callers are free to paste onto the copy.
+    """
+    return _background(number, WEATHER_LAYERS.get(weather), bool(trick_room)).copy()
+
+
+def _open_sprite(path):
+    """Decodes a sprite from the resources folder, logging it before raising if it is missing."""
+    try:
+        return Image.open(DIR / path).convert("RGBA")
+    except FileNotFoundError:
+        logger.warning("%s does not exist in duel resources!", path)
+        raise
+
+
+@lru_cache(maxsize=SPRITE_CACHE_SIZE)
+def sprite(path):
+    """A decoded sprite, already resized for the battle scene. Do not draw on it."""
+    try:
+        img = _open_sprite(path)
+    except FileNotFoundError:
+        img = Image.open(DIR / "sprites" / "ERROR.png").convert("RGBA")
+    return sresize(img)
+
+
+@lru_cache(maxsize=SPRITE_CACHE_SIZE)
+def card_sprite(path):
+    """A decoded sprite at its original size, for the team preview. Do not draw on it."""
+    return _open_sprite(path)
+
+
+@lru_cache(maxsize=BAR_CACHE_SIZE)
+def health_bar(current_health, max_health):
+    """A drawn health bar. Do not draw on it."""
+    return _health_bars.bar(current_health, max_health)
+
+
+def encode(img, image_format="png"):
+    """Encodes an image as png or webp, returns the bytes."""
+    fp = io.BytesIO()
+    if image_format == "webp":
+        img.save(fp, "WEBP", quality=WEBP_QUALITY, method=0)
+    else:
+        img.save(fp, "PNG", compress_level=PNG_COMPRESS_LEVEL)
+    return fp.getvalue()
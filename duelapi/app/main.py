@@ -1,24 +1,16 @@
-import io
 import math
+from functools import lru_cache
 from pathlib import Path
 
 import orjson
 from fastapi import FastAPI
 from PIL import Image, ImageDraw, ImageFont
-from starlette.responses import StreamingResponse
+from starlette.responses import Response
 
-from helpers import HealthBar, sresize
+from helpers import render_cache
 
 app = FastAPI()
 DIR = Path(__file__).parent / "res"
-PRELOADED = {
-    "trick_room": Image.open(str(DIR / "trick_room.png")).convert("RGBA"),
-    "rain": Image.open(str(DIR / "rain.png")).convert("RGBA"),
-    "hail": Image.open(str(DIR / "hail.png")).convert("RGBA"),
-    "sun": Image.open(str(DIR / "sun.png")).convert("RGBA"),
-    "sandstorm": Image.open(str(DIR / "sandstorm.png")).convert("RGBA"),
-    "sub": sresize(Image.open(str(DIR / "sub.png"))).convert("RGBA"),
-}
 
 font = ImageFont.truetype(str(DIR / "futur.ttf"), 16, encoding="unic")
 
@@ -30,17 +22,20 @@ def draw_rectangle(width, height, color):
     return Image.new("RGBA", (width, height), color)
 
 
+@lru_cache(maxsize=render_cache.SPRITE_CACHE_SIZE)
 def draw_pixel_pokemon_card(path, level, gender="-m"):
     """Parameters
     path: str
         Path to image
+
+    The card is cached, do not draw on it.
     """
     base_card_width, base_card_height = 272, 75
 
     base_card = draw_rectangle(base_card_width, base_card_height, "#f5f5f5").convert(
         "RGBA"
     )
-    pokemon_sprite = Image.open(DIR / path).convert("RGBA")
+    pokemon_sprite = render_cache.card_sprite(path)
     base_card.paste(pokemon_sprite, (5, -10), mask=pokemon_sprite)
 
     draw = ImageDraw.Draw(base_card)
@@ -89,26 +84,53 @@ def draw_player_teams(background, p1pokes, p2pokes):
         left += 80
 
 
+@lru_cache(maxsize=None)
+def team_preview_background():
+    img = Image.open(str(DIR / "team_preview.jpg")).convert("RGBA")
+    img.load()
+    return img
+
+
+def image_response(content, image_format):
+    return Response(content=content, media_type=render_cache.MEDIA_TYPES[image_format])
+
+
+def _image_format(image_format):
+    return image_format if image_format in render_cache.MEDIA_TYPES else "png"
+
+
+@lru_cache(maxsize=render_cache.OUTPUT_CACHE_SIZE)
+def render_team_preview(player1, player2, image_format):
+    """Renders a team preview, `player1` and `player2` being (name, ((sprite path, level), ...))."""
+    bg = team_preview_background().copy()
+    draw_player_headers(bg, [player1[0], player2[0]])
+    draw_player_teams(bg, player1[1], player2[1])
+    return render_cache.encode(bg, image_format)
+
+
 @app.post("/build_team_preview")
-def build_team_preview(player1_data: str, player2_data: str):
+def build_team_preview(player1_data: str, player2_data: str, image_format: str = "png"):
     """Paramater payload will be like the following
     player1_data: dictionary
         Contains the JSON serializable information for Player 1 containing name & list of (pokemon_sprite_path, level)
     player2_data: dictionary
         Contains the JSON serializable information for Player 2 containing name & list of (pokemon_sprite_path, level)
+    image_format: str
+        "png" (the default) or "webp"
     """
     player1_data, player2_data = orjson.loads(player1_data), orjson.loads(player2_data)
-    player1_pokes = player1_data["pokemon_info"]
-    player2_pokes = player2_data["pokemon_info"]
-
-    bg = Image.open(str(DIR / "team_preview.jpg")).convert("RGBA")
-    draw_player_headers(bg, [player1_data["name"], player2_data["name"]])
-    draw_player_teams(bg, player1_pokes, player2_pokes)
-
-    fp = io.BytesIO()
-    bg.save(fp, format="PNG")
-    fp.seek(0)
-    return StreamingResponse(fp, media_type="image/png")
+    player1 = (
+        player1_data["name"],
+        tuple((path, level) for path, level in player1_data["pokemon_info"]),
+    )
+    player2 = (
+        player2_data["name"],
+        tuple((path, level) for path, level in player2_data["pokemon_info"]),
+    )
+    image_format = _image_format(image_format)
+    return image_response(
+        render_team_preview(player1, player2, image_format), image_format
+    )
 
 
 @app.get("/ping")
@@ -116,6 +138,49 @@ def ping():
     return {"message": "ping"}
 
 
+@lru_cache(maxsize=render_cache.OUTPUT_CACHE_SIZE)
+def render_battle(
+    poke1_image_url,
+    poke2_image_url,
+    poke1_health,
+    poke2_health,
+    poke1_substitute,
+    poke2_substitute,
+    background_number,
+    weather,
+    trick_room,
+    image_format,
+):
+    """
+    Renders a turn of a duel.
+
+    Identical turn states are served from the cache without drawing anything.
+    The healths are (current, max) tuples.
+    """
+    bg = render_cache.background(background_number, weather, trick_room)
+    sub = render_cache.substitute()
+
+    p1 = render_cache.sprite(poke1_image_url)
+    p2 = render_cache.sprite(poke2_image_url)
+
+    area = (630, 50)
+    bg.paste(p2, area, p2)
+    if poke2_substitute:
+        bg.paste(sub, area, mask=sub)
+
+    area = (70, 50)
+    bg.paste(p1, area, p1)
+    if poke1_substitute:
+        bg.paste(sub, area, mask=sub)
+
+    bar1 = render_cache.health_bar(*poke1_health)
+    bar2 = render_cache.health_bar(*poke2_health)
+    bg.paste(bar1, (86, 44), mask=bar1)
+    bg.paste(bar2, (707, 44), mask=bar2)
+
+    return render_cache.encode(bg, image_format)
+
+
 @app.post("/build")
 def build_image(
     poke1_image_url: str,
@@ -125,6 +190,7 @@ def build_image(
     background_number: int,
     weather: str,
     trick_room: int,
+    image_format: str = "png",
 ):
     """Paramater payload will be like the following
 
@@ -142,78 +208,22 @@ def build_image(
         The current weather
     trick_room: bool/int
         If a trick room is active
+    image_format: str
+        "png" (the default) or "webp"
     """
-    args = {
-        "poke1_image_url": poke1_image_url,
-        "poke2_image_url": poke2_image_url,
-        "poke1": poke1,
-        "poke2": poke2,
-        "background_number": background_number,
-        "weather": weather,
-        "trick_room": trick_room,
-    }
-    poke1 = orjson.loads(args["poke1"])
-    poke2 = orjson.loads(args["poke2"])
-
-    bg = Image.open(str(DIR / f"bg{args['background_number']}.png"))
-
-    if int(args["trick_room"]):
-        trick_room = PRELOADED["trick_room"].resize(bg.size)
-        trick_room.putalpha(128)
-        bg.paste(trick_room)
-
-    if args["weather"]:
-        w = args["weather"]
-        if w in ("rain", "h-rain"):
-            layer = PRELOADED["rain"].resize(bg.size)
-            bg.paste(layer, mask=layer)
-        elif w == "hail":
-            layer = PRELOADED["hail"].resize(bg.size)
-            bg.paste(layer, mask=layer)
-        elif w in ("sun", "h-sun"):
-            layer = PRELOADED["sun"].resize(bg.size)
-            bg.paste(layer, mask=layer)
-        elif w == "sandstorm":
-            layer = PRELOADED["sandstorm"].resize(bg.size)
-            bg.paste(layer, mask=layer)
-        # TODO: wind
-
-    if bg.size != (1280, 640):
-        bg = bg.resize((1280, 640), Image.ANTIALIAS)
-
-    try:
-        p1 = Image.open(DIR / args["poke1_image_url"]).convert("RGBA")
-    except FileNotFoundError:
-        print(f"{args['poke1_image_url']} does not exist in duel resources!")
-        p1 = Image.open(DIR / "sprites" / "ERROR.png").convert("RGBA")
-
-    try:
-        p2 = Image.open(DIR / args["poke2_image_url"]).convert("RGBA")
-    except FileNotFoundError:
-        print(f"{args['poke2_image_url']} does not exist in duel resources!")
-        p2 = Image.open(DIR / "sprites" / "ERROR.png").convert("RGBA")
-
-    p1 = sresize(p1)
-    p2 = sresize(p2)
-
-    area = (630, 50)
-    bg.paste(p2, area, p2)
-    if poke2["substitute"] > 0:
-        bg.paste(PRELOADED["sub"], area, mask=PRELOADED["sub"])
-
-    area = (70, 50)
-    bg.paste(p1, area, p1)
-    if poke1["substitute"] > 0:
-        bg.paste(PRELOADED["sub"], area, mask=PRELOADED["sub"])
-
-    hb = HealthBar()
-    bar1 = hb.bar(math.ceil(poke1["hp"]), poke1["starting_hp"])
-    bar2 = hb.bar(math.ceil(poke2["hp"]), poke2["starting_hp"])
-    bg.paste(bar1, (86, 44), mask=bar1)
-    bg.paste(bar2, (707, 44), mask=bar2)
-
-    fp = io.BytesIO()
-    bg.save(fp, "PNG")
-    fp.seek(0)
-
-    return StreamingResponse(fp, media_type="image/png")
+    poke1 = orjson.loads(poke1)
+    poke2 = orjson.loads(poke2)
+    image_format = _image_format(image_format)
+    content = render_battle(
+        poke1_image_url,
+        poke2_image_url,
+        (math.ceil(poke1["hp"]), poke1["starting_hp"]),
+        (math.ceil(poke2["hp"]), poke2["starting_hp"]),
+        poke1["substitute"] > 0,
+        poke2["substitute"] > 0,
+        background_number,
+        weather or None,
+        bool(int(trick_room)),
+        image_format,
+    )
+    return image_response(content, image_format)
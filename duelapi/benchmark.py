@@ -0,0 +1,163 @@
+"""
+Drives a running duel API with the requests a duel makes, and reports requests per second.
+
+Start the API with a single worker, e.g. `uvicorn main:app --port 5864` from app/, then run
+`python benchmark.py`. DUELAPI_URL points at the API (default http://127.0.0.1:5864),
+DUELAPI_BACKGROUNDS is how many bg<n>.png backgrounds it has (default 1),
+DUELAPI_SPRITES is a comma separated list of sprite paths (default every file in
+res/sprites) and DUELAPI_DUELS is how many 12 turn duels to send (default 20).
+Run it against the same worker before and after a change to compare.
+"""
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import orjson
+import requests
+
+URL = os.getenv("DUELAPI_URL", "http://127.0.0.1:5864")
+BACKGROUNDS = int(os.getenv("DUELAPI_BACKGROUNDS", 1))
+SPRITES = (
+    os.getenv("DUELAPI_SPRITES", "").split(",")
+    if os.getenv("DUELAPI_SPRITES")
+    else sorted(
+        f"sprites/{path.name}"
+        for path in (Path(__file__).parent / "res" / "sprites").iterdir()
+        if path.name != "ERROR.png"
+    )
+)
+DUELS = int(os.getenv("DUELAPI_DUELS", 20))
+WEATHERS = ("", "", "", "rain", "h-rain", "hail", "sun", "h-sun", "sandstorm")
+
+
+def duel_turns(rng, duels, turns=12):
+    """The /build params of `duels` duels, turn by turn, as the duel cog sends them."""
+    params = []
+    for _ in range(duels):
+        sprites = [rng.choice(SPRITES), rng.choice(SPRITES)]
+        starting = [rng.randint(150, 400), rng.randint(150, 400)]
+        hp = list(starting)
+        background = rng.randint(1, BACKGROUNDS)
+        weather = rng.choice(WEATHERS)
+        trick_room = 0
+        substitutes = [0, 0]
+        for _ in range(turns):
+            for side in (0, 1):
+                hp[side] -= rng.uniform(0, starting[side] / 5)
+                if hp[side] <= 0:
+                    # The fainted poke is switched out for a fresh one
+                    sprites[side] = rng.choice(SPRITES)
+                    starting[side] = rng.randint(150, 400)
+                    hp[side] = starting[side]
+                    substitutes[side] = 0
+                elif not rng.randrange(10):
+                    substitutes[side] = int(hp[side] / 4)
+            if not rng.randrange(8):
+                weather = rng.choice(WEATHERS)
+            if not rng.randrange(10):
+                trick_room = int(not trick_room)
+            params.append(
+                {
+                    "poke1_image_url": sprites[0],
+                    "poke2_image_url": sprites[1],
+                    "poke1": orjson.dumps(
+                        {"hp": hp[0], "starting_hp": starting[0], "substitute": substitutes[0]}
+                    ).decode(),
+                    "poke2": orjson.dumps(
+                        {"hp": hp[1], "starting_hp": starting[1], "substitute": substitutes[1]}
+                    ).decode(),
+                    "background_number": background,
+                    "weather": weather,
+                    "trick_room": trick_room,
+                }
+            )
+    return params
+
+
+def team_previews(rng, count):
+    """The /build_team_preview params of `count` 6v6 duels."""
+    params = []
+    for _ in range(count):
+        players = [
+            {
+                "name": f"Trainer{rng.randrange(10000)}",
+                "pokemon_info": [
+                    [rng.choice(SPRITES), rng.randint(1, 100)] for _ in range(6)
+                ],
+            }
+            for _ in range(2)
+        ]
+        params.append(
+            {
+                "player1_data": orjson.dumps(players[0]).decode(),
+                "player2_data": orjson.dumps(players[1]).decode(),
+            }
+        )
+    return params
+
+
+def drive(endpoint, params, *, concurrency=3, image_format=None):
+    """
+    POSTs every set of params to `endpoint`, `concurrency` at a time.
+
+    Returns (requests per second, median seconds, p99 seconds, mean response bytes).
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+
+    def send(one):
+        if image_format is not None:
+            one = dict(one, image_format=image_format)
+        started = time.perf_counter()
+        response = session.post(URL + endpoint, params=one)
+        response.raise_for_status()
+        return time.perf_counter() - started, len(response.content)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(send, params))
+    elapsed = time.perf_counter() - started
+    timings = sorted(timing for timing, _ in results)
+    return (
+        len(params) / elapsed,
+        statistics.median(timings),
+        timings[int(len(timings) * 0.99) - 1],
+        sum(size for _, size in results) / len(results),
+    )
+
+
+def benchmark(duels=DUELS, seed=0, image_formats=(None, "webp")):
+    """
+    Runs every scenario against the API, returns {(scenario, format): drive() result}.
+
+    "turns" are unique turn states, "repeats" sends every turn twice like a re-rendered
+    message does. A format of None sends no image_format, which older builds understand.
+    """
+    results = {}
+    for image_format in image_formats:
+        # Fresh states per format, so the output cache of a previous run is not hit
+        rng = random.Random(seed + len(results))
+        turns = duel_turns(rng, duels)
+        previews = team_previews(rng, duels)
+        results["turns", image_format] = drive("/build", turns, image_format=image_format)
+        repeats = [one for one in turns for _ in range(2)]
+        results["repeats", image_format] = drive("/build", repeats, image_format=image_format)
+        results["team preview", image_format] = drive(
+            "/build_team_preview", previews, image_format=image_format
+        )
+    return results
+
+
+if __name__ == "__main__":
+    formats = (None,) if os.getenv("DUELAPI_PNG_ONLY") else (None, "webp")
+    for (scenario, image_format), (rps, median, p99, size) in benchmark(
+        image_formats=formats
+    ).items():
+        print(
+            f"{scenario:>12} {image_format or 'png':>4}: {rps:7.1f} req/s, "
+            f"median {median * 1000:7.2f}ms, p99 {p99 * 1000:7.2f}ms, {size / 1024:6.1f}KiB"
+        )
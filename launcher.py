@@ -278,19 +278,23 @@ class Main:
                 return elem
         raise ValueError("Unknown instance")
 
-    async def acknowledge(self, payload):
+    async def reply(self, payload, output) -> None:
+        # Clusters attach the channel they want replies on, older ones listen on dittobot_clusters
         await self.redis.execute(
             "PUBLISH",
-            "dittobot_clusters",
+            payload.get("reply_to", "dittobot_clusters"),
             orjson.dumps(
                 {
                     "command_id": payload["command_id"],
-                    "output": "ok",
+                    "output": output,
                     "scope": "bot",
                 }
             ),
         )
 
+    async def acknowledge(self, payload):
+        await self.reply(payload, "ok")
+
     async def event_handler(self) -> None:
         try:
             self.redis = await aioredis.create_pool(
@@ -304,7 +308,7 @@ class Main:
         channel = self.redis.pubsub_channels[bytes("dittobot_clusters", "utf-8")]
         while await channel.wait_message():
             try:
-                payload = await channel.get_json(encoding="utf-8")
+                payload = orjson.loads(await channel.get())
             except orjson.JSONDecodeError:
                 continue  # not a valid JSON message
             if payload.get("scope") != "launcher" or not payload.get("action"):
@@ -345,31 +349,14 @@ class Main:
                             "started_at": instance.started_at,
                             "shard_list": instance.shard_list,
                         }
-                    await self.redis.execute(
-                        "PUBLISH",
-                        "dittobot_clusters",
-                        orjson.dumps(
-                            {
-                                "command_id": payload["command_id"],
-                                "output": statuses,
-                                "scope": "bot",
-                            }
-                        ),
-                    )
+                    await self.reply(payload, statuses)
                 elif payload["action"] == "launch_next" and self.launching == id_:
                     self.waiting_for_msg = False
                     instance.pid = args["pid"]
                 elif payload["action"] == "num_processes":
-                    payload = {
-                        "command_id": payload["command_id"],
-                        "scope": "bot",
-                        "output": {
-                            "clusters": len(self.instances),
-                            "shards": self.shard_count,
-                        },
-                    }
-                    await self.redis.execute(
-                        "PUBLISH", "dittobot_clusters", orjson.dumps(payload)
+                    await self.reply(
+                        payload,
+                        {"clusters": len(self.instances), "shards": self.shard_count},
                     )
                 elif payload["action"] == "restartclusters":
                     await self.acknowledge(payload)